@@ -40,6 +40,7 @@ from agent.streaming import StreamingSession, CLIStreamHandler, streaming_manage
 
 # 导入新的SQLite会话管理
 from agent.persistence.sqlite_session_manager import SQLiteSessionManager
+from agent.persistence.async_session_manager import AsyncSessionManager, PersistenceTimeoutError
 
 # 导入CLI多语言文本管理器
 from agent.cli.cli_text_manager import CLITextManager
@@ -95,6 +96,9 @@ class ModernGTPlannerCLI:
 
         # 使用新的SQLite会话管理器
         self.session_manager = SQLiteSessionManager()
+
+        # 异步门面：CLI的所有数据库访问都经过门面，不阻塞事件循环（当前会话也由门面维护）
+        self.async_session_manager = AsyncSessionManager(self.session_manager)
         
         # 流式响应组件
         self.current_streaming_session: Optional[StreamingSession] = None
@@ -166,10 +170,11 @@ class ModernGTPlannerCLI:
         
         return streaming_session
     
-    def _build_agent_context(self) -> Optional[AgentContext]:
-        """构建AgentContext（使用SQLiteSessionManager）"""
-        # 直接使用SQLiteSessionManager的build_agent_context方法
-        return self.session_manager.build_agent_context()
+    async def _build_agent_context(self, session_id: str) -> Optional[AgentContext]:
+        """构建AgentContext（使用SQLiteSessionManager，在数据库线程池中执行，只读取历史token预算内的最近消息）"""
+        return await self.async_session_manager.build_agent_context(
+            session_id, token_budget=self.session_manager.compressor.token_budget
+        )
     
     def show_welcome(self):
         """显示欢迎信息"""
@@ -373,22 +378,21 @@ I want to build an online education platform
         if user_input.startswith('/'):
             return await self._handle_command(user_input)
         
-        # 确保有当前会话
-        if not self.session_manager.current_session_id:
-            session_id = self.session_manager.create_new_session()
-            self.console.print(self.text_manager.get_text("create_new_session", session_id=session_id))
-
         try:
+            # 确保有当前会话，本轮的读写都显式使用这个会话ID
+            session_id = self.async_session_manager.current_session_id
+            if not session_id:
+                session_id = await self.async_session_manager.create_new_session()
+                self.console.print(self.text_manager.get_text("create_new_session", session_id=session_id))
+
             # 构建AgentContext（不包含当前用户输入，避免重复保存）
-            context = self._build_agent_context()
+            context = await self._build_agent_context(session_id)
             if not context:
                 self.console.print(self.text_manager.get_text("context_build_failed"))
                 return True
             
             # 创建流式会话（统一流式架构，总是创建）
-            streaming_session = self._create_streaming_session(
-                self.session_manager.current_session_id
-            )
+            streaming_session = self._create_streaming_session(session_id)
             self.current_streaming_session = streaming_session
 
             # 只有在启用流式显示时才启动流式会话
@@ -401,7 +405,15 @@ I want to build an online education platform
             # 处理结果
             if result.success:
                 # 使用SQLiteSessionManager的update_from_agent_result方法，传递用户输入以避免重复保存
-                update_success = self.session_manager.update_from_agent_result(result, user_input=user_input)
+                try:
+                    update_success = await self.async_session_manager.update_from_agent_result(
+                        result, user_input=user_input, session_id=session_id
+                    )
+                except PersistenceTimeoutError as e:
+                    # 写入已开始时会在后台继续提交，重试会产生重复消息，因此只提示不重试
+                    update_success = e.pending is not None
+                    if update_success:
+                        self.console.print("⚠️ [yellow]保存结果超时，将在后台继续完成[/yellow]")
 
                 if not update_success:
                     self.console.print(self.text_manager.get_text("database_save_warning"))
@@ -456,11 +468,11 @@ I want to build an online education platform
             return False
 
         elif cmd == "sessions":
-            self._show_sessions()
+            await self._show_sessions()
 
         elif cmd == "new":
             title = " ".join(args) if args else None
-            session_id = self.session_manager.create_new_session(title)
+            session_id = await self.async_session_manager.create_new_session(title)
             self.console.print(self.text_manager.get_text("create_new_session", session_id=session_id))
 
         elif cmd == "load":
@@ -468,7 +480,7 @@ I want to build an online education platform
                 self.console.print(self.text_manager.get_text("specify_session_id"))
             else:
                 partial_id = args[0]
-                success, loaded_id, matches = self.session_manager.load_session_by_partial_id(partial_id)
+                success, loaded_id, matches = await self.async_session_manager.load_session_by_partial_id(partial_id)
 
                 if success:
                     self.console.print(self.text_manager.get_text("session_loaded", session_id=loaded_id))
@@ -476,7 +488,7 @@ I want to build an online education platform
                     # 找到多个匹配，显示选择界面
                     selected_session = self._show_session_selection(matches, partial_id)
                     if selected_session:
-                        if self.session_manager.load_session(selected_session["session_id"]):
+                        if await self.async_session_manager.load_session(selected_session["session_id"]):
                             self.console.print(self.text_manager.get_text("session_loaded", session_id=selected_session['session_id']))
                         else:
                             self.console.print(self.text_manager.get_text("session_load_failed", session_id=selected_session['session_id']))
@@ -484,7 +496,7 @@ I want to build an online education platform
                     self.console.print(self.text_manager.get_text("no_session_found", partial_id=partial_id))
 
         elif cmd == "current":
-            self._show_current_session()
+            await self._show_current_session()
 
         elif cmd == "config":
             self._show_config()
@@ -579,9 +591,9 @@ I want to build an online education platform
                 self.console.print("\n❌ [yellow]已取消选择[/yellow]")
                 return None
 
-    def _show_sessions(self):
+    async def _show_sessions(self):
         """显示会话列表"""
-        sessions = self.session_manager.list_sessions()
+        sessions = await self.async_session_manager.list_sessions()
 
         if not sessions:
             self.console.print("📭 [yellow]暂无会话[/yellow]")
@@ -594,7 +606,7 @@ I want to build an online education platform
         table.add_column("消息数", style="yellow")
         table.add_column("状态", style="magenta")
 
-        current_id = self.session_manager.current_session_id
+        current_id = self.async_session_manager.current_session_id
 
         for session in sessions:
             status = "🔸 当前" if session["session_id"] == current_id else ""
@@ -608,19 +620,20 @@ I want to build an online education platform
 
         self.console.print(table)
 
-    def _show_current_session(self):
+    async def _show_current_session(self):
         """显示当前会话信息"""
-        if not self.session_manager.current_session_id:
+        session_id = self.async_session_manager.current_session_id
+        if not session_id:
             self.console.print("❌ [red]当前无活跃会话[/red]")
             return
 
-        session = self.session_manager.get_current_session()
+        session = await self.async_session_manager.get_session(session_id)
         if not session:
             self.console.print("❌ [red]无法获取当前会话信息[/red]")
             return
 
         # 获取统计信息
-        stats = self.session_manager.get_session_statistics()
+        stats = await self.async_session_manager.get_session_statistics(session_id)
 
         info_text = f"""
 ## 📋 当前会话信息
@@ -706,7 +719,7 @@ I want to build an online education platform
         while self.running:
             try:
                 # 显示提示符
-                current_session = self.session_manager.current_session_id or "无会话"
+                current_session = self.async_session_manager.current_session_id or "无会话"
                 prompt_text = f"[bold blue]GTPlanner[/bold blue] ({current_session[:8]}) > "
 
                 user_input = Prompt.ask(prompt_text).strip()
@@ -745,7 +758,7 @@ I want to build an online education platform
         await self._preload_tool_index()
 
         # 创建新会话
-        session_id = self.session_manager.create_new_session("单次需求")
+        session_id = await self.async_session_manager.create_new_session("单次需求")
         self.console.print(self.text_manager.get_text("create_new_session", session_id=session_id))
 
         # 处理需求
@@ -779,12 +792,15 @@ async def main():
 
     # 如果指定了加载会话
     if args.load:
-        if cli.session_manager.load_session(args.load):
+        if await cli.async_session_manager.load_session(args.load):
             cli.console.print(cli.text_manager.get_text("session_loaded", session_id=args.load))
         else:
             cli.console.print(cli.text_manager.get_text("session_load_failed", session_id=args.load))
             return 1
 
+    # 启动后台数据库维护（WAL检查点、增量VACUUM、保留策略）
+    await cli.session_manager.maintenance.start()
+
     try:
         if args.requirement:
             # 直接处理需求
@@ -798,6 +814,9 @@ async def main():
         temp_text_manager = CLITextManager(args.language)
         console.print(temp_text_manager.get_text("cli_run_exception", error=str(e)))
         return 1
+    finally:
+        await cli.session_manager.maintenance.stop()
+        await cli.async_session_manager.close()
 
     return 0
 
@@ -12,6 +12,7 @@
 - 结果格式标准化
 """
 
+import asyncio
 import time
 from typing import Dict, List, Any, Optional
 from pocketflow import AsyncNode
@@ -117,46 +118,14 @@ class NodeSearch(AsyncNode):
         try:
             start_time = time.time()
             
-            # 执行搜索
-            all_results = []
-            
-            for keyword in search_keywords:
-                try:
-                    if self.search_available and self.search_client:
-                        # 使用真实搜索API - 异步调用
-                        results = await self.search_client.search_simple(keyword, count=max_results)
-
-                        # 转换为标准格式
-                        formatted_results = []
-                        for result in results:
-                            formatted_result = {
-                                "title": result.get("title", ""),
-                                "url": result.get("url", ""),
-                                "snippet": result.get("description", ""),
-                                "content": result.get("content", "")
-                            }
-                            formatted_results.append(formatted_result)
-
-                        all_results.extend(formatted_results)
-                    else:
-                        # 搜索API不可用，跳过此关键词
-                        streaming_session = prep_res.get("streaming_session")
-                        if streaming_session:
-                            from agent.streaming import emit_error_from_prep
-                            await emit_error_from_prep(prep_res, f"⚠️ 搜索API不可用，跳过关键词: {keyword}")
-                        continue
-
-                    # 避免请求过于频繁
-                    time.sleep(0.5)
-
-                except Exception as e:
-                    # 单个关键词搜索失败不影响其他关键词
-                    streaming_session = prep_res.get("streaming_session")
-                    if streaming_session:
-                        from agent.streaming import emit_error_from_prep
-                        await emit_error_from_prep(prep_res, f"❌ 搜索失败，关键词 '{keyword}': {str(e)}")
-                    continue
-            
+            # 并发执行各关键词的搜索，请求速率和并发数由全局限流器控制（异步等待，不阻塞事件循环）
+            keyword_results = await asyncio.gather(
+                *(self._search_keyword(keyword, max_results, prep_res) for keyword in search_keywords)
+            )
+
+            # 按关键词顺序合并结果，保证去重和截断的结果稳定
+            all_results = [result for results in keyword_results for result in results]
+
             # 去重
             deduplicated_results = self._deduplicate_results(all_results)
 
@@ -246,6 +215,36 @@ class NodeSearch(AsyncNode):
 
 
     
+    async def _search_keyword(self, keyword: str, max_results: int,
+                              prep_res: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """搜索单个关键词并转换为标准格式（失败时返回空列表，不影响其他关键词）"""
+        from agent.streaming import emit_error_from_prep
+
+        if not (self.search_available and self.search_client):
+            # 搜索API不可用，跳过此关键词
+            if prep_res.get("streaming_session"):
+                await emit_error_from_prep(prep_res, f"⚠️ 搜索API不可用，跳过关键词: {keyword}")
+            return []
+
+        try:
+            # 限流在JinaSearchClient中只作用于上游请求，缓存命中不占用配额
+            results = await self.search_client.search_simple(keyword, count=max_results)
+        except Exception as e:
+            if prep_res.get("streaming_session"):
+                await emit_error_from_prep(prep_res, f"❌ 搜索失败，关键词 '{keyword}': {str(e)}")
+            return []
+
+        # 转换为标准格式
+        return [
+            {
+                "title": result.get("title", ""),
+                "url": result.get("url", ""),
+                "snippet": result.get("description", ""),
+                "content": result.get("content", "")
+            }
+            for result in results
+        ]
+
     def _deduplicate_results(self, results: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
         """去重搜索结果"""
         seen_urls = set()
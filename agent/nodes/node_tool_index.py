@@ -6,21 +6,30 @@
 
 功能描述：
 - 扫描tools目录下的所有工具描述文件
-- 解析YAML格式的工具描述
+- 在线程池/进程池中并行解析YAML格式的工具描述（按文件哈希缓存解析结果）
 - 构建统一的文档结构
-- 调用向量服务进行批量索引
+- 通过共享的异步向量服务客户端进行批量索引（连接复用、超时和熔断）
+- 基于文档内容哈希的增量同步：本地清单记录已索引的文档，只写入新增/变化的工具并删除已移除的工具
+  （向量服务不支持按id删除文档时，工具修改或删除会明确改为全量重建，只新增工具时仍为增量写入）
+- 同时构建进程内本地检索索引，向量服务未配置或不可用时仍可检索工具
 - 支持多种工具类型的扩展
 """
 
 import os
 import glob
-import yaml
-import requests
+import asyncio
+import hashlib
+import json
 import time
 from datetime import datetime
 from typing import Dict, List, Any, Optional
 from pocketflow import AsyncNode
 from utils.config_manager import get_vector_service_config
+from agent.utils.tool_catalog_loader import ToolCatalogLoader
+from agent.utils.local_tool_index import local_tool_index
+from agent.utils.vector_service_client import (
+    get_vector_service_client, VectorServiceError, DeleteNotSupportedError
+)
 from agent.streaming import (
     emit_processing_status,
     emit_error
@@ -43,26 +52,23 @@ class NodeToolIndex(AsyncNode):
         # 从配置文件加载向量服务配置
         vector_config = get_vector_service_config()
         self.vector_service_url = vector_config.get("base_url")
-        self.timeout = vector_config.get("timeout", 30)
-
-        # 检查向量服务URL是否配置
-        if not self.vector_service_url:
-            raise ValueError("向量服务URL未配置，请设置VECTOR_SERVICE_BASE_URL环境变量")
 
         # 从配置文件读取索引相关参数（保留你同事的改进）
         self.index_name = vector_config.get("tools_index_name", "tools_index")
         self.vector_field = vector_config.get("vector_field", "combined_text")
+        self.manifest_path = vector_config.get("tools_index_manifest", ".gtplanner_cache/tool_index_manifest.json")
         
         # 工具目录配置
         self.tools_dir = "tools"
         self.supported_types = ["PYTHON_PACKAGE", "APIS"]
+
+        # 工具目录加载器：解析缓存与索引清单放在同一目录
+        self.catalog_loader = ToolCatalogLoader(
+            cache_path=os.path.join(os.path.dirname(self.manifest_path), "tool_parse_cache.json")
+        )
         
-        # 检查向量服务可用性
-        try:
-            response = requests.get(f"{self.vector_service_url}/health", timeout=5)
-            self.vector_service_available = response.status_code == 200
-        except Exception:
-            self.vector_service_available = False
+        # 共享的异步向量服务客户端（健康状态在执行时按缓存检查，未配置或不可用时只构建本地检索索引）
+        self.vector_client = get_vector_service_client()
             # 注意：初始化阶段无法发送流式事件
     
     async def prep_async(self, shared) -> Dict[str, Any]:
@@ -91,18 +97,23 @@ class NodeToolIndex(AsyncNode):
                     "tools_count": 0
                 }
 
-            # 解析工具文件
-            parsed_tools = []
-            failed_files = []
+            # 并行解析工具文件，再逐个校验
+            loaded_files, failed_files = await self.catalog_loader.load(tool_files)
+            for failed in failed_files:
+                await emit_error(shared, f"❌ 解析工具文件失败: {failed['file']}, 错误: {failed['error']}")
 
-            for file_path in tool_files:
-                try:
-                    tool_data = await self._parse_tool_file(file_path, shared)
-                    if tool_data:
-                        parsed_tools.append(tool_data)
-                except Exception as e:
-                    failed_files.append({"file": file_path, "error": str(e)})
-                    # 错误已在 _parse_tool_file 中发送事件
+            parsed_tools = []
+            for file_path, data in loaded_files:
+                tool_data = await self._validate_tool_data(data, file_path, shared)
+                if tool_data:
+                    parsed_tools.append(tool_data)
+
+            load_stats = self.catalog_loader.last_stats
+            await emit_processing_status(
+                shared,
+                f"📖 加载 {load_stats['files']} 个工具文件: 缓存命中 {load_stats['cache_hits']}, "
+                f"解析 {load_stats['parsed']} ({load_stats['loader']}), 耗时 {load_stats['elapsed_ms']:.0f}ms"
+            )
             
             if not parsed_tools:
                 return {
@@ -151,15 +162,9 @@ class NodeToolIndex(AsyncNode):
         if not parsed_tools:
             raise ValueError("No tools to index")
 
-        if not self.vector_service_available:
-            raise RuntimeError("Vector service is not available")
-
         try:
             start_time = time.time()
-
-            # 每次启动都清除现有索引数据，确保使用最新的工具信息
             shared_for_events = {"streaming_session": prep_res.get("streaming_session")}
-            await self._clear_index(index_name, shared_for_events)
 
             # 构建文档列表
             documents = []
@@ -167,19 +172,73 @@ class NodeToolIndex(AsyncNode):
                 doc = self._build_document(tool)
                 documents.append(doc)
 
-            # 调用向量服务进行批量索引，使用固定的索引名
-            index_result = await self._index_documents(documents, index_name, shared_for_events)
+            # 本地检索索引始终与工具目录保持一致，作为向量服务不可用时的检索后端
+            await asyncio.to_thread(local_tool_index.build, documents)
+            index_version = self._index_version(documents)
+
+            if not await self.vector_client.is_available():
+                await emit_processing_status(
+                    shared_for_events, f"⚠️ 向量服务不可用，仅构建本地检索索引（{len(documents)} 个工具）"
+                )
+                return {
+                    "indexed_count": len(documents),
+                    "index_name": index_name,
+                    "index_time": round((time.time() - start_time) * 1000),
+                    "documents": documents,
+                    "failed_tools": prep_res.get("failed_files", []),
+                    "total_processed": prep_res["tools_count"],
+                    "force_reindex": force_reindex,
+                    "index_version": index_version,
+                    "sync": {
+                        "mode": "local_only",
+                        "index_name": index_name,
+                        "added": len(documents),
+                        "updated": 0,
+                        "removed": 0,
+                        "unchanged": 0,
+                        "vector_writes": 0
+                    }
+                }
+
+            # 清单与当前配置一致时只同步变化的文档，否则（或增量同步失败时）全量重建
+            sync_result = None
+            rebuild_reason = None
+            manifest = None if force_reindex else self._load_manifest()
+            if manifest and self._manifest_matches(manifest, index_name):
+                try:
+                    sync_result = await self._sync_incremental(documents, manifest, shared_for_events)
+                except DeleteNotSupportedError:
+                    rebuild_reason = "delete_not_supported"
+                    await emit_processing_status(
+                        shared_for_events, "ℹ️ 向量服务不支持按id删除文档，工具有修改或删除，全量重建索引"
+                    )
+                except Exception as e:
+                    rebuild_reason = "incremental_failed"
+                    await emit_error(shared_for_events, f"⚠️ 增量同步失败，改为全量重建索引: {str(e)}")
+
+            if sync_result is None:
+                sync_result = await self._rebuild_index(documents, index_name, shared_for_events)
+                if rebuild_reason:
+                    sync_result["reason"] = rebuild_reason
+
+            try:
+                self._save_manifest(index_name, sync_result["index_name"], documents)
+            except OSError as e:
+                # 清单写入失败只影响下次启动的增量同步
+                await emit_error(shared_for_events, f"⚠️ 写入索引清单失败: {str(e)}")
 
             index_time = time.time() - start_time
 
             return {
-                "indexed_count": index_result.get("count", len(documents)),
-                "index_name": index_result.get("index", index_name),  # 返回实际使用的索引名
+                "indexed_count": len(documents),
+                "index_name": sync_result["index_name"],  # 返回实际使用的索引名
                 "index_time": round(index_time * 1000),  # 转换为毫秒
                 "documents": documents,
                 "failed_tools": prep_res.get("failed_files", []),
                 "total_processed": prep_res["tools_count"],
-                "force_reindex": force_reindex
+                "force_reindex": force_reindex,
+                "index_version": index_version,
+                "sync": sync_result
             }
 
         except Exception as e:
@@ -213,7 +272,9 @@ class NodeToolIndex(AsyncNode):
                     "indexed_count": indexed_count,
                     "index_name": index_name,
                     "index_time": exec_res["index_time"],
-                    "total_processed": exec_res["total_processed"]
+                    "total_processed": exec_res["total_processed"],
+                    "index_version": exec_res["index_version"],
+                    "sync": exec_res["sync"]
                 }
                 return "success"
 
@@ -261,6 +322,10 @@ class NodeToolIndex(AsyncNode):
             "total_processed": prep_res.get("tools_count", 0)
         }
     
+    async def _check_vector_service(self) -> bool:
+        """重新探测向量服务是否已配置且健康（忽略健康状态缓存）"""
+        return await self.vector_client.is_available(force=True)
+
     async def _scan_tool_files(self, tools_dir: str, shared: Dict[str, Any]) -> List[str]:
         """扫描工具描述文件"""
         if not os.path.exists(tools_dir):
@@ -268,42 +333,34 @@ class NodeToolIndex(AsyncNode):
             await emit_error(shared, f"⚠️ 工具目录不存在: {tools_dir}")
             return []
 
-        # 扫描所有子目录下的yml文件
+        # 扫描所有子目录下的yml文件（大型目录的扫描也不阻塞事件循环）
         pattern = os.path.join(tools_dir, "**", "*.yml")
-        tool_files = glob.glob(pattern, recursive=True)
+        tool_files = sorted(await asyncio.to_thread(glob.glob, pattern, recursive=True))
 
         # 发送发现文件的状态事件
         await emit_processing_status(shared, f"📁 发现 {len(tool_files)} 个工具描述文件")
         return tool_files
     
-    async def _parse_tool_file(self, file_path: str, shared: Dict[str, Any]) -> Optional[Dict[str, Any]]:
-        """解析单个工具描述文件"""
-        try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                data = yaml.safe_load(f)
-            
-            if not data or not isinstance(data, dict):
-                return None
-            
-            # 验证必需字段
-            required_fields = ['id', 'type', 'summary']
-            for field in required_fields:
-                if field not in data:
-                    # 发送警告事件
-                    await emit_error(shared, f"⚠️ 工具文件缺少必需字段 {field}: {file_path}")
-                    return None
-            
-            # 添加文件路径信息
-            data['file_path'] = file_path
-            data['file_name'] = os.path.basename(file_path)
-            
-            return data
-            
-        except Exception as e:
-            # 发送错误事件
-            await emit_error(shared, f"❌ 解析工具文件失败: {file_path}, 错误: {e}")
+    async def _validate_tool_data(self, data: Any, file_path: str,
+                                  shared: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """校验解析后的工具描述并补充文件信息"""
+        if not data or not isinstance(data, dict):
             return None
 
+        # 验证必需字段
+        required_fields = ['id', 'type', 'summary']
+        for field in required_fields:
+            if field not in data:
+                # 发送警告事件
+                await emit_error(shared, f"⚠️ 工具文件缺少必需字段 {field}: {file_path}")
+                return None
+
+        # 添加文件路径信息
+        data['file_path'] = file_path
+        data['file_name'] = os.path.basename(file_path)
+
+        return data
+
     def _build_document(self, tool_data: Dict[str, Any]) -> Dict[str, Any]:
         """构建用于索引的文档结构"""
         # 基础字段
@@ -376,17 +433,143 @@ class NodeToolIndex(AsyncNode):
 
         return doc
 
+    async def _rebuild_index(self, documents: List[Dict[str, Any]], index_name: str,
+                             shared: Dict[str, Any]) -> Dict[str, Any]:
+        """全量重建：清除索引后重新索引全部文档"""
+        await self._clear_index(index_name, shared)
+        index_result = await self._index_documents(documents, index_name, shared)
+
+        return {
+            "mode": "full",
+            "index_name": index_result.get("index", index_name),
+            "added": len(documents),
+            "updated": 0,
+            "removed": 0,
+            "unchanged": 0,
+            "vector_writes": 2
+        }
+
+    async def _sync_incremental(self, documents: List[Dict[str, Any]], manifest: Dict[str, Any],
+                                shared: Dict[str, Any]) -> Dict[str, Any]:
+        """增量同步：删除已移除和变化的文档，再索引新增和变化的文档"""
+        index_name = manifest["actual_index_name"]
+        indexed = manifest["documents"]
+        current_ids = {doc["id"] for doc in documents}
+
+        added = [doc for doc in documents if doc["id"] not in indexed]
+        updated = [
+            doc for doc in documents
+            if doc["id"] in indexed and indexed[doc["id"]]["hash"] != self._document_hash(doc)
+        ]
+        removed = [tool_id for tool_id in indexed if tool_id not in current_ids]
+
+        vector_writes = 0
+        # 变化的文档先删除再写入，不依赖向量服务按id覆盖的行为
+        stale_ids = removed + [doc["id"] for doc in updated]
+        if stale_ids:
+            # 删除在写入之前，服务不支持删除时索引保持不变，由调用方全量重建
+            await self._delete_documents(stale_ids, index_name, shared)
+            vector_writes += 1
+
+        if added or updated:
+            index_result = await self._index_documents(added + updated, index_name, shared)
+            vector_writes += 1
+            if index_result.get("index", index_name) != index_name:
+                raise RuntimeError(f"索引 {index_name} 不存在")
+
+        unchanged = len(documents) - len(added) - len(updated)
+        await emit_processing_status(
+            shared,
+            f"🔁 增量同步索引 {index_name}: 新增 {len(added)}, 更新 {len(updated)}, "
+            f"删除 {len(removed)}, 未变化 {unchanged}"
+        )
+
+        return {
+            "mode": "incremental",
+            "index_name": index_name,
+            "added": len(added),
+            "updated": len(updated),
+            "removed": len(removed),
+            "unchanged": unchanged,
+            "vector_writes": vector_writes
+        }
+
+    def _document_hash(self, doc: Dict[str, Any]) -> str:
+        """文档内容哈希（不含时间戳字段）"""
+        content = {k: v for k, v in doc.items() if k not in ("created_at", "updated_at")}
+        return hashlib.sha256(
+            json.dumps(content, ensure_ascii=False, sort_keys=True, default=str).encode("utf-8")
+        ).hexdigest()
+
+    def _index_version(self, documents: List[Dict[str, Any]]) -> str:
+        """索引版本：全部文档内容哈希的组合哈希，任何工具新增、修改或删除都会改变版本"""
+        digest = hashlib.sha256()
+        for doc_id, doc_hash in sorted((doc["id"], self._document_hash(doc)) for doc in documents):
+            digest.update(f"{doc_id}:{doc_hash}\n".encode("utf-8"))
+        return digest.hexdigest()[:16]
+
+    def _load_manifest(self) -> Optional[Dict[str, Any]]:
+        """读取本地索引清单，不存在或损坏时返回None"""
+        try:
+            with open(self.manifest_path, 'r', encoding='utf-8') as f:
+                manifest = json.load(f)
+            return manifest if isinstance(manifest.get("documents"), dict) else None
+        except (OSError, ValueError, AttributeError):
+            return None
+
+    def _manifest_matches(self, manifest: Dict[str, Any], index_name: str) -> bool:
+        """清单是否对应当前的向量服务、索引和向量字段"""
+        return (manifest.get("vector_service_url") == self.vector_service_url and
+                manifest.get("index_name") == index_name and
+                manifest.get("vector_field") == self.vector_field and
+                bool(manifest.get("actual_index_name")))
+
+    def _save_manifest(self, index_name: str, actual_index_name: str,
+                       documents: List[Dict[str, Any]]) -> None:
+        """写入本地索引清单（先写临时文件再替换，避免中断时留下不完整的清单）"""
+        manifest = {
+            "vector_service_url": self.vector_service_url,
+            "index_name": index_name,
+            "actual_index_name": actual_index_name,
+            "vector_field": self.vector_field,
+            "updated_at": datetime.now().isoformat(),
+            "documents": {
+                doc["id"]: {"hash": self._document_hash(doc), "file_path": doc.get("file_path", "")}
+                for doc in documents
+            }
+        }
+
+        manifest_dir = os.path.dirname(self.manifest_path)
+        if manifest_dir:
+            os.makedirs(manifest_dir, exist_ok=True)
+        tmp_path = f"{self.manifest_path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(manifest, f, ensure_ascii=False, indent=2)
+        os.replace(tmp_path, self.manifest_path)
+
+    async def _delete_documents(self, document_ids: List[str], index_name: str,
+                                shared: Dict[str, Any]) -> None:
+        """从索引中删除指定文档（服务不支持按id删除时抛出DeleteNotSupportedError）"""
+        try:
+            await emit_processing_status(shared, f"🗑️ 从索引 {index_name} 删除 {len(document_ids)} 个文档")
+
+            response = await self.vector_client.delete_documents(index_name, document_ids)
+
+            if response.status_code != 200:
+                raise RuntimeError(f"删除文档失败: {response.status_code}, {response.text}")
+
+        except DeleteNotSupportedError:
+            raise
+        except VectorServiceError as e:
+            raise RuntimeError(f"调用删除文档API失败: {str(e)}")
+
     async def _clear_index(self, index_name: str, shared: Dict[str, Any]) -> None:
         """清除指定索引的所有数据"""
         try:
             await emit_processing_status(shared, f"🗑️ 清除索引数据: {index_name}")
 
             # 调用向量服务清除索引
-            response = requests.delete(
-                f"{self.vector_service_url}/index/{index_name}/clear",
-                timeout=self.timeout,
-                headers={"accept": "application/json"}
-            )
+            response = await self.vector_client.clear_index(index_name)
 
             if response.status_code == 200:
                 await emit_processing_status(shared, f"✅ 成功清除索引 {index_name} 的数据")
@@ -399,7 +582,7 @@ class NodeToolIndex(AsyncNode):
                     await emit_error(shared, f"⚠️ {error_msg}")
                     # 不抛出异常，因为清除失败不应该阻止后续的索引操作
 
-        except requests.exceptions.RequestException as e:
+        except VectorServiceError as e:
             error_msg = f"调用清除索引API失败: {str(e)}"
             await emit_error(shared, f"⚠️ {error_msg}")
             # 不抛出异常，因为清除失败不应该阻止后续的索引操作
@@ -408,20 +591,9 @@ class NodeToolIndex(AsyncNode):
         """调用向量服务进行文档索引"""
         try:
             # 先尝试使用指定的索引名
-            request_data = {
-                "documents": documents,
-                "vector_field": self.vector_field,
-                "index": index_name
-            }
-
             await emit_processing_status(shared, f"📝 尝试使用索引 {index_name} 进行索引...")
 
-            response = requests.post(
-                f"{self.vector_service_url}/documents",
-                json=request_data,
-                timeout=self.timeout,
-                headers={"Content-Type": "application/json"}
-            )
+            response = await self.vector_client.index_documents(documents, self.vector_field, index_name)
 
             if response.status_code == 200:
                 result = response.json()
@@ -433,18 +605,7 @@ class NodeToolIndex(AsyncNode):
                 await emit_processing_status(shared, f"📝 索引 {index_name} 不存在，让服务自动创建新索引...")
 
                 # 不指定索引名，让服务自动创建
-                auto_request_data = {
-                    "documents": documents,
-                    "vector_field": self.vector_field
-                    # 不指定 index
-                }
-
-                response = requests.post(
-                    f"{self.vector_service_url}/documents",
-                    json=auto_request_data,
-                    timeout=self.timeout,
-                    headers={"Content-Type": "application/json"}
-                )
+                response = await self.vector_client.index_documents(documents, self.vector_field)
 
                 if response.status_code == 200:
                     result = response.json()
@@ -462,7 +623,7 @@ class NodeToolIndex(AsyncNode):
                 await emit_error(shared, f"❌ {error_msg}")
                 raise RuntimeError(error_msg)
 
-        except requests.exceptions.RequestException as e:
+        except VectorServiceError as e:
             error_msg = f"调用向量服务失败: {str(e)}"
             await emit_error(shared, f"❌ {error_msg}")
             raise RuntimeError(error_msg)
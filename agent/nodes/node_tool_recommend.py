@@ -6,20 +6,24 @@
 
 功能描述：
 - 接收用户查询文本
-- 调用向量服务进行相似度检索
+- 通过共享的异步向量服务客户端进行相似度检索（服务未配置、不可用或检索失败时使用本地检索索引）
 - 返回最相关的工具列表
 - 支持结果过滤和排序
-- 可选的大模型重排序
+- 可选的大模型重排序（本地重排可信时跳过大模型）
+- 检索和大模型筛选结果按查询与索引版本缓存
 """
 
 import time
-import requests
 import asyncio
 import json
 from typing import Dict, List, Any, Optional
 from pocketflow import AsyncNode
-from utils.openai_client import OpenAIClient
+from utils.openai_client import get_openai_client
 from utils.config_manager import get_vector_service_config
+from agent.utils.local_tool_index import local_tool_index
+from agent.utils.vector_service_client import get_vector_service_client, VectorServiceError
+from agent.utils.tool_recommend_cache import tool_recommend_cache
+from agent.utils.tool_reranker import tool_reranker
 from agent.streaming import (
     emit_processing_status,
     emit_error
@@ -45,11 +49,6 @@ class NodeToolRecommend(AsyncNode):
         # 从配置文件加载向量服务配置
         vector_config = get_vector_service_config()
         self.vector_service_url = vector_config.get("base_url")
-        self.timeout = vector_config.get("timeout", 30)
-
-        # 检查向量服务URL是否配置
-        if not self.vector_service_url:
-            raise ValueError("向量服务URL未配置，请设置VECTOR_SERVICE_BASE_URL环境变量")
 
         # 从配置文件读取索引相关参数
         self.index_name = vector_config.get("tools_index_name", "tools_index")
@@ -60,17 +59,14 @@ class NodeToolRecommend(AsyncNode):
         self.min_score_threshold = 0.1  # 最小相似度阈值
         self.use_llm_filter = True  # 是否使用大模型筛选
         self.llm_candidate_count = 10  # 传给大模型的候选工具数量
+        # 重排方式：llm 总是使用大模型筛选；local 只使用本地重排；gate 本地重排可信时跳过大模型
+        self.rerank_mode = "gate"
 
-        # 初始化OpenAI客户端
-        self.openai_client = OpenAIClient()
+        # 复用全局OpenAI客户端（节点每次推荐都会新建，避免重复加载配置）
+        self.openai_client = get_openai_client()
 
-        # 检查向量服务可用性
-        try:
-            response = requests.get(f"{self.vector_service_url}/health", timeout=5)
-            self.vector_service_available = response.status_code == 200
-        except Exception:
-            self.vector_service_available = False
-            print("⚠️ 向量服务不可用")
+        # 共享的异步向量服务客户端（健康状态在检索时按缓存检查，不可用时使用本地检索索引）
+        self.vector_client = get_vector_service_client()
 
     async def prep_async(self, shared) -> Dict[str, Any]:
         """
@@ -90,6 +86,7 @@ class NodeToolRecommend(AsyncNode):
             tool_types = shared.get("tool_types", [])  # 可选的工具类型过滤
             min_score = shared.get("min_score", self.min_score_threshold)
             use_llm_filter = shared.get("use_llm_filter", self.use_llm_filter)  # 是否使用大模型筛选
+            rerank_mode = shared.get("rerank_mode", self.rerank_mode)
             language = shared.get("language")  # 获取语言设置
 
             # 如果没有提供查询，尝试从其他字段提取
@@ -116,6 +113,7 @@ class NodeToolRecommend(AsyncNode):
                 "tool_types": tool_types,
                 "min_score": min_score,
                 "use_llm_filter": use_llm_filter,
+                "rerank_mode": rerank_mode,
                 "language": language,  # 添加语言设置
                 "streaming_session": shared.get("streaming_session")
             }
@@ -147,14 +145,12 @@ class NodeToolRecommend(AsyncNode):
         tool_types = prep_res["tool_types"]
         min_score = prep_res["min_score"]
         use_llm_filter = prep_res["use_llm_filter"]
+        rerank_mode = prep_res.get("rerank_mode", self.rerank_mode)
         language = prep_res["language"]
 
         if not query:
             raise ValueError("Empty query for tool recommendation")
 
-        if not self.vector_service_available:
-            raise RuntimeError("Vector service is not available")
-
         try:
             start_time = time.time()
 
@@ -162,7 +158,26 @@ class NodeToolRecommend(AsyncNode):
             search_top_k = max(top_k, self.llm_candidate_count) if use_llm_filter else top_k
             # 从 prep_res 中获取 streaming_session 用于事件发送
             shared_for_events = {"streaming_session": prep_res.get("streaming_session")}
-            search_results = await self._search_tools(query, index_name, search_top_k, shared_for_events)
+
+            # 查询缓存按索引版本区分，工具索引变化后自动失效
+            from agent.utils.tool_index_manager import get_tool_index_version
+            index_version = get_tool_index_version()
+            cache_info = {"index_version": index_version, "retrieval_hit": False, "rerank_hit": False}
+
+            search_results = tool_recommend_cache.get_retrieval(query, index_name, index_version, search_top_k)
+            if search_results is not None:
+                cache_info["retrieval_hit"] = True
+                await emit_processing_status(shared_for_events, f"⚡ 命中检索缓存: {search_results.get('total', 0)} 个相关工具")
+            elif await self.vector_client.is_available():
+                try:
+                    search_results = await self._search_tools(query, index_name, search_top_k, shared_for_events)
+                    tool_recommend_cache.put_retrieval(query, index_name, index_version, search_top_k, search_results)
+                except Exception as e:
+                    await emit_error(shared_for_events, f"⚠️ 向量检索失败，改用本地检索索引: {str(e)}")
+
+            # 本地检索只需几毫秒，不缓存（向量服务恢复后可以立即使用向量检索结果）
+            if search_results is None:
+                search_results = await self._search_local(query, search_top_k, shared_for_events)
 
             # 过滤和处理结果
             filtered_results = self._filter_results(
@@ -174,15 +189,45 @@ class NodeToolRecommend(AsyncNode):
             # 后处理结果
             processed_results = self._process_results(filtered_results)
 
-            # 使用大模型筛选（如果启用）
+            # 使用大模型筛选（如果启用）；gate模式下先本地重排，排序足够可靠时跳过大模型
+            rerank_info = {"mode": rerank_mode if use_llm_filter else "none", "llm_invoked": False}
             if use_llm_filter and len(processed_results) > 1:
-                try:
-                    llm_selected_results = await self._llm_filter_tools(query, processed_results, top_k, language, shared_for_events)
-                    processed_results = llm_selected_results
-                    await emit_processing_status(shared_for_events, f"✅ 大模型筛选完成，返回 {len(processed_results)} 个工具")
-                except Exception as e:
-                    await emit_error(shared_for_events, f"⚠️ 大模型筛选失败，使用原始排序: {str(e)}")
-                    processed_results = processed_results[:top_k]
+                candidates = processed_results
+                if rerank_mode in ("local", "gate"):
+                    rerank_result = tool_reranker.rerank(query, processed_results)
+                    candidates = rerank_result.tools
+                    rerank_info.update({
+                        "confident": rerank_result.confident,
+                        "top_score": rerank_result.top_score,
+                        "margin": rerank_result.margin
+                    })
+
+                if rerank_mode == "local" or (rerank_mode == "gate" and rerank_info["confident"]):
+                    processed_results = tool_reranker.select(rerank_result, top_k)
+                    await emit_processing_status(
+                        shared_for_events,
+                        f"⚡ 本地重排完成（分差 {rerank_result.margin:.2f}），跳过大模型筛选，返回 {len(processed_results)} 个工具"
+                    )
+                else:
+                    try:
+                        llm_selected_results = tool_recommend_cache.get_rerank(
+                            query, index_version, top_k, language, candidates
+                        )
+                        if llm_selected_results is not None:
+                            cache_info["rerank_hit"] = True
+                        else:
+                            rerank_info["llm_invoked"] = True
+                            llm_selected_results = await self._llm_filter_tools(query, candidates, top_k, language, shared_for_events)
+                            # 大模型调用或解析失败时同样返回空列表，因此只缓存非空的筛选结果
+                            if llm_selected_results:
+                                tool_recommend_cache.put_rerank(
+                                    query, index_version, top_k, language, candidates, llm_selected_results
+                                )
+                        processed_results = llm_selected_results
+                        await emit_processing_status(shared_for_events, f"✅ 大模型筛选完成，返回 {len(processed_results)} 个工具")
+                    except Exception as e:
+                        await emit_error(shared_for_events, f"⚠️ 大模型筛选失败，使用原始排序: {str(e)}")
+                        processed_results = candidates[:top_k]
             else:
                 processed_results = processed_results[:top_k]
 
@@ -198,7 +243,10 @@ class NodeToolRecommend(AsyncNode):
                     "index_name": index_name,
                     "top_k": top_k,
                     "min_score": min_score,
-                    "tool_types_filter": tool_types
+                    "tool_types_filter": tool_types,
+                    "backend": search_results.get("backend", "vector_service"),
+                    "cache": cache_info,
+                    "rerank": rerank_info
                 }
             }
 
@@ -347,21 +395,8 @@ class NodeToolRecommend(AsyncNode):
     async def _search_tools(self, query: str, index_name: str, top_k: int, shared: Dict[str, Any]) -> Dict[str, Any]:
         """调用向量服务进行工具检索"""
         try:
-            # 构建搜索请求
-            search_request = {
-                "query": query,
-                "vector_field": self.vector_field,
-                "index": index_name,
-                "top_k": top_k
-            }
-
             # 调用向量服务
-            response = requests.post(
-                f"{self.vector_service_url}/search",
-                json=search_request,
-                timeout=self.timeout,
-                headers={"Content-Type": "application/json"}
-            )
+            response = await self.vector_client.search(query, index_name, self.vector_field, top_k)
 
             if response.status_code == 200:
                 result = response.json()
@@ -372,11 +407,24 @@ class NodeToolRecommend(AsyncNode):
                 await emit_error(shared, f"❌ {error_msg}")
                 raise RuntimeError(error_msg)
 
-        except requests.exceptions.RequestException as e:
+        except VectorServiceError as e:
             error_msg = f"调用向量服务失败: {str(e)}"
             print(f"❌ {error_msg}")
             raise RuntimeError(error_msg)
 
+    async def _search_local(self, query: str, top_k: int, shared: Dict[str, Any]) -> Dict[str, Any]:
+        """使用进程内本地索引检索工具（索引为空时先同步工具索引）"""
+        if not local_tool_index.is_ready():
+            from agent.utils.tool_index_manager import ensure_tool_index
+            await ensure_tool_index(shared=shared)
+
+        if not local_tool_index.is_ready():
+            raise RuntimeError("向量服务不可用，且本地检索索引为空")
+
+        result = local_tool_index.search(query, top_k)
+        await emit_processing_status(shared, f"✅ 本地索引检索到 {result['total']} 个相关工具")
+        return result
+
     def _filter_results(self, search_results: Dict[str, Any],
                        tool_types: List[str] = None,
                        min_score: float = 0.0) -> List[Dict[str, Any]]:
@@ -6,17 +6,21 @@ URL解析节点 (Node_URL)
 
 功能描述：
 - URL有效性验证
-- 网页内容抓取
+- 网页内容抓取（子流程模式下并发抓取前N个搜索结果，按截止时间和页面评分选择最佳页面）
 - HTML解析和清理
 - 文本提取和结构化
 - 元数据提取和验证
 """
 
+import asyncio
+import contextlib
 import time
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Optional, Tuple
 from urllib.parse import urlparse
 from pocketflow import AsyncNode
 from ..utils.URL_to_Markdown import JinaWebClient
+from ..utils.local_tool_index import tokenize
+from utils.config_manager import get_research_config
 from agent.streaming import (
     emit_processing_status,
     emit_error
@@ -48,6 +52,12 @@ class NodeURL(AsyncNode):
 
         # 配置
         self.max_content_length = 10000  # 默认最大内容长度
+        research_config = get_research_config()
+        self.max_urls = research_config.get("url_fetch_count", 3)              # 并发抓取的搜索结果数量
+        self.url_timeout = research_config.get("url_timeout", 8)               # 单个URL的抓取时限（秒）
+        self.url_deadline = research_config.get("url_deadline", 12)            # 整个抓取阶段的截止时间（秒）
+        self.good_enough_score = research_config.get("url_good_enough_score", 0.7)  # 达到该分数立即采用
+        self.min_useful_length = 1500  # 页面内容达到该长度时长度得分为满分
     
     async def prep_async(self, shared) -> Dict[str, Any]:
         """
@@ -65,27 +75,42 @@ class NodeURL(AsyncNode):
             extraction_type = shared.get("extraction_type", "full")
             target_selectors = shared.get("target_selectors", [])
             max_content_length = shared.get("max_content_length", self.max_content_length)
+            max_urls = shared.get("max_urls", self.max_urls)
 
-            # 如果没有URL参数，尝试从共享变量中获取（子流程模式）
-            if not url and isinstance(shared, dict):
-                first_search_result = shared.get("first_search_result", {})
-                url = first_search_result.get("url", "")
+            if url:
+                candidates = [{"url": url, "title": ""}]
+            else:
+                # 子流程模式：从搜索结果中取前N个作为候选
+                candidates = list(shared.get("all_search_results") or [])
+                if not candidates and shared.get("first_search_result"):
+                    candidates = [shared["first_search_result"]]
+
+            # 验证URL格式并去重
+            valid_candidates = []
+            seen_urls = set()
+            for candidate in candidates:
+                candidate_url = candidate.get("url", "")
+                parsed_url = urlparse(candidate_url)
+                if parsed_url.scheme and parsed_url.netloc and candidate_url not in seen_urls:
+                    seen_urls.add(candidate_url)
+                    valid_candidates.append({"url": candidate_url, "title": candidate.get("title", "")})
+                if len(valid_candidates) >= max(1, max_urls):
+                    break
 
-            # 验证URL
-            if not url:
+            if not candidates:
                 return self._create_error_result("No URL provided", "", extraction_type)
-            
-            # URL格式验证
-            parsed_url = urlparse(url)
-            if not parsed_url.scheme or not parsed_url.netloc:
-                return self._create_error_result(f"Invalid URL format: {url}", url, extraction_type)
+            if not valid_candidates:
+                first_url = candidates[0].get("url", "")
+                return self._create_error_result(f"Invalid URL format: {first_url}", first_url, extraction_type)
             
             return {
-                "url": url,
+                "url": valid_candidates[0]["url"],
+                "candidates": valid_candidates,
+                "keyword": shared.get("current_keyword", ""),
                 "extraction_type": extraction_type,
                 "target_selectors": target_selectors,
                 "max_content_length": max_content_length,
-                "parsed_url": parsed_url
+                "parsed_url": urlparse(valid_candidates[0]["url"])
             }
             
         except Exception as e:
@@ -106,13 +131,17 @@ class NodeURL(AsyncNode):
         
         url = prep_res["url"]
         max_content_length = prep_res["max_content_length"]
+        candidates = prep_res.get("candidates") or [{"url": url, "title": ""}]
         
         try:
             start_time = time.time()
 
             if self.client_available and self.web_client:
-                # 使用Jina Web API - 异步调用
-                page_info = await self.web_client.get_page_info(url)
+                # 使用Jina Web API - 并发抓取候选URL，按评分和截止时间选择页面
+                page_info, fetch_stats = await self._fetch_best_page(
+                    candidates, prep_res.get("keyword", ""), max_content_length
+                )
+                url = page_info.get("source_url", url)
 
                 # 处理内容长度限制
                 content = page_info.get("content", "")
@@ -124,7 +153,8 @@ class NodeURL(AsyncNode):
                     "author": "",
                     "publish_date": "",
                     "tags": [],
-                    "description": page_info.get("description", "")
+                    "description": page_info.get("description", ""),
+                    "fetch_stats": fetch_stats
                 }
 
                 processing_time = time.time() - start_time
@@ -146,6 +176,80 @@ class NodeURL(AsyncNode):
         except Exception as e:
             raise RuntimeError(f"URL parsing failed: {str(e)}")
     
+    async def _fetch_best_page(self, candidates: List[Dict[str, str]], keyword: str,
+                               max_content_length: int) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+        """
+        并发抓取候选URL并选择最佳页面
+
+        - 每个URL有独立的抓取时限，整个阶段有统一的截止时间
+        - 某个页面评分达到 good_enough_score 时立即采用，取消其余抓取
+        - 否则在全部完成或到达截止时间时，采用已完成页面中评分最高的一个
+
+        Returns:
+            (页面信息（带source_url和score）, 抓取统计)
+        """
+        urls = [candidate["url"] for candidate in candidates]
+        ranks = {url: rank for rank, url in enumerate(urls)}
+        best = None
+        errors = []
+        completed = 0
+        early_cutoff = False
+
+        # iter_convert按完成顺序返回页面；提前停止或到达截止时间时关闭迭代器，取消其余抓取
+        pages = self.web_client.iter_convert(urls, concurrency=len(urls), timeout=self.url_timeout)
+        try:
+            async with contextlib.aclosing(pages), asyncio.timeout(self.url_deadline):
+                async for page_url, page_info in pages:
+                    if page_info.get("error"):
+                        errors.append(page_info["error"])
+                        continue
+                    completed += 1
+                    page_info["source_url"] = page_url
+                    page_info["score"] = self._score_page(
+                        page_info, keyword, ranks[page_url], len(candidates), max_content_length
+                    )
+                    if best is None or page_info["score"] > best["score"]:
+                        best = page_info
+                    if best["score"] >= self.good_enough_score:
+                        early_cutoff = True
+                        break
+        except TimeoutError:
+            pass
+
+        fetch_stats = {
+            "candidates": len(candidates),
+            "completed": completed,
+            "failed": len(errors),
+            "cancelled": len(candidates) - completed - len(errors),
+            "early_cutoff": early_cutoff,
+            "selected_rank": ranks[best["source_url"]] if best else None,
+            "selected_score": best["score"] if best else 0.0
+        }
+
+        if best is None:
+            reason = "; ".join(errors) if errors else f"no page fetched within {self.url_deadline}s"
+            raise RuntimeError(f"All {len(candidates)} URL fetches failed: {reason}")
+        return best, fetch_stats
+
+    def _score_page(self, page_info: Dict[str, Any], keyword: str, rank: int, total: int,
+                    max_content_length: int) -> float:
+        """
+        页面评分（0~1）：关键词覆盖率、内容长度和搜索排名
+
+        只统计会被保留的内容（max_content_length以内），空页面得0分
+        """
+        content = (page_info.get("content") or "")[:max_content_length]
+        if not content.strip():
+            return 0.0
+
+        terms = set(tokenize(keyword))
+        text_terms = set(tokenize(f"{page_info.get('title', '')} {content}"))
+        coverage = len(terms & text_terms) / len(terms) if terms else 1.0
+        length_score = min(len(content) / self.min_useful_length, 1.0)
+        rank_score = 1 - rank / total if total else 1.0
+
+        return round(0.6 * coverage + 0.3 * length_score + 0.1 * rank_score, 4)
+    
     async def post_async(self, shared, prep_res: Dict[str, Any], exec_res: Dict[str, Any]) -> str:
         """
         后处理阶段：将解析结果存储到共享状态
@@ -174,6 +278,8 @@ class NodeURL(AsyncNode):
             shared["url_content"] = exec_res["content"]
             shared["url_title"] = exec_res["title"]
             shared["url_metadata"] = exec_res.get("metadata", {})
+            # 实际采用的页面（可能不是第一个搜索结果）
+            shared["url_source"] = {"url": exec_res["url"], "title": exec_res["title"]}
 
             # 创建内容记录
             content_record = {
@@ -0,0 +1,331 @@
+"""
+异步会话管理器
+
+为SQLiteSessionManager提供异步门面，供CLI和FastAPI等协程调用方使用：
+1. 所有数据库操作在专用线程池中执行，不阻塞事件循环（以及其他会话的SSE流）
+2. 通过信号量限制并发操作数（含排队中的操作），避免线程池无限积压
+3. 每个操作带超时，超时抛出PersistenceTimeoutError
+4. 统计调用次数、超时、错误和排队等待时间
+5. 当前会话ID由门面在事件循环中维护，所有会话相关操作显式传递session_id，
+   工作线程不读写共享的current_session_id
+
+注意：超时只表示调用方不再等待。已开始执行的写操作会在线程中继续完成并提交，
+调用方不应直接重试非幂等写入（会产生重复消息），可通过PersistenceTimeoutError.pending
+等待最终结果。
+"""
+
+import asyncio
+import functools
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Any, Optional, Tuple, Callable, AsyncIterator
+
+from .sqlite_session_manager import SQLiteSessionManager
+from agent.context_types import AgentContext
+
+
+class PersistenceTimeoutError(Exception):
+    """
+    持久化操作超时错误
+
+    pending为None表示操作仍在排队、没有执行；否则操作已在线程中开始，
+    可能在超时之后仍然提交成功，可以await pending获取最终结果。
+    """
+
+    def __init__(self, message: str, pending: Optional[asyncio.Future] = None):
+        super().__init__(message)
+        self.pending = pending
+
+
+class AsyncSessionManager:
+    """SQLiteSessionManager的异步门面"""
+
+    def __init__(self, session_manager: Optional[SQLiteSessionManager] = None,
+                 db_path: str = "gtplanner_conversations.db",
+                 max_concurrency: int = 4, timeout: float = 10.0):
+        """
+        初始化异步会话管理器
+
+        Args:
+            session_manager: 被包装的同步会话管理器，为None时按db_path创建
+            db_path: 数据库文件路径（仅在未提供session_manager时使用）
+            max_concurrency: 最大并发操作数（同时也是工作线程数）
+            timeout: 单个操作的默认超时（秒），None表示不限制
+        """
+        self.sync = session_manager or SQLiteSessionManager(db_path)
+        self.max_concurrency = max_concurrency
+        self.timeout = timeout
+
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_concurrency, thread_name_prefix="gtplanner-db"
+        )
+        self._semaphore: Optional[asyncio.Semaphore] = None
+
+        # 当前会话ID（只在事件循环中读写）
+        self.current_session_id: Optional[str] = self.sync.current_session_id
+
+        # 统计信息
+        self.stats = {
+            "calls": 0,
+            "timeouts": 0,
+            "errors": 0,
+            "in_flight": 0,
+            "max_in_flight": 0,
+            "total_wait_ms": 0.0,
+            "max_wait_ms": 0.0,
+            "total_run_ms": 0.0
+        }
+
+    async def run(self, func: Callable, *args, timeout: Optional[float] = None, **kwargs) -> Any:
+        """
+        在数据库线程池中执行同步函数
+
+        超时后协程立即返回，但已开始的数据库操作会在线程中执行完毕（写操作照常提交），
+        PersistenceTimeoutError.pending即该操作的结果；
+        并发名额在线程真正结束后才释放，保证线程池积压不超过max_concurrency。
+
+        Args:
+            func: 同步函数
+            *args: 位置参数
+            timeout: 超时（秒），为None时使用默认超时
+            **kwargs: 关键字参数
+
+        Returns:
+            函数返回值
+        """
+        loop = asyncio.get_running_loop()
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+
+        effective_timeout = self.timeout if timeout is None else timeout
+        deadline = None if effective_timeout is None else loop.time() + effective_timeout
+        name = getattr(func, "__name__", repr(func))
+
+        self.stats["calls"] += 1
+        wait_start = time.perf_counter()
+
+        try:
+            await asyncio.wait_for(self._semaphore.acquire(), effective_timeout)
+        except asyncio.TimeoutError:
+            self.stats["timeouts"] += 1
+            raise PersistenceTimeoutError(f"持久化操作排队超时: {name}")
+
+        wait_ms = (time.perf_counter() - wait_start) * 1000
+        self.stats["total_wait_ms"] += wait_ms
+        self.stats["max_wait_ms"] = max(self.stats["max_wait_ms"], wait_ms)
+        self.stats["in_flight"] += 1
+        self.stats["max_in_flight"] = max(self.stats["max_in_flight"], self.stats["in_flight"])
+
+        run_start = time.perf_counter()
+        future = loop.run_in_executor(self._executor, functools.partial(func, *args, **kwargs))
+        future.add_done_callback(lambda _: self._release(run_start))
+
+        remaining = None if deadline is None else max(deadline - loop.time(), 0)
+        try:
+            return await asyncio.wait_for(asyncio.shield(future), remaining)
+        except asyncio.TimeoutError:
+            self.stats["timeouts"] += 1
+            raise PersistenceTimeoutError(f"持久化操作超时（可能仍会完成）: {name}", future)
+        except Exception:
+            self.stats["errors"] += 1
+            raise
+
+    def _release(self, run_start: float):
+        """线程中的操作结束后释放并发名额"""
+        self.stats["in_flight"] -= 1
+        self.stats["total_run_ms"] += (time.perf_counter() - run_start) * 1000
+        self._semaphore.release()
+
+    def get_statistics(self) -> Dict[str, Any]:
+        """
+        获取异步门面统计信息
+
+        Returns:
+            统计信息字典
+        """
+        calls = self.stats["calls"]
+        return {
+            **self.stats,
+            "avg_wait_ms": self.stats["total_wait_ms"] / calls if calls else 0.0,
+            "avg_run_ms": self.stats["total_run_ms"] / calls if calls else 0.0,
+            "max_concurrency": self.max_concurrency,
+            "timeout": self.timeout
+        }
+
+    async def close(self):
+        """等待进行中的操作结束并关闭线程池"""
+        await asyncio.get_running_loop().run_in_executor(
+            None, functools.partial(self._executor.shutdown, wait=True)
+        )
+        self.sync._session_cache.close()
+
+    # ==================== 会话管理 ====================
+
+    async def create_new_session(self, title: Optional[str] = None,
+                                 project_stage: str = "requirements") -> str:
+        """创建新会话并设置为当前会话"""
+        session_id = await self.run(self.sync.create_new_session, title, project_stage, False)
+        self.current_session_id = session_id
+        return session_id
+
+    async def load_session(self, session_id: str) -> bool:
+        """加载会话"""
+        success = await self.run(self.sync.load_session, session_id, False)
+        if success:
+            self.current_session_id = session_id
+        return success
+
+    async def load_session_by_partial_id(self, partial_id: str) -> Tuple[bool, Optional[str], List[Dict[str, Any]]]:
+        """通过部分会话ID加载会话"""
+        success, session_id, matches = await self.run(self.sync.load_session_by_partial_id, partial_id, False)
+        if success:
+            self.current_session_id = session_id
+        return success, session_id, matches
+
+    async def find_sessions_by_partial_id(self, partial_id: str) -> List[Dict[str, Any]]:
+        """通过部分会话ID查找会话"""
+        return await self.run(self.sync.find_sessions_by_partial_id, partial_id)
+
+    async def get_current_session(self) -> Optional[Dict[str, Any]]:
+        """获取当前会话信息"""
+        if not self.current_session_id:
+            return None
+        return await self.get_session(self.current_session_id)
+
+    async def get_session(self, session_id: str) -> Optional[Dict[str, Any]]:
+        """获取指定会话信息（优先使用缓存）"""
+        return await self.run(self.sync._get_session_cached, session_id)
+
+    async def list_sessions(self, limit: int = 50, include_archived: bool = False) -> List[Dict[str, Any]]:
+        """列出会话"""
+        return await self.run(self.sync.list_sessions, limit, include_archived)
+
+    async def update_session_title(self, title: str, session_id: Optional[str] = None) -> bool:
+        """更新会话标题"""
+        return await self.run(self.sync.update_session_title, title, self._target(session_id))
+
+    async def update_project_stage(self, stage: str, session_id: Optional[str] = None) -> bool:
+        """更新项目阶段"""
+        return await self.run(self.sync.update_project_stage, stage, self._target(session_id))
+
+    async def archive_session(self, session_id: Optional[str] = None) -> bool:
+        """归档会话"""
+        target_session_id = self._target(session_id)
+        success = await self.run(self.sync.archive_session, target_session_id)
+        self._forget_if_current(success, target_session_id)
+        return success
+
+    async def delete_session(self, session_id: Optional[str] = None) -> bool:
+        """删除会话（软删除）"""
+        target_session_id = self._target(session_id)
+        success = await self.run(self.sync.delete_session, target_session_id)
+        self._forget_if_current(success, target_session_id)
+        return success
+
+    def _target(self, session_id: Optional[str]) -> Optional[str]:
+        """解析目标会话ID（在事件循环中读取当前会话，传给工作线程）"""
+        return session_id or self.current_session_id
+
+    def _forget_if_current(self, success: bool, session_id: Optional[str]):
+        """归档或删除当前会话后清空当前会话"""
+        if success and session_id and session_id == self.current_session_id:
+            self.current_session_id = None
+
+    # ==================== 消息管理 ====================
+
+    async def add_user_message(self, content: str, metadata: Optional[Dict[str, Any]] = None,
+                               session_id: Optional[str] = None) -> Optional[str]:
+        """添加用户消息"""
+        return await self.run(self.sync.add_user_message, content, metadata, self._target(session_id))
+
+    async def add_assistant_message(self, content: str,
+                                    metadata: Optional[Dict[str, Any]] = None,
+                                    tool_calls: Optional[List[Dict[str, Any]]] = None,
+                                    parent_message_id: Optional[str] = None,
+                                    session_id: Optional[str] = None) -> Optional[str]:
+        """添加助手消息"""
+        return await self.run(self.sync.add_assistant_message, content, metadata,
+                              tool_calls, parent_message_id, self._target(session_id))
+
+    async def add_tool_message(self, content: str, tool_call_id: str,
+                               metadata: Optional[Dict[str, Any]] = None,
+                               parent_message_id: Optional[str] = None,
+                               session_id: Optional[str] = None) -> Optional[str]:
+        """添加工具消息"""
+        return await self.run(self.sync.add_tool_message, content, tool_call_id,
+                              metadata, parent_message_id, self._target(session_id))
+
+    async def add_messages(self, messages: List[Dict[str, Any]],
+                           session_id: Optional[str] = None) -> List[str]:
+        """批量添加消息"""
+        return await self.run(self.sync.add_messages, messages, self._target(session_id))
+
+    async def get_messages(self, session_id: str, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """获取指定会话的消息"""
+        return await self.run(self.sync.dao.get_messages, session_id, limit)
+
+    async def get_recent_messages(self, session_id: str, count: int = 10) -> List[Dict[str, Any]]:
+        """获取指定会话的最近消息"""
+        return await self.run(self.sync.dao.get_recent_messages, session_id, count)
+
+    async def get_messages_page(self, session_id: str, cursor: Optional[str] = None,
+                                limit: int = 100, reverse: bool = False) -> Dict[str, Any]:
+        """按游标分页获取会话消息"""
+        return await self.run(self.sync.dao.get_messages_page, session_id, cursor, limit, reverse)
+
+    async def iter_messages(self, session_id: str, batch_size: int = 200,
+                            reverse: bool = False) -> AsyncIterator[Dict[str, Any]]:
+        """流式遍历会话消息，每页在线程池中读取"""
+        cursor = None
+        while True:
+            page = await self.get_messages_page(session_id, cursor, batch_size, reverse)
+            for message in (reversed(page["messages"]) if reverse else page["messages"]):
+                yield message
+
+            cursor = page["next_cursor"]
+            if not cursor:
+                break
+
+    async def get_tail_messages(self, session_id: str, token_budget: int,
+                                max_messages: Optional[int] = None) -> List[Dict[str, Any]]:
+        """获取token总数不超过预算的最近消息"""
+        return await self.run(self.sync.dao.get_tail_messages, session_id, token_budget, max_messages)
+
+    # ==================== 上下文 ====================
+
+    async def build_agent_context(self, session_id: Optional[str] = None,
+                                  token_budget: Optional[int] = None) -> Optional[AgentContext]:
+        """构建AgentContext对象"""
+        return await self.run(self.sync.build_agent_context, self._target(session_id), token_budget)
+
+    async def update_from_agent_result(self, agent_result, user_input: Optional[str] = None,
+                                       session_id: Optional[str] = None) -> bool:
+        """从AgentResult更新会话数据"""
+        return await self.run(self.sync.update_from_agent_result, agent_result, user_input,
+                              self._target(session_id))
+
+    async def get_active_compressed_context(self, session_id: str) -> Optional[Dict[str, Any]]:
+        """获取活跃的压缩上下文"""
+        return await self.run(self.sync.dao.get_active_compressed_context, session_id)
+
+    async def get_compressed_contexts(self, session_id: str) -> List[Dict[str, Any]]:
+        """获取会话的所有压缩上下文版本"""
+        return await self.run(self.sync.dao.get_compressed_contexts, session_id)
+
+    # ==================== 搜索和统计 ====================
+
+    async def search_sessions(self, keyword: str, limit: int = 20) -> List[Dict[str, Any]]:
+        """搜索会话"""
+        return await self.run(self.sync.search_sessions, keyword, limit)
+
+    async def get_session_statistics(self, session_id: Optional[str] = None) -> Dict[str, Any]:
+        """获取会话统计信息"""
+        return await self.run(self.sync.get_session_statistics, self._target(session_id))
+
+    async def get_global_statistics(self) -> Dict[str, Any]:
+        """获取全局统计信息"""
+        return await self.run(self.sync.get_global_statistics)
+
+    async def get_cache_statistics(self) -> Dict[str, Any]:
+        """获取会话缓存统计信息"""
+        return await self.run(self.sync.get_cache_statistics)
@@ -9,11 +9,11 @@ import sqlite3
 import json
 import uuid
 from datetime import datetime
-from typing import Dict, List, Any, Optional, Tuple
+from typing import Dict, List, Any, Optional, Tuple, Iterator, Callable, ContextManager
 from pathlib import Path
-from contextlib import contextmanager
+from contextlib import contextmanager, ExitStack
 
-from .database_schema import initialize_database
+from .database_schema import initialize_database, migrate_database
 
 
 class DatabaseDAO:
@@ -27,6 +27,8 @@ class DatabaseDAO:
             db_path: 数据库文件路径
         """
         self.db_path = db_path
+        # 写事务钩子：每个钩子返回一个上下文管理器，包裹本DAO的每个写事务（提交后才退出）
+        self._write_hooks: List[Callable[[], ContextManager]] = []
         self._ensure_database_initialized()
     
     def _ensure_database_initialized(self):
@@ -34,6 +36,8 @@ class DatabaseDAO:
         if not Path(self.db_path).exists():
             print(f"🔧 初始化新数据库: {self.db_path}")
             initialize_database(self.db_path)
+        else:
+            migrate_database(self.db_path)
     
     @contextmanager
     def get_connection(self):
@@ -46,16 +50,28 @@ class DatabaseDAO:
         finally:
             conn.close()
     
+    def add_write_hook(self, hook: Callable[[], ContextManager]) -> None:
+        """
+        注册写事务钩子（例如会话缓存借此区分本进程的写入和其他连接的写入）
+
+        Args:
+            hook: 无参函数，返回包裹写事务的上下文管理器
+        """
+        self._write_hooks.append(hook)
+
     @contextmanager
     def transaction(self):
         """事务上下文管理器"""
-        with self.get_connection() as conn:
-            try:
-                yield conn
-                conn.commit()
-            except Exception:
-                conn.rollback()
-                raise
+        with ExitStack() as hooks:
+            for hook in self._write_hooks:
+                hooks.enter_context(hook())
+            with self.get_connection() as conn:
+                try:
+                    yield conn
+                    conn.commit()
+                except Exception:
+                    conn.rollback()
+                    raise
     
     # ==================== 会话管理 ====================
     
@@ -241,6 +257,7 @@ class DatabaseDAO:
         if not set_clauses:
             return True
         
+        set_clauses.append("updated_at = CURRENT_TIMESTAMP")
         values.append(session_id)
         sql = f"UPDATE sessions SET {', '.join(set_clauses)} WHERE session_id = ?"
         
@@ -260,7 +277,9 @@ class DatabaseDAO:
         """
         with self.transaction() as conn:
             cursor = conn.execute("""
-                UPDATE sessions SET status = 'deleted' WHERE session_id = ?
+                UPDATE sessions
+                SET status = 'deleted', updated_at = CURRENT_TIMESTAMP
+                WHERE session_id = ?
             """, (session_id,))
             return cursor.rowcount > 0
     
@@ -288,28 +307,77 @@ class DatabaseDAO:
         Returns:
             消息ID
         """
-        message_id = str(uuid.uuid4())
-        metadata_json = json.dumps(metadata) if metadata else None
-        tool_calls_json = json.dumps(tool_calls) if tool_calls else None
+        return self.add_messages(session_id, [{
+            "role": role,
+            "content": content,
+            "metadata": metadata,
+            "tool_calls": tool_calls,
+            "tool_call_id": tool_call_id,
+            "parent_message_id": parent_message_id,
+            "token_count": token_count
+        }])[0]
+
+    def add_messages(self, session_id: str, messages: List[Dict[str, Any]],
+                     compressed_messages: Optional[List[Dict[str, Any]]] = None) -> List[str]:
+        """
+        批量添加消息，整批在一个事务中写入，会话统计只更新一次
+
+        Args:
+            session_id: 会话ID
+            messages: 消息列表，字段与add_message参数一致（role和content必填，message_id可选）
+            compressed_messages: 同一事务中追加到活跃压缩上下文的消息，缺少压缩上下文时整批回滚
+
+        Returns:
+            消息ID列表（与输入顺序一致）
+        """
+        if not messages:
+            return []
+
+        message_ids = []
+        rows = []
+        total_tokens = 0
+
+        for message in messages:
+            message_id = message.get("message_id") or str(uuid.uuid4())
+            metadata = message.get("metadata")
+            tool_calls = message.get("tool_calls")
+            token_count = message.get("token_count")
+
+            message_ids.append(message_id)
+            rows.append((
+                message_id, session_id, message["role"], message["content"], token_count,
+                json.dumps(metadata) if metadata else None,
+                json.dumps(tool_calls) if tool_calls else None,
+                message.get("tool_call_id"), message.get("parent_message_id")
+            ))
+            total_tokens += token_count or 0
 
         with self.transaction() as conn:
-            conn.execute("""
+            if compressed_messages is not None:
+                # 读取并写回压缩上下文，需要从一开始就持有写锁
+                conn.execute("BEGIN IMMEDIATE")
+
+            conn.executemany("""
                 INSERT INTO messages (
                     message_id, session_id, role, content, token_count,
                     metadata, tool_calls, tool_call_id, parent_message_id
                 ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-            """, (message_id, session_id, role, content, token_count,
-                  metadata_json, tool_calls_json, tool_call_id, parent_message_id))
-
-            # 更新会话的token计数
-            if token_count:
-                conn.execute("""
-                    UPDATE sessions
-                    SET total_tokens = total_tokens + ?
-                    WHERE session_id = ?
-                """, (token_count, session_id))
+            """, rows)
+
+            # 同一事务中一次性更新会话统计和更新时间（每批只写一次sessions行）
+            conn.execute("""
+                UPDATE sessions
+                SET total_messages = total_messages + ?,
+                    total_tokens = total_tokens + ?,
+                    updated_at = CURRENT_TIMESTAMP
+                WHERE session_id = ?
+            """, (len(rows), total_tokens, session_id))
+
+            if (compressed_messages is not None and
+                    not self._append_compressed_messages(conn, session_id, compressed_messages)):
+                raise ValueError(f"会话 {session_id} 缺少压缩上下文记录，请检查会话创建流程")
 
-        return message_id
+        return message_ids
     
     def get_messages(self, session_id: str, limit: Optional[int] = None,
                     role_filter: Optional[str] = None,
@@ -336,7 +404,7 @@ class DatabaseDAO:
         if not include_compressed:
             sql += " AND is_compressed = FALSE"
         
-        sql += " ORDER BY timestamp ASC"
+        sql += " ORDER BY timestamp ASC, rowid ASC"
         
         if limit:
             sql += " LIMIT ?"
@@ -344,22 +412,7 @@ class DatabaseDAO:
         
         with self.get_connection() as conn:
             cursor = conn.execute(sql, params)
-            
-            messages = []
-            for row in cursor.fetchall():
-                messages.append({
-                    "message_id": row["message_id"],
-                    "session_id": row["session_id"],
-                    "role": row["role"],
-                    "content": row["content"],
-                    "timestamp": row["timestamp"],
-                    "token_count": row["token_count"],
-                    "metadata": json.loads(row["metadata"]) if row["metadata"] else {},
-                    "tool_calls": json.loads(row["tool_calls"]) if row["tool_calls"] else [],
-                    "parent_message_id": row["parent_message_id"]
-                })
-            
-            return messages
+            return [self._row_to_message(row) for row in cursor.fetchall()]
     
     def get_recent_messages(self, session_id: str, count: int = 10) -> List[Dict[str, Any]]:
         """
@@ -376,25 +429,135 @@ class DatabaseDAO:
             cursor = conn.execute("""
                 SELECT * FROM messages
                 WHERE session_id = ?
-                ORDER BY timestamp DESC
+                ORDER BY timestamp DESC, rowid DESC
                 LIMIT ?
             """, (session_id, count))
 
-            messages = []
-            for row in reversed(cursor.fetchall()):  # 反转以保持时间顺序
-                messages.append({
-                    "message_id": row["message_id"],
-                    "session_id": row["session_id"],
-                    "role": row["role"],
-                    "content": row["content"],
-                    "timestamp": row["timestamp"],
-                    "token_count": row["token_count"],
-                    "metadata": json.loads(row["metadata"]) if row["metadata"] else {},
-                    "tool_calls": json.loads(row["tool_calls"]) if row["tool_calls"] else [],
-                    "parent_message_id": row["parent_message_id"]
-                })
-            
-            return messages
+            # 反转以保持时间顺序
+            return [self._row_to_message(row) for row in reversed(cursor.fetchall())]
+
+    def get_messages_page(self, session_id: str, cursor: Optional[str] = None,
+                          limit: int = 100, reverse: bool = False) -> Dict[str, Any]:
+        """
+        按游标分页获取会话消息（keyset分页，翻页代价与页码无关）
+
+        Args:
+            session_id: 会话ID
+            cursor: 上一页返回的next_cursor，为None时从头（reverse时从尾）开始
+            limit: 每页消息数量
+            reverse: 是否从最新消息向前翻页
+
+        Returns:
+            {"messages": 本页消息（按时间正序）, "next_cursor": 下一页游标或None}
+        """
+        sql = "SELECT rowid AS _rowid, * FROM messages WHERE session_id = ?"
+        params: List[Any] = [session_id]
+
+        if cursor:
+            timestamp, rowid = self._decode_message_cursor(cursor)
+            sql += " AND (timestamp, rowid) < (?, ?)" if reverse else " AND (timestamp, rowid) > (?, ?)"
+            params.extend([timestamp, rowid])
+
+        order = "DESC" if reverse else "ASC"
+        sql += f" ORDER BY timestamp {order}, rowid {order} LIMIT ?"
+        params.append(limit)
+
+        with self.get_connection() as conn:
+            rows = conn.execute(sql, params).fetchall()
+
+        next_cursor = None
+        if len(rows) == limit:
+            last = rows[-1]
+            next_cursor = f"{last['timestamp']}|{last['_rowid']}"
+
+        if reverse:
+            rows.reverse()
+
+        return {
+            "messages": [self._row_to_message(row) for row in rows],
+            "next_cursor": next_cursor
+        }
+
+    def iter_messages(self, session_id: str, batch_size: int = 200,
+                      reverse: bool = False) -> Iterator[Dict[str, Any]]:
+        """
+        流式遍历会话消息，每次只在内存中保留一页
+
+        每页使用独立的短连接读取，遍历期间不会长时间持有读事务。
+
+        Args:
+            session_id: 会话ID
+            batch_size: 每页读取的消息数量
+            reverse: 是否从最新消息开始倒序遍历
+
+        Yields:
+            消息字典（reverse时按时间倒序）
+        """
+        cursor = None
+        while True:
+            page = self.get_messages_page(session_id, cursor, batch_size, reverse)
+            messages = page["messages"]
+            yield from (reversed(messages) if reverse else messages)
+
+            cursor = page["next_cursor"]
+            if not cursor:
+                break
+
+    def get_tail_messages(self, session_id: str, token_budget: int,
+                          max_messages: Optional[int] = None,
+                          batch_size: int = 50) -> List[Dict[str, Any]]:
+        """
+        从最新消息向前读取，返回token总数不超过预算的尾部消息
+
+        至少返回最新的一条消息（即使它本身超出预算），读取在预算耗尽时立即停止。
+
+        Args:
+            session_id: 会话ID
+            token_budget: token预算
+            max_messages: 最多返回的消息数量
+            batch_size: 每页读取的消息数量
+
+        Returns:
+            尾部消息列表（按时间正序）
+        """
+        tail: List[Dict[str, Any]] = []
+        used_tokens = 0
+
+        for message in self.iter_messages(session_id, batch_size=batch_size, reverse=True):
+            tokens = message["token_count"] or 0
+            if tail and used_tokens + tokens > token_budget:
+                break
+            if max_messages is not None and len(tail) >= max_messages:
+                break
+            tail.append(message)
+            used_tokens += tokens
+
+        tail.reverse()
+        return tail
+
+    @staticmethod
+    def _decode_message_cursor(cursor: str) -> Tuple[str, int]:
+        """解析消息分页游标（timestamp|rowid）"""
+        timestamp, _, rowid = cursor.rpartition("|")
+        if not timestamp:
+            raise ValueError(f"无效的消息游标: {cursor}")
+        return timestamp, int(rowid)
+
+    @staticmethod
+    def _row_to_message(row: sqlite3.Row) -> Dict[str, Any]:
+        """将messages表的行转换为消息字典"""
+        return {
+            "message_id": row["message_id"],
+            "session_id": row["session_id"],
+            "role": row["role"],
+            "content": row["content"],
+            "timestamp": row["timestamp"],
+            "token_count": row["token_count"],
+            "metadata": json.loads(row["metadata"]) if row["metadata"] else {},
+            "tool_calls": json.loads(row["tool_calls"]) if row["tool_calls"] else [],
+            "tool_call_id": row["tool_call_id"],
+            "parent_message_id": row["parent_message_id"]
+        }
 
     # ==================== 压缩上下文管理 ====================
 
@@ -479,33 +642,191 @@ class DatabaseDAO:
             压缩上下文信息或None
         """
         with self.get_connection() as conn:
-            cursor = conn.execute("""
-                SELECT * FROM compressed_context
-                WHERE session_id = ? AND is_active = TRUE
-                ORDER BY compression_version DESC
-                LIMIT 1
-            """, (session_id,))
+            return self._fetch_active_compressed_context(conn, session_id)
 
-            row = cursor.fetchone()
-            if not row:
-                return None
+    def get_active_compressed_context_tail(self, session_id: str, token_budget: int,
+                                           max_messages: Optional[int] = None,
+                                           batch_size: int = 50) -> Optional[Dict[str, Any]]:
+        """
+        读取活跃的压缩上下文，compressed_messages只包含token总数不超过预算的尾部消息
 
-            return {
-                "context_id": row["context_id"],
-                "session_id": row["session_id"],
-                "compression_version": row["compression_version"],
-                "created_at": row["created_at"],
-                "original_message_count": row["original_message_count"],
-                "compressed_message_count": row["compressed_message_count"],
-                "original_token_count": row["original_token_count"],
-                "compressed_token_count": row["compressed_token_count"],
-                "compression_ratio": row["compression_ratio"],
-                "compressed_messages": json.loads(row["compressed_messages"]),
-                "summary": row["summary"],
-                "key_decisions": json.loads(row["key_decisions"]) if row["key_decisions"] else [],
-                "tool_execution_results": json.loads(row["tool_execution_results"]) if row["tool_execution_results"] else {},
-                "is_active": bool(row["is_active"])
-            }
+        压缩消息由SQLite的json_each按数组下标从尾部keyset分页读取，Python侧不解析整个
+        compressed_messages；每页都要由SQLite重新解析JSON，因此页大小逐页翻倍以减少查询次数。
+        至少返回最后一条消息，读取在预算耗尽时立即停止。
+        元数据和尾部消息在同一读事务中读取，不会与压缩结果的保存交错。
+
+        Args:
+            session_id: 会话ID
+            token_budget: token预算
+            max_messages: 最多返回的消息数量
+            batch_size: 第一页读取的消息数量
+
+        Returns:
+            压缩上下文信息或None
+        """
+        with self.get_connection() as conn:
+            conn.execute("BEGIN")
+            try:
+                context = self._fetch_active_compressed_context(conn, session_id, include_messages=False)
+                if not context:
+                    return None
+
+                tail: List[Dict[str, Any]] = []
+                used_tokens = 0
+                cursor: Optional[int] = None
+                exhausted = False
+
+                while not exhausted:
+                    sql = """
+                        SELECT messages.key, messages.value
+                        FROM compressed_context, json_each(compressed_context.compressed_messages) AS messages
+                        WHERE compressed_context.context_id = ?
+                    """
+                    params: List[Any] = [context["context_id"]]
+                    if cursor is not None:
+                        sql += " AND messages.key < ?"
+                        params.append(cursor)
+                    sql += " ORDER BY messages.key DESC LIMIT ?"
+                    params.append(batch_size)
+
+                    rows = conn.execute(sql, params).fetchall()
+                    exhausted = len(rows) < batch_size
+                    batch_size *= 2
+
+                    for row in rows:
+                        message = json.loads(row["value"])
+                        tokens = message.get("token_count") or 0
+                        if tail and used_tokens + tokens > token_budget:
+                            exhausted = True
+                            break
+                        if max_messages is not None and len(tail) >= max_messages:
+                            exhausted = True
+                            break
+                        tail.append(message)
+                        used_tokens += tokens
+
+                    if rows:
+                        cursor = rows[-1]["key"]
+            finally:
+                conn.rollback()
+
+        tail.reverse()
+        context["compressed_messages"] = tail
+        return context
+
+    def _fetch_active_compressed_context(self, conn: sqlite3.Connection, session_id: str,
+                                         include_messages: bool = True) -> Optional[Dict[str, Any]]:
+        """在给定连接（可处于事务中）上读取活跃的压缩上下文（include_messages为False时不读取消息列）"""
+        columns = "*" if include_messages else """
+            context_id, session_id, compression_version, created_at,
+            original_message_count, compressed_message_count,
+            original_token_count, compressed_token_count, compression_ratio,
+            summary, key_decisions, tool_execution_results, is_active
+        """
+        cursor = conn.execute(f"""
+            SELECT {columns} FROM compressed_context
+            WHERE session_id = ? AND is_active = TRUE
+            ORDER BY compression_version DESC
+            LIMIT 1
+        """, (session_id,))
+
+        row = cursor.fetchone()
+        if not row:
+            return None
+
+        context = {
+            "context_id": row["context_id"],
+            "session_id": row["session_id"],
+            "compression_version": row["compression_version"],
+            "created_at": row["created_at"],
+            "original_message_count": row["original_message_count"],
+            "compressed_message_count": row["compressed_message_count"],
+            "original_token_count": row["original_token_count"],
+            "compressed_token_count": row["compressed_token_count"],
+            "compression_ratio": row["compression_ratio"],
+            "summary": row["summary"],
+            "key_decisions": json.loads(row["key_decisions"]) if row["key_decisions"] else [],
+            "tool_execution_results": json.loads(row["tool_execution_results"]) if row["tool_execution_results"] else {},
+            "is_active": bool(row["is_active"])
+        }
+        if include_messages:
+            context["compressed_messages"] = json.loads(row["compressed_messages"])
+        return context
+
+    def get_compression_snapshot(self, session_id: str) -> Optional[Dict[str, Any]]:
+        """
+        在同一读事务中读取会话的全部消息和活跃压缩上下文的消息数，供后台压缩使用
+
+        Args:
+            session_id: 会话ID
+
+        Returns:
+            {"messages": 消息列表, "base_message_count": 活跃上下文消息数}，
+            缺少活跃压缩上下文时返回None
+        """
+        with self.get_connection() as conn:
+            conn.execute("BEGIN")
+            try:
+                current_context = self._fetch_active_compressed_context(conn, session_id)
+                if not current_context:
+                    return None
+
+                rows = conn.execute("""
+                    SELECT * FROM messages
+                    WHERE session_id = ?
+                    ORDER BY timestamp ASC, rowid ASC
+                """, (session_id,)).fetchall()
+            finally:
+                conn.rollback()
+
+        return {
+            "messages": [self._row_to_message(row) for row in rows],
+            "base_message_count": len(current_context["compressed_messages"])
+        }
+
+    def append_compressed_messages(self, session_id: str,
+                                   messages: List[Dict[str, Any]]) -> bool:
+        """
+        向活跃的压缩上下文追加消息（读取和写回在同一写事务中，避免与压缩结果保存互相覆盖）
+
+        Args:
+            session_id: 会话ID
+            messages: 待追加的消息列表（包含token_count）
+
+        Returns:
+            是否追加成功（缺少活跃压缩上下文时返回False）
+        """
+        with self.transaction() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            return self._append_compressed_messages(conn, session_id, messages)
+
+    def _append_compressed_messages(self, conn: sqlite3.Connection, session_id: str,
+                                    messages: List[Dict[str, Any]]) -> bool:
+        """在调用方的写事务中向活跃的压缩上下文追加消息"""
+        current_context = self._fetch_active_compressed_context(conn, session_id)
+        if not current_context:
+            return False
+
+        compressed_messages = current_context["compressed_messages"] + messages
+        batch_tokens = sum(m.get("token_count") or 0 for m in messages)
+
+        conn.execute("""
+            UPDATE compressed_context
+            SET compressed_messages = ?,
+                compressed_message_count = ?,
+                compressed_token_count = ?,
+                original_message_count = ?,
+                original_token_count = ?
+            WHERE context_id = ?
+        """, (
+            json.dumps(compressed_messages),
+            current_context["compressed_message_count"] + len(messages),
+            current_context["compressed_token_count"] + batch_tokens,
+            current_context["original_message_count"] + len(messages),
+            current_context["original_token_count"] + batch_tokens,
+            current_context["context_id"]
+        ))
+        return True
 
     def get_compressed_contexts(self, session_id: str) -> List[Dict[str, Any]]:
         """
@@ -548,17 +869,18 @@ class DatabaseDAO:
             return contexts
 
     def save_compressed_context(self, session_id: str, compressed_data: Dict[str, Any],
-                               version: int, compression_ratio: float,
-                               metadata: Optional[Dict[str, Any]] = None) -> str:
+                               version: Optional[int] = None, compression_ratio: float = 1.0,
+                               base_message_count: Optional[int] = None) -> str:
         """
         保存压缩上下文（新的简化接口）
 
         Args:
             session_id: 会话ID
             compressed_data: 压缩数据
-            version: 版本号
+            version: 版本号，为None时使用当前最大版本号+1
             compression_ratio: 压缩比
-            metadata: 元数据
+            base_message_count: 压缩所基于的活跃上下文消息数；提供时，压缩期间追加到
+                活跃上下文的新消息会被接到压缩结果之后，避免丢失
 
         Returns:
             压缩上下文ID
@@ -566,14 +888,36 @@ class DatabaseDAO:
         context_id = str(uuid.uuid4())
 
         # 从压缩数据中提取信息
-        messages = compressed_data.get('messages', [])
+        messages = list(compressed_data.get('messages', []))
         summary = compressed_data.get('summary', '')
         key_decisions = compressed_data.get('key_decisions', [])
 
         original_count = compressed_data.get('original_count', 0)
-        compressed_count = len(messages)
+        original_tokens = compressed_data.get('original_token_count', 0)
 
         with self.transaction() as conn:
+            # 读取活跃上下文和写入新版本在同一写事务中完成
+            conn.execute("BEGIN IMMEDIATE")
+            current_context = self._fetch_active_compressed_context(conn, session_id)
+            tool_execution_results = {}
+
+            if current_context:
+                tool_execution_results = current_context["tool_execution_results"]
+
+                if base_message_count is not None:
+                    carried = current_context["compressed_messages"][base_message_count:]
+                    messages.extend(carried)
+                    original_count += len(carried)
+                    original_tokens += sum(m.get("token_count") or 0 for m in carried)
+
+            if version is None:
+                version = conn.execute("""
+                    SELECT COALESCE(MAX(compression_version), 0) + 1
+                    FROM compressed_context WHERE session_id = ?
+                """, (session_id,)).fetchone()[0]
+
+            compressed_tokens = sum(m.get("token_count") or 0 for m in messages)
+
             # 将之前的压缩上下文设为非活跃
             conn.execute("""
                 UPDATE compressed_context
@@ -581,7 +925,7 @@ class DatabaseDAO:
                 WHERE session_id = ? AND is_active = TRUE
             """, (session_id,))
 
-            # 插入新的压缩上下文
+            # 插入新的压缩上下文（工具执行结果沿用之前的活跃版本）
             conn.execute("""
                 INSERT INTO compressed_context (
                     context_id, session_id, compression_version,
@@ -591,10 +935,10 @@ class DatabaseDAO:
                 ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
             """, (
                 context_id, session_id, version,
-                original_count, compressed_count,
-                0, 0, compression_ratio,  # token counts暂时设为0
+                original_count, len(messages),
+                original_tokens, compressed_tokens, compression_ratio,
                 json.dumps(messages), summary, json.dumps(key_decisions),
-                json.dumps(metadata) if metadata else None
+                json.dumps(tool_execution_results)
             ))
 
         return context_id
@@ -747,3 +1091,188 @@ class DatabaseDAO:
             # 简化统计：删除复杂的工具统计
 
             return stats
+
+    # ==================== 维护与清理 ====================
+
+    def export_session(self, session_id: str) -> Optional[Dict[str, Any]]:
+        """
+        导出会话的完整数据（会话信息、全部消息、全部压缩上下文版本）
+
+        Args:
+            session_id: 会话ID
+
+        Returns:
+            可JSON序列化的会话数据字典或None
+        """
+        session = self.get_session(session_id)
+        if not session:
+            return None
+
+        with self.get_connection() as conn:
+            cursor = conn.execute("""
+                SELECT * FROM messages
+                WHERE session_id = ?
+                ORDER BY timestamp ASC
+            """, (session_id,))
+            messages = [dict(row) for row in cursor.fetchall()]
+
+        return {
+            "session": session,
+            "messages": messages,
+            "compressed_contexts": self.get_compressed_contexts(session_id)
+        }
+
+    def purge_session(self, session_id: str) -> bool:
+        """
+        物理删除会话（级联删除消息和压缩上下文）
+
+        Args:
+            session_id: 会话ID
+
+        Returns:
+            是否删除成功
+        """
+        with self.transaction() as conn:
+            cursor = conn.execute("""
+                DELETE FROM sessions WHERE session_id = ?
+            """, (session_id,))
+            return cursor.rowcount > 0
+
+    def prune_compressed_contexts(self, keep_versions: int) -> int:
+        """
+        清理历史压缩上下文，每个会话只保留最新的若干个版本（活跃版本始终保留）
+
+        Args:
+            keep_versions: 每个会话保留的版本数量
+
+        Returns:
+            删除的记录数
+        """
+        with self.transaction() as conn:
+            cursor = conn.execute("""
+                DELETE FROM compressed_context
+                WHERE is_active = FALSE
+                  AND context_id IN (
+                      SELECT context_id FROM (
+                          SELECT context_id,
+                                 ROW_NUMBER() OVER (
+                                     PARTITION BY session_id
+                                     ORDER BY compression_version DESC
+                                 ) AS version_rank
+                          FROM compressed_context
+                      )
+                      WHERE version_rank > ?
+                  )
+            """, (max(keep_versions, 1),))
+            return cursor.rowcount
+
+    def find_sessions_older_than(self, cutoff: str) -> List[str]:
+        """
+        查找最后更新时间早于指定时间的会话
+
+        Args:
+            cutoff: 截止时间（SQLite时间格式 YYYY-MM-DD HH:MM:SS）
+
+        Returns:
+            会话ID列表，按更新时间升序
+        """
+        with self.get_connection() as conn:
+            cursor = conn.execute("""
+                SELECT session_id FROM sessions
+                WHERE updated_at < ?
+                ORDER BY updated_at ASC
+            """, (cutoff,))
+            return [row["session_id"] for row in cursor.fetchall()]
+
+    def find_sessions_beyond_count(self, max_sessions: int) -> List[str]:
+        """
+        查找超出保留数量的会话（保留最近更新的max_sessions个）
+
+        Args:
+            max_sessions: 保留的会话数量
+
+        Returns:
+            会话ID列表，按更新时间升序
+        """
+        with self.get_connection() as conn:
+            cursor = conn.execute("""
+                SELECT session_id FROM sessions
+                ORDER BY updated_at DESC
+                LIMIT -1 OFFSET ?
+            """, (max_sessions,))
+            return [row["session_id"] for row in reversed(cursor.fetchall())]
+
+    def find_sessions_by_status(self, status: str) -> List[str]:
+        """
+        查找指定状态的会话
+
+        Args:
+            status: 会话状态
+
+        Returns:
+            会话ID列表，按更新时间升序
+        """
+        with self.get_connection() as conn:
+            cursor = conn.execute("""
+                SELECT session_id FROM sessions
+                WHERE status = ?
+                ORDER BY updated_at ASC
+            """, (status,))
+            return [row["session_id"] for row in cursor.fetchall()]
+
+    def get_storage_statistics(self) -> Dict[str, Any]:
+        """
+        获取数据库存储统计（页数、空闲页、数据库文件及WAL文件大小）
+
+        Returns:
+            存储统计字典
+        """
+        with self.get_connection() as conn:
+            page_size = conn.execute("PRAGMA page_size").fetchone()[0]
+            page_count = conn.execute("PRAGMA page_count").fetchone()[0]
+            freelist_count = conn.execute("PRAGMA freelist_count").fetchone()[0]
+            auto_vacuum = conn.execute("PRAGMA auto_vacuum").fetchone()[0]
+
+        db_file = Path(self.db_path)
+        wal_file = Path(f"{self.db_path}-wal")
+
+        return {
+            "page_size": page_size,
+            "page_count": page_count,
+            "freelist_count": freelist_count,
+            "used_bytes": (page_count - freelist_count) * page_size,
+            "auto_vacuum": auto_vacuum,
+            "db_file_bytes": db_file.stat().st_size if db_file.exists() else 0,
+            "wal_file_bytes": wal_file.stat().st_size if wal_file.exists() else 0
+        }
+
+    def set_metadata(self, key: str, value: str) -> None:
+        """
+        写入数据库元数据
+
+        Args:
+            key: 元数据键名
+            value: 元数据值
+        """
+        with self.transaction() as conn:
+            conn.execute("""
+                INSERT OR REPLACE INTO database_metadata (key, value, updated_at)
+                VALUES (?, ?, CURRENT_TIMESTAMP)
+            """, (key, value))
+
+    def get_metadata(self, key: str) -> Optional[str]:
+        """
+        读取数据库元数据
+
+        Args:
+            key: 元数据键名
+
+        Returns:
+            元数据值或None
+        """
+        with self.get_connection() as conn:
+            cursor = conn.execute("""
+                SELECT value FROM database_metadata WHERE key = ?
+            """, (key,))
+            row = cursor.fetchone()
+            return row["value"] if row else None
@@ -0,0 +1,354 @@
+"""
+数据库维护系统
+
+负责会话数据库的保留策略和空间回收：
+1. 按时间、数量和数据库大小执行保留策略
+2. 清理前将会话归档为压缩导出文件（gzip JSON）
+3. 清理历史压缩上下文版本，避免compressed_context无限增长
+4. 定期执行WAL检查点和增量VACUUM，分批进行，不阻塞前台写入
+5. 每次维护生成回收报告
+
+保留策略和后台维护默认关闭，需要在配置中显式启用（会物理删除会话）。
+旧数据库需要先通过 manage_database.py enable-incremental-vacuum 转换后增量VACUUM才能回收空间。
+"""
+
+import asyncio
+import gzip
+import json
+import time
+from dataclasses import dataclass, field, asdict
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Dict, List, Any, Optional
+
+from utils.config_manager import get_database_maintenance_config
+
+
+@dataclass
+class RetentionPolicy:
+    """保留策略配置"""
+    # 保留规则（None表示不限制）
+    max_age_days: Optional[int] = None        # 超过该天数未更新的会话将被清理
+    max_sessions: Optional[int] = None        # 最多保留的会话数量（按更新时间保留最新的）
+    max_db_size_mb: Optional[float] = None    # 数据有效占用超过该大小时从最旧的会话开始清理
+    purge_deleted: bool = True                # 是否清理已软删除的会话
+    keep_compressed_versions: int = 3         # 每个会话保留的压缩上下文版本数
+
+    # 归档设置
+    archive_enabled: bool = True              # 清理前是否归档
+    archive_dir: str = "archives"             # 归档文件目录（相对路径相对于数据库文件所在目录）
+
+    # 空间回收设置
+    wal_checkpoint_mode: str = "PASSIVE"      # WAL检查点模式：PASSIVE不阻塞读写
+    vacuum_batch_pages: int = 256             # 每批增量VACUUM回收的页数
+    vacuum_batch_pause: float = 0.05          # 批次间隔（秒），让出写锁给前台写入
+
+    # 调度设置
+    enabled: bool = False                     # 是否启动后台维护服务（默认关闭，需显式启用）
+    interval_seconds: float = 3600            # 后台维护间隔（秒）
+
+
+def create_retention_policy() -> RetentionPolicy:
+    """根据配置创建保留策略（配置中的0表示不限制）"""
+    config = get_database_maintenance_config()
+    return RetentionPolicy(
+        max_age_days=config["max_age_days"] or None,
+        max_sessions=config["max_sessions"] or None,
+        max_db_size_mb=config["max_db_size_mb"] or None,
+        keep_compressed_versions=config["keep_compressed_versions"],
+        archive_enabled=config["archive_enabled"],
+        archive_dir=config["archive_dir"],
+        enabled=config["enabled"],
+        interval_seconds=config["interval_seconds"]
+    )
+
+
+@dataclass
+class MaintenanceReport:
+    """维护报告"""
+    started_at: str = ""
+    duration_ms: int = 0
+    sessions_archived: int = 0
+    sessions_purged: int = 0
+    compressed_contexts_pruned: int = 0
+    wal_frames_checkpointed: int = 0
+    pages_vacuumed: int = 0
+    incremental_vacuum_required: bool = False  # 旧数据库有空闲页但未启用INCREMENTAL模式，需要手动转换
+    bytes_before: int = 0
+    bytes_after: int = 0
+    archive_files: List[str] = field(default_factory=list)
+    errors: List[str] = field(default_factory=list)
+
+    @property
+    def bytes_reclaimed(self) -> int:
+        """回收的磁盘字节数（数据库文件+WAL文件）"""
+        return max(self.bytes_before - self.bytes_after, 0)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """转换为字典"""
+        data = asdict(self)
+        data["bytes_reclaimed"] = self.bytes_reclaimed
+        return data
+
+
+class DatabaseMaintenance:
+    """数据库维护器"""
+
+    def __init__(self, dao, policy: Optional[RetentionPolicy] = None):
+        """
+        初始化数据库维护器
+
+        Args:
+            dao: DatabaseDAO实例
+            policy: 保留策略，为None时使用默认策略
+        """
+        self.dao = dao
+        self.policy = policy or RetentionPolicy()
+        self.last_report: Optional[MaintenanceReport] = None
+
+        # 后台调度任务
+        self.worker_task: Optional[asyncio.Task] = None
+        self.is_running = False
+
+    async def start(self):
+        """启动后台维护服务（策略未启用时不启动）"""
+        if self.is_running or not self.policy.enabled:
+            return
+
+        self.is_running = True
+        self.worker_task = asyncio.create_task(self._maintenance_worker())
+        print("🧹 数据库维护服务已启动")
+
+    async def stop(self):
+        """停止后台维护服务"""
+        if not self.is_running:
+            return
+
+        self.is_running = False
+
+        if self.worker_task:
+            self.worker_task.cancel()
+            try:
+                await self.worker_task
+            except asyncio.CancelledError:
+                pass
+
+        print("🧹 数据库维护服务已停止")
+
+    async def _maintenance_worker(self):
+        """后台维护循环，维护在线程中执行，避免阻塞事件循环"""
+        while self.is_running:
+            # 距离上次维护（可能来自上一次CLI运行）不足一个间隔时先等待，避免每次启动都立即维护
+            delay = await asyncio.to_thread(self.seconds_until_due)
+            if delay > 0:
+                await asyncio.sleep(delay)
+                continue
+
+            try:
+                report = await asyncio.to_thread(self.run_once)
+                print(f"🧹 数据库维护完成: 清理 {report.sessions_purged} 个会话, "
+                      f"回收 {report.bytes_reclaimed} 字节")
+                if report.incremental_vacuum_required:
+                    print("💡 数据库未启用增量VACUUM，空闲空间无法回收，"
+                          "请在空闲时运行: python manage_database.py enable-incremental-vacuum")
+            except Exception as e:
+                print(f"⚠️ 数据库维护失败: {e}")
+
+            await asyncio.sleep(self.policy.interval_seconds)
+
+    def seconds_until_due(self) -> float:
+        """距离下次维护的秒数（根据数据库中记录的上次维护时间，从未维护过时为0）"""
+        last_cleanup_at = self.dao.get_metadata("last_cleanup_at")
+        if not last_cleanup_at:
+            return 0.0
+        try:
+            elapsed = (datetime.now() - datetime.fromisoformat(last_cleanup_at)).total_seconds()
+        except ValueError:
+            return 0.0
+        return max(self.policy.interval_seconds - elapsed, 0.0)
+
+    def run_once(self) -> MaintenanceReport:
+        """
+        执行一次完整维护：保留策略 → 压缩上下文清理 → 增量VACUUM → WAL检查点
+
+        Returns:
+            维护报告
+        """
+        start_time = time.time()
+        report = MaintenanceReport(started_at=datetime.now().isoformat())
+        report.bytes_before = self._disk_usage()
+
+        for session_id in self.select_expired_sessions():
+            self._archive_and_purge(session_id, report)
+
+        # 数据库大小限制需要在按规则清理之后再判断
+        self._enforce_size_limit(report)
+
+        try:
+            report.compressed_contexts_pruned = self.dao.prune_compressed_contexts(
+                self.policy.keep_compressed_versions
+            )
+        except Exception as e:
+            report.errors.append(f"prune_compressed_contexts: {e}")
+
+        try:
+            report.incremental_vacuum_required = self.incremental_vacuum_required()
+            report.pages_vacuumed = self.incremental_vacuum()
+            report.wal_frames_checkpointed = self.checkpoint_wal()
+        except Exception as e:
+            report.errors.append(f"vacuum: {e}")
+
+        report.bytes_after = self._disk_usage()
+        report.duration_ms = round((time.time() - start_time) * 1000)
+
+        self.dao.set_metadata("last_cleanup_at", report.started_at)
+        self.last_report = report
+        return report
+
+    def select_expired_sessions(self) -> List[str]:
+        """
+        按保留策略选出需要清理的会话（不含数据库大小限制）
+
+        Returns:
+            会话ID列表，按最旧优先排序
+        """
+        selected: List[str] = []
+
+        if self.policy.purge_deleted:
+            selected.extend(self.dao.find_sessions_by_status("deleted"))
+
+        if self.policy.max_age_days is not None:
+            cutoff = datetime.now(timezone.utc) - timedelta(days=self.policy.max_age_days)
+            selected.extend(self.dao.find_sessions_older_than(cutoff.strftime("%Y-%m-%d %H:%M:%S")))
+
+        if self.policy.max_sessions is not None:
+            selected.extend(self.dao.find_sessions_beyond_count(self.policy.max_sessions))
+
+        # 去重并保持顺序
+        return list(dict.fromkeys(selected))
+
+    def archive_session(self, session_id: str) -> Optional[str]:
+        """
+        将会话导出为gzip压缩的JSON文件
+
+        Args:
+            session_id: 会话ID
+
+        Returns:
+            归档文件路径或None（会话不存在）
+        """
+        data = self.dao.export_session(session_id)
+        if data is None:
+            return None
+
+        archive_dir = self.archive_path()
+        archive_dir.mkdir(parents=True, exist_ok=True)
+        archive_file = archive_dir / f"{session_id}.json.gz"
+
+        data["archived_at"] = datetime.now().isoformat()
+        with gzip.open(archive_file, "wt", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False)
+
+        return str(archive_file)
+
+    def archive_path(self) -> Path:
+        """归档目录（相对路径按数据库文件所在目录解析，与进程工作目录无关）"""
+        archive_dir = Path(self.policy.archive_dir)
+        if archive_dir.is_absolute():
+            return archive_dir
+        return Path(self.dao.db_path).resolve().parent / archive_dir
+
+    def checkpoint_wal(self) -> int:
+        """
+        执行WAL检查点
+
+        Returns:
+            写回数据库文件的WAL帧数
+        """
+        mode = self.policy.wal_checkpoint_mode.upper()
+        with self.dao.get_connection() as conn:
+            # 返回值：(busy, log_frames, checkpointed_frames)，非WAL模式下为 -1
+            busy, log_frames, checkpointed = conn.execute(f"PRAGMA wal_checkpoint({mode})").fetchone()
+
+            # WAL已全部写回且无人占用时截断WAL文件，此时TRUNCATE无需等待读写方
+            if busy == 0 and log_frames > 0 and log_frames == checkpointed:
+                conn.execute("PRAGMA wal_checkpoint(TRUNCATE)").fetchone()
+
+        return max(checkpointed, 0)
+
+    def incremental_vacuum(self) -> int:
+        """
+        分批执行增量VACUUM，每批为独立的短事务，批次之间让出写锁
+
+        Returns:
+            回收的页数
+        """
+        stats = self.dao.get_storage_statistics()
+        if stats["auto_vacuum"] != 2:
+            # 旧数据库未启用INCREMENTAL模式，需要一次性VACUUM转换（会锁库，不在后台执行）
+            return 0
+
+        reclaimed = 0
+        with self.dao.get_connection() as conn:
+            while True:
+                before = conn.execute("PRAGMA freelist_count").fetchone()[0]
+                if before == 0:
+                    break
+                conn.execute(f"PRAGMA incremental_vacuum({self.policy.vacuum_batch_pages})").fetchall()
+                conn.commit()
+                after = conn.execute("PRAGMA freelist_count").fetchone()[0]
+                if after >= before:
+                    break
+                reclaimed += before - after
+                time.sleep(self.policy.vacuum_batch_pause)
+
+        return reclaimed
+
+    def incremental_vacuum_required(self) -> bool:
+        """数据库有空闲页但未启用INCREMENTAL模式（需要调用enable_incremental_vacuum转换才能回收空间）"""
+        stats = self.dao.get_storage_statistics()
+        return stats["auto_vacuum"] != 2 and stats["freelist_count"] > 0
+
+    def enable_incremental_vacuum(self) -> bool:
+        """
+        将旧数据库转换为INCREMENTAL自动清理模式（需要一次完整VACUUM，应在空闲时调用）
+
+        Returns:
+            是否转换成功
+        """
+        with self.dao.get_connection() as conn:
+            conn.execute("PRAGMA auto_vacuum = INCREMENTAL")
+            conn.execute("VACUUM")
+            return conn.execute("PRAGMA auto_vacuum").fetchone()[0] == 2
+
+    def _enforce_size_limit(self, report: MaintenanceReport):
+        """数据有效占用超过上限时，从最旧的会话开始清理"""
+        if self.policy.max_db_size_mb is None:
+            return
+
+        limit_bytes = int(self.policy.max_db_size_mb * 1024 * 1024)
+        if self.dao.get_storage_statistics()["used_bytes"] <= limit_bytes:
+            return
+
+        for session_id in self.dao.find_sessions_beyond_count(0):
+            if self.dao.get_storage_statistics()["used_bytes"] <= limit_bytes:
+                break
+            self._archive_and_purge(session_id, report)
+
+    def _archive_and_purge(self, session_id: str, report: MaintenanceReport):
+        """归档（如启用）并物理删除单个会话，每个会话独立事务"""
+        try:
+            if self.policy.archive_enabled:
+                archive_file = self.archive_session(session_id)
+                if archive_file:
+                    report.sessions_archived += 1
+                    report.archive_files.append(archive_file)
+            if self.dao.purge_session(session_id):
+                report.sessions_purged += 1
+        except Exception as e:
+            report.errors.append(f"{session_id}: {e}")
+
+    def _disk_usage(self) -> int:
+        """数据库文件与WAL文件的总字节数"""
+        stats = self.dao.get_storage_statistics()
+        return stats["db_file_bytes"] + stats["wal_file_bytes"]
@@ -15,7 +15,7 @@ class DatabaseSchema:
     """数据库架构管理器"""
     
     # 数据库版本，用于迁移管理
-    CURRENT_VERSION = 1
+    CURRENT_VERSION = 3
     
     @staticmethod
     def get_create_tables_sql() -> dict:
@@ -27,9 +27,9 @@ class DatabaseSchema:
                     session_id TEXT PRIMARY KEY,                           -- 会话唯一标识符（UUID）
                     title TEXT NOT NULL,                                   -- 会话标题，用户可自定义
                     created_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP, -- 会话创建时间
-                    updated_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP, -- 最后更新时间（触发器自动更新）
+                    updated_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP, -- 最后更新时间（由DAO写入时同步更新）
                     project_stage TEXT NOT NULL DEFAULT 'requirements',    -- 项目阶段（保留用于兼容性）
-                    total_messages INTEGER NOT NULL DEFAULT 0,             -- 消息总数（触发器自动维护）
+                    total_messages INTEGER NOT NULL DEFAULT 0,             -- 消息总数（由DAO写入时同步维护）
                     total_tokens INTEGER NOT NULL DEFAULT 0,               -- token总数（用于成本统计）
                     metadata TEXT NULL,                                     -- JSON格式的扩展元数据（用户偏好、配置等）
                     status TEXT NOT NULL DEFAULT 'active'                  -- 会话状态：active, archived, deleted
@@ -103,7 +103,7 @@ class DatabaseSchema:
             "idx_messages_session_id": "CREATE INDEX IF NOT EXISTS idx_messages_session_id ON messages (session_id);",                        # 按会话查询消息
             "idx_messages_timestamp": "CREATE INDEX IF NOT EXISTS idx_messages_timestamp ON messages (timestamp DESC);",                      # 全局时间排序
             "idx_messages_role": "CREATE INDEX IF NOT EXISTS idx_messages_role ON messages (role);",                                          # 按角色过滤（user/assistant/system/tool）
-            "idx_messages_session_timestamp": "CREATE INDEX IF NOT EXISTS idx_messages_session_timestamp ON messages (session_id, timestamp DESC);", # 会话内时间排序（最重要）
+            "idx_messages_session_order": "CREATE INDEX IF NOT EXISTS idx_messages_session_order ON messages (session_id, timestamp);",            # 会话内按(timestamp, rowid)排序和游标分页（最重要，双向扫描均无需额外排序）
             "idx_messages_parent": "CREATE INDEX IF NOT EXISTS idx_messages_parent ON messages (parent_message_id);",                         # 消息链追踪
             "idx_messages_tool_call_id": "CREATE INDEX IF NOT EXISTS idx_messages_tool_call_id ON messages (tool_call_id);",                 # 工具调用ID索引（用于关联tool消息）
             
@@ -118,31 +118,13 @@ class DatabaseSchema:
     
     @staticmethod
     def get_update_triggers_sql() -> dict:
-        """获取自动更新触发器的SQL语句"""
+        """
+        获取自动更新触发器的SQL语句
+
+        sessions表的updated_at、total_messages、total_tokens由DAO在写入消息的同一事务中
+        用一条UPDATE维护（每批消息只写一次sessions行）。这里只保留直接删除消息时的计数修正。
+        """
         return {
-            # 自动更新sessions表的updated_at字段
-            "sessions_update_trigger": """
-                CREATE TRIGGER IF NOT EXISTS sessions_update_timestamp 
-                AFTER UPDATE ON sessions
-                FOR EACH ROW
-                BEGIN
-                    UPDATE sessions SET updated_at = CURRENT_TIMESTAMP WHERE session_id = NEW.session_id;
-                END;
-            """,
-            
-            # 自动更新sessions表的消息计数
-            "sessions_message_count_insert": """
-                CREATE TRIGGER IF NOT EXISTS sessions_message_count_insert
-                AFTER INSERT ON messages
-                FOR EACH ROW
-                BEGIN
-                    UPDATE sessions 
-                    SET total_messages = total_messages + 1,
-                        updated_at = CURRENT_TIMESTAMP
-                    WHERE session_id = NEW.session_id;
-                END;
-            """,
-            
             "sessions_message_count_delete": """
                 CREATE TRIGGER IF NOT EXISTS sessions_message_count_delete
                 AFTER DELETE ON messages
@@ -156,6 +138,22 @@ class DatabaseSchema:
             """
         }
 
+    @staticmethod
+    def get_migrations_sql() -> dict:
+        """获取各版本的迁移SQL语句（键为目标版本号）"""
+        return {
+            # v2: 移除会自我触发的updated_at触发器和逐行计数触发器，改由DAO批量维护
+            2: [
+                "DROP TRIGGER IF EXISTS sessions_update_timestamp;",
+                "DROP TRIGGER IF EXISTS sessions_message_count_insert;"
+            ],
+            # v3: 会话内排序索引改为升序，(timestamp, rowid)游标分页可直接走索引
+            3: [
+                "DROP INDEX IF EXISTS idx_messages_session_timestamp;",
+                "CREATE INDEX IF NOT EXISTS idx_messages_session_order ON messages (session_id, timestamp);"
+            ]
+        }
+
 
 def initialize_database(db_path: str) -> bool:
     """
@@ -174,7 +172,10 @@ def initialize_database(db_path: str) -> bool:
         with sqlite3.connect(db_path) as conn:
             # 启用外键约束
             conn.execute("PRAGMA foreign_keys = ON;")
-            
+
+            # 启用增量自动清理（必须在建表之前设置），供后台维护任务回收空闲页
+            conn.execute("PRAGMA auto_vacuum = INCREMENTAL;")
+
             # 设置WAL模式以提高并发性能
             conn.execute("PRAGMA journal_mode = WAL;")
             
@@ -211,6 +212,44 @@ def initialize_database(db_path: str) -> bool:
         return False
 
 
+def migrate_database(db_path: str) -> bool:
+    """
+    将已有数据库迁移到当前版本
+    
+    Args:
+        db_path: 数据库文件路径
+        
+    Returns:
+        是否迁移成功（已是最新版本时同样返回True）
+    """
+    try:
+        with sqlite3.connect(db_path) as conn:
+            row = conn.execute(
+                "SELECT value FROM database_metadata WHERE key = 'schema_version'"
+            ).fetchone()
+            version = int(row[0]) if row else 1
+
+            if version >= DatabaseSchema.CURRENT_VERSION:
+                return True
+
+            migrations = DatabaseSchema.get_migrations_sql()
+            for target_version in range(version + 1, DatabaseSchema.CURRENT_VERSION + 1):
+                for sql in migrations.get(target_version, []):
+                    conn.execute(sql)
+                print(f"✅ 数据库迁移到版本: {target_version}")
+
+            conn.execute(
+                "INSERT OR REPLACE INTO database_metadata (key, value) VALUES (?, ?)",
+                ("schema_version", str(DatabaseSchema.CURRENT_VERSION))
+            )
+            conn.commit()
+            return True
+
+    except Exception as e:
+        print(f"❌ 数据库迁移失败: {e}")
+        return False
+
+
 def get_database_info(db_path: str) -> dict:
     """
     获取数据库信息
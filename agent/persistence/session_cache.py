@@ -0,0 +1,211 @@
+"""
+会话缓存
+
+为SQLiteSessionManager提供有界的LRU会话缓存：
+1. 按条目数量和估算内存双重限制，超出时淘汰最久未使用的条目
+2. 本进程写入时按会话失效
+3. 通过 PRAGMA data_version 检测其他连接/进程对数据库的修改，整体失效
+   （DAO每次操作使用独立连接，本进程的写事务通过 own_write 包裹：事务前检测外部修改，
+   提交后记录新的 data_version，因此本进程的写入不会触发整体失效）
+4. 统计命中、未命中、淘汰和失效次数
+"""
+
+import json
+import sqlite3
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Dict, Any, Optional
+
+
+class SessionCache:
+    """有界LRU会话缓存"""
+
+    def __init__(self, db_path: Optional[str] = None, max_entries: int = 256,
+                 max_bytes: int = 8 * 1024 * 1024):
+        """
+        初始化会话缓存
+
+        Args:
+            db_path: 数据库文件路径，提供时启用外部修改检测
+            max_entries: 最大缓存条目数
+            max_bytes: 缓存估算内存上限（字节）
+        """
+        self.db_path = db_path
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+
+        self._entries: "OrderedDict[str, Any]" = OrderedDict()
+        self._sizes: Dict[str, int] = {}
+        self._total_bytes = 0
+        self._lock = threading.RLock()
+
+        # 外部修改检测：data_version只在其他连接提交后变化，因此需要一个长期持有的连接
+        self._watch_conn: Optional[sqlite3.Connection] = None
+        self._data_version: Optional[int] = None
+
+        # 统计信息
+        self.stats = {
+            "hits": 0,
+            "misses": 0,
+            "evictions": 0,
+            "invalidations": 0,
+            "external_invalidations": 0
+        }
+
+    def get(self, key: str) -> Optional[Any]:
+        """
+        获取缓存值，命中时将条目移到最近使用位置
+
+        Args:
+            key: 缓存键（会话ID）
+
+        Returns:
+            缓存值或None
+        """
+        with self._lock:
+            self._check_external_modification()
+
+            if key not in self._entries:
+                self.stats["misses"] += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self.stats["hits"] += 1
+            return self._entries[key]
+
+    def put(self, key: str, value: Any) -> None:
+        """
+        写入缓存，超出限制时淘汰最久未使用的条目
+
+        Args:
+            key: 缓存键（会话ID）
+            value: 缓存值
+        """
+        size = self._estimate_size(value)
+        if size > self.max_bytes:
+            # 单个条目超过上限，不缓存
+            self.invalidate(key)
+            return
+
+        with self._lock:
+            # 写入前同步外部修改状态，避免新条目被旧的版本号误判失效
+            self._check_external_modification()
+
+            if key in self._entries:
+                self._remove(key)
+
+            self._entries[key] = value
+            self._sizes[key] = size
+            self._total_bytes += size
+
+            while (len(self._entries) > self.max_entries or
+                   self._total_bytes > self.max_bytes):
+                oldest_key = next(iter(self._entries))
+                self._remove(oldest_key)
+                self.stats["evictions"] += 1
+
+    def invalidate(self, key: str) -> None:
+        """
+        使指定会话的缓存失效
+
+        Args:
+            key: 缓存键（会话ID）
+        """
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+                self.stats["invalidations"] += 1
+
+    @contextmanager
+    def own_write(self):
+        """
+        包裹本进程的写事务（由DAO的写事务钩子调用）
+
+        事务开始前先处理已发生的外部修改，提交后记录新的data_version，
+        本进程的写入只按会话失效（由管理器负责），不整体清空缓存。
+        """
+        with self._lock:
+            self._check_external_modification()
+        yield
+        with self._lock:
+            self._data_version = self._read_data_version()
+
+    def clear(self) -> None:
+        """清空缓存"""
+        with self._lock:
+            self._entries.clear()
+            self._sizes.clear()
+            self._total_bytes = 0
+
+    def close(self) -> None:
+        """关闭外部修改检测连接"""
+        with self._lock:
+            if self._watch_conn is not None:
+                self._watch_conn.close()
+                self._watch_conn = None
+
+    def __contains__(self, key: str) -> bool:
+        with self._lock:
+            return key in self._entries
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        获取缓存统计信息
+
+        Returns:
+            统计信息字典（包含命中率和当前占用）
+        """
+        with self._lock:
+            lookups = self.stats["hits"] + self.stats["misses"]
+            return {
+                **self.stats,
+                "hit_rate": self.stats["hits"] / lookups if lookups else 0.0,
+                "entries": len(self._entries),
+                "estimated_bytes": self._total_bytes,
+                "max_entries": self.max_entries,
+                "max_bytes": self.max_bytes
+            }
+
+    def _remove(self, key: str) -> None:
+        """移除条目并更新内存统计"""
+        del self._entries[key]
+        self._total_bytes -= self._sizes.pop(key, 0)
+
+    def _check_external_modification(self) -> None:
+        """data_version变化说明其他连接提交过写入，整体失效缓存"""
+        if not self.db_path:
+            return
+
+        version = self._read_data_version()
+        if version is None or version != self._data_version:
+            if self._entries:
+                self.stats["external_invalidations"] += 1
+                self.clear()
+            self._data_version = version
+
+    def _read_data_version(self) -> Optional[int]:
+        """读取监视连接的data_version，无法读取时返回None"""
+        if not self.db_path:
+            return None
+
+        try:
+            if self._watch_conn is None:
+                self._watch_conn = sqlite3.connect(self.db_path, check_same_thread=False)
+            return self._watch_conn.execute("PRAGMA data_version").fetchone()[0]
+        except sqlite3.Error:
+            # 无法检测时保守处理：不使用缓存
+            self._watch_conn = None
+            return None
+
+    @staticmethod
+    def _estimate_size(value: Any) -> int:
+        """估算缓存值占用的内存（按JSON序列化长度近似）"""
+        try:
+            return len(json.dumps(value, ensure_ascii=False, default=str))
+        except (TypeError, ValueError):
+            return 1024
@@ -6,26 +6,40 @@
 2. 每次对话后自动检查并异步压缩
 3. 不阻塞对话流程，用户无感知
 4. 与SQLiteSessionManager原生集成
+5. 多个工作协程并发压缩不同会话，每个任务使用显式会话ID，不切换管理器的当前会话
+6. 同一会话的重复压缩请求自动合并，并统计队列深度和压缩延迟
+7. 滚动摘要模式：每次只把上次检查点之后的新消息并入已有摘要，压缩成本不随会话长度增长
+8. 分级压缩：按token压力（相对模型上下文窗口）选择级别，轻度压力只做本地裁剪，不调用LLM
+9. 流式读取LLM输出，流中断或JSON不完整时修复并保留已生成的部分，统计失败率和浪费的token
 """
 
 import asyncio
+import hashlib
 import json
 import time
 import uuid
-from typing import List, Dict, Any, Optional
+from collections import deque
+from typing import List, Dict, Any, Optional, Set, Tuple
 from dataclasses import dataclass
 from datetime import datetime
 from enum import Enum
 
 from agent.context_types import Message, MessageRole
 from utils.openai_client import OpenAIClient
+from utils.config_manager import get_llm_config
+from utils.json_stream_parser import parse_json
+
+
+class CompressionOutputError(Exception):
+    """LLM压缩输出无法使用（解析失败或缺少必要字段）"""
+    pass
 
 
 class CompressionLevel(Enum):
     """压缩级别"""
-    LIGHT = "light"      # 保留80%信息
-    MEDIUM = "medium"    # 保留60%信息
-    HEAVY = "heavy"      # 保留40%信息
+    LIGHT = "light"      # 本地裁剪：省略重复的工具结果、截断超长的工具结果，不调用LLM
+    MEDIUM = "medium"    # LLM摘要：将较早的消息压缩为摘要
+    HEAVY = "heavy"      # 本地裁剪 + LLM摘要，并将保留的最近消息数减半
 
 
 @dataclass
@@ -38,7 +52,28 @@ class CompressionConfig:
     
     # 压缩设置
     enable_compression: bool = True  # 启用压缩
-    default_level: CompressionLevel = CompressionLevel.MEDIUM
+    default_level: CompressionLevel = CompressionLevel.MEDIUM  # 仅消息数量超限时使用的级别
+
+    # 分级压缩设置（token压力 = 当前token数 / 历史token预算）
+    context_window_tokens: Optional[int] = None  # 模型上下文窗口，None时从LLM配置读取
+    history_window_ratio: float = 0.5            # 对话历史最多占用上下文窗口的比例
+    light_pressure: float = 0.75                 # 压力达到该值时执行LIGHT
+    medium_pressure: float = 1.0                 # 压力达到该值时执行MEDIUM
+    heavy_pressure: float = 1.5                  # 压力达到该值时执行HEAVY
+    tool_result_max_chars: int = 2000            # LIGHT裁剪时工具结果的最大保留字符数
+
+    # 成本估算（每1000 token的价格，0表示只统计token）
+    cost_per_1k_input_tokens: float = 0.0
+    cost_per_1k_output_tokens: float = 0.0
+
+    # 滚动摘要设置
+    rolling_summary: bool = True     # 只将新消息并入已有摘要（False时每次重新压缩全部历史）
+    summary_max_tokens: int = 800    # 滚动摘要的最大长度（token）
+    max_key_decisions: int = 20      # 保留的关键决策数量上限
+
+    # 并发设置
+    worker_count: int = 2            # 并发压缩的工作协程数
+    max_queue_size: int = 100        # 等待队列上限，超出时丢弃新请求
 
 
 class SmartCompressor:
@@ -47,21 +82,77 @@ class SmartCompressor:
     def __init__(self, session_manager, config: Optional[CompressionConfig] = None):
         self.session_manager = session_manager
         self.config = config or CompressionConfig()
-        self.openai_client = OpenAIClient()
+        # LLM客户端延迟初始化：LIGHT级别和阈值判断不需要LLM，也不要求配置API密钥
+        self._openai_client: Optional[OpenAIClient] = None
+
+        # 历史token预算：取阈值和上下文窗口比例中较小的一个
+        context_window = self.config.context_window_tokens or get_llm_config().get("context_window", 128000)
+        self.token_budget = min(
+            self.config.max_tokens, int(context_window * self.config.history_window_ratio)
+        )
         
-        # 异步任务队列
-        self.compression_queue = asyncio.Queue()
-        self.worker_task: Optional[asyncio.Task] = None
+        # 异步任务队列（元素为会话ID）
+        self.compression_queue: asyncio.Queue = asyncio.Queue(maxsize=self.config.max_queue_size)
+        self.worker_tasks: List[asyncio.Task] = []
         self.is_running = False
+
+        # 去重状态：排队中的会话（会话ID -> 入队时间）、执行中的会话、执行期间再次请求的会话
+        self._pending: Dict[str, float] = {}
+        self._running: Set[str] = set()
+        self._rerun: Set[str] = set()
+
+        # 统计信息
+        self.stats = {
+            "scheduled": 0,
+            "deduplicated": 0,
+            "dropped": 0,
+            "completed": 0,
+            "skipped": 0,
+            "failed": 0,
+            "llm_calls": 0,
+            "llm_input_tokens": 0,
+            "llm_output_tokens": 0,
+            "stream_interrupted": 0,   # 输出流中途中断的调用
+            "output_repaired": 0,      # 经修复后可用的输出
+            "output_rejected": 0,      # 无法使用的输出
+            "wasted_llm_tokens": 0     # 输出无法使用时浪费的token
+        }
+        self._queue_wait_ms: deque = deque(maxlen=200)
+        self._duration_ms: deque = deque(maxlen=200)
+        self.level_stats: Dict[str, Dict[str, float]] = {
+            level.value: {
+                "runs": 0,
+                "tokens_before": 0,
+                "tokens_after": 0,
+                "llm_input_tokens": 0,
+                "llm_output_tokens": 0,
+                "duration_ms": 0.0
+            }
+            for level in CompressionLevel
+        }
     
+    @property
+    def openai_client(self) -> OpenAIClient:
+        """获取LLM客户端（延迟初始化）"""
+        if self._openai_client is None:
+            self._openai_client = OpenAIClient()
+        return self._openai_client
+
+    @openai_client.setter
+    def openai_client(self, client: OpenAIClient):
+        self._openai_client = client
+
     async def start(self):
         """启动压缩服务"""
         if self.is_running:
             return
         
         self.is_running = True
-        self.worker_task = asyncio.create_task(self._compression_worker())
-        print("🗜️ 智能压缩服务已启动")
+        self.worker_tasks = [
+            asyncio.create_task(self._compression_worker(worker_id))
+            for worker_id in range(self.config.worker_count)
+        ]
+        print(f"🗜️ 智能压缩服务已启动（{self.config.worker_count} 个工作协程）")
     
     async def stop(self):
         """停止压缩服务"""
@@ -70,14 +161,16 @@ class SmartCompressor:
         
         self.is_running = False
         
-        if self.worker_task:
-            self.worker_task.cancel()
-            try:
-                await self.worker_task
-            except asyncio.CancelledError:
-                pass
+        for task in self.worker_tasks:
+            task.cancel()
+        await asyncio.gather(*self.worker_tasks, return_exceptions=True)
+        self.worker_tasks = []
         
         print("🗜️ 智能压缩服务已停止")
+
+    async def wait_until_idle(self):
+        """等待队列中的压缩任务全部完成"""
+        await self.compression_queue.join()
     
     def should_compress(self, session_id: str) -> bool:
         """
@@ -89,8 +182,20 @@ class SmartCompressor:
         Returns:
             是否需要压缩
         """
+        return self.get_compression_level(session_id) is not None
+
+    def get_compression_level(self, session_id: str) -> Optional[CompressionLevel]:
+        """
+        根据会话当前的token压力选择压缩级别
+        
+        Args:
+            session_id: 会话ID
+            
+        Returns:
+            压缩级别，无需压缩时返回None
+        """
         if not self.config.enable_compression:
-            return False
+            return None
         
         try:
             # 从compressed_context表获取token统计信息
@@ -99,98 +204,302 @@ class SmartCompressor:
             if not compressed_context:
                 # 这是异常情况，说明数据不一致
                 print(f"⚠️ 警告：会话 {session_id} 缺少压缩上下文记录，无法检测压缩需求")
-                return False
+                return None
 
-            # 从压缩上下文获取统计信息
-            message_count = compressed_context["compressed_message_count"]
-            token_count = compressed_context["compressed_token_count"]
-
-            # 超过任一阈值就压缩
-            return (token_count > self.config.max_tokens or
-                   message_count > self.config.max_messages)
+            return self.select_level(compressed_context)
             
         except Exception as e:
             print(f"⚠️ 压缩检查失败: {e}")
-            return False
+            return None
+
+    def select_level(self, compressed_context: Dict[str, Any]) -> Optional[CompressionLevel]:
+        """
+        按token压力和消息数量选择压缩级别
+
+        Args:
+            compressed_context: 活跃的压缩上下文
+
+        Returns:
+            压缩级别，无需压缩时返回None
+        """
+        pressure = self.get_pressure(compressed_context["compressed_token_count"])
+
+        if pressure >= self.config.heavy_pressure:
+            return CompressionLevel.HEAVY
+        if pressure >= self.config.medium_pressure:
+            return CompressionLevel.MEDIUM
+        if compressed_context["compressed_message_count"] > self.config.max_messages:
+            # 消息数量超限时本地裁剪无法减少消息数
+            return self.config.default_level
+        if pressure >= self.config.light_pressure:
+            return CompressionLevel.LIGHT
+        return None
+
+    def get_pressure(self, token_count: int) -> float:
+        """token压力：当前token数相对历史token预算的比例"""
+        return token_count / self.token_budget if self.token_budget > 0 else float("inf")
     
-    async def compress_if_needed(self, session_id: str):
+    async def compress_if_needed(self, session_id: str) -> bool:
         """
         如果需要则异步压缩（不阻塞调用方）
         
         Args:
             session_id: 会话ID
+
+        Returns:
+            是否新调度了压缩任务
         """
-        if self.should_compress(session_id):
+        if await asyncio.to_thread(self.should_compress, session_id):
             # 异步调度压缩任务
-            await self._schedule_compression(session_id)
+            return self._schedule_compression(session_id)
+        return False
     
-    async def _schedule_compression(self, session_id: str):
-        """调度压缩任务"""
+    def _schedule_compression(self, session_id: str) -> bool:
+        """调度压缩任务，同一会话已在排队或执行中时合并请求"""
+        if session_id in self._pending:
+            self.stats["deduplicated"] += 1
+            return False
+
+        if session_id in self._running:
+            # 执行结束后重新检查一次，覆盖压缩期间新增的消息
+            self._rerun.add(session_id)
+            self.stats["deduplicated"] += 1
+            return False
+
         try:
-            task = {
-                'session_id': session_id,
-                'scheduled_at': datetime.now()
-            }
-            
-            await self.compression_queue.put(task)
-            print(f"📋 已调度压缩任务: {session_id}")
-            
-        except Exception as e:
-            print(f"⚠️ 调度压缩失败: {e}")
+            self.compression_queue.put_nowait(session_id)
+        except asyncio.QueueFull:
+            self.stats["dropped"] += 1
+            print(f"⚠️ 压缩队列已满，丢弃压缩请求: {session_id}")
+            return False
+
+        self._pending[session_id] = time.time()
+        self.stats["scheduled"] += 1
+        print(f"📋 已调度压缩任务: {session_id}")
+        return True
     
-    async def _compression_worker(self):
-        """压缩工作线程"""
+    async def _compression_worker(self, worker_id: int):
+        """压缩工作协程"""
         while self.is_running:
-            try:
-                # 等待压缩任务
-                task = await asyncio.wait_for(
-                    self.compression_queue.get(),
-                    timeout=1.0
-                )
-
-                # 执行压缩
-                await self._execute_compression(task)
+            session_id = await self.compression_queue.get()
+            queued_at = self._pending.pop(session_id, time.time())
+            self._queue_wait_ms.append((time.time() - queued_at) * 1000)
+            self._running.add(session_id)
 
+            try:
+                await self._execute_compression(session_id)
+            except Exception as e:
+                self.stats["failed"] += 1
+                print(f"⚠️ 压缩失败 [worker {worker_id}] {session_id}: {e}")
+            finally:
+                self._running.discard(session_id)
                 # 标记任务完成
                 self.compression_queue.task_done()
 
-            except asyncio.TimeoutError:
-                continue
+            if session_id in self._rerun:
+                self._rerun.discard(session_id)
+                await self.compress_if_needed(session_id)
     
-    async def _execute_compression(self, task: Dict[str, Any]):
-        """执行压缩"""
-        session_id = task['session_id']
+    async def _execute_compression(self, session_id: str):
+        """执行压缩（数据库读写在线程中进行，不切换会话管理器的当前会话）"""
         start_time = time.time()
+        dao = self.session_manager.dao
 
-        # 保存当前会话
-        original_session = self.session_manager.current_session_id
-
-        # 加载目标会话
-        if not self.session_manager.load_session(session_id):
+        context = await asyncio.to_thread(dao.get_active_compressed_context, session_id)
+        if context is None:
             raise Exception(f"无法加载会话进行压缩: {session_id}")
 
-        # 获取消息
-        messages = self.session_manager.get_messages()
+        # 执行时重新选择级别，排队期间会话可能已经变化
+        level = self.select_level(context)
+        if level is None:
+            self.stats["skipped"] += 1
+            return
 
-        if len(messages) <= self.config.preserve_recent_count:
+        tokens_before = context["compressed_token_count"]
+
+        messages = context["compressed_messages"]
+        base_message_count = len(messages)
+        compressed_data = None
+
+        if level == CompressionLevel.LIGHT:
+            compressed_data = self._light_trim(context)
+            # 本地裁剪不足以缓解压力时升级为LLM摘要
+            if (compressed_data is None or
+                    self.get_pressure(self._sum_tokens(compressed_data["messages"])) >= self.config.medium_pressure):
+                level = CompressionLevel.MEDIUM
+                compressed_data = None
+
+        if level != CompressionLevel.LIGHT:
+            if self.config.rolling_summary:
+                # 滚动摘要：以活跃压缩上下文为检查点，只折叠其后的新消息
+                compressed_data = await self._rolling_compress(context, level)
+            else:
+                # 在同一读事务中获取消息和活跃上下文的消息数
+                snapshot = await asyncio.to_thread(dao.get_compression_snapshot, session_id)
+                if snapshot is None:
+                    raise Exception(f"无法加载会话进行压缩: {session_id}")
+
+                messages = snapshot["messages"]
+                base_message_count = snapshot["base_message_count"]
+                if len(messages) > self.config.preserve_recent_count:
+                    compressed_data = await self._compress_messages(messages)
+
+        if compressed_data is None:
+            self.stats["skipped"] += 1
             print(f"⚠️ 消息数量不足，跳过压缩: {session_id}")
             return
 
-        # 执行压缩
-        compressed_data = await self._compress_messages(messages)
+        # 保存压缩结果（压缩期间新增的消息会接到结果之后）
+        await asyncio.to_thread(
+            self._save_compression_result, session_id, compressed_data, base_message_count
+        )
 
-        # 保存压缩结果
-        await self._save_compression_result(session_id, compressed_data)
+        execution_time = time.time() - start_time
+        self._duration_ms.append(execution_time * 1000)
+        self.stats["completed"] += 1
+
+        tokens_after = self._sum_tokens(compressed_data["messages"])
+        llm_usage = compressed_data.get("llm_usage") or {}
+        level_stats = self.level_stats[level.value]
+        level_stats["runs"] += 1
+        level_stats["tokens_before"] += tokens_before
+        level_stats["tokens_after"] += tokens_after
+        level_stats["llm_input_tokens"] += llm_usage.get("input_tokens", 0)
+        level_stats["llm_output_tokens"] += llm_usage.get("output_tokens", 0)
+        level_stats["duration_ms"] += execution_time * 1000
+
+        print(f"✅ 压缩完成: {session_id} [{level.value}]")
+        print(f"   原始消息: {len(messages)}, 压缩后: {len(compressed_data.get('messages', []))}")
+        print(f"   token: {tokens_before} → {tokens_after}, 耗时: {execution_time:.1f}s")
 
-        # 恢复原会话
-        if original_session:
-            self.session_manager.load_session(original_session)
+    def _light_trim(self, context: Dict[str, Any], protect_recent: Optional[int] = None) -> Optional[Dict[str, Any]]:
+        """
+        本地裁剪工具结果（不调用LLM）：较早的工具结果与后续结果重复时替换为占位，超长时截断
 
-        execution_time = time.time() - start_time
+        Args:
+            context: 活跃的压缩上下文
+            protect_recent: 不裁剪的最近消息数，None时使用preserve_recent_count
 
-        print(f"✅ 压缩完成: {session_id}")
-        print(f"   原始消息: {len(messages)}, 压缩后: {len(compressed_data.get('messages', []))}")
-        print(f"   耗时: {execution_time:.1f}s")
+        Returns:
+            压缩数据，没有可裁剪的内容时返回None
+        """
+        messages = context["compressed_messages"]
+        protect = self.config.preserve_recent_count if protect_recent is None else protect_recent
+        boundary = max(len(messages) - protect, 0)
+        max_chars = self.config.tool_result_max_chars
+
+        # 最近消息中的工具结果也参与去重，保留最新的一份
+        seen = {
+            self._content_hash(msg.get("content") or "")
+            for msg in messages[boundary:] if msg["role"] == "tool"
+        }
+
+        trimmed = list(messages)
+        changed = False
+        for index in range(boundary - 1, -1, -1):
+            message = trimmed[index]
+            if message["role"] != "tool":
+                continue
+
+            content = message.get("content") or ""
+            content_hash = self._content_hash(content)
+            if content_hash in seen:
+                new_content = "[工具结果与后续调用重复，已省略]"
+            elif len(content) > max_chars:
+                new_content = f"{content[:max_chars]}\n...[已截断 {len(content) - max_chars} 字符]"
+            else:
+                seen.add(content_hash)
+                continue
+
+            seen.add(content_hash)
+            trimmed[index] = {
+                **message,
+                "content": new_content,
+                "token_count": self.session_manager._estimate_tokens("tool", new_content)
+            }
+            changed = True
+
+        if not changed:
+            return None
+
+        return {
+            'messages': trimmed,
+            'summary': context["summary"],
+            'key_decisions': context["key_decisions"],
+            'compression_method': 'light_trim',
+            'original_count': context["original_message_count"],
+            'original_token_count': context["original_token_count"],
+            'compressed_count': len(trimmed)
+        }
+
+    @staticmethod
+    def _content_hash(content: str) -> str:
+        """工具结果内容的摘要，用于识别重复结果"""
+        return hashlib.sha1(content.encode("utf-8")).hexdigest()
+
+    @staticmethod
+    def _sum_tokens(messages: List[Dict[str, Any]]) -> int:
+        """消息列表的token总数"""
+        return sum(msg.get("token_count") or 0 for msg in messages)
+
+    def get_statistics(self) -> Dict[str, Any]:
+        """
+        获取压缩服务统计信息
+
+        Returns:
+            统计信息字典（队列深度、执行中任务数、排队等待和压缩耗时）
+        """
+        attempts = self.stats["completed"] + self.stats["failed"]
+        return {
+            **self.stats,
+            "failure_rate": self.stats["failed"] / attempts if attempts else 0.0,
+            "queue_depth": self.compression_queue.qsize(),
+            "running": len(self._running),
+            "workers": len(self.worker_tasks),
+            "queue_wait_ms": self._summarize_latency(self._queue_wait_ms),
+            "compression_ms": self._summarize_latency(self._duration_ms),
+            "token_budget": self.token_budget,
+            "levels": self.get_level_report()
+        }
+
+    def get_level_report(self) -> Dict[str, Dict[str, Any]]:
+        """
+        按压缩级别汇总节省的token和成本
+
+        Returns:
+            {级别: {runs, tokens_saved, saving_ratio, llm_input_tokens, llm_output_tokens,
+                   estimated_cost, avg_duration_ms}}
+        """
+        report = {}
+        for level, stats in self.level_stats.items():
+            runs = stats["runs"]
+            tokens_saved = stats["tokens_before"] - stats["tokens_after"]
+            report[level] = {
+                "runs": runs,
+                "tokens_saved": tokens_saved,
+                "saving_ratio": tokens_saved / stats["tokens_before"] if stats["tokens_before"] else 0.0,
+                "llm_input_tokens": stats["llm_input_tokens"],
+                "llm_output_tokens": stats["llm_output_tokens"],
+                "estimated_cost": (
+                    stats["llm_input_tokens"] / 1000 * self.config.cost_per_1k_input_tokens +
+                    stats["llm_output_tokens"] / 1000 * self.config.cost_per_1k_output_tokens
+                ),
+                "avg_duration_ms": stats["duration_ms"] / runs if runs else 0.0
+            }
+        return report
+
+    @staticmethod
+    def _summarize_latency(samples: deque) -> Dict[str, float]:
+        """计算延迟样本的平均值、P95和最大值"""
+        if not samples:
+            return {"avg": 0.0, "p95": 0.0, "max": 0.0}
+
+        ordered = sorted(samples)
+        return {
+            "avg": sum(ordered) / len(ordered),
+            "p95": ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))],
+            "max": ordered[-1]
+        }
     
     def _estimate_tokens(self, messages: List[Dict[str, Any]]) -> int:
         """估算token数量"""
@@ -237,9 +546,194 @@ class SmartCompressor:
             'key_decisions': compression_result.get('key_decisions', []),
             'compression_method': 'llm_intelligent',
             'original_count': len(messages),
-            'compressed_count': len(compressed_messages)
+            'compressed_count': len(compressed_messages),
+            'llm_usage': compression_result['llm_usage']
         }
     
+    async def _rolling_compress(self, context: Dict[str, Any],
+                                level: CompressionLevel = CompressionLevel.MEDIUM) -> Optional[Dict[str, Any]]:
+        """
+        滚动摘要压缩：将上次检查点之后、最近消息之前的新消息并入已有摘要
+
+        Args:
+            context: 活跃的压缩上下文
+            level: 压缩级别，HEAVY时先本地裁剪全部工具结果并将保留的最近消息数减半
+
+        Returns:
+            压缩数据，没有可折叠的新消息时返回None
+        """
+        messages = context["compressed_messages"]
+        preserve_count = self.config.preserve_recent_count
+
+        if level == CompressionLevel.HEAVY:
+            trimmed = self._light_trim(context, protect_recent=0)
+            if trimmed:
+                messages = trimmed["messages"]
+            preserve_count = max(preserve_count // 2, 1)
+
+        has_summary = any(self._is_summary_message(msg) for msg in messages)
+        dialogue = [msg for msg in messages if not self._is_summary_message(msg)]
+
+        split_at = max(len(dialogue) - preserve_count, 0)
+        # 保留区不能以tool消息开头（其对应的assistant消息会被折叠），一并折叠
+        while split_at < len(dialogue) and dialogue[split_at]["role"] == "tool":
+            split_at += 1
+        messages_to_fold = dialogue[:split_at]
+        recent_messages = dialogue[split_at:]
+
+        if not messages_to_fold:
+            return None
+
+        result = await self._llm_rolling_summarize(
+            context["summary"] if has_summary else "",
+            context["key_decisions"] if has_summary else [],
+            messages_to_fold
+        )
+
+        summary_message = {
+            "message_id": f"summary_{uuid.uuid4().hex[:12]}",
+            "role": "system",
+            "content": f"以下是此前对话的摘要：\n{result['summary']}",
+            "timestamp": datetime.now().isoformat(),
+            "metadata": {"rolling_summary": True, "folded_messages": len(messages_to_fold)}
+        }
+        summary_message["token_count"] = self._estimate_tokens([summary_message])
+
+        compressed_messages = [summary_message] + recent_messages
+
+        return {
+            'messages': compressed_messages,
+            'summary': result['summary'],
+            'key_decisions': result['key_decisions'],
+            'compression_method': 'rolling_summary',
+            'original_count': context["original_message_count"],
+            'original_token_count': context["original_token_count"],
+            'compressed_count': len(compressed_messages),
+            'llm_usage': result['llm_usage']
+        }
+
+    async def _llm_rolling_summarize(self, previous_summary: str,
+                                     previous_decisions: List[Any],
+                                     new_messages: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """使用LLM将新消息并入已有摘要"""
+        system_prompt = f"""你是专业的对话压缩助手，负责维护一份持续更新的对话摘要。
+
+更新要求：
+1. 将新增对话中的需求、结论和决策并入已有摘要
+2. 删除已被新对话推翻或过时的内容
+3. 摘要保持精炼，不超过{self.config.summary_max_tokens}个token
+4. 关键决策只保留仍然有效的条目
+
+请以JSON格式返回：
+{{
+    "summary": "更新后的完整对话摘要",
+    "key_decisions": ["重要决策1", "重要决策2"]
+}}"""
+
+        prompt = (
+            f"已有摘要：\n{previous_summary or '（无）'}\n\n"
+            f"已有关键决策：\n{json.dumps(previous_decisions, ensure_ascii=False)}\n\n"
+            f"新增对话：\n{self._format_messages(new_messages)}"
+        )
+
+        result, llm_usage = await self._stream_llm_json(
+            system_prompt, prompt, self.config.summary_max_tokens * 2
+        )
+
+        summary = result.get('summary')
+        if not isinstance(summary, str) or not summary.strip():
+            self._reject_llm_output(llm_usage, "缺少summary")
+
+        key_decisions = result.get('key_decisions')
+        if not isinstance(key_decisions, list):
+            key_decisions = list(previous_decisions)
+
+        return {
+            'summary': summary,
+            'key_decisions': key_decisions[-self.config.max_key_decisions:],
+            'llm_usage': llm_usage
+        }
+
+    async def _stream_llm_json(self, system_prompt: str, prompt: str,
+                               max_tokens: int) -> Tuple[Dict[str, Any], Dict[str, int]]:
+        """
+        流式调用LLM并解析JSON输出
+
+        流中途中断时保留已收到的内容；输出不是合法JSON时用修复解析
+        （补全未闭合的字符串和括号、丢弃末尾不完整的元素、提取键值对）。
+
+        Args:
+            system_prompt: 系统提示词
+            prompt: 用户提示词
+            max_tokens: 最大输出token
+
+        Returns:
+            (解析结果, 本次调用的token用量)
+        """
+        chunks = []
+        usage = None
+        interrupted = False
+
+        try:
+            async for chunk in self.openai_client.chat_completion_stream(
+                messages=[{"role": "user", "content": prompt}],
+                system_prompt=system_prompt,
+                temperature=0.1,
+                max_tokens=max_tokens
+            ):
+                if chunk.choices and chunk.choices[0].delta.content:
+                    chunks.append(chunk.choices[0].delta.content)
+                if getattr(chunk, "usage", None):
+                    usage = chunk.usage
+        except Exception as e:
+            if not chunks:
+                raise
+            interrupted = True
+            self.stats["stream_interrupted"] += 1
+            print(f"⚠️ 压缩输出流中断，尝试使用已接收的 {sum(len(c) for c in chunks)} 字符: {e}")
+
+        result_text = "".join(chunks).strip()
+        llm_usage = self._record_llm_usage(usage, system_prompt + prompt, result_text)
+
+        try:
+            result = json.loads(result_text)
+            repaired = interrupted
+        except json.JSONDecodeError:
+            result = parse_json(result_text)
+            repaired = True
+
+        if not isinstance(result, dict) or not result:
+            self._reject_llm_output(llm_usage, "输出不是JSON对象")
+
+        if repaired:
+            self.stats["output_repaired"] += 1
+        return result, llm_usage
+
+    def _reject_llm_output(self, llm_usage: Dict[str, int], reason: str):
+        """记录无法使用的LLM输出（计入浪费的token）并中止本次压缩"""
+        self.stats["output_rejected"] += 1
+        self.stats["wasted_llm_tokens"] += llm_usage["input_tokens"] + llm_usage["output_tokens"]
+        raise CompressionOutputError(f"压缩输出无法使用: {reason}")
+
+    def _record_llm_usage(self, usage, prompt_text: str, result_text: str) -> Dict[str, int]:
+        """记录LLM调用的token用量（无usage信息时按文本估算），返回本次调用的用量"""
+        if usage:
+            input_tokens = usage.prompt_tokens
+            output_tokens = usage.completion_tokens
+        else:
+            input_tokens = self._estimate_tokens([{"content": prompt_text}])
+            output_tokens = self._estimate_tokens([{"content": result_text}])
+
+        self.stats["llm_calls"] += 1
+        self.stats["llm_input_tokens"] += input_tokens
+        self.stats["llm_output_tokens"] += output_tokens
+        return {"input_tokens": input_tokens, "output_tokens": output_tokens}
+
+    @staticmethod
+    def _is_summary_message(message: Dict[str, Any]) -> bool:
+        """是否为滚动摘要消息"""
+        return bool((message.get("metadata") or {}).get("rolling_summary"))
+
     async def _llm_intelligent_compress(self, messages: List[Dict[str, Any]]) -> Dict[str, Any]:
         """使用LLM进行智能压缩，生成结构化结果"""
         # 格式化消息
@@ -275,19 +769,25 @@ class SmartCompressor:
 
         prompt = f"请对以下对话历史进行智能压缩：\n\n{formatted}"
 
-        response = await self.openai_client.chat_completion(
-            messages=[{"role": "user", "content": prompt}],
-            system_prompt=system_prompt,
-            temperature=0.1,
-            max_tokens=2000
-        )
-
-        # 解析JSON结果
-        result_text = response.choices[0].message.content.strip()
-        result = json.loads(result_text)
+        result, llm_usage = await self._stream_llm_json(system_prompt, prompt, 2000)
+
+        # 验证和补充结果：丢弃不完整的消息（例如输出被截断时的最后一条）
+        summary = result.get('summary', '')
+        compressed_messages = [
+            msg for msg in result.get('compressed_messages') or []
+            if isinstance(msg, dict) and msg.get('role') in ('user', 'assistant', 'system')
+            and isinstance(msg.get('content'), str) and msg['content'].strip()
+        ]
+        if not compressed_messages:
+            if not isinstance(summary, str) or not summary.strip():
+                self._reject_llm_output(llm_usage, "缺少compressed_messages和summary")
+            # 只恢复出摘要时，用摘要代替压缩消息
+            compressed_messages = [{
+                "role": "system",
+                "content": f"以下是此前对话的摘要：\n{summary}",
+                "metadata": {"compression_note": "由摘要恢复"}
+            }]
 
-        # 验证和补充结果
-        compressed_messages = result.get('compressed_messages', [])
         for i, msg in enumerate(compressed_messages):
             # 确保必要字段存在，由代码生成
             if 'message_id' not in msg:
@@ -301,10 +801,12 @@ class SmartCompressor:
             if 'metadata' not in msg:
                 msg['metadata'] = {}
 
+        key_decisions = result.get('key_decisions')
         return {
             'compressed_messages': compressed_messages,
-            'summary': result.get('summary', ''),
-            'key_decisions': result.get('key_decisions', [])
+            'summary': summary if isinstance(summary, str) else '',
+            'key_decisions': key_decisions if isinstance(key_decisions, list) else [],
+            'llm_usage': llm_usage
         }
 
 
@@ -319,12 +821,9 @@ class SmartCompressor:
 
         return "\n".join(formatted)
     
-    async def _save_compression_result(self, session_id: str, compressed_data: Dict[str, Any]):
-        """保存压缩结果"""
-        # 获取现有压缩版本
-        existing = self.session_manager.dao.get_compressed_contexts(session_id)
-        next_version = len(existing) + 1
-
+    def _save_compression_result(self, session_id: str, compressed_data: Dict[str, Any],
+                                 base_message_count: Optional[int] = None):
+        """保存压缩结果（版本号由数据库在写事务中分配）"""
         # 计算压缩比
         original_count = compressed_data.get('original_count', 0)
         compressed_count = compressed_data.get('compressed_count', 0)
@@ -334,17 +833,11 @@ class SmartCompressor:
         self.session_manager.dao.save_compressed_context(
             session_id=session_id,
             compressed_data=compressed_data,
-            version=next_version,
             compression_ratio=compression_ratio,
-            metadata={
-                'compression_id': str(uuid.uuid4()),
-                'level': self.config.default_level.value,
-                'algorithm': 'smart_llm_v2',
-                'created_at': datetime.now().isoformat()
-            }
+            base_message_count=base_message_count
         )
 
-        print(f"💾 压缩结果已保存: {session_id} v{next_version}")
+        print(f"💾 压缩结果已保存: {session_id}")
 
 
 # 全局压缩器实例
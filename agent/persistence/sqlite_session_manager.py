@@ -8,27 +8,36 @@
 import uuid
 import json
 from datetime import datetime
-from typing import Dict, List, Any, Optional, Tuple
+from typing import Dict, List, Any, Optional, Tuple, Iterator
 from pathlib import Path
 
 from .database_dao import DatabaseDAO
+from .session_cache import SessionCache
 from ..context_types import AgentContext, Message, MessageRole
+from ..utils.token_estimator import estimate_tokens
 
 
 class SQLiteSessionManager:
     """基于SQLite的会话管理器"""
     
-    def __init__(self, db_path: str = "gtplanner_conversations.db"):
+    def __init__(self, db_path: str = "gtplanner_conversations.db",
+                 cache_max_entries: int = 256,
+                 cache_max_bytes: int = 8 * 1024 * 1024):
         """
         初始化SQLite会话管理器
 
         Args:
             db_path: 数据库文件路径
+            cache_max_entries: 会话缓存最大条目数
+            cache_max_bytes: 会话缓存估算内存上限（字节）
         """
         self.dao = DatabaseDAO(db_path)
         self.current_session_id: Optional[str] = None
         self._compressor = None  # 延迟初始化压缩器
-        self._session_cache = {}  # 会话缓存
+        self._maintenance = None  # 延迟初始化数据库维护器
+        # 有界LRU会话缓存，自动检测其他连接的写入
+        self._session_cache = SessionCache(db_path, cache_max_entries, cache_max_bytes)
+        self.dao.add_write_hook(self._session_cache.own_write)
 
     @property
     def compressor(self):
@@ -37,17 +46,27 @@ class SQLiteSessionManager:
             from .smart_compressor import SmartCompressor
             self._compressor = SmartCompressor(self)
         return self._compressor
+
+    @property
+    def maintenance(self):
+        """获取数据库维护器实例（延迟初始化，保留策略来自配置）"""
+        if self._maintenance is None:
+            from .database_maintenance import DatabaseMaintenance, create_retention_policy
+            self._maintenance = DatabaseMaintenance(self.dao, create_retention_policy())
+        return self._maintenance
     
     # ==================== 会话管理 ====================
     
     def create_new_session(self, title: Optional[str] = None, 
-                          project_stage: str = "requirements") -> str:
+                          project_stage: str = "requirements",
+                          set_current: bool = True) -> str:
         """
         创建新会话
         
         Args:
             title: 会话标题，如果为None则自动生成
             project_stage: 项目阶段
+            set_current: 是否设置为当前会话（异步门面自行维护当前会话，传False）
             
         Returns:
             新会话的ID
@@ -67,28 +86,28 @@ class SQLiteSessionManager:
         )
         
         # 设置为当前会话
-        self.current_session_id = session_id
-        
-        # 清除缓存
-        self._session_cache.clear()
+        if set_current:
+            self.current_session_id = session_id
         
         return session_id
     
-    def load_session(self, session_id: str) -> bool:
+    def load_session(self, session_id: str, set_current: bool = True) -> bool:
         """
         加载指定会话
 
         Args:
             session_id: 会话ID
+            set_current: 是否设置为当前会话（异步门面自行维护当前会话，传False）
 
         Returns:
             是否加载成功
         """
         session = self.dao.get_session(session_id)
         if session and session["status"] == "active":
-            self.current_session_id = session_id
-            # 清除缓存以强制重新加载
-            self._session_cache.clear()
+            if set_current:
+                self.current_session_id = session_id
+            # 使用刚读取的会话信息刷新缓存
+            self._session_cache.put(session_id, session)
             return True
         return False
 
@@ -104,18 +123,20 @@ class SQLiteSessionManager:
         """
         return self.dao.find_sessions_by_partial_id(partial_id)
 
-    def load_session_by_partial_id(self, partial_id: str) -> Tuple[bool, Optional[str], List[Dict[str, Any]]]:
+    def load_session_by_partial_id(self, partial_id: str,
+                                   set_current: bool = True) -> Tuple[bool, Optional[str], List[Dict[str, Any]]]:
         """
         根据部分会话ID加载会话
 
         Args:
             partial_id: 部分会话ID
+            set_current: 是否设置为当前会话（异步门面自行维护当前会话，传False）
 
         Returns:
             (是否成功, 加载的会话ID, 匹配的会话列表)
         """
         # 首先尝试精确匹配（向后兼容）
-        if self.load_session(partial_id):
+        if self.load_session(partial_id, set_current):
             return True, partial_id, []
 
         # 精确匹配失败，尝试模糊匹配
@@ -126,7 +147,7 @@ class SQLiteSessionManager:
         elif len(matches) == 1:
             # 只有一个匹配，直接加载
             session_id = matches[0]["session_id"]
-            success = self.load_session(session_id)
+            success = self.load_session(session_id, set_current)
             return success, session_id if success else None, matches
         else:
             # 多个匹配，返回列表供用户选择
@@ -142,15 +163,36 @@ class SQLiteSessionManager:
         if not self.current_session_id:
             return None
         
-        # 使用缓存
-        if self.current_session_id in self._session_cache:
-            return self._session_cache[self.current_session_id]
-        
-        session = self.dao.get_session(self.current_session_id)
+        return self._get_session_cached(self.current_session_id)
+
+    def _get_session_cached(self, session_id: str) -> Optional[Dict[str, Any]]:
+        """
+        通过缓存获取会话信息
+
+        Args:
+            session_id: 会话ID
+
+        Returns:
+            会话信息或None
+        """
+        session = self._session_cache.get(session_id)
+        if session is not None:
+            return session
+
+        session = self.dao.get_session(session_id)
         if session:
-            self._session_cache[self.current_session_id] = session
-        
+            self._session_cache.put(session_id, session)
+
         return session
+
+    def get_cache_statistics(self) -> Dict[str, Any]:
+        """
+        获取会话缓存统计信息
+
+        Returns:
+            命中、未命中、淘汰次数及命中率等
+        """
+        return self._session_cache.get_stats()
     
     def list_sessions(self, limit: int = 50, include_archived: bool = False) -> List[Dict[str, Any]]:
         """
@@ -187,9 +229,9 @@ class SQLiteSessionManager:
             return False
         
         success = self.dao.update_session(target_session_id, title=title)
-        if success and target_session_id in self._session_cache:
-            # 更新缓存
-            self._session_cache[target_session_id]["title"] = title
+        if success:
+            # 写入后失效缓存（updated_at等字段由数据库维护）
+            self._session_cache.invalidate(target_session_id)
         
         return success
     
@@ -209,9 +251,9 @@ class SQLiteSessionManager:
             return False
         
         success = self.dao.update_session(target_session_id, project_stage=stage)
-        if success and target_session_id in self._session_cache:
-            # 更新缓存
-            self._session_cache[target_session_id]["project_stage"] = stage
+        if success:
+            # 写入后失效缓存（updated_at等字段由数据库维护）
+            self._session_cache.invalidate(target_session_id)
         
         return success
     
@@ -236,8 +278,7 @@ class SQLiteSessionManager:
                 self.current_session_id = None
             
             # 清除缓存
-            if target_session_id in self._session_cache:
-                del self._session_cache[target_session_id]
+            self._session_cache.invalidate(target_session_id)
         
         return success
     
@@ -262,8 +303,7 @@ class SQLiteSessionManager:
                 self.current_session_id = None
             
             # 清除缓存
-            if target_session_id in self._session_cache:
-                del self._session_cache[target_session_id]
+            self._session_cache.invalidate(target_session_id)
         
         return success
     
@@ -282,38 +322,10 @@ class SQLiteSessionManager:
         Returns:
             消息ID或None（如果失败）
         """
-        target_session_id = session_id or self.current_session_id
-        if not target_session_id:
-            return None
-        
-        # 估算token数量（改进的估算方法）
-        # 中文字符按1个token计算，英文单词按1个token计算，标点符号等按0.5计算
-        chinese_chars = len([c for c in content if '\u4e00' <= c <= '\u9fff'])
-        english_words = len(content.replace('，', ' ').replace('。', ' ').split())
-        other_chars = len(content) - chinese_chars - sum(len(word) for word in content.split())
-        token_count = chinese_chars + english_words + max(1, other_chars // 2)
-        
-        # 同时写入messages表和compressed_context表
-        message_id = self.dao.add_message(
-            session_id=target_session_id,
-            role="user",
-            content=content,
-            metadata=metadata,
-            token_count=int(token_count)
-        )
-
-        if message_id:
-            # 更新compressed_context表
-            self._update_compressed_context_with_new_message(
-                target_session_id, message_id, "user", content,
-                int(token_count), metadata
-            )
-
-        # 清除会话缓存以更新统计信息
-        if target_session_id in self._session_cache:
-            del self._session_cache[target_session_id]
-
-        return message_id
+        message_ids = self.add_messages([
+            self._build_message("user", content, metadata=metadata)
+        ], session_id=session_id)
+        return message_ids[0] if message_ids else None
 
     def add_tool_message(self, content: str, tool_call_id: str,
                         metadata: Optional[Dict[str, Any]] = None,
@@ -332,36 +344,12 @@ class SQLiteSessionManager:
         Returns:
             消息ID或None（如果失败）
         """
-        target_session_id = session_id or self.current_session_id
-        if not target_session_id:
-            return None
-
-        # 估算token数量（工具结果通常是JSON格式）
-        token_count = max(1, len(content) // 4)  # 简单估算
-
-        # 保存到messages表
-        message_id = self.dao.add_message(
-            session_id=target_session_id,
-            role="tool",
-            content=content,
-            metadata=metadata,
-            tool_call_id=tool_call_id,
-            parent_message_id=parent_message_id,
-            token_count=int(token_count)
-        )
-
-        if message_id:
-            # 更新compressed_context表
-            self._update_compressed_context_with_new_message(
-                target_session_id, message_id, "tool", content,
-                int(token_count), metadata, tool_call_id=tool_call_id
-            )
-
-        # 清除会话缓存以更新统计信息
-        if target_session_id in self._session_cache:
-            del self._session_cache[target_session_id]
-
-        return message_id
+        message_ids = self.add_messages([
+            self._build_message("tool", content, metadata=metadata,
+                                tool_call_id=tool_call_id,
+                                parent_message_id=parent_message_id)
+        ], session_id=session_id)
+        return message_ids[0] if message_ids else None
 
     def add_assistant_message(self, content: str,
                             metadata: Optional[Dict[str, Any]] = None,
@@ -381,109 +369,105 @@ class SQLiteSessionManager:
         Returns:
             消息ID或None（如果失败）
         """
+        message_ids = self.add_messages([
+            self._build_message("assistant", content, metadata=metadata,
+                                tool_calls=tool_calls,
+                                parent_message_id=parent_message_id)
+        ], session_id=session_id)
+        return message_ids[0] if message_ids else None
+
+    def add_messages(self, messages: List[Dict[str, Any]],
+                     session_id: Optional[str] = None) -> List[str]:
+        """
+        批量添加消息：messages表一次事务写入，sessions行和compressed_context各只更新一次
+
+        Args:
+            messages: 消息列表（可用_build_message构建，缺少token_count时自动估算）
+            session_id: 会话ID，如果为None则使用当前会话
+
+        Returns:
+            消息ID列表
+        """
         target_session_id = session_id or self.current_session_id
-        if not target_session_id:
-            return None
-        
-        # 估算token数量（改进的估算方法）
-        chinese_chars = len([c for c in content if '\u4e00' <= c <= '\u9fff'])
-        english_words = len(content.replace('，', ' ').replace('。', ' ').split())
-        other_chars = len(content) - chinese_chars - sum(len(word) for word in content.split())
-        token_count = chinese_chars + english_words + max(1, other_chars // 2)
-        
-        # 同时写入messages表和compressed_context表
-        message_id = self.dao.add_message(
-            session_id=target_session_id,
-            role="assistant",
-            content=content,
-            metadata=metadata,
-            tool_calls=tool_calls,
-            parent_message_id=parent_message_id,
-            token_count=int(token_count)
-        )
+        if not target_session_id or not messages:
+            return []
 
-        if message_id:
-            # 更新compressed_context表
-            self._update_compressed_context_with_new_message(
-                target_session_id, message_id, "assistant", content,
-                int(token_count), metadata, tool_calls
-            )
+        # 复制消息再补充ID和token数量，不修改调用方的字典
+        messages = [
+            {
+                **message,
+                "message_id": message.get("message_id") or str(uuid.uuid4()),
+                "token_count": (message["token_count"] if message.get("token_count") is not None
+                                else self._estimate_tokens(message["role"], message["content"]))
+            }
+            for message in messages
+        ]
+
+        # 在同一事务中写入messages表和compressed_context表
+        message_ids = self.dao.add_messages(
+            target_session_id, messages,
+            compressed_messages=self._build_compressed_messages(messages)
+        )
 
         # 清除会话缓存以更新统计信息
-        if target_session_id in self._session_cache:
-            del self._session_cache[target_session_id]
+        self._session_cache.invalidate(target_session_id)
+
+        return message_ids
 
-        return message_id
+    def _build_message(self, role: str, content: str,
+                       metadata: Optional[Dict[str, Any]] = None,
+                       tool_calls: Optional[List[Dict[str, Any]]] = None,
+                       tool_call_id: Optional[str] = None,
+                       parent_message_id: Optional[str] = None) -> Dict[str, Any]:
+        """构建待写入的消息字典（token数量在写入时估算）"""
+        return {
+            "role": role,
+            "content": content,
+            "metadata": metadata,
+            "tool_calls": tool_calls,
+            "tool_call_id": tool_call_id,
+            "parent_message_id": parent_message_id,
+            "token_count": None
+        }
 
-    def _update_compressed_context_with_new_message(self, session_id: str, message_id: str,
-                                                   role: str, content: str, token_count: int,
-                                                   metadata: Optional[Dict[str, Any]] = None,
-                                                   tool_calls: Optional[List[Dict[str, Any]]] = None,
-                                                   tool_call_id: Optional[str] = None):
+    @staticmethod
+    def _estimate_tokens(role: str, content: str) -> int:
+        """估算消息的token数量（agent.utils.token_estimator）"""
+        return estimate_tokens(content, role)
+
+    def _build_compressed_messages(self, messages: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
         """
-        更新compressed_context表，添加新消息
+        构建追加到compressed_context表的消息（OpenAI API标准格式）
 
         Args:
-            session_id: 会话ID
-            message_id: 消息ID
-            role: 消息角色
-            content: 消息内容
-            token_count: token数量
-            metadata: 元数据
-            tool_calls: 工具调用
-        """
-        # 获取当前活跃的压缩上下文
-        current_context = self.dao.get_active_compressed_context(session_id)
+            messages: 已补充message_id和token_count的消息字典列表
 
-        # 构建新消息对象（OpenAI API标准格式）
-        new_message = {
-            "message_id": message_id,
-            "role": role,
-            "content": content,
-            "timestamp": datetime.now().isoformat(),
-            "token_count": token_count,
-            "metadata": metadata or {}
-        }
+        Returns:
+            压缩上下文中的消息对象列表
+        """
+        compressed_messages = []
+        for message in messages:
+            role = message["role"]
+
+            # 构建新消息对象（OpenAI API标准格式）
+            new_message = {
+                "message_id": message["message_id"],
+                "role": role,
+                "content": message["content"],
+                "timestamp": datetime.now().isoformat(),
+                "token_count": message["token_count"],
+                "metadata": message.get("metadata") or {}
+            }
 
-        # 根据消息类型添加特定字段
-        if role == "assistant" and tool_calls:
-            new_message["tool_calls"] = tool_calls
-        elif role == "tool" and tool_call_id:
-            new_message["tool_call_id"] = tool_call_id
+            # 根据消息类型添加特定字段
+            if role == "assistant" and message.get("tool_calls"):
+                new_message["tool_calls"] = message["tool_calls"]
+            elif role == "tool" and message.get("tool_call_id"):
+                new_message["tool_call_id"] = message["tool_call_id"]
 
-        if current_context:
-            # 更新现有压缩上下文
-            compressed_messages = current_context.get("compressed_messages", [])
             compressed_messages.append(new_message)
 
-            # 更新统计信息
-            new_compressed_token_count = current_context["compressed_token_count"] + token_count
-            new_compressed_message_count = current_context["compressed_message_count"] + 1
-            new_original_token_count = current_context["original_token_count"] + token_count
-            new_original_message_count = current_context["original_message_count"] + 1
-
-            # 更新数据库记录
-            with self.dao.transaction() as conn:
-                conn.execute("""
-                    UPDATE compressed_context
-                    SET compressed_messages = ?,
-                        compressed_message_count = ?,
-                        compressed_token_count = ?,
-                        original_message_count = ?,
-                        original_token_count = ?
-                    WHERE context_id = ?
-                """, (
-                    json.dumps(compressed_messages),
-                    new_compressed_message_count,
-                    new_compressed_token_count,
-                    new_original_message_count,
-                    new_original_token_count,
-                    current_context["context_id"]
-                ))
-        else:
-            # 这是异常情况，压缩上下文应该在会话创建时就存在
-            print(f"⚠️ 警告：会话 {session_id} 缺少压缩上下文记录")
-            raise ValueError(f"会话 {session_id} 缺少压缩上下文记录，请检查会话创建流程")
+        return compressed_messages
 
     def _update_compressed_context_tool_results(self, session_id: str,
                                               tool_execution_updates: Dict[str, Any]):
@@ -557,6 +541,65 @@ class SQLiteSessionManager:
         
         return self.dao.get_recent_messages(target_session_id, count=count)
 
+    def get_messages_page(self, cursor: Optional[str] = None, limit: int = 100,
+                          reverse: bool = False,
+                          session_id: Optional[str] = None) -> Dict[str, Any]:
+        """
+        按游标分页获取会话消息
+        
+        Args:
+            cursor: 上一页返回的next_cursor
+            limit: 每页消息数量
+            reverse: 是否从最新消息向前翻页
+            session_id: 会话ID，如果为None则使用当前会话
+            
+        Returns:
+            {"messages": 本页消息, "next_cursor": 下一页游标或None}
+        """
+        target_session_id = session_id or self.current_session_id
+        if not target_session_id:
+            return {"messages": [], "next_cursor": None}
+        
+        return self.dao.get_messages_page(target_session_id, cursor, limit, reverse)
+    
+    def iter_messages(self, batch_size: int = 200, reverse: bool = False,
+                      session_id: Optional[str] = None) -> Iterator[Dict[str, Any]]:
+        """
+        流式遍历会话消息（逐页读取，内存占用与会话长度无关）
+        
+        Args:
+            batch_size: 每页读取的消息数量
+            reverse: 是否从最新消息开始倒序遍历
+            session_id: 会话ID，如果为None则使用当前会话
+            
+        Yields:
+            消息字典
+        """
+        target_session_id = session_id or self.current_session_id
+        if not target_session_id:
+            return
+        
+        yield from self.dao.iter_messages(target_session_id, batch_size, reverse)
+    
+    def get_tail_messages(self, token_budget: int, max_messages: Optional[int] = None,
+                          session_id: Optional[str] = None) -> List[Dict[str, Any]]:
+        """
+        获取token总数不超过预算的最近消息
+        
+        Args:
+            token_budget: token预算
+            max_messages: 最多返回的消息数量
+            session_id: 会话ID，如果为None则使用当前会话
+            
+        Returns:
+            尾部消息列表（按时间正序）
+        """
+        target_session_id = session_id or self.current_session_id
+        if not target_session_id:
+            return []
+        
+        return self.dao.get_tail_messages(target_session_id, token_budget, max_messages)
+
     # ==================== 工具执行管理已删除 ====================
     # 注意：工具执行信息现在通过OpenAI标准格式的tool消息保存
     # 使用add_tool_message()和相关消息方法即可
@@ -637,39 +680,37 @@ class SQLiteSessionManager:
             return False
 
         try:
+            # 收集本轮的所有消息，整批写入（sessions行只更新一次）
+            batch = []
+
             # 如果提供了用户输入，先保存用户消息
             if user_input:
-                self.add_user_message(
-                    content=user_input,
-                    session_id=target_session_id
-                )
+                batch.append(self._build_message("user", user_input))
 
             # 保存新的消息（支持OpenAI API标准格式）
             for message in agent_result.new_messages:
                 if message.role.value == "assistant":
-                    self.add_assistant_message(
-                        content=message.content,
+                    batch.append(self._build_message(
+                        "assistant", message.content,
                         metadata=message.metadata,
-                        tool_calls=message.tool_calls if message.tool_calls else None,
-                        session_id=target_session_id
-                    )
+                        tool_calls=message.tool_calls if message.tool_calls else None
+                    ))
                 elif message.role.value == "tool":
                     # 确保tool_call_id不为空，否则跳过这条消息
                     if message.tool_call_id and message.tool_call_id.strip():
-                        self.add_tool_message(
-                            content=message.content,
-                            tool_call_id=message.tool_call_id,
+                        batch.append(self._build_message(
+                            "tool", message.content,
                             metadata=message.metadata,
-                            session_id=target_session_id
-                        )
+                            tool_call_id=message.tool_call_id
+                        ))
                     else:
                         print(f"⚠️ 跳过无效的tool消息：tool_call_id为空")
                 elif message.role.value == "user":
-                    self.add_user_message(
-                        content=message.content,
-                        metadata=message.metadata,
-                        session_id=target_session_id
-                    )
+                    batch.append(self._build_message(
+                        "user", message.content, metadata=message.metadata
+                    ))
+
+            self.add_messages(batch, session_id=target_session_id)
 
             # 更新工具执行结果到compressed_context表（如果有变化）
             if hasattr(agent_result, 'tool_execution_results_updates') and agent_result.tool_execution_results_updates:
@@ -726,12 +767,14 @@ class SQLiteSessionManager:
 
     # ==================== AgentContext转换 ====================
 
-    def build_agent_context(self, session_id: Optional[str] = None) -> Optional[AgentContext]:
+    def build_agent_context(self, session_id: Optional[str] = None,
+                            token_budget: Optional[int] = None) -> Optional[AgentContext]:
         """
         构建AgentContext对象（从compressed_context表读取数据）
 
         Args:
             session_id: 会话ID，如果为None则使用当前会话
+            token_budget: 对话历史的token预算，提供时只构建预算内的最近消息
 
         Returns:
             AgentContext对象或None
@@ -741,19 +784,24 @@ class SQLiteSessionManager:
             return None
 
         # 获取会话信息
-        session = self.dao.get_session(target_session_id)
+        session = self._get_session_cached(target_session_id)
         if not session:
             return None
 
-        # 从compressed_context表获取消息（Agent层的唯一数据源）
-        message_data = self.dao.get_compressed_context_messages(target_session_id)
-
-        # 获取活跃的压缩上下文（包含项目状态等信息）
-        compressed_context = self.dao.get_active_compressed_context(target_session_id)
+        # 获取活跃的压缩上下文（Agent层的唯一数据源，包含消息和项目状态等信息）
+        if token_budget is None:
+            compressed_context = self.dao.get_active_compressed_context(target_session_id)
+        else:
+            # 从尾部分页读取预算内的消息，不加载整个压缩消息列表
+            compressed_context = self.dao.get_active_compressed_context_tail(target_session_id, token_budget)
         if not compressed_context:
             print(f"⚠️ 警告：会话 {target_session_id} 缺少压缩上下文记录")
             return None
 
+        message_data = compressed_context.get("compressed_messages", [])
+        if token_budget is not None:
+            message_data = self._drop_leading_tool_messages(message_data)
+
         # 转换消息格式
         dialogue_history = []
         for msg_data in message_data:
@@ -785,6 +833,19 @@ class SQLiteSessionManager:
 
         return context
 
+    @staticmethod
+    def _drop_leading_tool_messages(messages: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        去除预算截取后开头的tool消息（对应的assistant消息已被截掉），保证tool_calls配对完整
+
+        至少保留最后一条消息。
+        """
+        start = 0
+        while start < len(messages) - 1 and messages[start]["role"] == "tool":
+            start += 1
+
+        return messages[start:]
+
     # 重复的update_from_agent_result方法已删除
 
     # ==================== 搜索和统计 ====================
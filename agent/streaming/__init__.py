@@ -12,6 +12,7 @@ from .stream_types import (
     AssistantMessageChunk,
     ToolCallStatus,
     DesignDocument,
+    ResearchResult,
     StreamEventIterator,
     StreamEventHandler
 )
@@ -38,7 +39,8 @@ from .event_helpers import (
     emit_processing_status_from_prep,
     emit_error_from_prep,
     emit_event_auto,
-    emit_design_document
+    emit_design_document,
+    emit_research_result
 )
 
 __all__ = [
@@ -50,6 +52,7 @@ __all__ = [
     "AssistantMessageChunk",
     "ToolCallStatus",
     "DesignDocument",
+    "ResearchResult",
     "StreamEventIterator",
     "StreamEventHandler",
 
@@ -75,5 +78,6 @@ __all__ = [
     "emit_processing_status_from_prep",
     "emit_error_from_prep",
     "emit_event_auto",
-    "emit_design_document"
+    "emit_design_document",
+    "emit_research_result"
 ]
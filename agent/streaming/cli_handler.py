@@ -65,6 +65,9 @@ class CLIStreamHandler(StreamHandler):
             elif event.event_type == StreamEventType.DESIGN_DOCUMENT_GENERATED:
                 await self._handle_design_document(event)
 
+            elif event.event_type == StreamEventType.RESEARCH_RESULT:
+                await self._handle_research_result(event)
+
             elif event.event_type == StreamEventType.CONVERSATION_END:
                 await self._handle_conversation_end(event)
 
@@ -163,6 +166,27 @@ class CLIStreamHandler(StreamHandler):
 
             print(f"ℹ️  {status_message}")
 
+    async def _handle_research_result(self, event: StreamEvent) -> None:
+        """处理关键词研究结果事件"""
+        keyword = event.data.get("keyword", "")
+        status = event.data.get("status", "")
+        progress = f"[{event.data.get('completed', 0)}/{event.data.get('total', 0)}]"
+
+        # 如果正在显示消息，先换行
+        if self.is_message_active:
+            print()
+
+        if status == "success":
+            summary = (event.data.get("result") or {}).get("summary", "")
+            print(f"🔎 {progress} 关键词 '{keyword}' 研究完成: {summary[:100]}")
+        else:
+            print(f"⚠️ {progress} 关键词 '{keyword}' 未完成: {event.data.get('error_message', '')}")
+
+        if self.show_metadata and event.data.get("aggregate"):
+            aggregate = event.data["aggregate"]
+            print(f"   📊 已汇总 {len(aggregate.get('key_findings', []))} 个关键点，"
+                  f"{len(aggregate.get('recommendations', []))} 条建议")
+
     async def _handle_error_event(self, event: StreamEvent) -> None:
         """处理错误事件"""
         error_message = event.data.get("error_message", "未知错误")
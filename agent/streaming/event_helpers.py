@@ -5,7 +5,7 @@
 """
 
 from typing import Dict, Any, Optional
-from .stream_types import StreamEventBuilder, ToolCallStatus, DesignDocument
+from .stream_types import StreamEventBuilder, ToolCallStatus, DesignDocument, ResearchResult
 
 
 async def emit_processing_status(shared: Dict[str, Any], message: str) -> None:
@@ -250,3 +250,23 @@ async def emit_design_document(
             document
         )
         await streaming_session.emit_event(event)
+
+
+async def emit_research_result(
+    context: Dict[str, Any],
+    research_result: ResearchResult
+) -> None:
+    """
+    发送关键词研究结果事件
+
+    Args:
+        context: 包含 streaming_session 的字典（shared 或 prep_res）
+        research_result: 关键词研究结果
+    """
+    streaming_session = context.get("streaming_session")
+    if streaming_session:
+        event = StreamEventBuilder.research_result(
+            streaming_session.session_id,
+            research_result
+        )
+        await streaming_session.emit_event(event)
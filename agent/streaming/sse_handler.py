@@ -126,6 +126,9 @@ class SSEStreamHandler(StreamHandler):
             elif event.event_type == StreamEventType.DESIGN_DOCUMENT_GENERATED:
                 await self._handle_design_document(event)
 
+            elif event.event_type == StreamEventType.RESEARCH_RESULT:
+                await self._handle_research_result(event)
+
             elif event.event_type == StreamEventType.CONVERSATION_END:
                 await self._handle_conversation_end(event)
 
@@ -247,6 +250,12 @@ class SSEStreamHandler(StreamHandler):
                 }
             )
 
+    async def _handle_research_result(self, event: StreamEvent) -> None:
+        """处理关键词研究结果事件"""
+        # 刷新缓冲区后立即发送，客户端在每个关键词完成时就能展示结果
+        await self._flush_buffer()
+        await self._write_sse_event(event)
+
     async def _handle_conversation_end(self, event: StreamEvent) -> None:
         """处理对话结束事件"""
         # 刷新所有缓冲
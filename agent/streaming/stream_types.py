@@ -27,6 +27,9 @@ class StreamEventType(Enum):
     # 设计文档相关事件
     DESIGN_DOCUMENT_GENERATED = "design_document_generated"
 
+    # 技术调研相关事件
+    RESEARCH_RESULT = "research_result"
+
     # 状态相关事件
     PROCESSING_STATUS = "processing_status"
     ERROR = "error"
@@ -144,6 +147,31 @@ class DesignDocument:
         }
 
 
+@dataclass
+class ResearchResult:
+    """单个关键词的研究结果（关键词完成时发送）"""
+    keyword: str
+    status: str  # "success", "failed", "skipped"
+    completed: int  # 已完成的关键词数量（含本次）
+    total: int
+    result: Optional[Dict[str, Any]] = None
+    error_message: Optional[str] = None
+    elapsed: Optional[float] = None
+    aggregate: Optional[Dict[str, Any]] = None  # 截至目前的增量聚合结果
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "keyword": self.keyword,
+            "status": self.status,
+            "completed": self.completed,
+            "total": self.total,
+            "result": self.result,
+            "error_message": self.error_message,
+            "elapsed": self.elapsed,
+            "aggregate": self.aggregate
+        }
+
+
 class StreamEventBuilder:
     """流式事件构建器"""
     
@@ -290,6 +318,18 @@ class StreamEventBuilder:
             data=document.to_dict()
         )
 
+    @staticmethod
+    def research_result(
+        session_id: str,
+        research_result: ResearchResult
+    ) -> StreamEvent:
+        """创建关键词研究结果事件"""
+        return StreamEvent(
+            event_type=StreamEventType.RESEARCH_RESULT,
+            session_id=session_id,
+            data=research_result.to_dict()
+        )
+
 
 # 类型别名
 StreamEventIterator = AsyncIterator[StreamEvent]
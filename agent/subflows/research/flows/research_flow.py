@@ -4,14 +4,16 @@
 """
 
 import asyncio
+import functools
 import os
 from typing import Dict, List, Any
 from pocketflow_tracing import trace_flow
 from pocketflow import AsyncFlow, AsyncNode
 from .keyword_research_flow import create_keyword_research_subflow
+from ..utils.content_dedup import create_content_deduplicator
+from ..utils.concurrent_research import run_concurrent_research
 from agent.streaming import (
     emit_processing_status_from_prep,
-    emit_error_from_prep,
     emit_processing_status,
     emit_error
 )
@@ -24,7 +26,7 @@ class ConcurrentResearchNode(AsyncNode):
         super().__init__()
         self.name = "concurrent_research"
         self._subflows_and_data = []
-        self._execution_results = []
+        self._deduplicator = None
 
     async def prep_async(self, shared: Dict[str, Any]) -> Dict[str, Any]:
         """准备并发研究参数"""
@@ -43,6 +45,8 @@ class ConcurrentResearchNode(AsyncNode):
 
         # 存储到实例变量
         self._subflows_and_keywords = subflows_and_keywords
+        # 本次研究请求内共享的近重复内容去重器
+        self._deduplicator = create_content_deduplicator()
 
         return {
             "keywords": research_keywords,
@@ -57,7 +61,6 @@ class ConcurrentResearchNode(AsyncNode):
         """并发执行关键词研究"""
 
         subflows_and_keywords = self._subflows_and_keywords
-        keywords = prep_res["keywords"]
 
         # 发送处理状态事件
         await emit_processing_status_from_prep(
@@ -65,8 +68,6 @@ class ConcurrentResearchNode(AsyncNode):
             f"🚀 开始并发执行 {len(subflows_and_keywords)} 个关键词研究..."
         )
 
-        start_time = asyncio.get_event_loop().time()
-
         # 为每个关键词创建独立的shared字典副本，但包含当前关键词信息
         async def run_keyword_research(subflow, keyword, shared_template):
             # 创建该关键词的shared字典副本
@@ -74,74 +75,24 @@ class ConcurrentResearchNode(AsyncNode):
             keyword_shared["current_keyword"] = keyword
 
             # 运行子流程
-            result = await subflow.run_async(keyword_shared)
+            await subflow.run_async(keyword_shared)
 
-            # 返回关键词和结果
-            return keyword, keyword_shared.get("research_findings", {}), result
+            # 返回该关键词的研究结果
+            return keyword_shared.get("research_findings", {})
 
         # 创建shared模板（包含所有公共数据）
         shared_template = {
             "focus_areas": prep_res["focus_areas"],
             "project_context": prep_res["project_context"],
-            "streaming_session": prep_res.get("streaming_session")
+            "streaming_session": prep_res.get("streaming_session"),
+            "content_deduplicator": self._deduplicator
         }
 
-        # 🔧 关键：在节点内部并发执行所有子流程
-        results = await asyncio.gather(*[
-            run_keyword_research(subflow, keyword, shared_template)
+        # 🔧 关键：在节点内部执行所有子流程，由研究执行器控制并发数、时间预算和提前完成
+        return await run_concurrent_research(prep_res, [
+            (keyword, functools.partial(run_keyword_research, subflow, keyword, shared_template))
             for subflow, keyword in subflows_and_keywords
-        ], return_exceptions=True)
-
-        execution_time = asyncio.get_event_loop().time() - start_time
-
-        # 分析结果
-        successful_results = []
-        failed_results = []
-
-        for result in results:
-            if isinstance(result, Exception):
-                # 发送错误事件
-                await emit_error_from_prep(
-                    prep_res,
-                    f"⚠️ 关键词研究处理失败: {result}"
-                )
-
-                failed_results.append({
-                    "keyword": "unknown",
-                    "error": str(result)
-                })
-            else:
-                keyword, keyword_result, _ = result  # 忽略 subflow_result
-
-                if keyword_result:  # 如果有研究结果
-                    successful_results.append({
-                        "keyword": keyword,
-                        "result": keyword_result
-                    })
-                else:
-                    failed_results.append({
-                        "keyword": keyword,
-                        "error": "No research findings generated"
-                    })
-
-        successful_count = len(successful_results)
-        failed_count = len(failed_results)
-
-        # 存储结果到实例变量
-        self._execution_results = {
-            "successful_results": successful_results,
-            "failed_results": failed_results
-        }
-
-        return {
-            "execution_time": execution_time,
-            "statistics": {
-                "total": len(keywords),
-                "successful": successful_count,
-                "failed": failed_count
-            },
-            "success_rate": successful_count / len(keywords) if keywords else 0
-        }
+        ], self._deduplicator, require_result=True)
 
     async def post_async(self, shared: Dict[str, Any], prep_res: Dict[str, Any], exec_res: Dict[str, Any]) -> str:
         """处理并发研究结果"""
@@ -149,30 +100,6 @@ class ConcurrentResearchNode(AsyncNode):
         statistics = exec_res["statistics"]
         success_rate = exec_res["success_rate"]
 
-        # 从实例变量获取详细结果
-        execution_results = self._execution_results
-        successful_results = execution_results["successful_results"]
-        failed_results = execution_results["failed_results"]
-
-        # 构建最终的研究结果
-        keyword_results = []
-
-        # 添加成功的结果
-        for item in successful_results:
-            keyword_results.append({
-                "keyword": item["keyword"],
-                "success": True,
-                "result": item["result"]
-            })
-
-        # 添加失败的结果
-        for item in failed_results:
-            keyword_results.append({
-                "keyword": item["keyword"],
-                "success": False,
-                "error": item["error"]
-            })
-
         # 生成研究摘要
         summary = self._generate_summary(
             prep_res["keywords"],
@@ -189,7 +116,11 @@ class ConcurrentResearchNode(AsyncNode):
             "total_keywords": statistics["total"],
             "successful_keywords": statistics["successful"],
             "failed_keywords": statistics["failed"],
-            "keyword_results": keyword_results,
+            "skipped_keywords": statistics["skipped"],
+            "early_completed": exec_res["early_completed"],
+            "dedup_stats": exec_res["dedup_stats"],
+            "aggregated_findings": exec_res["aggregated_findings"],
+            "keyword_results": exec_res["keyword_results"],
             "summary": summary,
             "execution_time": exec_res["execution_time"],
             "success_rate": success_rate
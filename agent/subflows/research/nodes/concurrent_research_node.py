@@ -5,12 +5,14 @@
 """
 
 import asyncio
+import functools
 from typing import Dict, List, Any
 from pocketflow import AsyncNode
 from ..flows.keyword_research_flow import create_keyword_research_subflow
+from ..utils.content_dedup import create_content_deduplicator
+from ..utils.concurrent_research import run_concurrent_research
 from agent.streaming import (
     emit_processing_status_from_prep,
-    emit_error_from_prep,
     emit_processing_status,
     emit_error
 )
@@ -27,7 +29,7 @@ class ConcurrentResearchNode(AsyncNode):
         super().__init__()
         self.name = "concurrent_research"
         self._subflows_and_data = []
-        self._execution_results = []
+        self._deduplicator = None
 
     async def prep_async(self, shared: Dict[str, Any]) -> Dict[str, Any]:
         """准备并发研究参数"""
@@ -45,6 +47,9 @@ class ConcurrentResearchNode(AsyncNode):
             return {"error": "缺少关注点"}
         
         
+        # 本次研究请求内共享的近重复内容去重器
+        self._deduplicator = create_content_deduplicator()
+
         # 创建子流程和数据对
         subflows_and_data = []
         for keyword in research_keywords:
@@ -55,7 +60,8 @@ class ConcurrentResearchNode(AsyncNode):
             keyword_data = {
                 "current_keyword": keyword,
                 "focus_areas": focus_areas,
-                "project_context": project_context
+                "project_context": project_context,
+                "content_deduplicator": self._deduplicator
             }
             
             subflows_and_data.append((keyword_subflow, keyword_data))
@@ -88,63 +94,18 @@ class ConcurrentResearchNode(AsyncNode):
             f"🚀 开始并发执行 {len(subflows_and_data)} 个关键词研究..."
         )
 
-        start_time = asyncio.get_event_loop().time()
-        
-        # 🔧 关键：在单个节点内部并发执行所有子流程
-        results = await asyncio.gather(*[
-            subflow.run_async(data)
-            for subflow, data in subflows_and_data
-        ], return_exceptions=True)
-        
-        execution_time = asyncio.get_event_loop().time() - start_time
-        
-        # 分析结果
-        successful_results = []
-        failed_results = []
-        
-        for i, (result, (subflow, data)) in enumerate(zip(results, subflows_and_data)):
-            keyword = data["current_keyword"]
-            
-            if isinstance(result, Exception):
-                # 发送错误事件
-                await emit_error_from_prep(
-                    prep_res,
-                    f"⚠️ 关键词 '{keyword}' 处理失败: {result}"
-                )
+        # 🔧 关键：在单个节点内部执行所有子流程，由研究执行器控制并发数、时间预算和提前完成
+        async def run_keyword_research(subflow, data):
+            await subflow.run_async(data)
+            # 从子流程的shared字典中获取结果
+            return data.get("keyword_report", {})
 
-                failed_results.append({
-                    "keyword": keyword,
-                    "error": str(result)
-                })
-            else:
-                # 从子流程的shared字典中获取结果
-                keyword_result = data.get("keyword_report", {})
-                successful_results.append({
-                    "keyword": keyword,
-                    "result": keyword_result
-                })
-        
-        successful_count = len(successful_results)
-        failed_count = len(failed_results)
-        
-        
-        # 存储结果到实例变量
-        self._execution_results = {
-            "successful_results": successful_results,
-            "failed_results": failed_results
-        }
-        
-        # 返回可序列化的执行结果
-        return {
-            "execution_time": execution_time,
-            "statistics": {
-                "total": len(keywords),
-                "successful": successful_count,
-                "failed": failed_count
-            },
-            "keywords_processed": keywords,
-            "success_rate": successful_count / len(keywords) if keywords else 0
-        }
+        exec_res = await run_concurrent_research(prep_res, [
+            (data["current_keyword"], functools.partial(run_keyword_research, subflow, data))
+            for subflow, data in subflows_and_data
+        ], self._deduplicator)
+        exec_res["keywords_processed"] = keywords
+        return exec_res
 
     async def post_async(self, shared: Dict[str, Any], prep_res: Dict[str, Any], exec_res: Dict[str, Any]) -> str:
         """处理并发研究结果"""
@@ -153,30 +114,6 @@ class ConcurrentResearchNode(AsyncNode):
         execution_time = exec_res["execution_time"]
         success_rate = exec_res["success_rate"]
         
-        # 从实例变量获取详细结果
-        execution_results = self._execution_results
-        successful_results = execution_results["successful_results"]
-        failed_results = execution_results["failed_results"]
-        
-        # 构建最终的研究结果
-        keyword_results = []
-        
-        # 添加成功的结果
-        for item in successful_results:
-            keyword_results.append({
-                "keyword": item["keyword"],
-                "success": True,
-                "result": item["result"]
-            })
-        
-        # 添加失败的结果
-        for item in failed_results:
-            keyword_results.append({
-                "keyword": item["keyword"],
-                "success": False,
-                "error": item["error"]
-            })
-        
         # 生成研究摘要
         summary = self._generate_summary(
             prep_res["keywords"], 
@@ -193,7 +130,11 @@ class ConcurrentResearchNode(AsyncNode):
             "total_keywords": statistics["total"],
             "successful_keywords": statistics["successful"],
             "failed_keywords": statistics["failed"],
-            "keyword_results": keyword_results,
+            "skipped_keywords": statistics["skipped"],
+            "early_completed": exec_res["early_completed"],
+            "dedup_stats": exec_res["dedup_stats"],
+            "aggregated_findings": exec_res["aggregated_findings"],
+            "keyword_results": exec_res["keyword_results"],
             "summary": summary,
             "execution_time": execution_time,
             "success_rate": success_rate
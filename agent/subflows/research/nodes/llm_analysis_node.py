@@ -8,6 +8,7 @@ import asyncio
 from pocketflow import AsyncNode
 
 from utils.openai_client import get_openai_client
+from utils.config_manager import get_research_config
 from agent.streaming import (
     emit_processing_status,
     emit_error
@@ -15,6 +16,7 @@ from agent.streaming import (
 
 # 导入多语言提示词系统
 from agent.prompts import get_prompt, PromptTypes
+from ..utils.passage_extractor import extract_relevant_passages
 
 
 class LLMAnalysisNode(AsyncNode):
@@ -23,6 +25,10 @@ class LLMAnalysisNode(AsyncNode):
     def __init__(self):
         super().__init__()
         self.name = "LLMAnalysisNode"
+
+        research_config = get_research_config()
+        self.max_analysis_chars = research_config.get("analysis_max_chars", 2000)  # 交给LLM分析的页面内容字符数
+        self.passage_chars = research_config.get("analysis_passage_chars", 300)    # 相关段落抽取的片段长度（0表示截取开头）
     
     async def prep_async(self, shared):
         """准备LLM分析"""
@@ -30,16 +36,35 @@ class LLMAnalysisNode(AsyncNode):
         url_content = shared.get("url_content", "")
         current_keyword = shared.get("current_keyword", "")
         analysis_requirements = shared.get("analysis_requirements", "")
+        focus_areas = shared.get("focus_areas", [])
         language = shared.get("language")  # 获取语言设置
 
         if not url_content:
             return {"error": "No URL content available for analysis"}
 
+        # 去掉与本次研究已分析内容近重复的段落，整页近重复时跳过LLM分析
+        duplicate_of = None
+        deduplicator = shared.get("content_deduplicator")
+        if deduplicator:
+            url_content, duplicate_of = deduplicator.filter_page(
+                url_content, source=current_keyword, max_chars=self.max_analysis_chars
+            )
+
+        # 在字符预算内抽取与关键词和关注点最相关的片段（关键词重复一次，权重高于关注点）
+        if self.passage_chars > 0 and not duplicate_of:
+            if isinstance(focus_areas, str):
+                focus_areas = [focus_areas]
+            query = " ".join([current_keyword, current_keyword, analysis_requirements, *focus_areas])
+            url_content = extract_relevant_passages(
+                url_content, query, max_chars=self.max_analysis_chars, passage_chars=self.passage_chars
+            )
+
         return {
             "url_content": url_content,
             "current_keyword": current_keyword,
             "analysis_requirements": analysis_requirements,
-            "language": language  # 添加语言设置
+            "language": language,  # 添加语言设置
+            "duplicate_of": duplicate_of
         }
     
     async def exec_async(self, prep_res):
@@ -52,6 +77,21 @@ class LLMAnalysisNode(AsyncNode):
         analysis_requirements = prep_res["analysis_requirements"]
         language = prep_res["language"]
 
+        if prep_res.get("duplicate_of"):
+            duplicate_of = prep_res["duplicate_of"]
+            print(f"♻️ 页面内容与 '{duplicate_of}' 的页面近重复，跳过LLM分析: {keyword}")
+            return {
+                "analysis": {
+                    "summary": f"页面内容与 '{duplicate_of}' 的页面近重复，已跳过重复分析",
+                    "key_points": [],
+                    "relevance": "",
+                    "recommendations": [],
+                    "keyword": keyword,
+                    "duplicate_of": duplicate_of
+                },
+                "keyword": keyword
+            }
+
         # 使用LLM进行内容分析 - 异步调用
         try:
             analysis_result = await self._analyze_content_with_llm_async(
@@ -138,7 +178,7 @@ class LLMAnalysisNode(AsyncNode):
             language=language,
             keyword=keyword,
             requirements=requirements,
-            content=content[:2000]
+            content=content[:self.max_analysis_chars]
         )
 
         try:
@@ -19,7 +19,8 @@ class ResultAssemblyNode(AsyncNode):
         """准备结果组装"""
         # 从共享变量中获取所有必要数据
         current_keyword = shared.get("current_keyword", "")
-        search_result = shared.get("first_search_result", {})
+        # NodeURL实际采用的页面优先，没有时使用第一个搜索结果
+        search_result = shared.get("url_source") or shared.get("first_search_result", {})
         url_content = shared.get("url_content", "")
         llm_analysis = shared.get("llm_analysis", {})
         
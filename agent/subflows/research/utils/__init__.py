@@ -4,8 +4,19 @@ Research Agent 工具包
 包含聚合器和其他工具类
 """
 
-from .research_aggregator import ResearchAggregator
+from .research_aggregator import ResearchAggregator, IncrementalResearchAggregator
+from .research_executor import ResearchExecutor, research_executor
+from .content_dedup import ContentDeduplicator, create_content_deduplicator
+from .passage_extractor import extract_relevant_passages
+from .concurrent_research import run_concurrent_research
 
 __all__ = [
-    'ResearchAggregator'
+    'ResearchAggregator',
+    'IncrementalResearchAggregator',
+    'ResearchExecutor',
+    'research_executor',
+    'ContentDeduplicator',
+    'create_content_deduplicator',
+    'extract_relevant_passages',
+    'run_concurrent_research'
 ]
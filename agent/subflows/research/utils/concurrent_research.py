@@ -0,0 +1,138 @@
+"""
+并发关键词研究 (run_concurrent_research)
+
+ConcurrentResearchNode（nodes/concurrent_research_node.py 和 flows/research_flow.py 中的两个版本）共用的执行逻辑：
+- 通过研究执行器有界并发地运行关键词子流程
+- 每个关键词完成时去掉与已完成关键词近重复的发现，加入增量聚合并立即发送 research_result 事件
+- 跳过的关键词在执行结束后发送事件，客户端不再等待它们的结果
+- 汇总成功/失败/跳过的关键词和近重复内容去重统计
+"""
+
+from typing import Dict, List, Any, Awaitable, Callable, Tuple
+
+from .content_dedup import ContentDeduplicator
+from .research_aggregator import IncrementalResearchAggregator
+from .research_executor import research_executor, KeywordOutcome
+from agent.streaming import (
+    emit_processing_status_from_prep,
+    emit_error_from_prep,
+    emit_research_result,
+    ResearchResult
+)
+
+NO_FINDINGS_ERROR = "No research findings generated"
+
+
+async def run_concurrent_research(prep_res: Dict[str, Any],
+                                  tasks: List[Tuple[str, Callable[[], Awaitable[Dict[str, Any]]]]],
+                                  deduplicator: ContentDeduplicator,
+                                  require_result: bool = False) -> Dict[str, Any]:
+    """
+    并发执行关键词研究并流式发送每个关键词的结果
+
+    Args:
+        prep_res: 节点prep结果（包含keywords，以及发送事件用的streaming_session）
+        tasks: (关键词, 无参协程工厂) 列表，协程返回该关键词的研究结果
+        deduplicator: 本次研究请求共享的近重复内容去重器
+        require_result: 为True时没有研究结果的关键词视为失败
+
+    Returns:
+        执行结果：execution_time、statistics、early_completed、budget_exhausted、dedup_stats、
+        aggregated_findings、keyword_results（成功、失败、跳过的顺序）和success_rate
+    """
+    # 每个关键词完成时立即增量聚合并流式发送结果，不等最慢的关键词
+    aggregator = IncrementalResearchAggregator(len(tasks))
+
+    async def report_outcome(outcome: KeywordOutcome) -> None:
+        if require_result and outcome.status == "success" and not outcome.result:
+            outcome.status = "failed"
+            outcome.error = NO_FINDINGS_ERROR
+        await _report_outcome(prep_res, aggregator, deduplicator, outcome)
+
+    execution = await research_executor.run(tasks, on_outcome=report_outcome)
+
+    successful_results = []
+    failed_results = []
+    skipped_results = []
+
+    for outcome in execution.outcomes:
+        if outcome.status == "success":
+            successful_results.append({
+                "keyword": outcome.keyword,
+                "success": True,
+                "result": outcome.result
+            })
+        elif outcome.status == "failed":
+            await emit_error_from_prep(
+                prep_res,
+                f"⚠️ 关键词 '{outcome.keyword}' 研究处理失败: {outcome.error}"
+            )
+            failed_results.append({
+                "keyword": outcome.keyword,
+                "success": False,
+                "error": outcome.error
+            })
+        else:
+            skipped_results.append({
+                "keyword": outcome.keyword,
+                "success": False,
+                "skipped": True,
+                "error": outcome.error
+            })
+            # 跳过的关键词也发送事件，客户端不再等待它们的结果
+            await _report_outcome(prep_res, aggregator, deduplicator, outcome)
+
+    if skipped_results:
+        await emit_processing_status_from_prep(
+            prep_res,
+            f"⏭️ {skipped_results[0]['error']}，跳过 {len(skipped_results)} 个关键词"
+        )
+
+    dedup_stats = deduplicator.get_stats()
+    if dedup_stats["tokens_saved"]:
+        await emit_processing_status_from_prep(
+            prep_res,
+            f"♻️ 近重复内容消除: 跳过 {dedup_stats['duplicate_pages']} 个重复页面，"
+            f"去掉 {dedup_stats['paragraphs_removed']} 个重复段落和 {dedup_stats['findings_removed']} 条重复发现，"
+            f"节省约 {dedup_stats['tokens_saved']} tokens"
+        )
+
+    successful_count = len(successful_results)
+    failed_count = len(failed_results)
+    attempted_count = successful_count + failed_count
+
+    return {
+        "execution_time": execution.execution_time,
+        "statistics": {
+            "total": len(tasks),
+            "successful": successful_count,
+            "failed": failed_count,
+            "skipped": len(skipped_results)
+        },
+        "early_completed": execution.early_completed,
+        "budget_exhausted": execution.budget_exhausted,
+        "dedup_stats": dedup_stats,
+        "aggregated_findings": aggregator.snapshot(),
+        "keyword_results": successful_results + failed_results + skipped_results,
+        # 被跳过的关键词不计入成功率
+        "success_rate": successful_count / attempted_count if attempted_count else 0
+    }
+
+
+async def _report_outcome(prep_res: Dict[str, Any], aggregator: IncrementalResearchAggregator,
+                          deduplicator: ContentDeduplicator, outcome: KeywordOutcome) -> None:
+    """关键词完成时：去掉与已完成关键词近重复的发现，加入增量聚合并发送研究结果事件"""
+    if outcome.status == "success" and outcome.result:
+        outcome.result = deduplicator.dedupe_findings([outcome.result])[0]
+    aggregator.add_outcome(outcome.keyword, outcome.status, outcome.result)
+
+    await emit_research_result(prep_res, ResearchResult(
+        keyword=outcome.keyword,
+        status=outcome.status,
+        completed=aggregator.completed,
+        total=aggregator.total,
+        result=outcome.result or None,
+        error_message=outcome.error or None,
+        elapsed=round(outcome.elapsed, 2),
+        aggregate=aggregator.snapshot()
+    ))
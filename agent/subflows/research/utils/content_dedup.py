@@ -0,0 +1,238 @@
+"""
+近重复内容消除 (ContentDeduplicator)
+
+镜像站点、转载文章和模板化页面会让多个关键词抓到几乎相同的内容，逐个交给LLM分析既浪费token，
+也会让最终报告出现重复的要点。本模块在一次研究请求内：
+- 页面级：LLM分析前计算页面的SimHash（64位，基于词级shingle），与已分析页面的汉明距离不超过阈值时
+  视为近重复页面，跳过LLM分析
+- 段落级：去掉与已分析段落近重复的段落（导航、版权声明、转载的相同段落），只把新内容交给LLM
+- 发现级：聚合前按shingle的Jaccard相似度去掉各关键词之间近重复的关键点和建议
+
+切词不依赖分词库：用空格分词的文字（拉丁、西里尔、阿拉伯、韩文等）按Unicode单词切分，
+中日文、泰文等不用空格分词的文字按字符二元组切分。特征太少的页面和段落（不支持的文字、纯符号）
+SimHash不可靠，不参与页面级和段落级去重。
+节省的token与会话消息的token_count使用同一个估算方法（agent.utils.token_estimator）。
+"""
+
+import hashlib
+import re
+from typing import Dict, List, Any, Optional, Set, Tuple
+
+from utils.config_manager import get_research_config
+from agent.utils.token_estimator import estimate_tokens
+
+# 段落分隔：空行
+_PARAGRAPH_PATTERN = re.compile(r"\n\s*\n")
+
+# 不用空格分词的文字：泰文、老挝文、缅甸文、高棉文、日文假名、中日韩汉字
+_UNSEGMENTED = "\u0e00-\u0eff\u1000-\u109f\u1780-\u17ff\u3040-\u30ff\u3400-\u4dbf\u4e00-\u9fff\uf900-\ufaff"
+# 单词内的组合符号（\w不包含）：拉丁/西里尔/希伯来/阿拉伯的变音符号和印度系文字的元音符号
+_MARKS = "\u0300-\u036f\u0483-\u0489\u0591-\u05c7\u0610-\u061a\u064b-\u065f\u0670\u0900-\u0dff"
+_TOKEN_PATTERN = re.compile(rf"[{_UNSEGMENTED}]+|(?:[^\W_{_UNSEGMENTED}]|[{_MARKS}])+")
+_UNSEGMENTED_PATTERN = re.compile(rf"[{_UNSEGMENTED}]")
+
+
+def tokenize(text: str) -> List[str]:
+    """切词：用空格分词的文字按Unicode单词（小写），中日文、泰文等按字符二元组"""
+    tokens = []
+    for run in _TOKEN_PATTERN.findall(text.lower()):
+        if _UNSEGMENTED_PATTERN.match(run):
+            tokens.extend(run[i:i + 2] for i in range(max(1, len(run) - 1)))
+        else:
+            tokens.append(run)
+    return tokens
+
+
+def shingles(text: str, size: int = 3) -> Set[int]:
+    """把文本切成连续size个词的shingle，返回64位哈希集合"""
+    tokens = tokenize(text)
+    if len(tokens) <= size:
+        grams = [tokens] if tokens else []
+    else:
+        grams = [tokens[i:i + size] for i in range(len(tokens) - size + 1)]
+    return {
+        int.from_bytes(hashlib.blake2b(" ".join(gram).encode("utf-8"), digest_size=8).digest(), "big")
+        for gram in grams
+    }
+
+
+def simhash(features: Set[int]) -> int:
+    """根据特征哈希集合计算64位SimHash"""
+    # 把所有特征拼成二进制字符串，按位统计1的个数（逐位切片计数比逐个特征移位快一个数量级）
+    bits = "".join(f"{feature:064b}" for feature in features)
+    total = len(features)
+    return sum(1 << (63 - position) for position in range(64) if bits[position::64].count("1") * 2 > total)
+
+
+def hamming_distance(a: int, b: int) -> int:
+    return (a ^ b).bit_count()
+
+
+def jaccard(a: Set[int], b: Set[int]) -> float:
+    if not a and not b:
+        return 1.0
+    return len(a & b) / len(a | b)
+
+
+def dedupe_texts(texts: List[str], similarity: float = 0.8,
+                 seen: Optional[List[Set[int]]] = None) -> List[str]:
+    """
+    按顺序去掉近重复的短文本（关键点、建议等）
+
+    Args:
+        texts: 待去重的文本
+        similarity: Jaccard相似度达到该值视为近重复
+        seen: 已保留文本的特征集合，跨多次调用共享时传入（会被追加）
+
+    Returns:
+        保留的文本（保持原顺序，先出现的优先保留）
+    """
+    seen = [] if seen is None else seen
+    kept = []
+    for text in texts:
+        if not isinstance(text, str) or not text.strip():
+            continue
+        features = shingles(text, size=1)
+        # 没有可比较特征的文本（纯符号等）无法判断是否重复，直接保留
+        if features and any(jaccard(features, other) >= similarity for other in seen):
+            continue
+        seen.append(features)
+        kept.append(text)
+    return kept
+
+
+class ContentDeduplicator:
+    """单次研究请求内的近重复内容消除"""
+
+    def __init__(self, max_distance: int = 3, similarity: float = 0.8,
+                 min_paragraph_chars: int = 50, min_features: int = 6, enabled: bool = True):
+        """
+        初始化去重器
+
+        Args:
+            max_distance: 页面/段落SimHash的汉明距离不超过该值视为近重复（64位）
+            similarity: 关键点/建议的Jaccard相似度达到该值视为近重复
+            min_paragraph_chars: 短于该长度的段落（标题、列表项等）不参与段落级去重
+            min_features: shingle数量少于该值的页面/段落SimHash不可靠，不参与页面级和段落级去重
+            enabled: 关闭时所有方法原样返回内容
+        """
+        self.max_distance = max_distance
+        self.similarity = similarity
+        self.min_paragraph_chars = min_paragraph_chars
+        self.min_features = min_features
+        self.enabled = enabled
+
+        self._pages: List[Tuple[int, str]] = []      # (页面SimHash, 来源)
+        self._paragraphs: List[Tuple[int, str]] = []  # (已分析段落的SimHash, 来源)
+        self._findings: Dict[str, List[Set[int]]] = {}  # 各字段已保留条目的特征集合
+        self.stats = {
+            "pages": 0,
+            "duplicate_pages": 0,
+            "paragraphs_removed": 0,
+            "findings_removed": 0,
+            "tokens_saved": 0
+        }
+
+    def filter_page(self, content: str, source: str = "",
+                    max_chars: Optional[int] = None) -> Tuple[str, Optional[str]]:
+        """
+        LLM分析前过滤页面内容
+
+        Args:
+            content: 页面Markdown内容
+            source: 页面来源（关键词或URL），用于说明重复页面来自哪里
+            max_chars: LLM实际读取的字符数，节省的token按该窗口计算
+
+        Returns:
+            (去掉重复段落后的内容, 近重复页面的来源)；页面是近重复页面时内容为空字符串
+        """
+        if not self.enabled or not content:
+            return content, None
+
+        window = content[:max_chars] if max_chars else content
+        self.stats["pages"] += 1
+
+        page_features = shingles(content)
+        page_hash = simhash(page_features) if len(page_features) >= self.min_features else None
+        for other_hash, other_source in self._pages if page_hash is not None else []:
+            if hamming_distance(page_hash, other_hash) <= self.max_distance:
+                self.stats["duplicate_pages"] += 1
+                self.stats["tokens_saved"] += estimate_tokens(window)
+                return "", other_source or "earlier page"
+
+        kept = []
+        duplicate_sources = []
+        for paragraph in _PARAGRAPH_PATTERN.split(content):
+            paragraph_features = shingles(paragraph) if len(paragraph.strip()) >= self.min_paragraph_chars else set()
+            if len(paragraph_features) >= self.min_features:
+                paragraph_hash = simhash(paragraph_features)
+                other_source = next((other_source for other_hash, other_source in self._paragraphs
+                                     if hamming_distance(paragraph_hash, other_hash) <= self.max_distance), None)
+                if other_source is not None:
+                    self.stats["paragraphs_removed"] += 1
+                    duplicate_sources.append(other_source)
+                    continue
+                self._paragraphs.append((paragraph_hash, source))
+            kept.append(paragraph)
+
+        filtered = "\n\n".join(kept)
+        if duplicate_sources and not any(len(paragraph.strip()) >= self.min_paragraph_chars for paragraph in kept):
+            # 正文段落全部与已分析内容重复（只剩导航、标题等短段落），等同于近重复页面；
+            # 本来就没有长段落的短页面不算重复
+            self.stats["duplicate_pages"] += 1
+            self.stats["tokens_saved"] += estimate_tokens(window)
+            return "", duplicate_sources[0] or "earlier page"
+
+        if page_hash is not None:
+            self._pages.append((page_hash, source))
+        if len(filtered) < len(content):
+            filtered_window = filtered[:max_chars] if max_chars else filtered
+            # 截断窗口内的重复段落被新内容替换时不减少token，只统计实际减少的部分
+            self.stats["tokens_saved"] += max(0, estimate_tokens(window) - estimate_tokens(filtered_window))
+        return filtered, None
+
+    def dedupe_findings(self, results: List[Dict[str, Any]],
+                        fields: Tuple[str, ...] = ("key_points", "recommendations")) -> List[Dict[str, Any]]:
+        """
+        聚合前去掉各关键词结果之间近重复的关键点和建议
+
+        可以在每个关键词完成时逐个调用（增量聚合），与之前所有调用保留的条目比较
+
+        Args:
+            results: 关键词研究结果列表（先传入的结果优先保留）
+            fields: 需要去重的列表字段
+
+        Returns:
+            新的结果列表（浅拷贝，不修改传入的结果）
+        """
+        if not self.enabled:
+            return results
+
+        deduped = []
+        for result in results:
+            result = dict(result)
+            for field in fields:
+                items = result.get(field)
+                if not isinstance(items, list):
+                    continue
+                kept = dedupe_texts(items, self.similarity, self._findings.setdefault(field, []))
+                removed = [item for item in items if item not in kept]
+                self.stats["findings_removed"] += len(removed)
+                self.stats["tokens_saved"] += sum(estimate_tokens(str(item)) for item in removed)
+                result[field] = kept
+            deduped.append(result)
+        return deduped
+
+    def get_stats(self) -> Dict[str, Any]:
+        """获取去重统计"""
+        return {"enabled": self.enabled, **self.stats}
+
+
+def create_content_deduplicator() -> ContentDeduplicator:
+    """根据研究配置为一次研究请求创建去重器"""
+    config = get_research_config()
+    return ContentDeduplicator(
+        max_distance=config["dedup_max_distance"],
+        similarity=config["dedup_similarity"],
+        enabled=config["dedup_enabled"]
+    )
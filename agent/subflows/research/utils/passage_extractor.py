@@ -0,0 +1,121 @@
+"""
+相关段落抽取 (Passage Extractor)
+
+NodeURL 最多抓取约10000字符的页面内容，LLM分析只读取其中一个固定的字符预算。
+直接截取开头会把导航、目录、前言交给LLM，相关内容常在预算之外。这里在LLM分析前：
+1. 按段落（过长的段落按句子）把页面切成约 passage_chars 字符的片段，标题与其后的正文合并在同一片段
+2. 用 LocalToolIndex 的BM25对片段按关键词和关注点打分（英文按单词、中文按字符二元组，不依赖分词库）
+3. 按分数从高到低选取片段直到用完字符预算，再按原文顺序拼接，不相邻的片段之间用省略号分隔
+
+页面本身不超过预算、或没有任何片段与查询相关时，退回原来的截取开头方式。
+"""
+
+import re
+from typing import List
+
+from agent.utils.local_tool_index import LocalToolIndex
+
+# 段落分隔：空行
+_PARAGRAPH_PATTERN = re.compile(r"\n\s*\n")
+# 句子分隔：中英文句末标点之后或换行处
+_SENTENCE_PATTERN = re.compile(r"(?<=[。！？!?；;.])\s+|(?<=[。！？；])|\n")
+# 相邻片段之间的分隔（原文中的段落分隔）
+_ADJACENT = "\n\n"
+# 不相邻片段之间的分隔
+_GAP = "\n\n...\n\n"
+
+
+def _split_paragraph(paragraph: str, passage_chars: int) -> List[str]:
+    """把过长的段落按句子打包成不超过 passage_chars 的片段"""
+    if len(paragraph) <= passage_chars:
+        return [paragraph]
+
+    pieces = []
+    current = ""
+    for sentence in _SENTENCE_PATTERN.split(paragraph):
+        if not sentence:
+            continue
+        # 单个句子超过上限时硬切
+        while len(sentence) > passage_chars:
+            if current:
+                pieces.append(current)
+                current = ""
+            pieces.append(sentence[:passage_chars])
+            sentence = sentence[passage_chars:]
+        if current and len(current) + len(sentence) > passage_chars:
+            pieces.append(current)
+            current = sentence
+        else:
+            current += sentence
+    if current:
+        pieces.append(current)
+    return pieces
+
+
+def split_passages(content: str, passage_chars: int = 300) -> List[str]:
+    """把页面内容切成约 passage_chars 字符的片段（短段落与后续段落合并）"""
+    passages = []
+    current = ""
+    for paragraph in _PARAGRAPH_PATTERN.split(content):
+        paragraph = paragraph.strip()
+        if not paragraph:
+            continue
+        for piece in _split_paragraph(paragraph, passage_chars):
+            if current and len(current) + len(piece) > passage_chars:
+                passages.append(current)
+                current = piece
+            else:
+                current = f"{current}\n\n{piece}" if current else piece
+    if current:
+        passages.append(current)
+    return passages
+
+
+def extract_relevant_passages(content: str, query: str, max_chars: int = 2000,
+                              passage_chars: int = 300) -> str:
+    """
+    在字符预算内抽取与查询最相关的片段
+
+    Args:
+        content: 页面Markdown内容
+        query: 查询文本（关键词和关注点）
+        max_chars: 交给LLM的字符预算（与原来的截取长度一致，token成本不增加）
+        passage_chars: 片段的目标长度
+
+    Returns:
+        按原文顺序拼接的相关片段，不超过 max_chars 个字符
+    """
+    if len(content) <= max_chars:
+        return content
+
+    passages = split_passages(content, passage_chars)
+    index = LocalToolIndex(text_field="text")
+    index.build([{"text": passage, "position": position} for position, passage in enumerate(passages)])
+    ranked = [result["document"]["position"] for result in index.search(query, top_k=len(passages))["results"]]
+    if not ranked:
+        return content[:max_chars]
+
+    # 按分数从高到低加入片段，按拼接后的实际长度判断预算（只有不相邻的片段之间才有省略号）
+    selected = []
+    for position in ranked:
+        candidate = sorted(selected + [position])
+        if _joined_length(passages, candidate) <= max_chars:
+            selected = candidate
+    if not selected:
+        return content[:max_chars]
+
+    parts = [passages[selected[0]]]
+    for previous, position in zip(selected, selected[1:]):
+        parts.append(_separator(previous, position))
+        parts.append(passages[position])
+    return "".join(parts)
+
+
+def _separator(previous: int, position: int) -> str:
+    return _ADJACENT if position == previous + 1 else _GAP
+
+
+def _joined_length(passages: List[str], positions: List[int]) -> int:
+    """按原文顺序拼接所选片段（positions已排序）后的字符数"""
+    return (sum(len(passages[position]) for position in positions)
+            + sum(len(_separator(previous, position)) for previous, position in zip(positions, positions[1:])))
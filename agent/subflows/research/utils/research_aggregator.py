@@ -4,6 +4,10 @@
 负责将多个关键词的研究报告聚合成最终的研究总结
 """
 
+from typing import Dict, List, Any, Optional
+
+from .content_dedup import dedupe_texts, estimate_tokens
+
 
 class ResearchAggregator:
     """研究结果聚合器"""
@@ -21,6 +25,10 @@ class ResearchAggregator:
                     "total_keywords": 0,
                     "successful_keywords": 0,
                     "average_relevance": 0.0
+                },
+                "deduplication": {
+                    "removed_items": 0,
+                    "tokens_saved": 0
                 }
             }
         
@@ -49,10 +57,18 @@ class ResearchAggregator:
             relevance = analysis.get("relevance_score", 0.0)
             relevance_scores.append(relevance)
         
-        # 去重和排序
-        unique_insights = list(set(all_insights))[:10]  # 最多10个洞察
-        unique_tech_details = list(set(all_technical_details))[:8]  # 最多8个技术细节
-        unique_recommendations = list(set(all_recommendations))[:6]  # 最多6个建议
+        # 近重复去重（保持原顺序，先出现的优先保留），再截断
+        deduped_insights = dedupe_texts(all_insights)
+        deduped_tech_details = dedupe_texts(all_technical_details)
+        deduped_recommendations = dedupe_texts(all_recommendations)
+        unique_insights = deduped_insights[:10]  # 最多10个洞察
+        unique_tech_details = deduped_tech_details[:8]  # 最多8个技术细节
+        unique_recommendations = deduped_recommendations[:6]  # 最多6个建议
+
+        all_items = all_insights + all_technical_details + all_recommendations
+        deduped_items = deduped_insights + deduped_tech_details + deduped_recommendations
+        tokens_saved = (sum(estimate_tokens(str(item)) for item in all_items)
+                        - sum(estimate_tokens(item) for item in deduped_items))
         
         # 计算平均相关性
         avg_relevance = sum(relevance_scores) / len(relevance_scores) if relevance_scores else 0.0
@@ -67,5 +83,73 @@ class ResearchAggregator:
                 "successful_keywords": len([r for r in research_report if r.get("analysis", {}).get("relevance_score", 0) > 0.5]),
                 "average_relevance": avg_relevance,
                 "high_quality_results": len([r for r in research_report if r.get("analysis", {}).get("relevance_score", 0) > 0.7])
+            },
+            "deduplication": {
+                "removed_items": len(all_items) - len(deduped_items),
+                "tokens_saved": tokens_saved
             }
         }
+
+
+class IncrementalResearchAggregator:
+    """
+    增量研究结果聚合器
+
+    每个关键词完成时调用 add_outcome，随时可以通过 snapshot 获取截至目前的聚合结果，
+    不需要等最慢的关键词完成后再统一聚合。关键点和建议按完成顺序近重复去重。
+    """
+
+    def __init__(self, total: int, max_key_points: int = 10, max_recommendations: int = 6):
+        """
+        初始化聚合器
+
+        Args:
+            total: 本次研究的关键词总数
+            max_key_points: 聚合结果保留的关键点数量
+            max_recommendations: 聚合结果保留的建议数量
+        """
+        self.total = total
+        self.max_key_points = max_key_points
+        self.max_recommendations = max_recommendations
+
+        self.completed = 0
+        self.counts = {"success": 0, "failed": 0, "skipped": 0}
+        self.key_points: List[str] = []
+        self.recommendations: List[str] = []
+        self.sources: List[Dict[str, str]] = []
+        self._seen = {"key_points": [], "recommendations": []}
+
+    def add_outcome(self, keyword: str, status: str, result: Optional[Dict[str, Any]] = None) -> None:
+        """
+        加入一个关键词的结果
+
+        Args:
+            keyword: 关键词
+            status: success / failed / skipped
+            result: 关键词研究结果（summary、key_points、recommendations、source）
+        """
+        self.completed += 1
+        self.counts[status] = self.counts.get(status, 0) + 1
+        if status != "success" or not result:
+            return
+
+        self.key_points.extend(dedupe_texts(result.get("key_points") or [], seen=self._seen["key_points"]))
+        self.recommendations.extend(
+            dedupe_texts(result.get("recommendations") or [], seen=self._seen["recommendations"])
+        )
+        source = result.get("source") or {}
+        if source.get("url"):
+            self.sources.append({"keyword": keyword, "url": source["url"], "title": source.get("title", "")})
+
+    def snapshot(self) -> Dict[str, Any]:
+        """截至目前的聚合结果"""
+        return {
+            "completed": self.completed,
+            "total": self.total,
+            "successful_keywords": self.counts["success"],
+            "failed_keywords": self.counts["failed"],
+            "skipped_keywords": self.counts["skipped"],
+            "key_findings": self.key_points[:self.max_key_points],
+            "recommendations": self.recommendations[:self.max_recommendations],
+            "sources": list(self.sources)
+        }
@@ -0,0 +1,229 @@
+"""
+关键词研究执行器 (ResearchExecutor)
+
+有界并发地执行关键词研究子流程（搜索 → URL解析 → LLM分析），替代对所有关键词无限制的 asyncio.gather：
+- 单请求并发上限：一个研究请求同时进行的子流程数量
+- 进程级并发上限：所有请求共享，避免多个请求同时把Jina和大模型服务打满
+- 时间预算：超过预算后取消进行中的子流程，未开始的关键词跳过
+- 提前完成：高质量结果达到数量要求后，取消其余子流程并跳过未开始的关键词
+"""
+
+import asyncio
+import time
+from dataclasses import dataclass, field
+from typing import Dict, List, Any, Awaitable, Callable, Optional, Tuple
+
+from utils.config_manager import get_research_config
+
+
+@dataclass
+class KeywordOutcome:
+    """单个关键词的执行结果"""
+    keyword: str
+    status: str                              # success / failed / skipped
+    result: Dict[str, Any] = field(default_factory=dict)
+    error: str = ""
+    quality: float = 0.0
+    elapsed: float = 0.0
+
+
+@dataclass
+class ResearchExecution:
+    """一次研究请求的执行结果"""
+    outcomes: List[KeywordOutcome]           # 与输入关键词顺序一致
+    early_completed: bool = False
+    budget_exhausted: bool = False
+    execution_time: float = 0.0
+
+    def by_status(self, status: str) -> List[KeywordOutcome]:
+        return [outcome for outcome in self.outcomes if outcome.status == status]
+
+
+def score_research_result(result: Dict[str, Any]) -> float:
+    """
+    估算单个关键词研究结果的质量（0~1）
+
+    有实际摘要（不是默认占位摘要）、关键点越多、带有来源URL的结果质量越高
+    """
+    if not result:
+        return 0.0
+    keyword = result.get("keyword", "")
+    summary = str(result.get("summary", "")).strip()
+    key_points = result.get("key_points") or []
+    source = result.get("source") or {}
+
+    score = 0.0
+    if summary and summary != f"关于{keyword}的分析":
+        score += 0.4
+    score += 0.4 * min(len(key_points), 3) / 3
+    if source.get("url"):
+        score += 0.2
+    return round(score, 4)
+
+
+class ResearchExecutor:
+    """关键词研究子流程的有界并发执行器"""
+
+    def __init__(self, max_concurrency_per_request: int = 3, max_global_concurrency: int = 6,
+                 time_budget: float = 180, early_stop_results: int = 5, quality_threshold: float = 0.6):
+        """
+        初始化执行器
+
+        Args:
+            max_concurrency_per_request: 单个研究请求的并发子流程上限
+            max_global_concurrency: 进程内所有研究请求的并发子流程上限
+            time_budget: 单个研究请求的时间预算（秒，<=0 表示不限制）
+            early_stop_results: 高质量结果达到该数量后提前完成（<=0 表示不提前完成）
+            quality_threshold: 高质量结果的最低质量分数
+        """
+        self.max_concurrency_per_request = max(1, max_concurrency_per_request)
+        self.max_global_concurrency = max(1, max_global_concurrency)
+        self.time_budget = time_budget
+        self.early_stop_results = early_stop_results
+        self.quality_threshold = quality_threshold
+
+        # 进程级信号量绑定创建时的事件循环，按需创建
+        self._global_semaphore: Optional[asyncio.Semaphore] = None
+        self._loop = None
+
+        self.stats = {
+            "requests": 0,
+            "subflows_started": 0,
+            "subflows_skipped": 0,
+            "subflows_cancelled": 0,
+            "early_completions": 0,
+            "budget_exhaustions": 0,
+            "active": 0,
+            "peak_active": 0
+        }
+
+    async def run(self, tasks: List[Tuple[str, Callable[[], Awaitable[Dict[str, Any]]]]],
+                  scorer: Callable[[Dict[str, Any]], float] = score_research_result,
+                  on_outcome: Optional[Callable[[KeywordOutcome], Awaitable[None]]] = None) -> ResearchExecution:
+        """
+        有界并发地执行关键词研究任务
+
+        Args:
+            tasks: (关键词, 返回该关键词研究结果的协程函数) 列表，协程抛出异常视为失败
+            scorer: 结果质量评分函数
+            on_outcome: 每个关键词完成（成功或失败）时立即调用的回调，用于流式返回和增量聚合；
+                回调可以修改传入的结果，回调本身的异常不影响该关键词的结果
+
+        Returns:
+            执行结果（关键词顺序与输入一致）
+        """
+        self.stats["requests"] += 1
+        global_semaphore = self._get_global_semaphore()
+        request_semaphore = asyncio.Semaphore(self.max_concurrency_per_request)
+        outcomes: Dict[int, KeywordOutcome] = {}
+        reporting = set()  # 正在执行结果回调的关键词，提前完成或超出预算时不取消
+        enough_results = asyncio.Event()
+        start_time = time.perf_counter()
+
+        async def run_one(index: int, keyword: str, factory):
+            async with request_semaphore, global_semaphore:
+                if enough_results.is_set():
+                    return
+                self.stats["subflows_started"] += 1
+                self.stats["active"] += 1
+                self.stats["peak_active"] = max(self.stats["peak_active"], self.stats["active"])
+                task_start = time.perf_counter()
+                try:
+                    result = await factory() or {}
+                    quality = scorer(result)
+                    outcomes[index] = KeywordOutcome(keyword, "success", result, quality=quality,
+                                                     elapsed=time.perf_counter() - task_start)
+                    if self._enough_quality_results(outcomes):
+                        enough_results.set()
+                except asyncio.CancelledError:
+                    self.stats["subflows_cancelled"] += 1
+                    raise
+                except Exception as e:
+                    outcomes[index] = KeywordOutcome(keyword, "failed", error=str(e),
+                                                     elapsed=time.perf_counter() - task_start)
+                finally:
+                    self.stats["active"] -= 1
+
+            # 释放并发名额后再回调，回调耗时不占用子流程的并发上限
+            if on_outcome and index in outcomes:
+                reporting.add(index)
+                try:
+                    await on_outcome(outcomes[index])
+                except Exception as e:
+                    print(f"⚠️ 关键词 '{keyword}' 结果回调失败: {e}")
+
+        running = [asyncio.create_task(run_one(i, keyword, factory)) for i, (keyword, factory) in enumerate(tasks)]
+        all_done = asyncio.gather(*running, return_exceptions=True)
+        waiter = asyncio.create_task(enough_results.wait())
+        budget = self.time_budget if self.time_budget and self.time_budget > 0 else None
+
+        try:
+            done, _ = await asyncio.wait(
+                [all_done, waiter],
+                timeout=budget,
+                return_when=asyncio.FIRST_COMPLETED
+            )
+            early_completed = enough_results.is_set()
+            budget_exhausted = not done
+        finally:
+            waiter.cancel()
+            for index, task in enumerate(running):
+                if not task.done() and index not in reporting:
+                    task.cancel()
+            await all_done
+
+        if early_completed:
+            self.stats["early_completions"] += 1
+        if budget_exhausted:
+            self.stats["budget_exhaustions"] += 1
+
+        # 没有结果的关键词：已开始的被取消，未开始的被跳过
+        reason = "已获得足够的高质量研究结果" if early_completed else "研究超出时间预算"
+        ordered = []
+        for i, (keyword, _) in enumerate(tasks):
+            if i in outcomes:
+                ordered.append(outcomes[i])
+            else:
+                ordered.append(KeywordOutcome(keyword, "skipped", error=reason))
+                self.stats["subflows_skipped"] += 1
+
+        return ResearchExecution(
+            outcomes=ordered,
+            early_completed=early_completed,
+            budget_exhausted=budget_exhausted,
+            execution_time=time.perf_counter() - start_time
+        )
+
+    def _enough_quality_results(self, outcomes: Dict[int, KeywordOutcome]) -> bool:
+        if self.early_stop_results <= 0:
+            return False
+        good = sum(1 for outcome in outcomes.values()
+                   if outcome.status == "success" and outcome.quality >= self.quality_threshold)
+        return good >= self.early_stop_results
+
+    def _get_global_semaphore(self) -> asyncio.Semaphore:
+        """事件循环变化时重新创建进程级信号量"""
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            self._global_semaphore = asyncio.Semaphore(self.max_global_concurrency)
+            self._loop = loop
+        return self._global_semaphore
+
+    def get_stats(self) -> Dict[str, Any]:
+        """获取执行统计信息"""
+        return dict(self.stats)
+
+
+def _create_executor() -> ResearchExecutor:
+    config = get_research_config()
+    return ResearchExecutor(
+        max_concurrency_per_request=config.get("max_concurrency_per_request", 3),
+        max_global_concurrency=config.get("max_global_concurrency", 6),
+        time_budget=config.get("time_budget", 180),
+        early_stop_results=config.get("early_stop_results", 5),
+        quality_threshold=config.get("quality_threshold", 0.6)
+    )
+
+
+# 全局研究执行器实例（进程级并发上限在所有研究请求之间共享）
+research_executor = _create_executor()
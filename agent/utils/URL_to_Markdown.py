@@ -5,8 +5,10 @@ Jina URL转Markdown工具
 import os
 import aiohttp
 import asyncio
-from typing import Dict, Optional, Any
-from utils.config_manager import get_jina_api_key
+from typing import Dict, List, Optional, Any, AsyncIterator, Tuple
+from utils.config_manager import get_jina_api_key, get_jina_base_urls
+from agent.utils.http_session import get_http_session
+from agent.utils.web_cache import web_cache, make_cache_key
 
 class JinaWebClient:
     """Jina URL转Markdown客户端"""
@@ -14,20 +16,23 @@ class JinaWebClient:
     def __init__(
         self,
         api_key: Optional[str] = None,
-        base_url: str = "https://r.jina.ai/",
-        timeout: int = 30
+        base_url: Optional[str] = None,
+        timeout: int = 30,
+        use_cache: bool = True
     ):
         """
         初始化 Jina Web 客户端
         
         Args:
             api_key: API密钥，如果为None则从环境变量JINA_API_KEY读取
-            base_url: API端点URL
+            base_url: API端点URL，如果为None则从配置读取（jina.web_base_url，默认 https://r.jina.ai/）
             timeout: 请求超时时间（秒）
+            use_cache: 是否使用磁盘缓存（agent.utils.web_cache）
         """
         self.api_key = api_key or get_jina_api_key() or os.getenv("JINA_API_KEY")
-        self.base_url = base_url.rstrip("/")
+        self.base_url = (base_url or get_jina_base_urls()["web_base_url"]).rstrip("/")
         self.timeout = timeout
+        self.cache = web_cache if use_cache else None
         
         if not self.api_key:
             raise ValueError("API密钥未设置，请设置JINA_API_KEY环境变量或传入api_key参数")
@@ -56,16 +61,23 @@ class JinaWebClient:
             # 构建完整的API URL
             api_url = f"{self.base_url}/{url}"
 
-            # 使用异步HTTP客户端发送请求
+            # 使用共享的异步HTTP会话发送请求（复用连接）
             timeout = aiohttp.ClientTimeout(total=self.timeout)
-            async with aiohttp.ClientSession(timeout=timeout) as session:
-                async with session.get(
-                    api_url,
-                    headers=self.headers,
-                    params=kwargs
-                ) as response:
-                    response.raise_for_status()
-                    return await response.json()
+            if self.cache:
+                # 缓存键不包含API密钥
+                return await self.cache.fetch_json(
+                    "reader", make_cache_key(api_url, kwargs),
+                    api_url, params=kwargs, headers=self.headers, timeout=timeout
+                )
+
+            async with get_http_session().get(
+                api_url,
+                headers=self.headers,
+                params=kwargs,
+                timeout=timeout
+            ) as response:
+                response.raise_for_status()
+                return await response.json()
 
         except aiohttp.ClientError as e:
             raise Exception(f"Jina Web API调用失败: {str(e)}")
@@ -74,13 +86,13 @@ class JinaWebClient:
         except Exception as e:
             raise Exception(f"URL转换过程中发生错误: {str(e)}")
     
-    def get_content(
+    async def get_content(
         self,
         url: str,
         **kwargs
     ) -> str:
         """
-        获取URL的Markdown内容
+        获取URL的Markdown内容 - 异步版本
         
         Args:
             url: 要获取内容的URL
@@ -89,7 +101,7 @@ class JinaWebClient:
         Returns:
             Markdown格式的内容字符串
         """
-        result = self.url_to_markdown(url, **kwargs)
+        result = await self.url_to_markdown(url, **kwargs)
         
         if result.get("code") != 200:
             raise Exception(f"获取内容失败: {result.get('status', 'Unknown error')}")
@@ -147,33 +159,80 @@ class JinaWebClient:
             "tokens": usage.get("tokens", 0) or meta_usage.get("tokens", 0)
         }
     
-    def batch_convert(
+    async def iter_convert(
+        self,
+        urls: List[str],
+        concurrency: int = 5,
+        timeout: Optional[float] = None,
+        **kwargs
+    ) -> AsyncIterator[Tuple[str, Dict[str, str]]]:
+        """
+        并发转换多个URL，按完成顺序逐个返回结果 - 异步版本
+
+        同时进行的请求数不超过concurrency，每个URL有独立的超时；
+        单个URL失败时返回带error字段的结果，不影响其他URL。
+        调用方提前停止迭代时（使用 contextlib.aclosing 包裹），未完成的请求会被立即取消。
+
+        Args:
+            urls: URL列表（重复的URL只转换一次）
+            concurrency: 最大并发请求数
+            timeout: 单个URL的超时时间（秒），为None时使用客户端的timeout
+            **kwargs: 其他请求参数
+
+        Yields:
+            (url, 页面信息) 元组，页面信息格式同get_page_info，失败时包含error字段
+        """
+        semaphore = asyncio.Semaphore(max(1, concurrency))
+        per_url_timeout = timeout if timeout is not None else self.timeout
+
+        async def convert(url: str) -> Tuple[str, Dict[str, str]]:
+            async with semaphore:
+                try:
+                    page_info = await asyncio.wait_for(self.get_page_info(url, **kwargs), timeout=per_url_timeout)
+                    return url, page_info
+                except asyncio.TimeoutError:
+                    error = f"转换超时（{per_url_timeout}秒）"
+                except Exception as e:
+                    error = str(e)
+            return url, {
+                "title": "",
+                "description": "",
+                "url": url,
+                "content": "",
+                "error": error
+            }
+
+        tasks = [asyncio.create_task(convert(url)) for url in dict.fromkeys(urls)]
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                yield await next_done
+        finally:
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def batch_convert(
         self,
-        urls: list,
+        urls: List[str],
+        concurrency: int = 5,
+        timeout: Optional[float] = None,
         **kwargs
     ) -> Dict[str, Dict[str, str]]:
         """
-        批量转换多个URL
+        批量转换多个URL - 异步版本（并发执行，见iter_convert）
         
         Args:
             urls: URL列表
+            concurrency: 最大并发请求数
+            timeout: 单个URL的超时时间（秒）
             **kwargs: 其他请求参数
             
         Returns:
-            以URL为键的结果字典
+            以URL为键的结果字典（按输入顺序），失败的URL包含error字段
         """
         results = {}
-        
-        for url in urls:
-            try:
-                results[url] = self.get_page_info(url, **kwargs)
-            except Exception as e:
-                results[url] = {
-                    "title": "",
-                    "description": "",
-                    "url": url,
-                    "content": "",
-                    "error": str(e)
-                }
-        
-        return results
+        async for url, page_info in self.iter_convert(urls, concurrency=concurrency, timeout=timeout, **kwargs):
+            results[url] = page_info
+
+        return {url: results[url] for url in dict.fromkeys(urls)}
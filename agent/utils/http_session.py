@@ -0,0 +1,187 @@
+"""
+共享HTTP会话管理器 (HTTPSessionManager)
+
+Jina搜索和Jina Reader客户端共用的进程级aiohttp会话，替代每次请求新建会话：
+- 连接池：总连接数和每个主机的连接数上限，空闲连接保持keep-alive以便复用
+- DNS缓存：解析结果在TTL内复用
+- 通过aiohttp的TraceConfig统计连接复用率、DNS缓存命中和每个主机的请求延迟
+- 应用退出时调用 close_http_sessions() 关闭会话（FastAPI在shutdown事件中调用）
+"""
+
+import asyncio
+import time
+from collections import defaultdict, deque
+from typing import Dict, Any, Optional
+from urllib.parse import urlsplit
+
+import aiohttp
+
+from utils.config_manager import get_http_config
+
+
+class HTTPSessionManager:
+    """进程级共享aiohttp会话管理器"""
+
+    def __init__(self, pool_limit: int = 100, limit_per_host: int = 20,
+                 keepalive_timeout: float = 30, dns_cache_ttl: int = 300,
+                 latency_window: int = 200):
+        """
+        初始化会话管理器
+
+        Args:
+            pool_limit: 连接池总连接数上限
+            limit_per_host: 每个主机的连接数上限
+            keepalive_timeout: 空闲连接保持时间（秒）
+            dns_cache_ttl: DNS缓存时间（秒）
+            latency_window: 每个主机保留的最近请求延迟数量（用于计算分位数）
+        """
+        self.pool_limit = pool_limit
+        self.limit_per_host = limit_per_host
+        self.keepalive_timeout = keepalive_timeout
+        self.dns_cache_ttl = dns_cache_ttl
+        self.latency_window = latency_window
+
+        # aiohttp会话绑定创建它的事件循环
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._session_loop = None
+
+        self.stats = {
+            "sessions_created": 0,
+            "requests": 0,
+            "errors": 0,
+            "new_connections": 0,
+            "reused_connections": 0,
+            "dns_cache_hits": 0,
+            "dns_cache_misses": 0
+        }
+        self._host_stats: Dict[str, Dict[str, Any]] = defaultdict(self._new_host_stats)
+
+    def get_session(self) -> aiohttp.ClientSession:
+        """获取当前事件循环的共享会话（不存在、已关闭或事件循环变化时创建）"""
+        loop = asyncio.get_running_loop()
+        if self._session is None or self._session.closed or self._session_loop is not loop:
+            connector = aiohttp.TCPConnector(
+                limit=self.pool_limit,
+                limit_per_host=self.limit_per_host,
+                keepalive_timeout=self.keepalive_timeout,
+                use_dns_cache=True,
+                ttl_dns_cache=self.dns_cache_ttl
+            )
+            self._session = aiohttp.ClientSession(connector=connector, trace_configs=[self._build_trace_config()])
+            self._session_loop = loop
+            self.stats["sessions_created"] += 1
+        return self._session
+
+    async def close(self) -> None:
+        """关闭共享会话（只能在创建会话的事件循环中关闭）"""
+        if self._session and not self._session.closed:
+            try:
+                if self._session_loop is asyncio.get_running_loop():
+                    await self._session.close()
+            except RuntimeError:
+                pass
+        self._session = None
+        self._session_loop = None
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        获取会话统计信息
+
+        Returns:
+            全局计数、连接复用率和每个主机的请求数、错误数、平均/p95延迟
+        """
+        connections = self.stats["new_connections"] + self.stats["reused_connections"]
+        hosts = {}
+        for host, host_stats in self._host_stats.items():
+            latencies = sorted(host_stats["latencies"])
+            completed = host_stats["requests"] - host_stats["errors"]
+            hosts[host] = {
+                "requests": host_stats["requests"],
+                "errors": host_stats["errors"],
+                "new_connections": host_stats["new_connections"],
+                "reused_connections": host_stats["reused_connections"],
+                "avg_ms": host_stats["total_ms"] / completed if completed else 0.0,
+                "p95_ms": latencies[min(int(len(latencies) * 0.95), len(latencies) - 1)] if latencies else 0.0
+            }
+        return {
+            **self.stats,
+            "connection_reuse_rate": self.stats["reused_connections"] / connections if connections else 0.0,
+            "hosts": hosts
+        }
+
+    def _new_host_stats(self) -> Dict[str, Any]:
+        return {
+            "requests": 0,
+            "errors": 0,
+            "new_connections": 0,
+            "reused_connections": 0,
+            "total_ms": 0.0,
+            "latencies": deque(maxlen=self.latency_window)
+        }
+
+    def _build_trace_config(self) -> aiohttp.TraceConfig:
+        """请求生命周期回调：统计连接复用、DNS缓存和请求延迟"""
+        trace_config = aiohttp.TraceConfig()
+
+        async def on_request_start(session, ctx, params):
+            ctx.host = urlsplit(str(params.url)).netloc
+            ctx.start_time = time.perf_counter()
+            self.stats["requests"] += 1
+            self._host_stats[ctx.host]["requests"] += 1
+
+        async def on_request_end(session, ctx, params):
+            elapsed_ms = (time.perf_counter() - ctx.start_time) * 1000
+            host_stats = self._host_stats[ctx.host]
+            host_stats["total_ms"] += elapsed_ms
+            host_stats["latencies"].append(elapsed_ms)
+
+        async def on_request_exception(session, ctx, params):
+            self.stats["errors"] += 1
+            self._host_stats[ctx.host]["errors"] += 1
+
+        async def on_connection_create_end(session, ctx, params):
+            self.stats["new_connections"] += 1
+            self._host_stats[ctx.host]["new_connections"] += 1
+
+        async def on_connection_reuseconn(session, ctx, params):
+            self.stats["reused_connections"] += 1
+            self._host_stats[ctx.host]["reused_connections"] += 1
+
+        async def on_dns_cache_hit(session, ctx, params):
+            self.stats["dns_cache_hits"] += 1
+
+        async def on_dns_cache_miss(session, ctx, params):
+            self.stats["dns_cache_misses"] += 1
+
+        trace_config.on_request_start.append(on_request_start)
+        trace_config.on_request_end.append(on_request_end)
+        trace_config.on_request_exception.append(on_request_exception)
+        trace_config.on_connection_create_end.append(on_connection_create_end)
+        trace_config.on_connection_reuseconn.append(on_connection_reuseconn)
+        trace_config.on_dns_cache_hit.append(on_dns_cache_hit)
+        trace_config.on_dns_cache_miss.append(on_dns_cache_miss)
+        return trace_config
+
+
+def _create_manager() -> HTTPSessionManager:
+    config = get_http_config()
+    return HTTPSessionManager(
+        pool_limit=config.get("pool_limit", 100),
+        limit_per_host=config.get("limit_per_host", 20),
+        keepalive_timeout=config.get("keepalive_timeout", 30),
+        dns_cache_ttl=config.get("dns_cache_ttl", 300)
+    )
+
+
+# 全局会话管理器实例
+http_session_manager = _create_manager()
+
+
+def get_http_session() -> aiohttp.ClientSession:
+    """获取共享HTTP会话的便捷函数（需要在事件循环中调用）"""
+    return http_session_manager.get_session()
+
+
+async def close_http_sessions() -> None:
+    """关闭共享HTTP会话的便捷函数（应用退出时调用）"""
+    await http_session_manager.close()
@@ -0,0 +1,224 @@
+"""
+本地工具检索索引 (LocalToolIndex)
+
+向量服务不可用时的进程内检索后端，索引与NodeToolIndex._build_document生成的文档相同：
+- BM25词法检索：英文/数字按单词切分，中文按字符二元组切分，不依赖分词库
+- 可选稠密向量：提供embedder时在内存中保存文档向量，按余弦相似度与BM25加权融合
+  （安装了numpy时使用矩阵运算，否则使用纯Python计算）
+- 检索结果格式与向量服务 /search 接口一致（{"results": [{"document", "score"}], "total"}），
+  分数归一化到0~1，可直接复用NodeToolRecommend的过滤和阈值逻辑
+"""
+
+import heapq
+import math
+import re
+import threading
+import time
+from collections import Counter, defaultdict
+from typing import Dict, List, Any, Optional, Callable
+
+from utils.config_manager import get_vector_service_config
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+
+# 英文单词/数字，或连续的中日韩字符
+_TOKEN_PATTERN = re.compile(r"[a-z0-9]+|[぀-ヿ㐀-䶿一-鿿]+")
+_CJK_PATTERN = re.compile(r"[぀-ヿ㐀-䶿一-鿿]")
+
+
+def tokenize(text: str) -> List[str]:
+    """切分检索词：英文按单词，中文按字符二元组（单个汉字保留为一元词）"""
+    tokens = []
+    for match in _TOKEN_PATTERN.findall(text.lower()):
+        if not _CJK_PATTERN.match(match):
+            tokens.append(match)
+        elif len(match) == 1:
+            tokens.append(match)
+        else:
+            tokens.extend(match[i:i + 2] for i in range(len(match) - 1))
+    return tokens
+
+
+class LocalToolIndex:
+    """进程内BM25（+可选稠密向量）工具检索索引"""
+
+    def __init__(self, text_field: str = "combined_text", k1: float = 1.5, b: float = 0.75,
+                 embedder: Optional[Callable[[List[str]], List[List[float]]]] = None,
+                 dense_weight: float = 0.5):
+        """
+        初始化本地索引
+
+        Args:
+            text_field: 用于检索的文档字段（与向量服务的vector_field一致）
+            k1: BM25词频饱和参数
+            b: BM25文档长度归一化参数
+            embedder: 可选的向量化函数（文本列表 -> 向量列表），提供时启用稠密检索
+            dense_weight: 稠密相似度在融合分数中的权重
+        """
+        self.text_field = text_field
+        self.k1 = k1
+        self.b = b
+        self.embedder = embedder
+        self.dense_weight = dense_weight
+
+        self._documents: List[Dict[str, Any]] = []
+        self._postings: Dict[str, List[tuple]] = {}
+        self._idf: Dict[str, float] = {}
+        self._vectors = None
+        self._lock = threading.Lock()
+        self.built_at: Optional[float] = None
+
+        self.stats = {"searches": 0, "total_search_ms": 0.0, "build_ms": 0.0}
+
+    def __len__(self) -> int:
+        return len(self._documents)
+
+    def is_ready(self) -> bool:
+        """索引中是否有文档"""
+        return bool(self._documents)
+
+    def build(self, documents: List[Dict[str, Any]]) -> None:
+        """
+        用文档列表重建索引（构建完成后原子替换，构建期间的检索使用旧索引）
+
+        Args:
+            documents: NodeToolIndex._build_document生成的文档列表
+        """
+        start_time = time.perf_counter()
+
+        term_freqs = []
+        doc_freq = Counter()
+        for doc in documents:
+            tokens = tokenize(self._document_text(doc))
+            counts = Counter(tokens)
+            term_freqs.append((counts, len(tokens)))
+            doc_freq.update(counts.keys())
+
+        total = len(documents)
+        avg_length = sum(length for _, length in term_freqs) / total if total else 0.0
+        idf = {
+            term: math.log(1 + (total - freq + 0.5) / (freq + 0.5))
+            for term, freq in doc_freq.items()
+        }
+
+        # 倒排表中预先计算每个(词, 文档)的BM25分量，检索时只需累加
+        postings = defaultdict(list)
+        for doc_index, (counts, length) in enumerate(term_freqs):
+            norm = self.k1 * (1 - self.b + self.b * length / avg_length) if avg_length else self.k1
+            for term, tf in counts.items():
+                postings[term].append((doc_index, idf[term] * tf * (self.k1 + 1) / (tf + norm)))
+
+        vectors = None
+        if self.embedder and documents:
+            vectors = self._normalize_vectors(
+                self.embedder([self._document_text(doc) for doc in documents])
+            )
+
+        with self._lock:
+            self._documents = list(documents)
+            self._postings = dict(postings)
+            self._idf = idf
+            self._vectors = vectors
+            self.built_at = time.time()
+
+        self.stats["build_ms"] = (time.perf_counter() - start_time) * 1000
+
+    def search(self, query: str, top_k: int = 5) -> Dict[str, Any]:
+        """
+        检索与查询最相关的工具
+
+        BM25分数按查询中出现在索引里的词的理论最大分数（idf*(k1+1)之和）归一化到0~1，
+        表示文档覆盖了多少可匹配的查询证据（索引中不存在的词，如口语化的填充词，不参与归一化）；
+        启用稠密向量时与余弦相似度加权融合。
+
+        Args:
+            query: 查询文本
+            top_k: 返回结果数量
+
+        Returns:
+            {"results": [{"document": 文档, "score": 分数}], "total": 结果数量}
+        """
+        start_time = time.perf_counter()
+        with self._lock:
+            documents = self._documents
+            postings = self._postings
+            idf = self._idf
+            vectors = self._vectors
+
+        query_terms = Counter(tokenize(query))
+        scores = defaultdict(float)
+        max_score = 0.0
+        for term, query_tf in query_terms.items():
+            if term not in postings:
+                continue
+            max_score += idf[term] * (self.k1 + 1) * query_tf
+            for doc_index, weight in postings[term]:
+                scores[doc_index] += weight * query_tf
+
+        final_scores = {
+            doc_index: score / max_score for doc_index, score in scores.items()
+        } if max_score else {}
+
+        if vectors is not None and self.embedder:
+            dense_scores = self._dense_scores(query, vectors)
+            final_scores = {
+                doc_index: (1 - self.dense_weight) * final_scores.get(doc_index, 0.0) +
+                self.dense_weight * max(dense_scores[doc_index], 0.0)
+                for doc_index in range(len(documents))
+            }
+
+        ranked = heapq.nlargest(top_k, final_scores.items(), key=lambda item: item[1])
+        results = [
+            {"document": dict(documents[doc_index]), "score": round(score, 4)}
+            for doc_index, score in ranked if score > 0
+        ]
+
+        self.stats["searches"] += 1
+        self.stats["total_search_ms"] += (time.perf_counter() - start_time) * 1000
+        return {"results": results, "total": len(results), "backend": "local"}
+
+    def get_stats(self) -> Dict[str, Any]:
+        """获取索引统计信息"""
+        searches = self.stats["searches"]
+        return {
+            **self.stats,
+            "documents": len(self._documents),
+            "terms": len(self._postings),
+            "dense": self._vectors is not None,
+            "avg_search_ms": self.stats["total_search_ms"] / searches if searches else 0.0
+        }
+
+    def _document_text(self, doc: Dict[str, Any]) -> str:
+        """参与检索的文本：组合文本加上工具id（id中常含包名/服务名）"""
+        return f"{doc.get('id', '')} {doc.get(self.text_field) or doc.get('summary', '')}"
+
+    def _dense_scores(self, query: str, vectors) -> List[float]:
+        """查询与全部文档的余弦相似度"""
+        query_vector = self._normalize_vectors(self.embedder([query]))
+        if numpy is not None:
+            return (vectors @ query_vector[0]).tolist()
+        return [sum(a * b for a, b in zip(vector, query_vector[0])) for vector in vectors]
+
+    @staticmethod
+    def _normalize_vectors(vectors: List[List[float]]):
+        """向量L2归一化（有numpy时返回矩阵）"""
+        if numpy is not None:
+            matrix = numpy.asarray(vectors, dtype=numpy.float32)
+            norms = numpy.linalg.norm(matrix, axis=1, keepdims=True)
+            return matrix / numpy.maximum(norms, 1e-12)
+
+        normalized = []
+        for vector in vectors:
+            norm = math.sqrt(sum(value * value for value in vector)) or 1e-12
+            normalized.append([value / norm for value in vector])
+        return normalized
+
+
+# 全局本地索引实例（由NodeToolIndex在每次同步时重建）
+local_tool_index = LocalToolIndex(
+    text_field=get_vector_service_config().get("vector_field", "combined_text")
+)
@@ -0,0 +1,111 @@
+"""
+异步限流器 (AsyncRateLimiter)
+
+限制对外部API（如Jina搜索）的请求速率和并发数，替代在异步代码中调用 time.sleep 的节流方式：
+- 令牌桶：按 requests_per_second 匀速补充令牌，最多积累 burst 个，允许短时突发
+- 并发上限：同时进行中的请求数不超过 max_concurrency
+- 等待令牌使用 asyncio.sleep，不阻塞事件循环中的其他任务
+- 限流器是进程级的：并发执行的多个研究子流程共享同一个配额
+"""
+
+import asyncio
+import time
+from contextlib import asynccontextmanager
+from typing import Dict, Any, Optional
+
+from utils.config_manager import get_search_config
+
+
+class AsyncRateLimiter:
+    """令牌桶 + 并发上限的异步限流器"""
+
+    def __init__(self, requests_per_second: float = 2.0, burst: int = 2, max_concurrency: int = 3):
+        """
+        初始化限流器
+
+        Args:
+            requests_per_second: 每秒补充的令牌数（<=0 表示不限速）
+            burst: 令牌桶容量（允许的最大突发请求数）
+            max_concurrency: 同时进行中的请求数上限（<=0 表示不限制）
+        """
+        self.requests_per_second = requests_per_second
+        self.burst = max(1, burst)
+        self.max_concurrency = max_concurrency
+
+        self._tokens = float(self.burst)
+        self._last_refill = time.monotonic()
+        # asyncio原语绑定创建时的事件循环，按需创建
+        self._lock: Optional[asyncio.Lock] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._loop = None
+
+        self.stats = {"acquired": 0, "throttled": 0, "total_wait_ms": 0.0, "max_wait_ms": 0.0}
+
+    @asynccontextmanager
+    async def limit(self):
+        """
+        在限流下执行一个请求
+
+        用法：
+            async with limiter.limit():
+                await client.search(...)
+        """
+        self._ensure_primitives()
+        start_time = time.monotonic()
+        if self._semaphore:
+            await self._semaphore.acquire()
+        try:
+            await self._acquire_token()
+            wait_ms = (time.monotonic() - start_time) * 1000
+            self.stats["acquired"] += 1
+            self.stats["total_wait_ms"] += wait_ms
+            self.stats["max_wait_ms"] = max(self.stats["max_wait_ms"], wait_ms)
+            yield
+        finally:
+            if self._semaphore:
+                self._semaphore.release()
+
+    async def _acquire_token(self) -> None:
+        """取得一个令牌，令牌不足时异步等待到下一个令牌补充"""
+        if self.requests_per_second <= 0:
+            return
+
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self._tokens = min(self.burst, self._tokens + (now - self._last_refill) * self.requests_per_second)
+                self._last_refill = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                self.stats["throttled"] += 1
+                await asyncio.sleep((1 - self._tokens) / self.requests_per_second)
+
+    def _ensure_primitives(self) -> None:
+        """事件循环变化时重新创建锁和信号量"""
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            self._lock = asyncio.Lock()
+            self._semaphore = asyncio.Semaphore(self.max_concurrency) if self.max_concurrency > 0 else None
+            self._loop = loop
+
+    def get_stats(self) -> Dict[str, Any]:
+        """获取限流统计信息"""
+        acquired = self.stats["acquired"]
+        return {
+            **self.stats,
+            "avg_wait_ms": self.stats["total_wait_ms"] / acquired if acquired else 0.0
+        }
+
+
+def _create_search_limiter() -> AsyncRateLimiter:
+    config = get_search_config()
+    return AsyncRateLimiter(
+        requests_per_second=config.get("requests_per_second", 2.0),
+        burst=config.get("burst", 2),
+        max_concurrency=config.get("max_concurrency", 3)
+    )
+
+
+# 全局搜索限流器实例（所有JinaSearchClient共享，只作用于上游请求）
+search_rate_limiter = _create_search_limiter()
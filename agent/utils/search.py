@@ -5,8 +5,12 @@ Jina 搜索引擎客户端工具
 import os
 import aiohttp
 import asyncio
+import contextlib
 from typing import Dict, List, Optional, Any
-from utils.config_manager import get_jina_api_key
+from utils.config_manager import get_jina_api_key, get_jina_base_urls
+from agent.utils.http_session import get_http_session
+from agent.utils.rate_limiter import search_rate_limiter
+from agent.utils.web_cache import web_cache, make_cache_key
 
 
 class JinaSearchClient:
@@ -15,20 +19,26 @@ class JinaSearchClient:
     def __init__(
         self,
         api_key: Optional[str] = None,
-        base_url: str = "https://s.jina.ai/",
-        timeout: int = 30
+        base_url: Optional[str] = None,
+        timeout: int = 30,
+        use_cache: bool = True,
+        use_rate_limit: bool = True
     ):
         """
         初始化 Jina 搜索客户端
         
         Args:
             api_key: API密钥，如果为None则从环境变量JINA_API_KEY读取
-            base_url: API端点URL
+            base_url: API端点URL，如果为None则从配置读取（jina.search_base_url，默认 https://s.jina.ai/）
             timeout: 请求超时时间（秒）
+            use_cache: 是否使用磁盘缓存（agent.utils.web_cache）
+            use_rate_limit: 是否对上游请求限流（进程级共享的search_rate_limiter，缓存命中不占用配额）
         """
         self.api_key = api_key or get_jina_api_key() or os.getenv("JINA_API_KEY")
-        self.base_url = base_url.rstrip("/")
+        self.base_url = (base_url or get_jina_base_urls()["search_base_url"]).rstrip("/")
         self.timeout = timeout
+        self.cache = web_cache if use_cache else None
+        self.rate_limiter = search_rate_limiter if use_rate_limit else None
         
         if not self.api_key:
             raise ValueError("API密钥未设置，请设置JINA_API_KEY环境变量或传入api_key参数")
@@ -70,13 +80,21 @@ class JinaSearchClient:
             if site:
                 params["site"] = site
 
-            # 使用异步HTTP客户端
+            # 使用共享的异步HTTP会话（复用连接）
             timeout = aiohttp.ClientTimeout(total=self.timeout)
-            async with aiohttp.ClientSession(timeout=timeout) as session:
-                async with session.get(
+            if self.cache:
+                return await self.cache.fetch_json(
+                    "search", self._cache_key(params, self.headers),
+                    self.base_url, params=params, headers=self.headers, timeout=timeout,
+                    rate_limiter=self.rate_limiter
+                )
+
+            async with self._limit():
+                async with get_http_session().get(
                     self.base_url,
                     params=params,
-                    headers=self.headers
+                    headers=self.headers,
+                    timeout=timeout
                 ) as response:
                     response.raise_for_status()
                     result = await response.json()
@@ -152,19 +170,27 @@ class JinaSearchClient:
             }
 
             timeout = aiohttp.ClientTimeout(total=self.timeout)
-            async with aiohttp.ClientSession(timeout=timeout) as session:
-                async with session.get(
-                    self.base_url,
-                    params=params,
-                    headers=headers
-                ) as response:
-                    response.raise_for_status()
-                    result = await response.json()
-
-                    if result.get("code") != 200:
-                        raise Exception(f"搜索失败: {result.get('status', 'Unknown error')}")
-
-                    return result.get("data", [])
+            if self.cache:
+                result = await self.cache.fetch_json(
+                    "search", self._cache_key(params, headers),
+                    self.base_url, params=params, headers=headers, timeout=timeout,
+                    rate_limiter=self.rate_limiter
+                )
+            else:
+                async with self._limit():
+                    async with get_http_session().get(
+                        self.base_url,
+                        params=params,
+                        headers=headers,
+                        timeout=timeout
+                    ) as response:
+                        response.raise_for_status()
+                        result = await response.json()
+
+            if result.get("code") != 200:
+                raise Exception(f"搜索失败: {result.get('status', 'Unknown error')}")
+
+            return result.get("data", [])
 
         except aiohttp.ClientError as e:
             raise Exception(f"Jina搜索API调用失败: {str(e)}")
@@ -173,6 +199,15 @@ class JinaSearchClient:
         except Exception as e:
             raise Exception(f"搜索过程中发生错误: {str(e)}")
     
+    def _limit(self):
+        """上游请求的限流上下文（未启用限流时为空上下文）"""
+        return self.rate_limiter.limit() if self.rate_limiter else contextlib.nullcontext()
+
+    def _cache_key(self, params: Dict[str, Any], headers: Dict[str, str]) -> str:
+        """缓存键：端点、查询参数和影响返回内容的请求头（不包含API密钥）"""
+        content_headers = {k: v for k, v in headers.items() if k != "Authorization"}
+        return make_cache_key(self.base_url, params, content_headers)
+
     def get_usage_info(self, result: Dict[str, Any]) -> Dict[str, int]:
         """
         从搜索结果中提取使用信息
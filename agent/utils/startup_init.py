@@ -2,7 +2,7 @@
 应用启动初始化模块
 
 负责在应用启动时进行必要的初始化工作，包括：
-- 工具索引预热
+- 工具索引预热（向量服务不可用时预热本地检索索引）
 - 系统状态检查
 - 配置验证
 
@@ -16,6 +16,7 @@ from typing import Dict, Any, Optional
 
 from agent.utils.tool_index_manager import tool_index_manager, ensure_tool_index
 from utils.config_manager import get_vector_service_config
+from agent.utils.vector_service_client import get_vector_service_client
 from agent.streaming import emit_processing_status
 
 logger = logging.getLogger(__name__)
@@ -40,7 +41,8 @@ async def initialize_application(
     init_result = {
         "success": True,
         "components": {},
-        "errors": []
+        "errors": [],
+        "warnings": []
     }
     
     logger.info("🚀 开始应用初始化...")
@@ -50,17 +52,21 @@ async def initialize_application(
         vector_config_result = await _check_vector_service_config(shared)
         init_result["components"]["vector_service"] = vector_config_result
         
-        if not vector_config_result["available"]:
-            init_result["errors"].append("向量服务不可用")
-        
-        # 2. 预加载工具索引（如果启用）
-        if preload_index and vector_config_result["available"]:
+        # 2. 预加载工具索引（如果启用）；向量服务不可用时只构建本地检索索引
+        index_result = None
+        if preload_index:
             index_result = await _preload_tool_index(tools_dir, shared)
             init_result["components"]["tool_index"] = index_result
             
             if not index_result["success"]:
                 init_result["errors"].append(f"工具索引预加载失败: {index_result.get('error', 'Unknown error')}")
         
+        if not vector_config_result["available"]:
+            if index_result and index_result["success"]:
+                init_result["warnings"].append("向量服务不可用，工具检索使用本地索引")
+            else:
+                init_result["errors"].append("向量服务不可用")
+        
         # 3. 其他初始化任务可以在这里添加
         
         # 判断整体初始化是否成功
@@ -101,22 +107,18 @@ async def _check_vector_service_config(shared: Dict[str, Any] = None) -> Dict[st
                 "config": vector_config
             }
         
-        # 检查向量服务可用性
-        import requests
-        try:
-            response = requests.get(f"{base_url}/health", timeout=5)
-            available = response.status_code == 200
-        except Exception as e:
-            available = False
-            error = str(e)
+        # 检查向量服务可用性（探测结果写入共享客户端的健康状态缓存）
+        vector_client = get_vector_service_client()
+        available = await vector_client.is_available(force=True)
         
         result = {
             "available": available,
-            "config": vector_config
+            "config": vector_config,
+            "client": vector_client.get_stats()
         }
         
         if not available:
-            result["error"] = f"向量服务不可用: {error if 'error' in locals() else 'Unknown error'}"
+            result["error"] = f"向量服务不可用: {vector_client.last_error or 'Unknown error'}"
         
         if shared:
             status = "✅ 向量服务可用" if available else f"❌ 向量服务不可用"
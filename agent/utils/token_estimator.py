@@ -0,0 +1,28 @@
+"""
+Token估算 (estimate_tokens)
+
+不依赖分词器的token数量估算，会话消息的token_count（持久化层）和研究流程统计的节省token
+使用同一个估算方法，两边的数字可以直接比较：
+- 工具结果通常是JSON格式，按4个字符1个token估算
+- 其他消息中文字符按1个token计算，英文单词按1个token计算，标点符号等按0.5计算
+"""
+
+
+def estimate_tokens(content: str, role: str = "assistant") -> int:
+    """
+    估算文本的token数量
+
+    Args:
+        content: 文本内容
+        role: 消息角色，tool消息按JSON估算
+
+    Returns:
+        token数量（至少为1）
+    """
+    if role == "tool":
+        return max(1, len(content) // 4)
+
+    chinese_chars = len([c for c in content if '\u4e00' <= c <= '\u9fff'])
+    english_words = len(content.replace('，', ' ').replace('。', ' ').split())
+    other_chars = len(content) - chinese_chars - sum(len(word) for word in content.split())
+    return int(chinese_chars + english_words + max(1, other_chars // 2))
@@ -0,0 +1,215 @@
+"""
+工具目录加载器 (ToolCatalogLoader)
+
+并行加载工具描述YAML文件，适用于包含数千个工具的大型目录：
+- 文件读取、哈希和YAML解析都在线程池/进程池中执行，不阻塞事件循环
+- 优先使用libyaml加速的CSafeLoader，不可用时回退到SafeLoader
+- 解析结果按文件内容哈希缓存（内存 + 本地缓存文件），未变化的文件不再重复解析；
+  只有能经JSON原样往返的结果（不含日期、集合、非字符串键等）写入缓存文件，命中和未命中时返回的类型一致
+- 待解析文件较多时按批分发到进程池并行解析，较少时在线程中解析，避免进程启动开销
+"""
+
+import asyncio
+import copy
+import hashlib
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Any, Optional, Tuple
+
+import yaml
+
+try:
+    from yaml import CSafeLoader as YAMLSafeLoader
+except ImportError:
+    from yaml import SafeLoader as YAMLSafeLoader
+
+
+def parse_tool_yaml(content: bytes) -> Any:
+    """使用可用的最快安全Loader解析YAML内容"""
+    return yaml.load(content, Loader=YAMLSafeLoader)
+
+
+def _parse_batch(items: List[Tuple[str, bytes]]) -> List[Tuple[str, Any, Optional[str]]]:
+    """解析一批YAML文件（进程池中执行，必须是模块级函数）"""
+    results = []
+    for file_hash, content in items:
+        try:
+            results.append((file_hash, parse_tool_yaml(content), None))
+        except Exception as e:
+            results.append((file_hash, None, str(e)))
+    return results
+
+
+def _is_json_round_trippable(data: Any) -> bool:
+    """解析结果能否经JSON序列化后原样读回（YAML的日期、集合、非字符串键等不能）"""
+    if data is None or isinstance(data, (str, bool, int, float)):
+        return True
+    if isinstance(data, list):
+        return all(_is_json_round_trippable(item) for item in data)
+    if isinstance(data, dict):
+        return all(isinstance(key, str) and _is_json_round_trippable(value) for key, value in data.items())
+    return False
+
+
+def _read_files(tool_files: List[str]) -> List[Tuple[str, Optional[bytes], Optional[str], Optional[str]]]:
+    """读取文件并计算内容哈希，返回 (文件路径, 内容, 哈希, 错误)"""
+    results = []
+    for file_path in tool_files:
+        try:
+            with open(file_path, 'rb') as f:
+                content = f.read()
+            results.append((file_path, content, hashlib.sha1(content).hexdigest(), None))
+        except OSError as e:
+            results.append((file_path, None, None, str(e)))
+    return results
+
+
+class ToolCatalogLoader:
+    """工具目录加载器"""
+
+    def __init__(self, cache_path: Optional[str] = None, max_workers: Optional[int] = None,
+                 process_threshold: int = 500, batch_size: int = 200):
+        """
+        初始化加载器
+
+        Args:
+            cache_path: 解析缓存文件路径，为None时只使用内存缓存
+            max_workers: 并行解析的最大工作进程数，默认为CPU核数（最多8个）
+            process_threshold: 待解析文件数达到该值时使用进程池
+            batch_size: 每个进程任务解析的文件数
+        """
+        self.cache_path = cache_path
+        self.max_workers = max_workers or min(os.cpu_count() or 1, 8)
+        self.process_threshold = process_threshold
+        self.batch_size = batch_size
+
+        # 文件内容哈希 -> 解析结果
+        self._cache: Optional[Dict[str, Any]] = None
+        self.last_stats: Dict[str, Any] = {}
+
+    @property
+    def loader_name(self) -> str:
+        """当前使用的YAML Loader"""
+        return YAMLSafeLoader.__name__
+
+    async def load(self, tool_files: List[str]) -> Tuple[List[Tuple[str, Any]], List[Dict[str, str]]]:
+        """
+        加载工具描述文件
+
+        Args:
+            tool_files: 工具描述文件路径列表
+
+        Returns:
+            ([(文件路径, 解析结果)], [{"file": 文件路径, "error": 错误信息}])，结果顺序与输入一致
+        """
+        start_time = time.perf_counter()
+
+        if self._cache is None:
+            self._cache = await asyncio.to_thread(self._load_cache_file)
+
+        # 读取和哈希文件（分片到多个线程）
+        chunk_size = max(len(tool_files) // self.max_workers + 1, 1)
+        chunks = [tool_files[i:i + chunk_size] for i in range(0, len(tool_files), chunk_size)]
+        read_results = [
+            item
+            for chunk_result in await asyncio.gather(*(asyncio.to_thread(_read_files, chunk) for chunk in chunks))
+            for item in chunk_result
+        ]
+
+        # 未命中缓存的文件按内容去重后解析
+        to_parse = {}
+        for _, content, file_hash, _ in read_results:
+            if file_hash and file_hash not in self._cache and file_hash not in to_parse:
+                to_parse[file_hash] = content
+
+        parse_errors = {}
+        if to_parse:
+            for file_hash, data, error in await self._parse(list(to_parse.items())):
+                if error:
+                    parse_errors[file_hash] = error
+                else:
+                    self._cache[file_hash] = data
+
+        loaded_hashes = []
+        failed = []
+        current_hashes = set()
+        cache_hits = 0
+        for file_path, _, file_hash, read_error in read_results:
+            error = read_error or parse_errors.get(file_hash)
+            if error:
+                failed.append({"file": file_path, "error": error})
+                continue
+            current_hashes.add(file_hash)
+            cache_hits += file_hash not in to_parse
+            loaded_hashes.append((file_path, file_hash))
+
+        # 返回深拷贝（在线程中复制），调用方修改嵌套的列表和字典不会污染缓存
+        loaded = await asyncio.to_thread(
+            lambda: [(file_path, copy.deepcopy(self._cache[file_hash])) for file_path, file_hash in loaded_hashes]
+        )
+
+        # 清理已不存在的文件对应的缓存条目，有变化时写回缓存文件
+        stale = [file_hash for file_hash in self._cache if file_hash not in current_hashes]
+        for file_hash in stale:
+            del self._cache[file_hash]
+        if self.cache_path and (to_parse or stale):
+            await asyncio.to_thread(self._save_cache_file)
+
+        self.last_stats = {
+            "files": len(tool_files),
+            "cache_hits": cache_hits,
+            "parsed": len(to_parse),
+            "failed": len(failed),
+            "loader": self.loader_name,
+            "elapsed_ms": (time.perf_counter() - start_time) * 1000
+        }
+        return loaded, failed
+
+    async def _parse(self, items: List[Tuple[str, bytes]]) -> List[Tuple[str, Any, Optional[str]]]:
+        """解析YAML内容：数量较多时使用进程池并行解析，否则在线程中解析"""
+        if len(items) < self.process_threshold or self.max_workers <= 1:
+            return await asyncio.to_thread(_parse_batch, items)
+
+        loop = asyncio.get_running_loop()
+        batches = [items[i:i + self.batch_size] for i in range(0, len(items), self.batch_size)]
+        with ProcessPoolExecutor(max_workers=self.max_workers) as executor:
+            batch_results = await asyncio.gather(
+                *(loop.run_in_executor(executor, _parse_batch, batch) for batch in batches)
+            )
+        return [result for batch_result in batch_results for result in batch_result]
+
+    def _load_cache_file(self) -> Dict[str, Any]:
+        """读取解析缓存文件，不存在或损坏时返回空缓存"""
+        if not self.cache_path:
+            return {}
+        try:
+            with open(self.cache_path, 'r', encoding='utf-8') as f:
+                cache = json.load(f)
+            if cache.get("loader_version") != 2:
+                return {}
+            return cache["entries"]
+        except (OSError, ValueError, KeyError, AttributeError):
+            return {}
+
+    def _save_cache_file(self) -> None:
+        """写入解析缓存文件（先写临时文件再替换，不能经JSON原样往返的结果只保留在内存中）"""
+        try:
+            cache_dir = os.path.dirname(self.cache_path)
+            if cache_dir:
+                os.makedirs(cache_dir, exist_ok=True)
+            tmp_path = f"{self.cache_path}.tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                entries = {
+                    file_hash: data for file_hash, data in self._cache.items()
+                    if _is_json_round_trippable(data)
+                }
+                json.dump({"loader_version": 2, "entries": entries}, f, ensure_ascii=False)
+            os.replace(tmp_path, self.cache_path)
+        except OSError as e:
+            print(f"⚠️ 写入工具解析缓存失败: {e}")
+
+    def clear_cache(self) -> None:
+        """清空内存中的解析缓存（下次加载时重新读取缓存文件）"""
+        self._cache = None
@@ -6,8 +6,9 @@
 
 功能特性：
 - 单例模式管理索引生命周期
-- 智能检测工具目录变化
-- 支持强制更新和增量更新
+- 通过工具目录修改时间检测变化（在线程中扫描目录，并限制检查频率），变化时触发同步
+- 支持强制重建和增量同步（由NodeToolIndex按文档内容哈希只写入变化的工具）
+- 向量服务不可用时只构建本地检索索引，服务恢复后自动同步到向量服务
 - 异步索引操作，不阻塞业务流程
 - 索引状态监控和错误恢复
 """
@@ -50,9 +51,15 @@ class ToolIndexManager:
         self._current_index_name = None
         self._last_index_time = None
         self._last_tools_dir_mtime = None
+        self._last_sync = None
+        self._last_service_check = 0.0
+        self._last_tools_dir_check = 0.0
+        self._index_version = None
 
         # 配置
         self._tools_dir = "tools"
+        self._service_check_interval = 30  # 仅本地索引时，检查向量服务是否恢复的最小间隔（秒）
+        self._tools_dir_check_interval = 5  # 扫描工具目录检测变化的最小间隔（秒）
         self._index_node = None
         
         self._initialized = True
@@ -84,7 +91,7 @@ class ToolIndexManager:
             needs_rebuild = await self._should_rebuild_index(tools_dir, force_reindex, shared)
             
             if needs_rebuild:
-                await self._create_index(tools_dir, shared)
+                await self._create_index(tools_dir, shared, force_reindex)
             
             return self._current_index_name or self._index_name
     
@@ -94,7 +101,7 @@ class ToolIndexManager:
         force_reindex: bool,
         shared: Dict[str, Any] = None
     ) -> bool:
-        """检查是否需要重建索引 - 简化版：总是在首次调用时创建新索引"""
+        """检查是否需要同步索引：强制重建、首次调用或工具目录发生变化"""
 
         # 强制重建
         if force_reindex:
@@ -102,19 +109,49 @@ class ToolIndexManager:
                 await emit_processing_status(shared, "🔄 强制重建工具索引...")
             return True
 
-        # 首次创建或索引未创建时，总是创建新索引
+        # 首次调用时同步索引（未变化的工具不会写入向量服务）
         if not self._index_created:
             if shared:
-                await emit_processing_status(shared, "🆕 创建新的工具索引...")
+                await emit_processing_status(shared, "🆕 同步工具索引...")
             return True
 
-        # 已经创建过索引，不再重建
+        # 工具目录发生变化时重新同步（每次推荐都会调用，扫描目录限制频率并在线程中执行）
+        if time.time() - self._last_tools_dir_check >= self._tools_dir_check_interval:
+            self._last_tools_dir_check = time.time()
+            tools_dir_mtime = await asyncio.to_thread(self._get_tools_dir_mtime, tools_dir)
+            if tools_dir_mtime != self._last_tools_dir_mtime:
+                if shared:
+                    await emit_processing_status(shared, "📝 检测到工具目录变化，同步工具索引...")
+                return True
+
+        # 上次只构建了本地索引时，向量服务恢复后同步到向量服务
+        if self._last_sync and self._last_sync["mode"] == "local_only" and \
+                time.time() - self._last_service_check >= self._service_check_interval:
+            self._last_service_check = time.time()
+            if await self._index_node._check_vector_service():
+                if shared:
+                    await emit_processing_status(shared, "🔌 向量服务已恢复，同步工具索引...")
+                return True
+
         return False
+
+    @staticmethod
+    def _get_tools_dir_mtime(tools_dir: str) -> Optional[float]:
+        """工具目录（含子目录和工具文件）的最新修改时间，新增/删除/修改文件都会改变该值"""
+        if not os.path.exists(tools_dir):
+            return None
+
+        latest = 0.0
+        for root, _, files in os.walk(tools_dir):
+            latest = max(latest, os.path.getmtime(root))
+            for name in files:
+                if name.endswith(".yml"):
+                    latest = max(latest, os.path.getmtime(os.path.join(root, name)))
+        return latest
     
-    # 简化版本：移除复杂的变化检测逻辑，每次启动时创建新索引
-    
-    async def _create_index(self, tools_dir: str, shared: Dict[str, Any] = None):
-        """创建或重建工具索引"""
+    async def _create_index(self, tools_dir: str, shared: Dict[str, Any] = None,
+                            force_reindex: bool = False):
+        """创建或同步工具索引（force_reindex为True时全量重建）"""
         try:
             if shared:
                 await emit_processing_status(shared, "🔨 开始创建工具索引...")
@@ -127,12 +164,13 @@ class ToolIndexManager:
             index_shared = {
                 "tools_dir": tools_dir,
                 "index_name": self._index_name,
-                "force_reindex": True,
+                "force_reindex": force_reindex,
                 "streaming_session": shared.get("streaming_session") if shared else None
             }
             
-            # 执行索引创建
+            # 执行索引创建（先记录目录修改时间，同步期间的修改会在下次检查时发现）
             start_time = time.time()
+            tools_dir_mtime = await asyncio.to_thread(self._get_tools_dir_mtime, tools_dir)
             
             prep_result = await self._index_node.prep_async(index_shared)
             if "error" in prep_result:
@@ -144,21 +182,28 @@ class ToolIndexManager:
             # 更新状态
             self._index_created = True
             self._last_index_time = datetime.now()
+            self._last_tools_dir_mtime = tools_dir_mtime
+            self._last_sync = exec_result.get("sync")
+            self._index_version = exec_result.get("index_version")
+            self._last_service_check = time.time()
+            self._last_tools_dir_check = time.time()
             
             index_time = time.time() - start_time
             
             if shared:
                 await emit_processing_status(
                     shared, 
-                    f"✅ 索引创建完成: {self._current_index_name} (耗时: {index_time:.2f}秒)"
+                    f"✅ 索引同步完成: {self._current_index_name} (耗时: {index_time:.2f}秒)"
                 )
             
-            # 短暂等待索引刷新（比原来的2秒更短）
-            await asyncio.sleep(0.5)
+            # 有写入时短暂等待索引刷新
+            if self._last_sync and self._last_sync["vector_writes"]:
+                await asyncio.sleep(0.5)
             
         except Exception as e:
             self._index_created = False
             self._current_index_name = None
+            self._index_version = None
             if shared:
                 await emit_error(shared, f"❌ 索引创建失败: {str(e)}")
             raise RuntimeError(f"索引创建失败: {str(e)}")
@@ -171,6 +216,10 @@ class ToolIndexManager:
         """获取当前索引名称"""
         return self._current_index_name
     
+    def get_index_version(self) -> Optional[str]:
+        """获取当前索引版本（工具文档内容的组合哈希，工具目录变化时改变）"""
+        return self._index_version
+
     def get_index_info(self) -> Dict[str, Any]:
         """获取索引信息"""
         return {
@@ -178,7 +227,9 @@ class ToolIndexManager:
             "current_index_name": self._current_index_name,
             "last_index_time": self._last_index_time.isoformat() if self._last_index_time else None,
             "tools_dir": self._tools_dir,
-            "last_tools_dir_mtime": self._last_tools_dir_mtime
+            "last_tools_dir_mtime": self._last_tools_dir_mtime,
+            "last_sync": self._last_sync,
+            "index_version": self._index_version
         }
     
     async def force_refresh_index(self, tools_dir: str = None, shared: Dict[str, Any] = None) -> str:
@@ -191,6 +242,10 @@ class ToolIndexManager:
         self._current_index_name = None
         self._last_index_time = None
         self._last_tools_dir_mtime = None
+        self._last_sync = None
+        self._last_service_check = 0.0
+        self._last_tools_dir_check = 0.0
+        self._index_version = None
 
 
 # 全局索引管理器实例
@@ -212,6 +267,11 @@ async def get_tool_index_name() -> Optional[str]:
     return tool_index_manager.get_current_index_name()
 
 
+def get_tool_index_version() -> Optional[str]:
+    """获取当前工具索引版本的便捷函数"""
+    return tool_index_manager.get_index_version()
+
+
 def is_tool_index_ready() -> bool:
     """检查工具索引是否就绪的便捷函数"""
     return tool_index_manager.is_index_ready()
@@ -0,0 +1,156 @@
+"""
+工具推荐查询缓存 (ToolRecommendCache)
+
+缓存NodeToolRecommend两个阶段的结果，重复的查询不再重复检索和调用大模型：
+1. 检索阶段：键为 归一化查询 + 索引名 + 索引版本 + 候选数量，值为检索结果
+2. 重排阶段：键为 归一化查询 + 索引版本 + top_k + 语言 + 候选工具id，值为大模型筛选结果
+   （候选工具id参与键计算，检索结果变化时不会复用旧的筛选结果）
+
+索引版本由NodeToolIndex根据文档内容哈希计算，工具目录变化时版本随之变化，
+缓存发现版本变化后整体失效。没有索引版本时不使用缓存。
+两个阶段分别统计命中率。
+"""
+
+import copy
+import hashlib
+import json
+import re
+import threading
+import unicodedata
+from collections import OrderedDict
+from typing import Dict, List, Any, Optional
+
+_WHITESPACE_PATTERN = re.compile(r"\s+")
+_EDGE_PUNCTUATION = "。，！？、；：.,!?;: \"'“”‘’"
+
+
+def normalize_query(query: str) -> str:
+    """归一化查询文本：全角转半角、小写、合并空白、去掉首尾标点"""
+    normalized = unicodedata.normalize("NFKC", query).lower()
+    normalized = _WHITESPACE_PATTERN.sub(" ", normalized)
+    return normalized.strip(_EDGE_PUNCTUATION)
+
+
+class ToolRecommendCache:
+    """工具推荐两阶段LRU缓存"""
+
+    STAGES = ("retrieval", "rerank")
+
+    def __init__(self, max_entries: int = 512):
+        """
+        初始化缓存
+
+        Args:
+            max_entries: 每个阶段的最大缓存条目数
+        """
+        self.max_entries = max_entries
+
+        self._entries: Dict[str, "OrderedDict[str, Any]"] = {stage: OrderedDict() for stage in self.STAGES}
+        self._index_version: Optional[str] = None
+        self._lock = threading.RLock()
+
+        # 统计信息（按阶段）
+        self.stats = {
+            stage: {"hits": 0, "misses": 0, "evictions": 0}
+            for stage in self.STAGES
+        }
+        self.stats["version_invalidations"] = 0
+
+    def get_retrieval(self, query: str, index_name: str, index_version: Optional[str],
+                      top_k: int) -> Optional[Dict[str, Any]]:
+        """获取缓存的检索结果"""
+        return self._get("retrieval", index_version, query, index_name, top_k)
+
+    def put_retrieval(self, query: str, index_name: str, index_version: Optional[str],
+                      top_k: int, search_results: Dict[str, Any]) -> None:
+        """缓存检索结果"""
+        self._put("retrieval", index_version, search_results, query, index_name, top_k)
+
+    def get_rerank(self, query: str, index_version: Optional[str], top_k: int, language: Optional[str],
+                   candidates: List[Dict[str, Any]]) -> Optional[List[Dict[str, Any]]]:
+        """获取缓存的大模型筛选结果"""
+        return self._get("rerank", index_version, query, top_k, language, [tool["id"] for tool in candidates])
+
+    def put_rerank(self, query: str, index_version: Optional[str], top_k: int, language: Optional[str],
+                   candidates: List[Dict[str, Any]], selected_tools: List[Dict[str, Any]]) -> None:
+        """缓存大模型筛选结果"""
+        self._put("rerank", index_version, selected_tools, query, top_k, language,
+                  [tool["id"] for tool in candidates])
+
+    def clear(self) -> None:
+        """清空缓存"""
+        with self._lock:
+            for entries in self._entries.values():
+                entries.clear()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        获取缓存统计信息
+
+        Returns:
+            按阶段的命中、未命中、命中率和条目数，以及索引版本失效次数
+        """
+        with self._lock:
+            result = {
+                "index_version": self._index_version,
+                "version_invalidations": self.stats["version_invalidations"]
+            }
+            for stage in self.STAGES:
+                stage_stats = self.stats[stage]
+                lookups = stage_stats["hits"] + stage_stats["misses"]
+                result[stage] = {
+                    **stage_stats,
+                    "hit_rate": stage_stats["hits"] / lookups if lookups else 0.0,
+                    "entries": len(self._entries[stage])
+                }
+            return result
+
+    def _get(self, stage: str, index_version: Optional[str], *key_parts) -> Optional[Any]:
+        if not index_version:
+            return None
+
+        key = self._make_key(key_parts)
+        with self._lock:
+            self._check_index_version(index_version)
+            entries = self._entries[stage]
+            if key not in entries:
+                self.stats[stage]["misses"] += 1
+                return None
+
+            entries.move_to_end(key)
+            self.stats[stage]["hits"] += 1
+            # 返回副本，调用方对结果的修改不会污染缓存
+            return copy.deepcopy(entries[key])
+
+    def _put(self, stage: str, index_version: Optional[str], value: Any, *key_parts) -> None:
+        if not index_version:
+            return
+
+        key = self._make_key(key_parts)
+        with self._lock:
+            self._check_index_version(index_version)
+            entries = self._entries[stage]
+            entries[key] = copy.deepcopy(value)
+            entries.move_to_end(key)
+            while len(entries) > self.max_entries:
+                entries.popitem(last=False)
+                self.stats[stage]["evictions"] += 1
+
+    def _check_index_version(self, index_version: str) -> None:
+        """索引版本变化时整体失效"""
+        if index_version != self._index_version:
+            if any(self._entries.values()):
+                self.stats["version_invalidations"] += 1
+                self.clear()
+            self._index_version = index_version
+
+    @staticmethod
+    def _make_key(key_parts: tuple) -> str:
+        """由查询和参数生成缓存键（查询文本先归一化）"""
+        query, *params = key_parts
+        raw = json.dumps([normalize_query(query), *params], ensure_ascii=False, default=str)
+        return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+
+# 全局工具推荐缓存实例
+tool_recommend_cache = ToolRecommendCache()
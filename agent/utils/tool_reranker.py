@@ -0,0 +1,135 @@
+"""
+本地工具重排器 (ToolReranker)
+
+在大模型筛选之前对检索候选做一次毫秒级的本地重排，并判断是否还需要调用大模型：
+- 按字段加权的词法匹配：工具id、摘要、描述、示例/接口分别设置权重，
+  词的权重按候选集合内的文档频率计算（所有候选都包含的词区分度低）
+- 与检索分数加权融合得到重排分数（0~1）
+- 置信判断：第一名分数足够高且与第二名的差距超过阈值时，认为本地排序已足够可靠，
+  可以跳过大模型筛选；否则仍交给大模型判断
+"""
+
+import math
+import time
+from dataclasses import dataclass, field
+from typing import Dict, List, Any
+
+from agent.utils.local_tool_index import tokenize
+
+
+@dataclass
+class RerankResult:
+    """重排结果"""
+    tools: List[Dict[str, Any]]          # 按重排分数降序的候选工具（带rerank_score字段）
+    confident: bool                      # 本地排序是否足够可靠（可跳过大模型）
+    top_score: float = 0.0
+    margin: float = 0.0                  # 第一名与第二名的分数差
+    elapsed_ms: float = 0.0
+
+
+@dataclass
+class RerankConfig:
+    """重排配置"""
+    field_weights: Dict[str, float] = field(default_factory=lambda: {
+        "id": 1.5,
+        "summary": 3.0,
+        "description": 1.0,
+        "examples": 0.5,
+        "endpoints": 0.5,
+        "requirement": 0.5
+    })
+    retrieval_weight: float = 0.4        # 检索分数在融合分数中的权重
+    min_confidence: float = 0.4          # 跳过大模型所需的最低第一名分数
+    min_margin: float = 0.12             # 跳过大模型所需的第一名与第二名最小分差
+    min_relevance: float = 0.15          # 本地选择结果的最低分数
+    relative_cutoff: float = 0.6         # 本地选择结果的分数不低于第一名的比例
+
+
+class ToolReranker:
+    """基于字段加权词法匹配的本地工具重排器"""
+
+    def __init__(self, config: RerankConfig = None):
+        self.config = config or RerankConfig()
+        self.stats = {"calls": 0, "confident": 0, "total_ms": 0.0}
+
+    def rerank(self, query: str, tools: List[Dict[str, Any]]) -> RerankResult:
+        """
+        重排候选工具
+
+        Args:
+            query: 查询文本
+            tools: 检索得到的候选工具（包含score字段）
+
+        Returns:
+            重排结果
+        """
+        start_time = time.perf_counter()
+
+        field_tokens = [
+            {name: set(tokenize(str(tool.get(name) or ""))) for name in self.config.field_weights}
+            for tool in tools
+        ]
+
+        # 候选集合内的文档频率：只有部分候选包含的词才有区分度；
+        # 没有候选包含的词按最低权重计入满分，避免候选很少时只凭个别词命中就得到高分
+        query_terms = set(tokenize(query))
+        doc_freq = {
+            term: sum(1 for fields in field_tokens if any(term in tokens for tokens in fields.values()))
+            for term in query_terms
+        }
+        total = len(tools)
+        idf = {term: math.log(1 + total / freq) for term, freq in doc_freq.items() if freq}
+        unmatched_weight = math.log(2) * sum(1 for freq in doc_freq.values() if not freq)
+        max_lexical = (sum(idf.values()) + unmatched_weight) * max(self.config.field_weights.values(), default=1.0)
+
+        scored = []
+        for tool, fields in zip(tools, field_tokens):
+            lexical = 0.0
+            for term, weight in idf.items():
+                # 每个词只按命中的最高权重字段计分
+                field_weight = max(
+                    (self.config.field_weights[name] for name, tokens in fields.items() if term in tokens),
+                    default=0.0
+                )
+                lexical += weight * field_weight
+            lexical = lexical / max_lexical if max_lexical else 0.0
+
+            score = (self.config.retrieval_weight * float(tool.get("score", 0.0)) +
+                     (1 - self.config.retrieval_weight) * lexical)
+            scored.append({**tool, "rerank_score": round(score, 4)})
+
+        scored.sort(key=lambda tool: tool["rerank_score"], reverse=True)
+
+        top_score = scored[0]["rerank_score"] if scored else 0.0
+        second_score = scored[1]["rerank_score"] if len(scored) > 1 else 0.0
+        margin = top_score - second_score
+        confident = top_score >= self.config.min_confidence and margin >= self.config.min_margin
+
+        elapsed_ms = (time.perf_counter() - start_time) * 1000
+        self.stats["calls"] += 1
+        self.stats["confident"] += confident
+        self.stats["total_ms"] += elapsed_ms
+
+        return RerankResult(scored, confident, top_score, round(margin, 4), elapsed_ms)
+
+    def select(self, result: RerankResult, top_k: int) -> List[Dict[str, Any]]:
+        """
+        从重排结果中选择推荐工具（替代大模型筛选时使用）
+
+        只保留分数达到最低相关度、且不低于第一名一定比例的工具，最多top_k个
+        """
+        cutoff = max(self.config.min_relevance, result.top_score * self.config.relative_cutoff)
+        return [tool for tool in result.tools if tool["rerank_score"] >= cutoff][:top_k]
+
+    def get_stats(self) -> Dict[str, Any]:
+        """获取重排统计信息"""
+        calls = self.stats["calls"]
+        return {
+            **self.stats,
+            "confident_rate": self.stats["confident"] / calls if calls else 0.0,
+            "avg_ms": self.stats["total_ms"] / calls if calls else 0.0
+        }
+
+
+# 全局重排器实例
+tool_reranker = ToolReranker()
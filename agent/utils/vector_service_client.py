@@ -0,0 +1,317 @@
+"""
+向量服务异步客户端 (VectorServiceClient)
+
+工具推荐和工具索引共用的向量服务客户端，替代在异步代码中直接调用requests：
+- 使用进程级共享HTTP会话（agent.utils.http_session）的keep-alive连接池，请求不阻塞事件循环
+- 每个请求有超时控制
+- 健康检查结果按TTL缓存，并发的检查共享同一次探测，不再每次创建节点都探测
+- 熔断器：连续失败达到阈值后在恢复时间内直接失败，之后放行一次试探请求（半开）
+
+向量服务公开的接口只有 POST /search、POST /documents、DELETE /index/{index}/clear 和健康检查，
+按id删除文档（DELETE /index/{index}/documents）只有部分部署支持。客户端在第一次删除时探测，
+服务不支持时记录下来并抛出DeleteNotSupportedError，之后不再发送删除请求。
+"""
+
+import asyncio
+import time
+from dataclasses import dataclass
+from typing import Dict, List, Any, Optional
+
+import aiohttp
+
+from agent.utils.http_session import get_http_session
+from utils.config_manager import get_vector_service_config
+
+
+class VectorServiceError(Exception):
+    """向量服务请求失败（连接错误、超时或熔断）"""
+
+
+class CircuitOpenError(VectorServiceError):
+    """熔断器打开，请求未发送"""
+
+
+class DeleteNotSupportedError(VectorServiceError):
+    """向量服务不支持按id删除文档"""
+
+
+@dataclass
+class VectorServiceResponse:
+    """向量服务响应"""
+    status_code: int
+    text: str
+    data: Any = None
+
+    def json(self) -> Any:
+        return self.data
+
+
+class VectorServiceClient:
+    """向量服务异步客户端"""
+
+    def __init__(self, base_url: Optional[str], timeout: float = 30,
+                 health_cache_ttl: float = 30, failure_threshold: int = 3,
+                 recovery_timeout: float = 30, health_timeout: float = 5):
+        """
+        初始化客户端
+
+        Args:
+            base_url: 向量服务地址，为空时客户端始终不可用
+            timeout: 请求超时时间（秒）
+            health_cache_ttl: 健康检查结果的缓存时间（秒）
+            failure_threshold: 连续失败多少次后打开熔断器
+            recovery_timeout: 熔断器打开后多久放行试探请求（秒）
+            health_timeout: 健康检查超时时间（秒）
+        """
+        self.base_url = base_url.rstrip("/") if base_url else None
+        self.timeout = timeout
+        self.health_cache_ttl = health_cache_ttl
+        self.failure_threshold = failure_threshold
+        self.recovery_timeout = recovery_timeout
+        self.health_timeout = health_timeout
+
+        # 健康状态缓存
+        self._healthy: Optional[bool] = None
+        self._health_checked_at = 0.0
+        self._health_probe: Optional[asyncio.Task] = None
+        self.last_error: Optional[str] = None
+
+        # 熔断器状态
+        self._consecutive_failures = 0
+        self._circuit_opened_at: Optional[float] = None
+        self._half_open_trial = False
+
+        # 是否支持按id删除文档（None表示尚未探测）
+        self.delete_supported: Optional[bool] = None
+
+        self.stats = {
+            "requests": 0,
+            "failures": 0,
+            "rejected": 0,
+            "health_probes": 0,
+            "health_cache_hits": 0,
+            "circuit_opened": 0
+        }
+
+    @property
+    def configured(self) -> bool:
+        return bool(self.base_url)
+
+    @property
+    def circuit_state(self) -> str:
+        """熔断器状态：closed / open / half_open"""
+        if self._circuit_opened_at is None:
+            return "closed"
+        if time.monotonic() - self._circuit_opened_at >= self.recovery_timeout:
+            return "half_open"
+        return "open"
+
+    def cached_health(self) -> Optional[bool]:
+        """缓存中的健康状态（未检查过或已过期时返回None，不发起请求）"""
+        if not self.configured:
+            return False
+        if self.circuit_state == "open":
+            return False
+        if self._healthy is None or time.monotonic() - self._health_checked_at > self.health_cache_ttl:
+            return None
+        return self._healthy
+
+    async def is_available(self, force: bool = False) -> bool:
+        """
+        检查向量服务是否可用
+
+        Args:
+            force: 是否忽略缓存重新探测
+
+        Returns:
+            服务是否可用
+        """
+        if not self.configured:
+            return False
+
+        if not force:
+            cached = self.cached_health()
+            if cached is not None:
+                self.stats["health_cache_hits"] += 1
+                return cached
+
+        # 并发的健康检查共享同一次探测
+        loop = asyncio.get_running_loop()
+        if self._health_probe is None or self._health_probe.done() or self._health_probe.get_loop() is not loop:
+            self._health_probe = loop.create_task(self._probe_health())
+        return await asyncio.shield(self._health_probe)
+
+    async def _probe_health(self) -> bool:
+        self.stats["health_probes"] += 1
+        try:
+            response = await self.request("GET", "/health", timeout=self.health_timeout, bypass_circuit=True)
+            healthy = response.status_code == 200
+            if not healthy:
+                self.last_error = f"健康检查返回 {response.status_code}"
+        except VectorServiceError as e:
+            healthy = False
+            self.last_error = str(e)
+
+        self._healthy = healthy
+        self._health_checked_at = time.monotonic()
+        return healthy
+
+    async def request(self, method: str, path: str, json: Any = None,
+                      timeout: Optional[float] = None, bypass_circuit: bool = False) -> VectorServiceResponse:
+        """
+        发送请求
+
+        Args:
+            method: HTTP方法
+            path: 接口路径（如 /search）
+            json: JSON请求体
+            timeout: 本次请求的超时时间，默认使用客户端超时
+            bypass_circuit: 是否忽略熔断器（健康检查使用）
+
+        Returns:
+            响应对象（非2xx状态码不视为失败，由调用方判断）
+
+        Raises:
+            CircuitOpenError: 熔断器打开
+            VectorServiceError: 连接错误或超时
+        """
+        if not self.configured:
+            raise VectorServiceError("向量服务URL未配置，请设置VECTOR_SERVICE_BASE_URL环境变量")
+
+        is_trial = False if bypass_circuit else self._before_request()
+
+        self.stats["requests"] += 1
+        try:
+            async with get_http_session().request(
+                method,
+                f"{self.base_url}{path}",
+                json=json,
+                headers={"Accept": "application/json"},
+                timeout=aiohttp.ClientTimeout(total=timeout or self.timeout)
+            ) as response:
+                text = await response.text()
+                data = None
+                if response.content_type == "application/json":
+                    try:
+                        data = await response.json()
+                    except (aiohttp.ContentTypeError, ValueError):
+                        data = None
+                result = VectorServiceResponse(response.status, text, data)
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            self._record_failure(f"{type(e).__name__}: {e}")
+            raise VectorServiceError(f"调用向量服务失败: {type(e).__name__}: {e}")
+        finally:
+            # 试探请求被取消时没有记录成功或失败，释放试探名额，否则熔断器会一直拒绝请求
+            if is_trial:
+                self._half_open_trial = False
+
+        # 服务端错误计入熔断，4xx（如索引不存在）属于正常业务响应
+        if result.status_code >= 500:
+            self._record_failure(f"HTTP {result.status_code}")
+        else:
+            self._record_success()
+        return result
+
+    async def search(self, query: str, index: str, vector_field: str, top_k: int) -> VectorServiceResponse:
+        """相似度检索"""
+        return await self.request("POST", "/search", json={
+            "query": query,
+            "vector_field": vector_field,
+            "index": index,
+            "top_k": top_k
+        })
+
+    async def index_documents(self, documents: List[Dict[str, Any]], vector_field: str,
+                              index: Optional[str] = None) -> VectorServiceResponse:
+        """写入文档（不指定index时由服务自动创建索引）"""
+        payload = {"documents": documents, "vector_field": vector_field}
+        if index:
+            payload["index"] = index
+        return await self.request("POST", "/documents", json=payload)
+
+    async def delete_documents(self, index: str, document_ids: List[str]) -> VectorServiceResponse:
+        """
+        按id删除文档
+
+        Raises:
+            DeleteNotSupportedError: 服务没有删除接口（404/405/501且不是索引不存在），或之前已探测到不支持
+        """
+        if self.delete_supported is False:
+            raise DeleteNotSupportedError("向量服务不支持按id删除文档")
+
+        response = await self.request("DELETE", f"/index/{index}/documents", json={"ids": document_ids})
+        if response.status_code in (404, 405, 501) and "不存在" not in response.text:
+            self.delete_supported = False
+            print(f"⚠️ 向量服务不支持按id删除文档（HTTP {response.status_code}），"
+                  f"工具修改或删除后将全量重建索引")
+            raise DeleteNotSupportedError(f"向量服务不支持按id删除文档: HTTP {response.status_code}")
+        if response.status_code == 200:
+            self.delete_supported = True
+        return response
+
+    async def clear_index(self, index: str) -> VectorServiceResponse:
+        """清除索引中的全部文档"""
+        return await self.request("DELETE", f"/index/{index}/clear")
+
+    def get_stats(self) -> Dict[str, Any]:
+        """获取客户端统计信息"""
+        return {
+            **self.stats,
+            "circuit_state": self.circuit_state,
+            "consecutive_failures": self._consecutive_failures,
+            "healthy": self._healthy,
+            "delete_supported": self.delete_supported,
+            "last_error": self.last_error
+        }
+
+    def _before_request(self) -> bool:
+        """熔断器检查：打开时拒绝请求，半开时只放行一个试探请求（返回本次请求是否为试探请求）"""
+        state = self.circuit_state
+        if state == "open" or (state == "half_open" and self._half_open_trial):
+            self.stats["rejected"] += 1
+            raise CircuitOpenError(f"向量服务熔断中（最近错误: {self.last_error}）")
+        if state == "half_open":
+            self._half_open_trial = True
+            return True
+        return False
+
+    def _record_success(self) -> None:
+        self._consecutive_failures = 0
+        self._circuit_opened_at = None
+        self._half_open_trial = False
+        self._healthy = True
+        self._health_checked_at = time.monotonic()
+
+    def _record_failure(self, error: str) -> None:
+        self.stats["failures"] += 1
+        self.last_error = error
+        self._consecutive_failures += 1
+        self._half_open_trial = False
+        if self._consecutive_failures >= self.failure_threshold:
+            if self._circuit_opened_at is None:
+                self.stats["circuit_opened"] += 1
+                print(f"⚠️ 向量服务连续失败 {self._consecutive_failures} 次，熔断 {self.recovery_timeout} 秒")
+            # 半开状态下的试探失败会重新计时
+            self._circuit_opened_at = time.monotonic()
+            self._healthy = False
+            self._health_checked_at = time.monotonic()
+
+
+_clients: Dict[str, VectorServiceClient] = {}
+
+
+def get_vector_service_client() -> VectorServiceClient:
+    """获取当前配置对应的共享客户端（同一个向量服务地址复用同一个客户端）"""
+    config = get_vector_service_config()
+    base_url = config.get("base_url") or ""
+    client = _clients.get(base_url)
+    if client is None:
+        client = VectorServiceClient(
+            base_url,
+            timeout=config.get("timeout", 30),
+            health_cache_ttl=config.get("health_cache_ttl", 30),
+            failure_threshold=config.get("circuit_failure_threshold", 3),
+            recovery_timeout=config.get("circuit_recovery_timeout", 30)
+        )
+        _clients[base_url] = client
+    return client
@@ -0,0 +1,376 @@
+"""
+网页缓存 (WebCache)
+
+Jina搜索结果和Jina Reader转换的Markdown的磁盘缓存（SQLite单文件），跨会话和进程重启复用：
+1. 按命名空间（search / reader）设置不同的TTL
+2. 条件重新验证：过期条目保存了上游返回的ETag/Last-Modified时，
+   客户端带 If-None-Match / If-Modified-Since 请求，304时只刷新过期时间
+3. 上游请求失败时可以返回过期条目（stale-if-error）
+4. 按总字节数限制缓存大小，超出时淘汰最久未访问的条目
+5. 支持预热：提前搜索常用关键词、抓取常用URL（见 prewarm_web_cache 和 manage_web_cache.py）
+"""
+
+import asyncio
+import contextlib
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from typing import Dict, List, Any, Optional
+
+import aiohttp
+
+from utils.config_manager import get_web_cache_config
+from agent.utils.http_session import get_http_session
+from agent.utils.rate_limiter import AsyncRateLimiter
+
+
+@dataclass
+class CacheEntry:
+    """缓存条目"""
+    value: Any
+    fresh: bool                              # 是否仍在TTL内
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+
+    def revalidation_headers(self) -> Dict[str, str]:
+        """条件请求头（上游没有返回验证信息时为空）"""
+        headers = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+
+def make_cache_key(*parts: Any) -> str:
+    """由请求参数生成稳定的缓存键"""
+    raw = json.dumps(parts, ensure_ascii=False, sort_keys=True, default=str)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+class WebCache:
+    """SQLite磁盘缓存，按总字节数LRU淘汰"""
+
+    def __init__(self, db_path: str, max_bytes: int = 256 * 1024 * 1024,
+                 ttls: Optional[Dict[str, float]] = None, enabled: bool = True):
+        """
+        初始化网页缓存
+
+        Args:
+            db_path: 缓存数据库文件路径
+            max_bytes: 缓存内容总字节数上限
+            ttls: 各命名空间的TTL（秒），未配置的命名空间使用1天
+            enabled: 是否启用（禁用时所有读写都是空操作）
+        """
+        self.db_path = db_path
+        self.max_bytes = max_bytes
+        self.ttls = ttls or {}
+        self.enabled = enabled
+
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+        self._total_bytes: Optional[int] = None
+
+        self.stats = {
+            "hits": 0,
+            "stale_hits": 0,
+            "misses": 0,
+            "writes": 0,
+            "revalidated": 0,
+            "stale_served": 0,
+            "evictions": 0
+        }
+
+    def get(self, namespace: str, key: str) -> Optional[CacheEntry]:
+        """
+        读取缓存条目（包括已过期的条目，由调用方决定重新验证或重新请求）
+
+        Returns:
+            缓存条目，不存在时返回None
+        """
+        if not self.enabled:
+            return None
+
+        with self._lock:
+            conn = self._connect()
+            row = conn.execute(
+                "SELECT value, expires_at, etag, last_modified FROM web_cache WHERE namespace = ? AND key = ?",
+                (namespace, key)
+            ).fetchone()
+            if row is None:
+                self.stats["misses"] += 1
+                return None
+
+            now = time.time()
+            conn.execute("UPDATE web_cache SET last_access = ? WHERE namespace = ? AND key = ?",
+                         (now, namespace, key))
+            conn.commit()
+
+        fresh = row[1] > now
+        self.stats["hits" if fresh else "stale_hits"] += 1
+        return CacheEntry(json.loads(row[0]), fresh, row[2], row[3])
+
+    def put(self, namespace: str, key: str, value: Any, etag: Optional[str] = None,
+            last_modified: Optional[str] = None, ttl: Optional[float] = None) -> None:
+        """写入缓存条目，超出大小上限时淘汰最久未访问的条目"""
+        if not self.enabled:
+            return
+
+        data = json.dumps(value, ensure_ascii=False)
+        size = len(data.encode("utf-8"))
+        if size > self.max_bytes:
+            return
+
+        now = time.time()
+        expires_at = now + (ttl if ttl is not None else self.ttls.get(namespace, 86400))
+        with self._lock:
+            conn = self._connect()
+            old = conn.execute("SELECT size FROM web_cache WHERE namespace = ? AND key = ?",
+                               (namespace, key)).fetchone()
+            conn.execute(
+                "INSERT OR REPLACE INTO web_cache "
+                "(namespace, key, value, size, etag, last_modified, created_at, expires_at, last_access) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (namespace, key, data, size, etag, last_modified, now, expires_at, now)
+            )
+            self._total_bytes += size - (old[0] if old else 0)
+            self._evict(conn)
+            conn.commit()
+        self.stats["writes"] += 1
+
+    def refresh(self, namespace: str, key: str, ttl: Optional[float] = None) -> None:
+        """重新验证成功（304）后延长条目的过期时间"""
+        if not self.enabled:
+            return
+
+        now = time.time()
+        expires_at = now + (ttl if ttl is not None else self.ttls.get(namespace, 86400))
+        with self._lock:
+            conn = self._connect()
+            conn.execute("UPDATE web_cache SET expires_at = ?, last_access = ? WHERE namespace = ? AND key = ?",
+                         (expires_at, now, namespace, key))
+            conn.commit()
+        self.stats["revalidated"] += 1
+
+    async def fetch_json(self, namespace: str, key: str, url: str, params: Optional[Dict[str, Any]] = None,
+                         headers: Optional[Dict[str, str]] = None,
+                         timeout: Optional[aiohttp.ClientTimeout] = None,
+                         rate_limiter: Optional[AsyncRateLimiter] = None) -> Any:
+        """
+        带缓存的JSON GET请求（使用共享HTTP会话）
+
+        未过期的缓存直接返回；过期条目带条件请求头重新验证，304时刷新过期时间；
+        上游返回 code == 200 的结果才写入缓存；请求失败且存在过期条目时返回过期条目
+
+        Args:
+            namespace: 缓存命名空间（决定TTL）
+            key: 缓存键（见 make_cache_key）
+            url: 请求URL
+            params: 查询参数
+            headers: 请求头
+            timeout: 请求超时
+            rate_limiter: 请求上游时使用的限流器（缓存命中时不占用限流配额）
+
+        Returns:
+            上游返回的JSON
+        """
+        entry = await asyncio.to_thread(self.get, namespace, key) if self.enabled else None
+        if entry and entry.fresh:
+            return entry.value
+
+        request_headers = dict(headers or {})
+        if entry:
+            request_headers.update(entry.revalidation_headers())
+
+        try:
+            async with rate_limiter.limit() if rate_limiter else contextlib.nullcontext():
+                async with get_http_session().get(url, params=params, headers=request_headers,
+                                                  timeout=timeout) as response:
+                    if response.status == 304 and entry:
+                        await asyncio.to_thread(self.refresh, namespace, key)
+                        return entry.value
+                    response.raise_for_status()
+                    result = await response.json()
+                    etag = response.headers.get("ETag")
+                    last_modified = response.headers.get("Last-Modified")
+        except (aiohttp.ClientError, asyncio.TimeoutError):
+            if entry:
+                self.stats["stale_served"] += 1
+                return entry.value
+            raise
+
+        if self.enabled and isinstance(result, dict) and result.get("code") == 200:
+            await asyncio.to_thread(self.put, namespace, key, result, etag, last_modified)
+        return result
+
+    def purge_expired(self, namespace: Optional[str] = None) -> int:
+        """删除已过期的条目，返回删除数量"""
+        if not self.enabled:
+            return 0
+
+        with self._lock:
+            conn = self._connect()
+            where, params = "expires_at <= ?", [time.time()]
+            if namespace:
+                where += " AND namespace = ?"
+                params.append(namespace)
+            cursor = conn.execute(f"DELETE FROM web_cache WHERE {where}", params)
+            conn.commit()
+            self._total_bytes = self._query_total_bytes(conn)
+            return cursor.rowcount
+
+    def clear(self, namespace: Optional[str] = None) -> int:
+        """清空缓存（可只清空一个命名空间），返回删除数量"""
+        if not self.enabled:
+            return 0
+
+        with self._lock:
+            conn = self._connect()
+            if namespace:
+                cursor = conn.execute("DELETE FROM web_cache WHERE namespace = ?", (namespace,))
+            else:
+                cursor = conn.execute("DELETE FROM web_cache")
+            conn.commit()
+            self._total_bytes = self._query_total_bytes(conn)
+            return cursor.rowcount
+
+    def get_stats(self) -> Dict[str, Any]:
+        """获取缓存统计信息（包括各命名空间的条目数和字节数）"""
+        stats = {**self.stats, "enabled": self.enabled, "db_path": self.db_path, "max_bytes": self.max_bytes}
+        if not self.enabled:
+            return stats
+
+        with self._lock:
+            conn = self._connect()
+            rows = conn.execute(
+                "SELECT namespace, COUNT(*), COALESCE(SUM(size), 0), SUM(expires_at > ?) "
+                "FROM web_cache GROUP BY namespace",
+                (time.time(),)
+            ).fetchall()
+
+        lookups = self.stats["hits"] + self.stats["stale_hits"] + self.stats["misses"]
+        stats.update({
+            "total_bytes": self._total_bytes,
+            "hit_rate": self.stats["hits"] / lookups if lookups else 0.0,
+            "namespaces": {
+                namespace: {"entries": count, "bytes": size, "fresh": fresh or 0}
+                for namespace, count, size, fresh in rows
+            }
+        })
+        return stats
+
+    def close(self) -> None:
+        """关闭数据库连接"""
+        with self._lock:
+            if self._conn:
+                self._conn.close()
+                self._conn = None
+
+    def _connect(self) -> sqlite3.Connection:
+        """按需打开数据库连接并创建表（调用方持有锁）"""
+        if self._conn is None:
+            cache_dir = os.path.dirname(self.db_path)
+            if cache_dir:
+                os.makedirs(cache_dir, exist_ok=True)
+            conn = sqlite3.connect(self.db_path, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode = WAL;")
+            conn.execute("PRAGMA synchronous = NORMAL;")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS web_cache (
+                    namespace TEXT NOT NULL,
+                    key TEXT NOT NULL,
+                    value TEXT NOT NULL,
+                    size INTEGER NOT NULL,
+                    etag TEXT,
+                    last_modified TEXT,
+                    created_at REAL NOT NULL,
+                    expires_at REAL NOT NULL,
+                    last_access REAL NOT NULL,
+                    PRIMARY KEY (namespace, key)
+                )
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_web_cache_last_access ON web_cache(last_access)")
+            conn.commit()
+            self._conn = conn
+            self._total_bytes = self._query_total_bytes(conn)
+        return self._conn
+
+    @staticmethod
+    def _query_total_bytes(conn: sqlite3.Connection) -> int:
+        return conn.execute("SELECT COALESCE(SUM(size), 0) FROM web_cache").fetchone()[0]
+
+    def _evict(self, conn: sqlite3.Connection) -> None:
+        """总字节数超出上限时按最久未访问淘汰（调用方持有锁）"""
+        while self._total_bytes > self.max_bytes:
+            rows = conn.execute(
+                "SELECT namespace, key, size FROM web_cache ORDER BY last_access LIMIT 64"
+            ).fetchall()
+            if not rows:
+                break
+            for namespace, key, size in rows:
+                if self._total_bytes <= self.max_bytes:
+                    break
+                conn.execute("DELETE FROM web_cache WHERE namespace = ? AND key = ?", (namespace, key))
+                self._total_bytes -= size
+                self.stats["evictions"] += 1
+
+
+def _create_cache() -> WebCache:
+    config = get_web_cache_config()
+    return WebCache(
+        db_path=config.get("path", ".gtplanner_cache/web_cache.db"),
+        max_bytes=config.get("max_bytes", 256 * 1024 * 1024),
+        ttls={"search": config.get("search_ttl", 86400), "reader": config.get("reader_ttl", 604800)},
+        enabled=config.get("enabled", True)
+    )
+
+
+# 全局网页缓存实例（JinaSearchClient和JinaWebClient共享）
+web_cache = _create_cache()
+
+
+async def prewarm_web_cache(queries: Optional[List[str]] = None, urls: Optional[List[str]] = None,
+                            count: int = 5, concurrency: int = 4, search_client=None,
+                            web_client=None) -> Dict[str, Any]:
+    """
+    预热缓存：提前搜索关键词、抓取URL并写入缓存（已有未过期缓存的不会请求上游）
+
+    Args:
+        queries: 要预热的搜索关键词
+        urls: 要预热的URL
+        count: 每个关键词的搜索结果数量（与NodeSearch使用的数量一致时才能命中）
+        concurrency: 并发请求数
+        search_client: 搜索客户端，为None时使用默认配置创建JinaSearchClient
+        web_client: Reader客户端，为None时使用默认配置创建JinaWebClient
+
+    Returns:
+        预热统计：各类型的成功、失败数量
+    """
+    from agent.utils.search import JinaSearchClient
+    from agent.utils.URL_to_Markdown import JinaWebClient
+
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+    summary = {"queries": {"ok": 0, "failed": 0}, "urls": {"ok": 0, "failed": 0}}
+
+    async def warm(kind: str, coro_factory):
+        async with semaphore:
+            try:
+                await coro_factory()
+                summary[kind]["ok"] += 1
+            except Exception:
+                summary[kind]["failed"] += 1
+
+    tasks = []
+    if queries:
+        search_client = search_client or JinaSearchClient()
+        tasks += [warm("queries", lambda q=q: search_client.search_simple(q, count=count)) for q in queries]
+    if urls:
+        web_client = web_client or JinaWebClient()
+        tasks += [warm("urls", lambda u=u: web_client.get_page_info(u)) for u in urls]
+
+    await asyncio.gather(*tasks)
+    return summary
@@ -0,0 +1,84 @@
+"""
+JinaWebClient 批量转换吞吐基准测试
+
+使用本地假Jina Reader服务（固定延迟，部分URL返回500）比较：
+1. sequential：逐个 await get_page_info（旧版batch_convert的预期行为）
+2. batch_convert 在不同并发数下的总耗时、吞吐量和首个结果到达时间（iter_convert流式返回）
+
+用法：
+    python benchmarks/batch_convert_throughput.py --urls 60 --latency 0.3
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+# 添加项目根目录到 Python 路径
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.fake_jina import start_fake_jina_service
+
+
+async def run_sequential(client, urls):
+    start_time = time.perf_counter()
+    first = None
+    failed = 0
+    for url in urls:
+        try:
+            await client.get_page_info(url)
+        except Exception:
+            failed += 1
+        first = first or time.perf_counter() - start_time
+    return time.perf_counter() - start_time, first, failed
+
+
+async def run_streaming(client, urls, concurrency: int, timeout: float):
+    start_time = time.perf_counter()
+    first = None
+    failed = 0
+    async for _, page_info in client.iter_convert(urls, concurrency=concurrency, timeout=timeout):
+        failed += "error" in page_info
+        first = first or time.perf_counter() - start_time
+    return time.perf_counter() - start_time, first, failed
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="JinaWebClient 批量转换吞吐基准测试")
+    parser.add_argument("--urls", type=int, default=60, help="URL数量")
+    parser.add_argument("--latency", type=float, default=0.3, help="假Reader服务延迟（秒）")
+    parser.add_argument("--fail-every", type=int, default=10, help="每隔多少个URL返回500")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 5, 10, 20], help="并发数")
+    parser.add_argument("--timeout", type=float, default=5, help="单个URL超时（秒）")
+    parser.add_argument("--port", type=int, default=18771, help="假服务端口")
+    args = parser.parse_args()
+
+    os.environ.setdefault("JINA_API_KEY", "benchmark-unused")
+    from agent.utils.URL_to_Markdown import JinaWebClient
+    from agent.utils.http_session import close_http_sessions
+
+    start_fake_jina_service(args.port, args.latency)
+    client = JinaWebClient(api_key="benchmark", base_url=f"http://127.0.0.1:{args.port}/read", use_cache=False)
+    urls = [
+        f"https://example.com/status/500/{i}" if args.fail_every and i % args.fail_every == 0
+        else f"https://example.com/page/{i}"
+        for i in range(args.urls)
+    ]
+
+    rows = [("sequential", *await run_sequential(client, urls))]
+    for concurrency in args.concurrency:
+        rows.append((f"batch(c={concurrency})", *await run_streaming(client, urls, concurrency, args.timeout)))
+
+    print("🧪 JinaWebClient 批量转换吞吐基准测试")
+    print(f"   URL数: {args.urls}, 服务延迟: {args.latency * 1000:.0f}ms, 失败URL: 每 {args.fail_every} 个一个")
+    print("=" * 60)
+    print(f"{'mode':<14}{'总耗时s':>10}{'URL/s':>10}{'首个结果ms':>14}{'失败':>8}")
+    for label, total, first, failed in rows:
+        print(f"{label:<14}{total:>10.2f}{len(urls) / total:>10.1f}{first * 1000:>14.0f}{failed:>8}")
+
+    await close_http_sessions()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
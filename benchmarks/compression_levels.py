@@ -0,0 +1,123 @@
+"""
+分级压缩基准测试
+
+模拟一个工具调用密集的会话（工具结果较大且经常重复），每轮对话后按token压力触发压缩，
+对比两种策略的LLM调用次数、LLM输入token和节省的token：
+1. llm_only：关闭LIGHT级别，任何压力都直接进行LLM摘要
+2. tiered：按压力分级，轻度压力只做本地裁剪，压力较重时才调用LLM
+
+LLM调用由本地假客户端代替（返回固定大小的结果），不产生网络请求。
+
+用法：
+    python benchmarks/compression_levels.py --turns 300 --context-window 32000
+"""
+
+import argparse
+import asyncio
+import contextlib
+import json
+import os
+import sys
+import tempfile
+from types import SimpleNamespace
+
+# 添加项目根目录到 Python 路径
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from agent.persistence.sqlite_session_manager import SQLiteSessionManager
+from agent.persistence.smart_compressor import SmartCompressor, CompressionConfig
+
+
+class FakeLLMClient:
+    """返回固定大小摘要的假LLM客户端"""
+
+    async def chat_completion_stream(self, messages, system_prompt=None, **kwargs):
+        payload = {"summary": "对话摘要" * 100, "key_decisions": ["决策"]}
+        text = json.dumps(payload, ensure_ascii=False)
+        for start in range(0, len(text), 64):
+            delta = SimpleNamespace(content=text[start:start + 64])
+            yield SimpleNamespace(choices=[SimpleNamespace(delta=delta)], usage=None)
+
+
+def build_turn(manager: SQLiteSessionManager, turn: int, tool_size: int) -> list:
+    """一轮对话：用户消息、带工具调用的助手消息、工具结果（每4轮重复一次相同的查询结果）"""
+    call_id = f"call_{turn}"
+    tool_result = f"查询结果{turn % 4}：" + "工具返回的检索内容" * (tool_size // 9)
+    return [
+        manager._build_message("user", f"第{turn}轮需求：" + "用户描述需求细节" * 4),
+        manager._build_message("assistant", f"第{turn}轮调用工具",
+                               tool_calls=[{"id": call_id, "type": "function",
+                                            "function": {"name": "search", "arguments": "{}"}}]),
+        manager._build_message("tool", tool_result, tool_call_id=call_id),
+        manager._build_message("assistant", f"第{turn}轮回复：" + "助手给出设计方案" * 10)
+    ]
+
+
+async def run_mode(tiered: bool, turns: int, context_window: int, tool_size: int) -> dict:
+    """运行单个策略，返回压缩统计"""
+    config = CompressionConfig(
+        context_window_tokens=context_window,
+        max_messages=10 ** 6,
+        light_pressure=0.75 if tiered else 1.0
+    )
+
+    # 屏蔽压缩过程中的逐条日志，只输出汇总表
+    with tempfile.TemporaryDirectory() as tmp_dir, open(os.devnull, "w") as devnull, \
+            contextlib.redirect_stdout(devnull):
+        manager = SQLiteSessionManager(os.path.join(tmp_dir, "levels.db"))
+        compressor = SmartCompressor(manager, config)
+        compressor.openai_client = FakeLLMClient()
+        session_id = manager.create_new_session("levels-bench")
+
+        peak_pressure = 0.0
+        for turn in range(turns):
+            manager.add_messages(build_turn(manager, turn, tool_size), session_id=session_id)
+            context = manager.dao.get_active_compressed_context(session_id)
+            peak_pressure = max(peak_pressure, compressor.get_pressure(context["compressed_token_count"]))
+            if compressor.should_compress(session_id):
+                await compressor._execute_compression(session_id)
+
+        manager._session_cache.close()
+
+    return {
+        "mode": "tiered" if tiered else "llm_only",
+        "peak_pressure": peak_pressure,
+        "llm_calls": compressor.stats["llm_calls"],
+        "llm_input_tokens": compressor.stats["llm_input_tokens"],
+        "levels": compressor.get_level_report()
+    }
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="分级压缩基准测试")
+    parser.add_argument("--turns", type=int, default=300, help="对话轮数")
+    parser.add_argument("--context-window", type=int, default=32000, help="模型上下文窗口（token）")
+    parser.add_argument("--tool-size", type=int, default=6000, help="每个工具结果的字符数")
+    args = parser.parse_args()
+
+    results = [
+        await run_mode(False, args.turns, args.context_window, args.tool_size),
+        await run_mode(True, args.turns, args.context_window, args.tool_size)
+    ]
+
+    print("🧪 分级压缩基准测试")
+    print(f"   对话轮数: {args.turns}, 上下文窗口: {args.context_window}, 工具结果: {args.tool_size} 字符")
+    print("=" * 78)
+    print(f"{'mode':<10}{'峰值压力':>10}{'LLM调用':>10}{'LLM输入token':>14}")
+    for result in results:
+        print(f"{result['mode']:<10}{result['peak_pressure']:>10.2f}"
+              f"{result['llm_calls']:>10}{result['llm_input_tokens']:>14}")
+
+    print("-" * 78)
+    print(f"{'mode':<10}{'level':<8}{'次数':>8}{'节省token':>12}{'节省比例':>10}{'LLM输入':>10}{'平均ms':>10}")
+    for result in results:
+        for level, stats in result["levels"].items():
+            if not stats["runs"]:
+                continue
+            print(f"{result['mode']:<10}{level:<8}{stats['runs']:>8}{stats['tokens_saved']:>12}"
+                  f"{stats['saving_ratio']:>10.1%}{stats['llm_input_tokens']:>10}"
+                  f"{stats['avg_duration_ms']:>10.1f}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,146 @@
+"""
+压缩输出修复基准测试
+
+用会注入故障的假LLM客户端反复执行压缩，对比两种处理LLM输出的方式：
+1. strict：旧版做法，等待完整回复后json.loads，流中断或解析失败时丢弃整个回复
+2. streaming：流式读取，流中断时保留已接收的内容，解析失败时修复不完整的JSON
+
+注入的故障（按比例随机出现）：
+- truncated：输出在中途结束（如达到max_tokens）
+- interrupted：输出流在中途抛出异常（如网络中断）
+- fenced：JSON被markdown代码块包裹并带有说明文字
+- trailing_comma：对象末尾多余的逗号
+
+用法：
+    python benchmarks/compression_output_repair.py --trials 200 --fault-rate 0.3
+"""
+
+import argparse
+import asyncio
+import contextlib
+import json
+import os
+import random
+import sys
+import tempfile
+from types import SimpleNamespace
+
+# 添加项目根目录到 Python 路径
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from agent.persistence.sqlite_session_manager import SQLiteSessionManager
+from agent.persistence.smart_compressor import SmartCompressor, CompressionConfig
+
+FAULTS = ["truncated", "interrupted", "fenced", "trailing_comma"]
+
+
+class FaultyLLMClient:
+    """按比例注入输出故障的假LLM客户端（流式）"""
+
+    def __init__(self, fault_rate: float, seed: int):
+        self.fault_rate = fault_rate
+        self.random = random.Random(seed)
+        self.last_fault = None
+        self.last_text = ""
+
+    async def chat_completion_stream(self, messages, system_prompt=None, **kwargs):
+        payload = {
+            "compressed_messages": [
+                {"role": "user", "content": "合并后的需求" * 20},
+                {"role": "assistant", "content": "合并后的方案" * 40},
+                {"role": "assistant", "content": "后续的补充说明" * 30}
+            ],
+            "summary": "对话摘要" * 60,
+            "key_decisions": ["决策一", "决策二"]
+        }
+        text = json.dumps(payload, ensure_ascii=False, indent=2)
+        fault = self.random.choice(FAULTS) if self.random.random() < self.fault_rate else None
+        cut = int(len(text) * self.random.uniform(0.3, 0.95))
+
+        if fault == "truncated":
+            text = text[:cut]
+        elif fault == "fenced":
+            text = f"好的，压缩结果如下：\n```json\n{text}\n```\n以上。"
+        elif fault == "trailing_comma":
+            text = text[:-2] + ",\n}"
+
+        self.last_fault = fault
+        self.last_text = text
+        for start in range(0, len(text), 64):
+            if fault == "interrupted" and start >= cut:
+                raise ConnectionError("stream interrupted")
+            delta = SimpleNamespace(content=text[start:start + 64])
+            yield SimpleNamespace(choices=[SimpleNamespace(delta=delta)], usage=None)
+
+
+def strict_accepts(fault, text: str) -> bool:
+    """旧版处理方式能否使用该输出"""
+    if fault == "interrupted":
+        return False
+    try:
+        return bool(json.loads(text).get("compressed_messages"))
+    except json.JSONDecodeError:
+        return False
+
+
+async def run(trials: int, fault_rate: float, seed: int) -> dict:
+    """执行多次压缩，返回两种方式的成功次数和浪费的token"""
+    client = FaultyLLMClient(fault_rate, seed)
+    result = {"strict_ok": 0, "strict_wasted": 0, "faults": {}}
+
+    with tempfile.TemporaryDirectory() as tmp_dir, open(os.devnull, "w") as devnull, \
+            contextlib.redirect_stdout(devnull):
+        manager = SQLiteSessionManager(os.path.join(tmp_dir, "repair.db"))
+        compressor = SmartCompressor(manager, CompressionConfig(max_messages=10, rolling_summary=False))
+        compressor.openai_client = client
+
+        for trial in range(trials):
+            session_id = manager.create_new_session(f"repair-{trial}")
+            manager.add_messages([
+                manager._build_message("user" if i % 2 == 0 else "assistant", f"消息{i}：" + "对话内容" * 30)
+                for i in range(20)
+            ], session_id=session_id)
+
+            tokens_before = compressor.stats["llm_input_tokens"] + compressor.stats["llm_output_tokens"]
+            try:
+                await compressor._execute_compression(session_id)
+            except Exception:
+                compressor.stats["failed"] += 1
+            call_tokens = compressor.stats["llm_input_tokens"] + compressor.stats["llm_output_tokens"] - tokens_before
+
+            fault = client.last_fault or "none"
+            result["faults"][fault] = result["faults"].get(fault, 0) + 1
+            if strict_accepts(client.last_fault, client.last_text):
+                result["strict_ok"] += 1
+            else:
+                result["strict_wasted"] += call_tokens
+
+        manager._session_cache.close()
+
+    result["statistics"] = compressor.get_statistics()
+    return result
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="压缩输出修复基准测试")
+    parser.add_argument("--trials", type=int, default=200, help="压缩次数")
+    parser.add_argument("--fault-rate", type=float, default=0.3, help="注入故障的比例")
+    parser.add_argument("--seed", type=int, default=7, help="随机种子")
+    args = parser.parse_args()
+
+    result = await run(args.trials, args.fault_rate, args.seed)
+    stats = result["statistics"]
+    strict_failed = args.trials - result["strict_ok"]
+
+    print("🧪 压缩输出修复基准测试")
+    print(f"   压缩次数: {args.trials}, 故障比例: {args.fault_rate:.0%}, 故障分布: {result['faults']}")
+    print("=" * 64)
+    print(f"{'mode':<12}{'成功':>8}{'失败':>8}{'失败率':>10}{'浪费token':>12}{'修复':>8}")
+    print(f"{'strict':<12}{result['strict_ok']:>8}{strict_failed:>8}"
+          f"{strict_failed / args.trials:>10.1%}{result['strict_wasted']:>12}{'-':>8}")
+    print(f"{'streaming':<12}{stats['completed']:>8}{stats['failed']:>8}"
+          f"{stats['failure_rate']:>10.1%}{stats['wasted_llm_tokens']:>12}{stats['output_repaired']:>8}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,327 @@
+"""
+离线假Jina搜索/Reader服务
+
+在本地提供与 s.jina.ai / r.jina.ai 相同响应格式的服务，让技术调研子流程（NodeSearch → NodeURL →
+LLMAnalysisNode → ResultAssemblyNode）不依赖外网和JINA密钥即可运行：
+- 语料：{"searches": {查询: [搜索结果]}, "pages": {URL: 页面}}，可以从JSON文件加载；
+  语料中没有的查询和URL按随机种子确定性生成（同一查询/URL每次返回相同内容）
+- 延迟：搜索、Reader、模拟大模型分别配置延迟分布（fixed / uniform / lognormal）
+- 故障：按比例返回500/502/429，或长时间不响应（触发客户端超时）；URL包含 /status/500 时固定返回500
+- /read 返回 ETag，请求带匹配的 If-None-Match 时返回304
+- /v1/chat/completions：OpenAI兼容的模拟大模型，按研究分析提示词的格式返回JSON，
+  让 LLMAnalysisNode 也能离线运行
+
+同一请求（查询或URL）的第N次尝试的延迟和故障由随机种子决定，重试时重新抽取。
+
+用法：
+    # 前台运行，按提示设置环境变量后即可离线运行调研流程
+    python benchmarks/fake_jina.py --port 18780 --read-latency lognormal:0.6:0.8 --read-failure-rate 0.1
+    # 生成语料文件（可编辑后用 --corpus 加载）
+    python benchmarks/fake_jina.py --save-corpus /tmp/corpus.json --keywords "FastAPI 认证" "Redis 连接池"
+"""
+
+import argparse
+import asyncio
+import hashlib
+import json
+import math
+import os
+import random
+import re
+import threading
+import time
+from typing import Callable, Dict, List, Optional
+from urllib.parse import unquote, urlparse
+
+from aiohttp import web
+
+TOPIC_WORDS = ("架构 配置 部署 性能 并发 缓存 认证 授权 数据库 索引 连接池 重试 超时 限流 监控 日志 "
+               "容器 扩容 测试 版本 兼容 接口 协议 序列化 中间件 队列 事务 一致性 安全 最佳实践").split()
+NOISE_WORDS = ("首页 登录 注册 订阅 分享 评论 广告 推荐 热门 标签 归档 版权 隐私 条款 联系 关于 "
+               "社区 活动 招聘 下载 帮助 反馈").split()
+
+
+def parse_latency(spec) -> Callable[[random.Random], float]:
+    """
+    解析延迟分布
+
+    支持：数字或 fixed:S（固定）、uniform:A:B（均匀分布）、lognormal:MEDIAN:SIGMA（对数正态，长尾）
+    """
+    if isinstance(spec, (int, float)):
+        return lambda rng: float(spec)
+    kind, _, params = str(spec).partition(":")
+    if not params:
+        value = float(kind)
+        return lambda rng: value
+    values = [float(value) for value in params.split(":")]
+    if kind == "fixed":
+        return lambda rng: values[0]
+    if kind == "uniform":
+        return lambda rng: rng.uniform(values[0], values[1])
+    if kind == "lognormal":
+        return lambda rng: rng.lognormvariate(math.log(values[0]), values[1])
+    raise ValueError(f"不支持的延迟分布: {spec}")
+
+
+def search_results(query: str, count: int = 10, seed: int = 7) -> List[Dict[str, str]]:
+    """为查询确定性生成搜索结果（URL形如 https://example.com/{查询}/{序号}）"""
+    rng = random.Random(f"{seed}:search:{query}")
+    return [
+        {
+            "title": f"{query} {rng.choice(TOPIC_WORDS)}指南 ({i})",
+            "url": f"https://example.com/{query}/{i}",
+            "description": f"介绍{query}的{rng.choice(TOPIC_WORDS)}和{rng.choice(TOPIC_WORDS)}。",
+            "date": ""
+        }
+        for i in range(count)
+    ]
+
+
+def page_for_url(url: str, seed: int = 7, useless_rate: float = 0.1) -> Dict[str, str]:
+    """
+    为URL确定性生成页面：导航和无关章节中穿插与主题相关的章节
+
+    主题取自URL路径的第一段（search_results生成的URL即为查询词）；
+    useless_rate 比例的页面为空页面或拦截页面
+    """
+    rng = random.Random(f"{seed}:page:{url}")
+    path = [unquote(part) for part in urlparse(url).path.split("/") if part]
+    topic = path[0] if path else urlparse(url).netloc
+    title = f"{topic} {rng.choice(TOPIC_WORDS)}实践"
+
+    if rng.random() < useless_rate:
+        content = rng.choice(["", "Access denied. Please enable JavaScript and cookies to continue.\n" * 3])
+        return {"title": title, "description": "", "url": url, "content": content}
+
+    def paragraph(related: bool) -> str:
+        words = TOPIC_WORDS if related else NOISE_WORDS
+        text = "".join(rng.choice(words) for _ in range(rng.randint(25, 60))) + "。"
+        return f"{topic} 的{text}" if related else text
+
+    sections = [" | ".join(rng.sample(NOISE_WORDS, 6)), f"# {title}"]
+    for _ in range(rng.randint(6, 16)):
+        related = rng.random() < 0.5
+        heading = f"## {topic} {rng.choice(TOPIC_WORDS)}" if related else f"## {rng.choice(NOISE_WORDS)}"
+        sections.append(heading)
+        sections.extend(paragraph(related) for _ in range(rng.randint(1, 4)))
+    sections.append(f"版权所有 © {urlparse(url).netloc}")
+    return {"title": title, "description": f"{topic} 技术文章", "url": url, "content": "\n\n".join(sections)}
+
+
+def build_corpus(keywords: List[str], results_per_query: int = 10, seed: int = 7,
+                 useless_rate: float = 0.1) -> Dict[str, Dict]:
+    """为关键词生成语料（搜索结果和对应页面），可保存为JSON后手工编辑"""
+    corpus = {"searches": {}, "pages": {}}
+    for keyword in keywords:
+        results = search_results(keyword, results_per_query, seed)
+        corpus["searches"][keyword] = results
+        for result in results:
+            corpus["pages"][result["url"]] = page_for_url(result["url"], seed, useless_rate)
+    return corpus
+
+
+class FakeJinaService:
+    """本地假Jina搜索/Reader服务（附带OpenAI兼容的模拟大模型接口）"""
+
+    def __init__(self, corpus: Optional[Dict[str, Dict]] = None, search_latency="fixed:0",
+                 read_latency=None, llm_latency="fixed:0", search_failure_rate: float = 0.0,
+                 read_failure_rate: float = 0.0, hang_rate: float = 0.0, hang_seconds: float = 60.0,
+                 useless_rate: float = 0.1, seed: int = 7):
+        """
+        初始化服务
+
+        Args:
+            corpus: 语料，没有的查询和URL按种子生成
+            search_latency / read_latency / llm_latency: 延迟分布（见 parse_latency），read_latency默认与搜索相同
+            search_failure_rate / read_failure_rate: 返回500/502/429的比例
+            hang_rate: 长时间不响应的比例（搜索和Reader）
+            hang_seconds: 不响应的时长（秒）
+            useless_rate: 生成页面中空页面/拦截页面的比例
+            seed: 随机种子
+        """
+        self.corpus = corpus or {"searches": {}, "pages": {}}
+        self.search_latency = parse_latency(search_latency)
+        self.read_latency = parse_latency(search_latency if read_latency is None else read_latency)
+        self.llm_latency = parse_latency(llm_latency)
+        self.failure_rates = {"search": search_failure_rate, "read": read_failure_rate}
+        self.hang_rate = hang_rate
+        self.hang_seconds = hang_seconds
+        self.useless_rate = useless_rate
+        self.seed = seed
+
+        self.port = None
+        self.counters = {"search": 0, "read": 0, "not_modified": 0, "failed": 0, "hung": 0, "llm": 0}
+        self._attempts: Dict[str, int] = {}
+
+    @property
+    def base_url(self) -> str:
+        return f"http://127.0.0.1:{self.port}"
+
+    def env(self) -> Dict[str, str]:
+        """让Jina客户端和LLM客户端使用本服务的环境变量"""
+        return {
+            "JINA_SEARCH_BASE_URL": f"{self.base_url}/search",
+            "JINA_WEB_BASE_URL": f"{self.base_url}/read",
+            "LLM_BASE_URL": f"{self.base_url}/v1",
+            "LLM_MODEL": "fake-research-model"
+        }
+
+    def start(self, port: int) -> "FakeJinaService":
+        """在后台线程中启动服务"""
+        ready = threading.Event()
+        self.port = port
+
+        def run():
+            loop = asyncio.new_event_loop()
+            asyncio.set_event_loop(loop)
+            runner = web.AppRunner(self.create_app())
+            loop.run_until_complete(runner.setup())
+            loop.run_until_complete(web.TCPSite(runner, "127.0.0.1", port).start())
+            ready.set()
+            loop.run_forever()
+
+        threading.Thread(target=run, daemon=True).start()
+        ready.wait(10)
+        return self
+
+    def create_app(self) -> web.Application:
+        app = web.Application()
+        app.router.add_get("/search", self._search)
+        app.router.add_get("/read/{url:.*}", self._read)
+        app.router.add_post("/v1/chat/completions", self._chat_completions)
+        return app
+
+    def _attempt_rng(self, kind: str, key: str) -> random.Random:
+        """同一请求第N次尝试的随机数发生器（重试时重新抽取延迟和故障）"""
+        attempt_key = f"{kind}:{key}"
+        attempt = self._attempts.get(attempt_key, 0)
+        self._attempts[attempt_key] = attempt + 1
+        return random.Random(f"{self.seed}:{attempt_key}:{attempt}")
+
+    async def _simulate(self, kind: str, rng: random.Random, latency: float) -> Optional[web.Response]:
+        """模拟延迟和故障，返回故障响应或None"""
+        failed = rng.random() < self.failure_rates[kind]
+        hung = rng.random() < self.hang_rate
+        status = rng.choice([500, 502, 429])
+        await asyncio.sleep(self.hang_seconds if hung else latency)
+        if hung:
+            self.counters["hung"] += 1
+        if failed:
+            self.counters["failed"] += 1
+            return web.json_response({"code": status, "status": status * 100, "data": None}, status=status)
+        return None
+
+    async def _search(self, request):
+        self.counters["search"] += 1
+        query = request.query.get("q", "")
+        count = int(request.query.get("count", 10))
+        rng = self._attempt_rng("search", query)
+        failure = await self._simulate("search", rng, self.search_latency(rng))
+        if failure:
+            return failure
+
+        results = self.corpus["searches"].get(query) or search_results(query, max(count, 10), self.seed)
+        data = results[:count]
+        return web.json_response({"code": 200, "status": 20000, "data": data,
+                                  "meta": {"usage": {"tokens": 100 * len(data)}}})
+
+    async def _read(self, request):
+        self.counters["read"] += 1
+        url = request.match_info["url"]
+        rng = self._attempt_rng("read", url)
+        failure = await self._simulate("read", rng, self.read_latency(rng))
+        if failure:
+            return failure
+        if "/status/500" in url:
+            self.counters["failed"] += 1
+            return web.json_response({"code": 500, "status": 50000, "data": None}, status=500)
+
+        page = self.corpus["pages"].get(url)
+        if page is None:
+            page = page_for_url(url, self.seed, self.useless_rate)
+        etag = '"%s"' % hashlib.md5(page["content"].encode("utf-8")).hexdigest()[:16]
+        if request.headers.get("If-None-Match") == etag:
+            self.counters["not_modified"] += 1
+            return web.Response(status=304, headers={"ETag": etag})
+        data = {**page, "url": page.get("url", url)}
+        return web.json_response({"code": 200, "status": 20000, "data": data}, headers={"ETag": etag})
+
+    async def _chat_completions(self, request):
+        """模拟大模型：按研究分析提示词要求的JSON格式返回，关键点取自内容中的小标题"""
+        self.counters["llm"] += 1
+        body = await request.json()
+        prompt = "\n".join(str(message.get("content", "")) for message in body.get("messages", []))
+        rng = random.Random(f"{self.seed}:llm:{hashlib.md5(prompt.encode('utf-8')).hexdigest()}")
+        await asyncio.sleep(self.llm_latency(rng))
+
+        headings = list(dict.fromkeys(re.findall(r"^#{1,3} +(.+)$", prompt, flags=re.MULTILINE)))
+        analysis = {
+            "summary": f"根据页面内容（{len(prompt)}字符）的模拟分析",
+            "key_points": headings[:3],
+            "relevance": "模拟相关性分析",
+            "recommendations": [f"参考{heading}" for heading in headings[3:5]]
+        }
+        content = json.dumps(analysis, ensure_ascii=False)
+        return web.json_response({
+            "id": f"chatcmpl-fake-{self.counters['llm']}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": body.get("model", "fake-research-model"),
+            "choices": [{"index": 0, "message": {"role": "assistant", "content": content},
+                         "finish_reason": "stop"}],
+            "usage": {"prompt_tokens": len(prompt) // 2, "completion_tokens": len(content) // 2,
+                      "total_tokens": (len(prompt) + len(content)) // 2}
+        })
+
+
+def start_fake_jina_service(port: int, latency: float, read_latency: float = None) -> dict:
+    """
+    在后台线程中运行固定延迟的假Jina服务（/search 返回搜索结果，/read/{url} 返回页面内容）
+
+    返回的字典记录各接口收到的请求数，服务运行期间持续更新。
+    """
+    service = FakeJinaService(search_latency=latency, read_latency=read_latency).start(port)
+    return service.counters
+
+
+def main():
+    parser = argparse.ArgumentParser(description="离线假Jina搜索/Reader服务")
+    parser.add_argument("--port", type=int, default=18780, help="服务端口")
+    parser.add_argument("--corpus", help="语料JSON文件")
+    parser.add_argument("--save-corpus", help="为 --keywords 生成语料并保存到该文件后退出")
+    parser.add_argument("--keywords", nargs="+", default=[], help="生成语料的关键词")
+    parser.add_argument("--search-latency", default="uniform:0.3:0.8", help="搜索延迟分布")
+    parser.add_argument("--read-latency", default="lognormal:0.6:0.8", help="Reader延迟分布")
+    parser.add_argument("--llm-latency", default="uniform:0.8:2.0", help="模拟大模型延迟分布")
+    parser.add_argument("--search-failure-rate", type=float, default=0.0, help="搜索故障比例")
+    parser.add_argument("--read-failure-rate", type=float, default=0.0, help="Reader故障比例")
+    parser.add_argument("--hang-rate", type=float, default=0.0, help="不响应比例")
+    parser.add_argument("--seed", type=int, default=7, help="随机种子")
+    args = parser.parse_args()
+
+    if args.save_corpus:
+        with open(args.save_corpus, "w", encoding="utf-8") as f:
+            json.dump(build_corpus(args.keywords, seed=args.seed), f, ensure_ascii=False, indent=2)
+        print(f"✅ 语料已保存: {args.save_corpus}（{len(args.keywords)} 个关键词）")
+        return
+
+    corpus = None
+    if args.corpus:
+        with open(args.corpus, "r", encoding="utf-8") as f:
+            corpus = json.load(f)
+
+    service = FakeJinaService(
+        corpus, search_latency=args.search_latency, read_latency=args.read_latency,
+        llm_latency=args.llm_latency, search_failure_rate=args.search_failure_rate,
+        read_failure_rate=args.read_failure_rate, hang_rate=args.hang_rate, seed=args.seed
+    )
+    service.port = args.port
+    print(f"🧪 假Jina服务: {service.base_url}，设置以下环境变量后运行调研流程:")
+    for key, value in service.env().items():
+        print(f"   export {key}={value}")
+    print("   export JINA_API_KEY=offline LLM_API_KEY=offline")
+    web.run_app(service.create_app(), host="127.0.0.1", port=args.port, print=None)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+"""
+合成工具目录生成器
+
+按tools/目录中的工具描述格式（APIS和PYTHON_PACKAGE两类）生成大量合成工具YAML文件，
+用于测试大规模工具目录的加载、索引和检索性能。生成结果由随机种子决定，可重复。
+
+用法：
+    python benchmarks/generate_tool_catalog.py --count 10000 --output /tmp/tool_catalog
+"""
+
+import argparse
+import os
+import random
+
+import yaml
+
+# 优先使用libyaml加速的Dumper
+YAML_DUMPER = getattr(yaml, "CSafeDumper", yaml.SafeDumper)
+
+DOMAINS = ["天气", "地图", "支付", "翻译", "语音识别", "图像生成", "视频处理", "文档解析",
+           "邮件", "短信", "日历", "数据库", "向量检索", "爬虫", "监控", "日志分析"]
+VERBS = ["查询", "创建", "更新", "删除", "分析", "转换", "同步", "导出"]
+OBJECTS = ["记录", "任务", "用户", "订单", "文件", "报表", "事件", "模型"]
+
+
+def build_tool(index: int, rng: random.Random) -> dict:
+    """生成单个合成工具描述"""
+    domain = rng.choice(DOMAINS)
+    features = [f"{rng.choice(VERBS)}{rng.choice(OBJECTS)}" for _ in range(rng.randint(3, 8))]
+    description = (
+        f"合成的{domain}工具 #{index}，用于基准测试。\n\n主要功能：\n" +
+        "\n".join(f"- 支持{feature}" for feature in features)
+    )
+
+    if rng.random() < 0.6:
+        endpoints = [
+            {
+                "method": rng.choice(["GET", "POST", "PUT", "DELETE"]),
+                "path": f"/v1/{rng.choice(OBJECTS)}/{n}",
+                "summary": f"{rng.choice(VERBS)}{rng.choice(OBJECTS)}"
+            }
+            for n in range(rng.randint(1, 6))
+        ]
+        return {
+            "id": f"synthetic.api.{domain}.{index}",
+            "type": "APIS",
+            "summary": f"{domain}服务API：{'、'.join(features[:3])}。",
+            "description": description,
+            "base_url": f"https://api.example.com/{index}",
+            "endpoints": endpoints,
+            "examples": [
+                {"title": "cURL 示例", "content": f"curl https://api.example.com/{index}/v1/{endpoints[0]['path']}"}
+            ]
+        }
+
+    return {
+        "id": f"pypi.synthetic-{domain}-{index}",
+        "type": "PYTHON_PACKAGE",
+        "summary": f"{domain}相关的Python库：{'、'.join(features[:3])}。",
+        "description": description,
+        "requirement": f"synthetic-{index}>=1.0",
+        "examples": [
+            {"title": "安装依赖", "content": f"pip install synthetic-{index}"},
+            {"title": "基础示例", "content": f"import synthetic_{index}\nsynthetic_{index}.run()"}
+        ]
+    }
+
+
+def generate_catalog(output_dir: str, count: int, seed: int = 42) -> int:
+    """
+    生成合成工具目录
+
+    Args:
+        output_dir: 输出目录（按类型分为apis/和python_packages/子目录）
+        count: 工具数量
+        seed: 随机种子
+
+    Returns:
+        生成的文件数量
+    """
+    rng = random.Random(seed)
+    for sub_dir in ("apis", "python_packages"):
+        os.makedirs(os.path.join(output_dir, sub_dir), exist_ok=True)
+
+    for index in range(count):
+        tool = build_tool(index, rng)
+        sub_dir = "apis" if tool["type"] == "APIS" else "python_packages"
+        path = os.path.join(output_dir, sub_dir, f"synthetic_{index:05d}.yml")
+        with open(path, "w", encoding="utf-8") as f:
+            yaml.dump(tool, f, Dumper=YAML_DUMPER, allow_unicode=True, sort_keys=False)
+
+    return count
+
+
+def main():
+    parser = argparse.ArgumentParser(description="合成工具目录生成器")
+    parser.add_argument("--count", type=int, default=10000, help="工具数量")
+    parser.add_argument("--output", required=True, help="输出目录")
+    parser.add_argument("--seed", type=int, default=42, help="随机种子")
+    args = parser.parse_args()
+
+    generate_catalog(args.output, args.count, args.seed)
+    print(f"✅ 已生成 {args.count} 个工具描述文件: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+"""
+本地工具检索基准测试
+
+在合成工具目录（或已有目录）上测量LocalToolIndex的构建耗时和查询延迟（p50/p95），
+可选地对同一批查询调用向量服务 /search 接口作为对比（需要已建好的索引）。
+
+用法：
+    python benchmarks/local_tool_retrieval.py --count 10000
+    python benchmarks/local_tool_retrieval.py --catalog tools --show-results
+    python benchmarks/local_tool_retrieval.py --count 10000 --vector-url http://localhost:8080 --index tools_index
+"""
+
+import argparse
+import asyncio
+import contextlib
+import glob
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+# 添加项目根目录到 Python 路径
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from agent.nodes.node_tool_index import NodeToolIndex
+from agent.utils.local_tool_index import LocalToolIndex
+from agent.utils.tool_catalog_loader import ToolCatalogLoader
+from benchmarks.generate_tool_catalog import generate_catalog
+
+QUERIES = [
+    "查询天气",
+    "我需要一个能把语音识别成文字的服务",
+    "图像生成 API",
+    "解析PDF文档并导出报表",
+    "发送短信通知用户",
+    "向量检索 同步记录",
+    "download video subtitles",
+    "监控日志分析，发现异常事件后创建任务",
+]
+
+
+async def load_documents(catalog_dir: str):
+    """加载工具目录并构建与NodeToolIndex相同的索引文档"""
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        node = NodeToolIndex()
+    tool_files = sorted(glob.glob(os.path.join(catalog_dir, "**", "*.yml"), recursive=True))
+    loaded, _ = await ToolCatalogLoader().load(tool_files)
+    return [
+        node._build_document(dict(data, file_path=file_path, file_name=os.path.basename(file_path)))
+        for file_path, data in loaded
+        if isinstance(data, dict) and all(field in data for field in ("id", "type", "summary"))
+    ]
+
+
+def percentile(values, ratio: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(int(len(ordered) * ratio), len(ordered) - 1)]
+
+
+def measure_queries(search, repeat: int):
+    """对每个查询重复检索，返回全部延迟（毫秒）"""
+    latencies = []
+    for _ in range(repeat):
+        for query in QUERIES:
+            start_time = time.perf_counter()
+            search(query)
+            latencies.append((time.perf_counter() - start_time) * 1000)
+    return latencies
+
+
+def print_row(label: str, latencies) -> None:
+    print(f"{label:<16}{statistics.mean(latencies):>10.2f}{percentile(latencies, 0.5):>10.2f}"
+          f"{percentile(latencies, 0.95):>10.2f}{len(latencies):>10}")
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="本地工具检索基准测试")
+    parser.add_argument("--count", type=int, default=10000, help="合成工具数量")
+    parser.add_argument("--catalog", help="使用已有的工具目录（不生成合成目录）")
+    parser.add_argument("--repeat", type=int, default=20, help="每个查询的重复次数")
+    parser.add_argument("--top-k", type=int, default=10, help="每次检索返回的结果数量")
+    parser.add_argument("--vector-url", help="向量服务地址（提供时对比 /search 延迟）")
+    parser.add_argument("--index", default="tools_index", help="向量服务中的索引名")
+    parser.add_argument("--show-results", action="store_true", help="打印每个查询的前3个结果")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        catalog_dir = args.catalog
+        if not catalog_dir:
+            catalog_dir = os.path.join(tmp_dir, "tools")
+            generate_catalog(catalog_dir, args.count)
+        documents = await load_documents(catalog_dir)
+
+    index = LocalToolIndex()
+    index.build(documents)
+    stats = index.get_stats()
+
+    print("🧪 本地工具检索基准测试")
+    print(f"   文档数: {stats['documents']}, 词项数: {stats['terms']}, 构建耗时: {stats['build_ms']:.0f}ms")
+    print("=" * 56)
+    print(f"{'backend':<16}{'平均ms':>10}{'p50ms':>10}{'p95ms':>10}{'查询数':>10}")
+    print_row("local", measure_queries(lambda query: index.search(query, args.top_k), args.repeat))
+
+    if args.vector_url:
+        import requests
+
+        def remote_search(query):
+            response = requests.post(
+                f"{args.vector_url}/search",
+                json={"query": query, "vector_field": index.text_field, "index": args.index, "top_k": args.top_k},
+                timeout=30
+            )
+            response.raise_for_status()
+
+        print_row("vector_service", measure_queries(remote_search, args.repeat))
+
+    if args.show_results:
+        print()
+        for query in QUERIES:
+            results = index.search(query, 3)["results"]
+            print(f"🔍 {query}: " + ", ".join(f"{r['document']['id']}({r['score']:.2f})" for r in results))
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,110 @@
+"""
+近重复内容消除基准测试
+
+生成一次研究请求的页面：--mirror-rate 比例的关键词抓到的是其他关键词页面的镜像/转载
+（加了站点导航和版权声明，个别标点不同），--shared-rate 比例的页面带有相同的模板段落。
+每个页面依次经过 LLMAnalysisNode.prep_async（与研究子流程相同的共享变量），比较：
+1. no_dedup：不使用去重器，所有页面都交给LLM分析
+2. dedup：研究请求内共享 ContentDeduplicator
+
+指标：LLM调用次数、交给LLM的页面token数（按LLMAnalysisNode实际读取的字符窗口估算）、
+去重后聚合的关键点条数、去重耗时。
+
+用法：
+    python benchmarks/near_duplicate_savings.py --keywords 20
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import sys
+import time
+
+# 添加项目根目录到 Python 路径
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+WORDS = ("FastAPI 依赖 注入 异步 路由 认证 OAuth2 JWT 中间件 配置 数据库 连接池 缓存 Redis 过期 淘汰 并发 性能 "
+         "测试 部署 容器 日志 监控 指标 请求 响应 序列化 校验 模型 接口 文档 版本 队列 重试 限流 超时").split()
+BOILERPLATE = "本站内容仅供学习参考，转载请注明出处。关注我们的公众号获取更多技术文章、视频教程和开源项目推荐，欢迎留言交流。"
+
+
+def build_pages(keywords, mirror_rate: float, shared_rate: float, seed: int):
+    """为每个关键词生成页面内容和LLM返回的关键点：[(关键词, 内容, 关键点)]"""
+    rng = random.Random(seed)
+
+    def paragraph():
+        return "".join(rng.choice(WORDS) + ("，" if rng.random() < 0.2 else "") for _ in range(50)) + "。"
+
+    pages = []
+    for keyword in keywords:
+        if pages and rng.random() < mirror_rate:
+            _, original, points = rng.choice(pages)
+            content = f"镜像站点导航 | 首页 | {keyword}\n\n" + original.replace("。", "！", 2) + "\n\n版权所有 © mirror"
+            points = [point + "。" for point in points]
+        else:
+            content = f"# {keyword}\n\n" + "\n\n".join(paragraph() for _ in range(rng.randint(6, 12)))
+            points = [f"{keyword} 的{rng.choice(WORDS)}{rng.choice(WORDS)}实践" for _ in range(3)]
+        if rng.random() < shared_rate:
+            content += "\n\n" + BOILERPLATE
+        pages.append((keyword, content, points))
+    return pages
+
+
+async def run(pages, deduplicator):
+    """按研究子流程的方式准备LLM分析，返回(LLM调用次数, 页面token数, 关键点条数, 去重耗时ms)"""
+    from agent.subflows.research.nodes.llm_analysis_node import LLMAnalysisNode
+    from agent.subflows.research.utils.content_dedup import estimate_tokens
+
+    node = LLMAnalysisNode()
+    calls = tokens = 0
+    results = []
+    elapsed = 0.0
+    for keyword, content, points in pages:
+        shared = {"url_content": content, "current_keyword": keyword, "content_deduplicator": deduplicator}
+        start_time = time.perf_counter()
+        prep_res = await node.prep_async(shared)
+        elapsed += time.perf_counter() - start_time
+        if prep_res.get("duplicate_of"):
+            continue
+        calls += 1
+        tokens += estimate_tokens(prep_res["url_content"][:node.max_analysis_chars])
+        results.append({"keyword": keyword, "key_points": points, "recommendations": []})
+
+    if deduplicator:
+        start_time = time.perf_counter()
+        results = deduplicator.dedupe_findings(results)
+        elapsed += time.perf_counter() - start_time
+    return calls, tokens, sum(len(result["key_points"]) for result in results), elapsed * 1000
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="近重复内容消除基准测试")
+    parser.add_argument("--keywords", type=int, default=20, help="关键词数量")
+    parser.add_argument("--mirror-rate", type=float, default=0.3, help="镜像/转载页面比例")
+    parser.add_argument("--shared-rate", type=float, default=0.5, help="带相同模板段落的页面比例")
+    parser.add_argument("--seed", type=int, default=7, help="随机种子")
+    args = parser.parse_args()
+
+    from agent.subflows.research.utils.content_dedup import ContentDeduplicator
+
+    keywords = [f"关键词{i}" for i in range(args.keywords)]
+    pages = build_pages(keywords, args.mirror_rate, args.shared_rate, args.seed)
+
+    deduplicator = ContentDeduplicator()
+    rows = [("no_dedup", *await run(pages, None)), ("dedup", *await run(pages, deduplicator))]
+
+    print("🧪 近重复内容消除基准测试")
+    print(f"   关键词: {args.keywords}, 镜像页面: {args.mirror_rate:.0%}, 模板段落: {args.shared_rate:.0%}")
+    print("=" * 60)
+    print(f"{'mode':<10}{'LLM调用':>10}{'页面tokens':>12}{'关键点':>10}{'去重耗时ms':>14}")
+    for label, calls, tokens, points, elapsed_ms in rows:
+        print(f"{label:<10}{calls:>10}{tokens:>12}{points:>10}{elapsed_ms:>14.1f}")
+
+    stats = deduplicator.get_stats()
+    print(f"\n📊 重复页面: {stats['duplicate_pages']}, 重复段落: {stats['paragraphs_removed']}, "
+          f"重复发现: {stats['findings_removed']}, 节省约 {stats['tokens_saved']} tokens")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
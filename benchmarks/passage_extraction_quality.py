@@ -0,0 +1,115 @@
+"""
+LLM分析输入的相关段落抽取基准测试
+
+固定语料（随机种子决定）：每个关键词一个约 --page-chars 字符的页面，开头是导航、目录和前言，
+正文由与关键词无关的章节和 --facts 个与关键词相关的章节组成，相关章节随机分布在页面各处，
+每个相关章节带一个唯一的事实标记（如 FACT-3-1）。对每个页面执行 LLMAnalysisNode.prep_async，比较：
+1. prefix：截取开头 analysis_max_chars 个字符（原来的做法）
+2. passages：按BM25在同样的字符预算内抽取相关片段
+
+指标（作为LLM分析质量的代理，LLM只能分析它读到的内容）：
+- 事实召回率：交给LLM的内容中包含的事实标记比例
+- 输入token数、相关token占比（相关章节的token / 输入token）
+- 抽取耗时
+
+用法：
+    python benchmarks/passage_extraction_quality.py --pages 50
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import re
+import sys
+import time
+
+# 添加项目根目录到 Python 路径
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+KEYWORDS = ["Redis 连接池", "FastAPI 认证", "Kafka 消费者组", "PostgreSQL 索引", "Celery 重试",
+            "Nginx 反向代理", "Docker 多阶段构建", "gRPC 流式调用", "Elasticsearch 分词", "JWT 刷新令牌"]
+NOISE_WORDS = ("项目 介绍 安装 下载 社区 版本 发布 许可 贡献 文档 教程 示例 作者 更新 日志 订阅 评论 分享 "
+               "相关 推荐 阅读 热门 标签 分类 归档 联系 关于 隐私 条款 广告 赞助 合作 招聘 活动").split()
+FOCUS_AREAS = ["技术选型", "性能优化", "最佳实践"]
+
+
+def build_page(rng, index: int, keyword: str, page_chars: int, facts: int):
+    """生成一个页面，返回(内容, 事实标记列表, 相关章节列表)"""
+    def noise(length: int) -> str:
+        text = ""
+        while len(text) < length:
+            text += "".join(rng.choice(NOISE_WORDS) for _ in range(12)) + "。"
+        return text
+
+    header = (f"首页 | 文档 | 博客 | 社区 | 登录\n\n# {keyword} 完全指南\n\n目录\n\n"
+              + "\n".join(f"- 第{i}章 {rng.choice(NOISE_WORDS)}{rng.choice(NOISE_WORDS)}" for i in range(12))
+              + "\n\n## 前言\n\n" + noise(600))
+
+    sections = [f"## {rng.choice(NOISE_WORDS)}{rng.choice(NOISE_WORDS)}\n\n{noise(rng.randint(300, 700))}"
+                for _ in range(16)]
+    markers = [f"FACT-{index}-{i}" for i in range(facts)]
+    relevant = [
+        f"## {keyword} {rng.choice(FOCUS_AREAS)}\n\n{keyword} 的关键配置（{marker}）："
+        f"建议把 {keyword} 的超时时间设置为 {rng.randint(1, 30)} 秒，并在高并发场景下监控 {keyword} 的指标。"
+        for marker in markers
+    ]
+    # 相关章节放在前言之后的随机位置
+    for section in relevant:
+        sections.insert(rng.randint(0, len(sections)), section)
+
+    content = header + "\n\n" + "\n\n".join(sections)
+    return content[:page_chars], markers, relevant
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="LLM分析输入的相关段落抽取基准测试")
+    parser.add_argument("--pages", type=int, default=50, help="页面数量")
+    parser.add_argument("--page-chars", type=int, default=10000, help="页面长度（与NodeURL的最大内容长度一致）")
+    parser.add_argument("--facts", type=int, default=3, help="每个页面的相关章节数量")
+    parser.add_argument("--seed", type=int, default=7, help="随机种子")
+    args = parser.parse_args()
+
+    from agent.subflows.research.nodes.llm_analysis_node import LLMAnalysisNode
+    from agent.subflows.research.utils.content_dedup import estimate_tokens
+
+    rng = random.Random(args.seed)
+    corpus = [build_page(rng, i, KEYWORDS[i % len(KEYWORDS)], args.page_chars, args.facts) for i in range(args.pages)]
+
+    rows = []
+    for label, passage_chars in (("prefix", 0), ("passages", None)):
+        node = LLMAnalysisNode()
+        if passage_chars is not None:
+            node.passage_chars = passage_chars
+        recalled = total_facts = tokens = relevant_tokens = 0
+        elapsed = 0.0
+        for index, (content, markers, relevant) in enumerate(corpus):
+            shared = {"url_content": content, "current_keyword": KEYWORDS[index % len(KEYWORDS)],
+                      "focus_areas": FOCUS_AREAS}
+            start_time = time.perf_counter()
+            prep_res = await node.prep_async(shared)
+            elapsed += time.perf_counter() - start_time
+
+            # LLM实际读取的内容（与 _analyze_content_with_llm_async 一致）
+            analysis_input = prep_res["url_content"][:node.max_analysis_chars]
+            recalled += sum(marker in analysis_input for marker in markers)
+            total_facts += len(markers)
+            tokens += estimate_tokens(analysis_input)
+            for section in relevant:
+                body = section.split("\n\n", 1)[1]
+                if body in analysis_input:
+                    relevant_tokens += estimate_tokens(section)
+        rows.append((label, recalled / total_facts, tokens / len(corpus), relevant_tokens / tokens,
+                     elapsed * 1000 / len(corpus)))
+
+    print("🧪 LLM分析输入的相关段落抽取基准测试")
+    print(f"   页面: {args.pages}, 页面长度: {args.page_chars}, 每页相关章节: {args.facts}, "
+          f"字符预算: {LLMAnalysisNode().max_analysis_chars}")
+    print("=" * 62)
+    print(f"{'mode':<10}{'事实召回':>10}{'平均输入tokens':>16}{'相关占比':>10}{'抽取ms/页':>12}")
+    for label, recall, avg_tokens, density, elapsed_ms in rows:
+        print(f"{label:<10}{recall:>10.0%}{avg_tokens:>16.0f}{density:>10.0%}{elapsed_ms:>12.2f}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,128 @@
+"""
+关键词研究有界并发基准测试
+
+用模拟的关键词研究子流程（搜索 → URL解析 → 大模型分析，各阶段固定延迟）模拟多个研究请求同时到达，对比：
+1. unbounded：旧版做法，每个请求对所有关键词直接 asyncio.gather
+2. bounded：ResearchExecutor，单请求和进程级并发上限，不提前完成
+3. bounded_early：ResearchExecutor，高质量结果数量达到要求后提前完成
+
+指标：外部服务（Jina、大模型）的最大同时请求数、大模型调用次数、每个请求的平均/最慢完成时间。
+模拟子流程中每隔 --low-quality-every 个关键词产生一个低质量结果（没有关键点）。
+
+用法：
+    python benchmarks/research_concurrency.py --requests 4 --keywords 10
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+# 添加项目根目录到 Python 路径
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from agent.subflows.research.utils.research_executor import ResearchExecutor
+
+
+class FakeProviders:
+    """记录各外部服务同时进行中的请求数"""
+
+    def __init__(self, search_latency: float, fetch_latency: float, llm_latency: float):
+        self.latency = {"jina": search_latency + fetch_latency, "llm": llm_latency}
+        self.active = {"jina": 0, "llm": 0}
+        self.peak = {"jina": 0, "llm": 0}
+        self.calls = {"jina": 0, "llm": 0}
+
+    async def call(self, provider: str):
+        self.active[provider] += 1
+        self.calls[provider] += 1
+        self.peak[provider] = max(self.peak[provider], self.active[provider])
+        try:
+            await asyncio.sleep(self.latency[provider])
+        finally:
+            self.active[provider] -= 1
+
+
+def make_subflow(providers: FakeProviders, keyword: str, low_quality: bool):
+    """模拟一个关键词研究子流程，返回ResultAssemblyNode格式的研究结果"""
+
+    async def run():
+        await providers.call("jina")
+        await providers.call("llm")
+        return {
+            "keyword": keyword,
+            "summary": f"{keyword} 的技术调研摘要",
+            "key_points": [] if low_quality else ["要点1", "要点2", "要点3"],
+            "recommendations": [],
+            "source": {"url": f"https://example.com/{keyword}", "title": keyword}
+        }
+
+    return run
+
+
+async def run_request(mode: str, executor: ResearchExecutor, providers: FakeProviders,
+                      request_id: int, keywords: int, low_quality_every: int) -> float:
+    start_time = time.perf_counter()
+    tasks = [
+        (f"r{request_id}-k{i}", make_subflow(providers, f"r{request_id}-k{i}",
+                                            low_quality_every > 0 and i % low_quality_every == 0))
+        for i in range(keywords)
+    ]
+    if mode == "unbounded":
+        await asyncio.gather(*(factory() for _, factory in tasks), return_exceptions=True)
+    else:
+        await executor.run(tasks)
+    return time.perf_counter() - start_time
+
+
+async def run_mode(mode: str, args) -> dict:
+    providers = FakeProviders(args.search_latency, args.fetch_latency, args.llm_latency)
+    executor = ResearchExecutor(
+        max_concurrency_per_request=args.per_request,
+        max_global_concurrency=args.global_limit,
+        time_budget=0,
+        early_stop_results=args.early_stop if mode == "bounded_early" else 0
+    )
+    durations = await asyncio.gather(*(
+        run_request(mode, executor, providers, r, args.keywords, args.low_quality_every)
+        for r in range(args.requests)
+    ))
+    return {
+        "avg_s": sum(durations) / len(durations),
+        "max_s": max(durations),
+        "peak_jina": providers.peak["jina"],
+        "peak_llm": providers.peak["llm"],
+        "llm_calls": providers.calls["llm"],
+        "skipped": executor.stats["subflows_skipped"]
+    }
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="关键词研究有界并发基准测试")
+    parser.add_argument("--requests", type=int, default=4, help="同时到达的研究请求数")
+    parser.add_argument("--keywords", type=int, default=10, help="每个请求的关键词数量")
+    parser.add_argument("--per-request", type=int, default=3, help="单请求并发上限")
+    parser.add_argument("--global-limit", type=int, default=6, help="进程级并发上限")
+    parser.add_argument("--early-stop", type=int, default=5, help="提前完成所需的高质量结果数")
+    parser.add_argument("--low-quality-every", type=int, default=4, help="每隔多少个关键词产生一个低质量结果")
+    parser.add_argument("--search-latency", type=float, default=0.1, help="模拟搜索延迟（秒）")
+    parser.add_argument("--fetch-latency", type=float, default=0.2, help="模拟URL解析延迟（秒）")
+    parser.add_argument("--llm-latency", type=float, default=0.5, help="模拟大模型分析延迟（秒）")
+    args = parser.parse_args()
+
+    rows = {mode: await run_mode(mode, args) for mode in ("unbounded", "bounded", "bounded_early")}
+
+    print("🧪 关键词研究有界并发基准测试")
+    print(f"   请求数: {args.requests}, 每请求关键词: {args.keywords}, "
+          f"并发上限: 单请求 {args.per_request} / 进程 {args.global_limit}, 提前完成: {args.early_stop} 个高质量结果")
+    print("=" * 78)
+    print(f"{'mode':<15}{'平均完成s':>10}{'最慢完成s':>10}{'Jina峰值并发':>14}{'大模型峰值并发':>14}"
+          f"{'大模型调用':>10}{'跳过':>6}")
+    for mode, row in rows.items():
+        print(f"{mode:<15}{row['avg_s']:>10.2f}{row['max_s']:>10.2f}{row['peak_jina']:>14}"
+              f"{row['peak_llm']:>14}{row['llm_calls']:>10}{row['skipped']:>6}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,115 @@
+"""
+技术调研流程端到端离线基准测试
+
+启动本地假Jina服务（benchmarks/fake_jina.py），通过 JINA_SEARCH_BASE_URL / JINA_WEB_BASE_URL / LLM_BASE_URL
+让真实的 ResearchFlow（ConcurrentResearchNode → NodeSearch → NodeURL → LLMAnalysisNode → ResultAssemblyNode）
+使用本地搜索、Reader和模拟大模型，不需要外网和任何密钥，在任意离线Linux机器上可复现。
+搜索、Reader、大模型的延迟分布和故障比例可配置，同一随机种子下每次运行看到相同的语料、延迟和故障序列。
+
+指标：
+- 总耗时、首个研究结果到达时间（research_result 事件）
+- 每个关键词的状态（成功 / 失败 / 跳过）
+- 上游请求数（搜索、Reader、304、大模型）和故障数、去重节省的token
+
+关闭Web缓存，每次运行都请求上游。
+
+用法：
+    python benchmarks/research_e2e_offline.py --keywords 6 --runs 3
+    python benchmarks/research_e2e_offline.py --read-latency lognormal:0.8:1.0 --read-failure-rate 0.2
+"""
+
+import argparse
+import asyncio
+import contextlib
+import os
+import sys
+import time
+
+# 添加项目根目录到 Python 路径
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.fake_jina import FakeJinaService
+from benchmarks.research_streaming import RecordingHandler, percentile
+
+KEYWORDS = ["FastAPI 认证", "Redis 连接池", "Kafka 消费者组", "PostgreSQL 索引", "Celery 重试",
+            "Nginx 反向代理", "Docker 多阶段构建", "gRPC 流式调用", "Elasticsearch 分词", "JWT 刷新令牌"]
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="技术调研流程端到端离线基准测试")
+    parser.add_argument("--keywords", type=int, default=6, help="关键词数量（最多10个）")
+    parser.add_argument("--runs", type=int, default=3, help="运行次数")
+    parser.add_argument("--search-latency", default="uniform:0.3:0.8", help="搜索延迟分布")
+    parser.add_argument("--read-latency", default="lognormal:0.6:0.8", help="Reader延迟分布")
+    parser.add_argument("--llm-latency", default="uniform:0.8:2.0", help="模拟大模型延迟分布")
+    parser.add_argument("--search-failure-rate", type=float, default=0.05, help="搜索故障比例")
+    parser.add_argument("--read-failure-rate", type=float, default=0.1, help="Reader故障比例")
+    parser.add_argument("--hang-rate", type=float, default=0.0, help="不响应比例")
+    parser.add_argument("--port", type=int, default=18781, help="假Jina服务端口")
+    parser.add_argument("--seed", type=int, default=7, help="随机种子")
+    args = parser.parse_args()
+
+    service = FakeJinaService(
+        search_latency=args.search_latency, read_latency=args.read_latency, llm_latency=args.llm_latency,
+        search_failure_rate=args.search_failure_rate, read_failure_rate=args.read_failure_rate,
+        hang_rate=args.hang_rate, seed=args.seed
+    ).start(args.port)
+
+    # 在导入调研模块（创建客户端）之前指向本地服务
+    os.environ.update(service.env())
+    os.environ.setdefault("JINA_API_KEY", "benchmark-unused")
+    os.environ.setdefault("LLM_API_KEY", "benchmark-unused")
+    os.environ["WEB_CACHE_ENABLED"] = "false"
+
+    from agent.streaming import StreamingSession
+    from agent.subflows.research.flows.research_flow import create_research_flow
+    from agent.utils.http_session import close_http_sessions
+
+    keywords = KEYWORDS[:args.keywords]
+    totals, firsts = [], []
+    statuses = {keyword: [] for keyword in keywords}
+    tokens_saved = 0
+    for _ in range(args.runs):
+        start_time = time.perf_counter()
+        session = StreamingSession("benchmark")
+        handler = RecordingHandler(start_time)
+        session.add_handler(handler)
+        shared = {
+            "research_keywords": keywords,
+            "focus_areas": ["技术选型", "最佳实践"],
+            "project_context": "离线基准测试",
+            "streaming_session": session
+        }
+        with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+            await create_research_flow().run_async(shared)
+
+        totals.append(time.perf_counter() - start_time)
+        firsts.append(handler.arrivals[0] if handler.arrivals else totals[-1])
+        findings = shared.get("research_findings", {})
+        tokens_saved += findings.get("dedup_stats", {}).get("tokens_saved", 0)
+        for item in findings.get("keyword_results", []):
+            status = "skipped" if item.get("skipped") else ("ok" if item["success"] else "failed")
+            statuses[item["keyword"]].append(status)
+    await close_http_sessions()
+
+    counters = service.counters
+    print("🧪 技术调研流程端到端离线基准测试")
+    print(f"   关键词: {len(keywords)}, 运行: {args.runs} 次, 搜索: {args.search_latency} "
+          f"(故障 {args.search_failure_rate:.0%}), Reader: {args.read_latency} (故障 {args.read_failure_rate:.0%}), "
+          f"大模型: {args.llm_latency}")
+    print("=" * 56)
+    print(f"{'指标':<20}{'p50 s':>12}{'最大 s':>12}")
+    print(f"{'总耗时':<20}{percentile(totals, 0.5):>12.2f}{max(totals):>12.2f}")
+    print(f"{'首个研究结果':<20}{percentile(firsts, 0.5):>12.2f}{max(firsts):>12.2f}")
+    print()
+    print(f"{'关键词':<24}{'成功':>6}{'失败':>6}{'跳过':>6}")
+    for keyword, values in statuses.items():
+        print(f"{keyword:<24}{values.count('ok'):>6}{values.count('failed'):>6}{values.count('skipped'):>6}")
+
+    print(f"\n📊 上游请求: 搜索 {counters['search']}, Reader {counters['read']}, 304 {counters['not_modified']}, "
+          f"大模型 {counters['llm']}, 故障 {counters['failed']}, 不响应 {counters['hung']}, "
+          f"去重节省 {tokens_saved} tokens")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
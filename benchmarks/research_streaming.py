@@ -0,0 +1,127 @@
+"""
+技术调研结果流式返回基准测试
+
+用模拟的关键词研究子流程（耗时为长尾分布：大部分关键词 --fast 秒左右，--slow-rate 比例的关键词 --slow 秒左右）
+执行 ResearchFlow 的 ConcurrentResearchNode，通过记录事件的流式会话比较客户端看到结果的时间：
+1. batch：原来的方式，所有关键词完成并聚合后才返回（即节点执行结束的时间）
+2. streaming：每个关键词完成时发送的 research_result 事件
+
+指标：首个结果到达时间、一半关键词结果到达时间、全部结果到达时间。
+
+用法：
+    python benchmarks/research_streaming.py --keywords 8 --runs 5
+"""
+
+import argparse
+import asyncio
+import contextlib
+import os
+import random
+import sys
+import time
+
+# 添加项目根目录到 Python 路径
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from agent.streaming import StreamHandler, StreamingSession, StreamEventType
+
+
+class RecordingHandler(StreamHandler):
+    """记录研究结果事件到达时间的处理器"""
+
+    def __init__(self, start_time: float):
+        self.start_time = start_time
+        self.arrivals = []
+
+    async def handle_event(self, event) -> None:
+        if event.event_type == StreamEventType.RESEARCH_RESULT:
+            self.arrivals.append(time.perf_counter() - self.start_time)
+
+    async def handle_error(self, error, session_id=None) -> None:
+        pass
+
+    async def close(self) -> None:
+        pass
+
+
+class FakeKeywordSubflow:
+    """模拟关键词研究子流程：等待一段时间后写入研究结果"""
+
+    def __init__(self, latency: float):
+        self.latency = latency
+
+    async def run_async(self, shared):
+        await asyncio.sleep(self.latency)
+        keyword = shared["current_keyword"]
+        shared["research_findings"] = {
+            "keyword": keyword,
+            "summary": f"{keyword} 的调研摘要",
+            "key_points": [f"{keyword} 要点{i}" for i in range(3)],
+            "recommendations": [f"{keyword} 建议"],
+            "source": {"url": f"https://example.com/{keyword}", "title": keyword}
+        }
+
+
+def percentile(values, q: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(int(len(ordered) * q), len(ordered) - 1)]
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="技术调研结果流式返回基准测试")
+    parser.add_argument("--keywords", type=int, default=8, help="关键词数量")
+    parser.add_argument("--runs", type=int, default=5, help="运行次数")
+    parser.add_argument("--fast", type=float, default=1.0, help="普通关键词的耗时（秒）")
+    parser.add_argument("--slow", type=float, default=4.0, help="慢关键词的耗时（秒）")
+    parser.add_argument("--slow-rate", type=float, default=0.25, help="慢关键词比例")
+    parser.add_argument("--seed", type=int, default=7, help="随机种子")
+    args = parser.parse_args()
+
+    from agent.subflows.research.flows import research_flow
+    from agent.subflows.research.utils.research_executor import research_executor
+
+    # 比较完整执行的时间线，关闭提前完成
+    research_executor.early_stop_results = 0
+    rng = random.Random(args.seed)
+
+    rows = {"batch": [], "streaming_first": [], "streaming_half": [], "streaming_all": []}
+    for _ in range(args.runs):
+        latencies = [
+            rng.uniform(args.slow * 0.8, args.slow * 1.2) if rng.random() < args.slow_rate
+            else rng.uniform(args.fast * 0.5, args.fast * 1.5)
+            for _ in range(args.keywords)
+        ]
+        subflows = iter(FakeKeywordSubflow(latency) for latency in latencies)
+        research_flow.create_keyword_research_subflow = lambda: next(subflows)
+
+        start_time = time.perf_counter()
+        session = StreamingSession("benchmark")
+        handler = RecordingHandler(start_time)
+        session.add_handler(handler)
+        shared = {
+            "research_keywords": [f"关键词{i}" for i in range(args.keywords)],
+            "focus_areas": ["技术选型"],
+            "project_context": "",
+            "streaming_session": session
+        }
+        with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+            await research_flow.ConcurrentResearchNode().run_async(shared)
+
+        rows["batch"].append(time.perf_counter() - start_time)
+        rows["streaming_first"].append(handler.arrivals[0])
+        rows["streaming_half"].append(handler.arrivals[len(handler.arrivals) // 2 - 1])
+        rows["streaming_all"].append(handler.arrivals[-1])
+
+    print("🧪 技术调研结果流式返回基准测试")
+    print(f"   关键词: {args.keywords}, 运行: {args.runs} 次, 普通关键词: ~{args.fast}s, "
+          f"慢关键词: ~{args.slow}s ({args.slow_rate:.0%}), 单请求并发: {research_executor.max_concurrency_per_request}")
+    print("=" * 56)
+    print(f"{'客户端看到':<20}{'p50 s':>12}{'最大 s':>12}")
+    labels = {"batch": "batch 首个结果", "streaming_first": "streaming 首个结果",
+              "streaming_half": "streaming 一半结果", "streaming_all": "streaming 全部结果"}
+    for key, values in rows.items():
+        print(f"{labels[key]:<20}{percentile(values, 0.5):>12.2f}{max(values):>12.2f}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
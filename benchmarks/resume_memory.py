@@ -0,0 +1,89 @@
+"""
+长会话恢复内存基准测试
+
+构造一个包含大量消息的会话，用tracemalloc测量不同读取方式的峰值内存和耗时：
+1. get_messages：一次性读取全部消息
+2. iter_messages：游标分页流式遍历
+3. get_tail_messages：按token预算读取尾部消息
+4. build_agent_context：完整恢复上下文
+5. build_agent_context(token_budget)：只构建预算内的上下文
+
+用法：
+    python benchmarks/resume_memory.py --messages 10000 --token-budget 8000
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+# 添加项目根目录到 Python 路径
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from agent.persistence.sqlite_session_manager import SQLiteSessionManager
+
+
+def populate_session(manager: SQLiteSessionManager, total_messages: int,
+                     content_size: int, batch_size: int = 500) -> str:
+    """创建会话并批量写入消息（user/assistant交替）"""
+    session_id = manager.create_new_session("resume-bench")
+    for offset in range(0, total_messages, batch_size):
+        count = min(batch_size, total_messages - offset)
+        manager.add_messages([
+            manager._build_message(
+                "user" if (offset + i) % 2 == 0 else "assistant",
+                f"消息{offset + i} " + "x" * content_size
+            )
+            for i in range(count)
+        ], session_id=session_id)
+    return session_id
+
+
+def measure(label: str, func):
+    """测量函数执行的峰值内存和耗时"""
+    tracemalloc.start()
+    start_time = time.perf_counter()
+    result = func()
+    elapsed = time.perf_counter() - start_time
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    print(f"{label:<36}{peak / 1024 / 1024:>12.2f}{elapsed * 1000:>12.1f}{result:>10}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="长会话恢复内存基准测试")
+    parser.add_argument("--messages", type=int, default=10000, help="会话消息数量")
+    parser.add_argument("--content-size", type=int, default=400, help="每条消息内容长度")
+    parser.add_argument("--token-budget", type=int, default=8000, help="尾部读取的token预算")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        manager = SQLiteSessionManager(os.path.join(tmp_dir, "resume.db"))
+        session_id = populate_session(manager, args.messages, args.content_size)
+        dao = manager.dao
+
+        print("🧪 长会话恢复内存基准测试")
+        print(f"   消息数: {args.messages}, 内容长度: {args.content_size}, token预算: {args.token_budget}")
+        print("=" * 70)
+        print(f"{'方式':<36}{'峰值内存MB':>12}{'耗时ms':>12}{'消息数':>10}")
+
+        measure("get_messages（全部）",
+                lambda: len(dao.get_messages(session_id)))
+        measure("iter_messages（流式）",
+                lambda: sum(1 for _ in dao.iter_messages(session_id)))
+        measure("get_tail_messages（token预算）",
+                lambda: len(dao.get_tail_messages(session_id, args.token_budget)))
+        measure("build_agent_context（全部）",
+                lambda: len(manager.build_agent_context(session_id).dialogue_history))
+        measure("build_agent_context（token预算）",
+                lambda: len(manager.build_agent_context(
+                    session_id, token_budget=args.token_budget).dialogue_history))
+
+        manager._session_cache.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+"""
+滚动摘要压缩基准测试
+
+模拟一个500轮的会话，每轮对话后按阈值触发压缩，对比两种压缩模式每次触发的LLM输入token：
+1. full：每次将全部历史消息重新压缩
+2. rolling：只将上次检查点之后的新消息并入已有摘要
+
+LLM调用由本地假客户端代替（返回固定大小的结果），只统计输入规模，不产生网络请求。
+
+用法：
+    python benchmarks/rolling_summary.py --turns 500
+"""
+
+import argparse
+import asyncio
+import contextlib
+import json
+import os
+import statistics
+import sys
+import tempfile
+from types import SimpleNamespace
+
+# 添加项目根目录到 Python 路径
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from agent.persistence.sqlite_session_manager import SQLiteSessionManager
+from agent.persistence.smart_compressor import SmartCompressor, CompressionConfig
+
+
+class FakeLLMClient:
+    """返回固定大小压缩结果的假LLM客户端"""
+
+    async def chat_completion_stream(self, messages, system_prompt=None, **kwargs):
+        payload = {
+            "compressed_messages": [
+                {"role": "user", "content": "合并后的需求" * 20},
+                {"role": "assistant", "content": "合并后的方案" * 40}
+            ],
+            "summary": "对话摘要" * 100,
+            "key_decisions": ["决策"]
+        }
+        text = json.dumps(payload, ensure_ascii=False)
+        for start in range(0, len(text), 64):
+            delta = SimpleNamespace(content=text[start:start + 64])
+            yield SimpleNamespace(choices=[SimpleNamespace(delta=delta)], usage=None)
+
+
+async def run_mode(rolling: bool, turns: int) -> dict:
+    """运行单个压缩模式，返回每次触发的LLM输入token"""
+    # 屏蔽压缩过程中的逐条日志，只输出汇总表
+    with tempfile.TemporaryDirectory() as tmp_dir, open(os.devnull, "w") as devnull, \
+            contextlib.redirect_stdout(devnull):
+        manager = SQLiteSessionManager(os.path.join(tmp_dir, "rolling.db"))
+        compressor = SmartCompressor(manager, CompressionConfig(rolling_summary=rolling))
+        compressor.openai_client = FakeLLMClient()
+        session_id = manager.create_new_session("rolling-bench")
+
+        per_trigger = []
+        for turn in range(turns):
+            manager.add_messages([
+                manager._build_message("user", f"第{turn}轮需求：" + "用户描述需求细节" * 8),
+                manager._build_message("assistant", f"第{turn}轮回复：" + "助手给出设计方案" * 25)
+            ], session_id=session_id)
+
+            if compressor.should_compress(session_id):
+                before = compressor.stats["llm_input_tokens"]
+                await compressor._execute_compression(session_id)
+                per_trigger.append(compressor.stats["llm_input_tokens"] - before)
+
+        manager._session_cache.close()
+        return {
+            "mode": "rolling" if rolling else "full",
+            "triggers": len(per_trigger),
+            "first": per_trigger[0] if per_trigger else 0,
+            "median": statistics.median(per_trigger) if per_trigger else 0,
+            "last": per_trigger[-1] if per_trigger else 0,
+            "max": max(per_trigger) if per_trigger else 0,
+            "total": sum(per_trigger)
+        }
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="滚动摘要压缩基准测试")
+    parser.add_argument("--turns", type=int, default=500, help="对话轮数")
+    args = parser.parse_args()
+
+    results = [await run_mode(False, args.turns), await run_mode(True, args.turns)]
+
+    print("🧪 滚动摘要压缩基准测试")
+    print(f"   对话轮数: {args.turns}（每轮1条用户消息 + 1条助手消息）")
+    print("=" * 72)
+    print(f"{'mode':<10}{'触发次数':>10}{'首次输入':>10}{'中位输入':>10}{'末次输入':>10}{'最大输入':>10}{'总输入':>12}")
+    for result in results:
+        print(f"{result['mode']:<10}{result['triggers']:>10}{result['first']:>10}"
+              f"{result['median']:>10.0f}{result['last']:>10}{result['max']:>10}{result['total']:>12}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,117 @@
+"""
+NodeSearch 关键词并发搜索基准测试
+
+使用本地假Jina搜索服务（带固定延迟），对比两种关键词搜索方式的研究延迟和事件循环卡顿：
+1. legacy：旧版做法，关键词顺序搜索，每个关键词之后调用阻塞的 time.sleep(0.5)
+2. concurrent：NodeSearch.exec_async，关键词并发搜索，由全局限流器异步控制请求速率
+
+测试期间后台任务每10ms唤醒一次，记录实际唤醒时间与预期时间的最大偏差（事件循环卡顿）。
+同时运行 --users 个并发搜索，模拟多个用户的研究流程同时进行。
+
+用法：
+    python benchmarks/search_concurrency.py --keywords 5 --users 3
+"""
+
+import argparse
+import asyncio
+import contextlib
+import os
+import sys
+import time
+
+# 添加项目根目录到 Python 路径
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.jina_session_reuse import start_fake_jina_service
+
+
+async def measure_loop_lag(stop: asyncio.Event, interval: float = 0.01) -> float:
+    """周期性唤醒，返回最大唤醒延迟（毫秒）"""
+    max_lag = 0.0
+    while not stop.is_set():
+        expected = time.perf_counter() + interval
+        await asyncio.sleep(interval)
+        max_lag = max(max_lag, (time.perf_counter() - expected) * 1000)
+    return max_lag
+
+
+async def legacy_search(client, keywords, max_results):
+    """旧版NodeSearch的关键词循环（顺序搜索 + 阻塞sleep）"""
+    results = []
+    for keyword in keywords:
+        results.extend(await client.search_simple(keyword, count=max_results))
+        time.sleep(0.5)
+    return results
+
+
+async def concurrent_search(client, keywords, max_results):
+    """当前NodeSearch的执行阶段"""
+    from agent.nodes.node_search import NodeSearch
+
+    node = NodeSearch()
+    node.search_client = client
+    node.search_available = True
+    result = await node.exec_async({"search_keywords": keywords, "max_results": max_results})
+    return result["search_results"]
+
+
+async def run(mode_func, client, users: int, keywords, max_results: int):
+    """并发运行多个用户的搜索，返回平均研究延迟和最大事件循环卡顿"""
+    stop = asyncio.Event()
+    lag_task = asyncio.create_task(measure_loop_lag(stop))
+    await asyncio.sleep(0.05)
+
+    async def one_user(user):
+        start_time = time.perf_counter()
+        await mode_func(client, [f"用户{user} {keyword}" for keyword in keywords], max_results)
+        return (time.perf_counter() - start_time) * 1000
+
+    latencies = await asyncio.gather(*(one_user(user) for user in range(users)))
+    stop.set()
+    return sum(latencies) / len(latencies), max(latencies), await lag_task
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="NodeSearch 关键词并发搜索基准测试")
+    parser.add_argument("--keywords", type=int, default=5, help="每个用户的关键词数量")
+    parser.add_argument("--users", type=int, default=3, help="同时进行的用户搜索数量")
+    parser.add_argument("--latency", type=float, default=0.3, help="假搜索服务延迟（秒）")
+    parser.add_argument("--max-results", type=int, default=5, help="每个关键词的结果数量")
+    parser.add_argument("--port", type=int, default=18768, help="假服务端口")
+    args = parser.parse_args()
+
+    os.environ.setdefault("JINA_API_KEY", "benchmark-unused")
+    from agent.utils.search import JinaSearchClient
+    from agent.utils.rate_limiter import search_rate_limiter
+    from agent.utils.http_session import close_http_sessions
+
+    start_fake_jina_service(args.port, args.latency)
+    base_url = f"http://127.0.0.1:{args.port}/search"
+    # 旧实现没有限流器，只在关键词之间 time.sleep
+    legacy_client = JinaSearchClient(api_key="benchmark", base_url=base_url, use_cache=False, use_rate_limit=False)
+    client = JinaSearchClient(api_key="benchmark", base_url=base_url, use_cache=False)
+    keywords = [f"关键词{i}" for i in range(args.keywords)]
+
+    rows = {}
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        rows["legacy"] = await run(legacy_search, legacy_client, args.users, keywords, args.max_results)
+        rows["concurrent"] = await run(concurrent_search, client, args.users, keywords, args.max_results)
+
+    limiter = search_rate_limiter
+    print("🧪 NodeSearch 关键词并发搜索基准测试")
+    print(f"   用户数: {args.users}, 每用户关键词: {args.keywords}, 搜索延迟: {args.latency * 1000:.0f}ms, "
+          f"限流: {limiter.requests_per_second}/s, 突发 {limiter.burst}, 并发 {limiter.max_concurrency}")
+    print("=" * 60)
+    print(f"{'mode':<12}{'平均研究ms':>14}{'最慢研究ms':>14}{'事件循环最大卡顿ms':>20}")
+    for mode, (avg_ms, max_ms, lag_ms) in rows.items():
+        print(f"{mode:<12}{avg_ms:>14.0f}{max_ms:>14.0f}{lag_ms:>20.1f}")
+
+    stats = limiter.get_stats()
+    print(f"\n📊 限流器: 请求 {stats['acquired']}, 被限速 {stats['throttled']} 次, "
+          f"平均等待 {stats['avg_wait_ms']:.0f}ms")
+
+    await close_http_sessions()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
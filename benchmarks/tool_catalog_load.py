@@ -0,0 +1,110 @@
+"""
+工具目录加载基准测试
+
+生成合成工具目录（或使用已有目录），对比不同加载方式的耗时和对事件循环的阻塞：
+1. serial：旧版做法，在事件循环中逐个 yaml.safe_load
+2. loader_cold：ToolCatalogLoader首次加载（无解析缓存）
+3. loader_warm：重启后加载（新加载器实例，读取解析缓存文件）
+4. loader_one_changed：修改一个文件后加载
+
+事件循环阻塞通过1ms心跳协程测量（最大心跳延迟）。
+
+用法：
+    python benchmarks/tool_catalog_load.py --count 10000
+    python benchmarks/tool_catalog_load.py --catalog tools
+"""
+
+import argparse
+import asyncio
+import glob
+import os
+import sys
+import tempfile
+import time
+
+import yaml
+
+# 添加项目根目录到 Python 路径
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from agent.utils.tool_catalog_loader import ToolCatalogLoader
+from benchmarks.generate_tool_catalog import generate_catalog
+
+
+async def measure(label: str, coro_factory) -> None:
+    """执行加载并测量耗时和事件循环最大心跳延迟"""
+    max_lag = 0.0
+    running = True
+
+    async def heartbeat():
+        nonlocal max_lag
+        loop = asyncio.get_running_loop()
+        while running:
+            expected = loop.time() + 0.001
+            await asyncio.sleep(0.001)
+            max_lag = max(max_lag, loop.time() - expected)
+
+    heartbeat_task = asyncio.create_task(heartbeat())
+    await asyncio.sleep(0.01)
+
+    start_time = time.perf_counter()
+    loaded, detail = await coro_factory()
+    elapsed = time.perf_counter() - start_time
+
+    running = False
+    await heartbeat_task
+    print(f"{label:<22}{elapsed * 1000:>12.0f}{max_lag * 1000:>14.1f}{loaded:>10}  {detail}")
+
+
+async def load_serial(tool_files):
+    """旧版：在事件循环中逐个解析"""
+    count = 0
+    for file_path in tool_files:
+        with open(file_path, 'r', encoding='utf-8') as f:
+            if yaml.safe_load(f):
+                count += 1
+    return count, "yaml.safe_load"
+
+
+async def load_with_loader(loader: ToolCatalogLoader, tool_files):
+    loaded, _ = await loader.load(tool_files)
+    stats = loader.last_stats
+    return len(loaded), f"{stats['loader']}, 缓存命中 {stats['cache_hits']}, 解析 {stats['parsed']}"
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="工具目录加载基准测试")
+    parser.add_argument("--count", type=int, default=10000, help="合成工具数量")
+    parser.add_argument("--catalog", help="使用已有的工具目录（不生成合成目录）")
+    parser.add_argument("--workers", type=int, default=None, help="解析进程数（默认CPU核数）")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        catalog_dir = args.catalog
+        if not catalog_dir:
+            catalog_dir = os.path.join(tmp_dir, "tools")
+            generate_catalog(catalog_dir, args.count)
+
+        tool_files = sorted(glob.glob(os.path.join(catalog_dir, "**", "*.yml"), recursive=True))
+        cache_path = os.path.join(tmp_dir, "cache", "tool_parse_cache.json")
+
+        print("🧪 工具目录加载基准测试")
+        print(f"   工具文件: {len(tool_files)}, CPU核数: {os.cpu_count()}")
+        print("=" * 86)
+        print(f"{'mode':<22}{'耗时ms':>12}{'最大阻塞ms':>14}{'工具数':>10}  说明")
+
+        await measure("serial", lambda: load_serial(tool_files))
+        await measure("loader_cold", lambda: load_with_loader(
+            ToolCatalogLoader(cache_path, max_workers=args.workers), tool_files))
+        await measure("loader_warm", lambda: load_with_loader(
+            ToolCatalogLoader(cache_path, max_workers=args.workers), tool_files))
+
+        if not args.catalog:
+            with open(tool_files[0], 'a', encoding='utf-8') as f:
+                f.write("\n# changed\n")
+            await measure("loader_one_changed", lambda: load_with_loader(
+                ToolCatalogLoader(cache_path, max_workers=args.workers), tool_files))
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,143 @@
+"""
+工具推荐查询缓存基准测试
+
+使用假向量服务（带检索延迟）和假大模型（带筛选延迟），按偏斜分布重放一批重复的工具推荐查询，
+对比不使用缓存和使用ToolRecommendCache时的向量检索次数、大模型调用次数和平均延迟。
+重放到一半时向工具目录新增一个工具并重新同步索引，验证索引版本变化后缓存自动失效。
+
+用法：
+    python benchmarks/tool_recommend_cache.py --calls 200 --distinct 20
+"""
+
+import argparse
+import asyncio
+import contextlib
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+from types import SimpleNamespace
+
+# 添加项目根目录到 Python 路径
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.generate_tool_catalog import generate_catalog, build_tool
+from benchmarks.vector_client_stall import start_fake_vector_service
+
+
+class FakeLLMClient:
+    """固定延迟、总是选择前3个候选的假大模型"""
+
+    def __init__(self, latency: float):
+        self.latency = latency
+        self.calls = 0
+
+    async def chat_completion(self, messages, **kwargs):
+        self.calls += 1
+        await asyncio.sleep(self.latency)
+        selected = [{"index": i, "reason": "相关"} for i in range(3)]
+        content = json.dumps({"selected_tools": selected, "analysis": "ok"}, ensure_ascii=False)
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=content))])
+
+
+async def replay(queries, tools_dir: str, llm: FakeLLMClient, use_cache: bool) -> dict:
+    """按顺序重放查询，返回延迟和缓存统计"""
+    import yaml
+    from agent.nodes.node_tool_recommend import NodeToolRecommend
+    from agent.utils.tool_index_manager import ensure_tool_index, tool_index_manager
+    from agent.utils.tool_recommend_cache import tool_recommend_cache
+    from agent.utils.vector_service_client import get_vector_service_client
+
+    tool_index_manager.reset()
+    tool_recommend_cache.clear()
+    stats_before = tool_recommend_cache.get_stats()
+    client_stats = get_vector_service_client().stats
+    requests_before = client_stats["requests"]
+    llm.calls = 0
+    latencies = []
+
+    for i, query in enumerate(queries):
+        if i == len(queries) // 2:
+            # 新增工具后重新同步，索引版本变化
+            with open(os.path.join(tools_dir, "apis", "added_tool.yml"), "w", encoding="utf-8") as f:
+                yaml.safe_dump(build_tool(99999, random.Random(1)), f, allow_unicode=True)
+
+        index_name = await ensure_tool_index(tools_dir=tools_dir)
+        if not use_cache:
+            tool_recommend_cache.clear()
+
+        node = NodeToolRecommend()
+        node.openai_client = llm
+        start_time = time.perf_counter()
+        prep_res = await node.prep_async({"query": query, "top_k": 3, "index_name": index_name,
+                                         "use_llm_filter": True, "rerank_mode": "llm"})
+        await node.exec_async(prep_res)
+        latencies.append((time.perf_counter() - start_time) * 1000)
+
+    os.remove(os.path.join(tools_dir, "apis", "added_tool.yml"))
+    stats_after = tool_recommend_cache.get_stats()
+    hit_rates = {}
+    for stage in ("retrieval", "rerank"):
+        hits = stats_after[stage]["hits"] - stats_before[stage]["hits"]
+        misses = stats_after[stage]["misses"] - stats_before[stage]["misses"]
+        hit_rates[stage] = hits / (hits + misses) if hits + misses else 0.0
+
+    return {
+        "avg_ms": sum(latencies) / len(latencies),
+        "requests": client_stats["requests"] - requests_before,
+        "llm_calls": llm.calls,
+        "hit_rates": hit_rates,
+        "version_invalidations": stats_after["version_invalidations"] - stats_before["version_invalidations"]
+    }
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="工具推荐查询缓存基准测试")
+    parser.add_argument("--calls", type=int, default=200, help="推荐调用次数")
+    parser.add_argument("--distinct", type=int, default=20, help="不同查询的数量")
+    parser.add_argument("--search-latency", type=float, default=0.05, help="假向量服务检索延迟（秒）")
+    parser.add_argument("--llm-latency", type=float, default=0.8, help="假大模型筛选延迟（秒）")
+    parser.add_argument("--port", type=int, default=18766, help="假向量服务端口")
+    parser.add_argument("--seed", type=int, default=3, help="随机种子")
+    args = parser.parse_args()
+
+    os.environ["VECTOR_SERVICE_BASE_URL"] = f"http://127.0.0.1:{args.port}"
+    os.environ.setdefault("OPENAI_API_KEY", "benchmark-unused")
+    start_fake_vector_service(args.port, args.search_latency)
+
+    # 偏斜分布：少数查询占大部分调用
+    rng = random.Random(args.seed)
+    pool = [f"  查询工具 {i}，帮我找找 " if i % 2 else f"查询工具 {i}" for i in range(args.distinct)]
+    weights = [1 / (rank + 1) for rank in range(args.distinct)]
+    queries = rng.choices(pool, weights=weights, k=args.calls)
+
+    llm = FakeLLMClient(args.llm_latency)
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        os.environ["VECTOR_SERVICE_INDEX_MANIFEST"] = os.path.join(tmp_dir, "cache", "manifest.json")
+        tools_dir = os.path.join(tmp_dir, "tools")
+        generate_catalog(tools_dir, 50)
+
+        with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+            baseline = await replay(queries, tools_dir, llm, use_cache=False)
+            cached = await replay(queries, tools_dir, llm, use_cache=True)
+
+    from agent.utils.http_session import close_http_sessions
+    await close_http_sessions()
+
+    print("🧪 工具推荐查询缓存基准测试")
+    print(f"   调用次数: {args.calls}, 不同查询: {args.distinct}, "
+          f"检索延迟: {args.search_latency * 1000:.0f}ms, 大模型延迟: {args.llm_latency * 1000:.0f}ms")
+    print("=" * 60)
+    print(f"{'mode':<12}{'平均ms':>10}{'向量服务请求':>14}{'大模型调用':>12}")
+    for label, result in (("no_cache", baseline), ("cache", cached)):
+        print(f"{label:<12}{result['avg_ms']:>10.1f}{result['requests']:>14}{result['llm_calls']:>12}")
+
+    print(f"\n📊 检索命中率: {cached['hit_rates']['retrieval']:.1%}, "
+          f"重排命中率: {cached['hit_rates']['rerank']:.1%}, "
+          f"索引版本失效: {cached['version_invalidations']} 次")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
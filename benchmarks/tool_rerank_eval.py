@@ -0,0 +1,185 @@
+"""
+本地工具重排评估
+
+在固定评估集上比较工具推荐的重排方式（质量与延迟）：
+1. retrieval：直接使用检索排序
+2. local：ToolReranker本地重排并选择结果（不调用大模型）
+3. gate：本地排序可信时直接返回，否则交给大模型（默认不调用真实大模型，只统计需要调用的比例；
+   提供 --llm 时使用配置的大模型执行筛选）
+
+候选来自LocalToolIndex对 tools/ 目录加上合成干扰工具的检索结果。
+评估集中expected为空表示没有合适的工具（期望不推荐任何工具）。
+
+指标：
+- top1：第一个推荐是期望工具（无合适工具的查询要求不推荐）
+- hit@3：期望工具出现在前3个推荐中
+- empty_ok：无合适工具的查询中没有推荐工具的比例
+
+用法：
+    python benchmarks/tool_rerank_eval.py
+    python benchmarks/tool_rerank_eval.py --llm
+"""
+
+import argparse
+import asyncio
+import contextlib
+import glob
+import os
+import sys
+import tempfile
+import time
+
+# 添加项目根目录到 Python 路径
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from agent.utils.local_tool_index import LocalToolIndex
+from agent.utils.tool_catalog_loader import ToolCatalogLoader
+from agent.utils.tool_reranker import ToolReranker
+from benchmarks.generate_tool_catalog import generate_catalog
+
+# 固定评估集：(查询, 期望的工具id，None表示没有合适的工具)
+EVAL_SET = [
+    ("我想解析视频字幕", "pypi.yt-dlp"),
+    ("下载B站视频", "pypi.yt-dlp"),
+    ("批量下载YouTube播放列表", "pypi.yt-dlp"),
+    ("download videos from youtube", "pypi.yt-dlp"),
+    ("查询北京明天的天气", "public.weather-api"),
+    ("获取城市实时天气信息", "public.weather-api"),
+    ("weather forecast api", "public.weather-api"),
+    ("把文章朗读成音频", "public.tts-api"),
+    ("文本转语音", "public.tts-api"),
+    ("克隆我的音色合成语音", "public.tts-api"),
+    ("把会议录音转成文字", "sensevoice.asr-api"),
+    ("语音识别，还要识别说话人的情绪", "sensevoice.asr-api"),
+    ("speech to text transcription", "sensevoice.asr-api"),
+    ("根据文字描述生成图片", "openai-compatible.dalle-image-generation"),
+    ("AI画图生成海报", "openai-compatible.dalle-image-generation"),
+    ("generate an image from a prompt", "openai-compatible.dalle-image-generation"),
+    ("计算两段文本的语义相似度", "openai-compatible.embeddings"),
+    ("把文档转换成向量用于语义搜索", "openai-compatible.embeddings"),
+    ("text embeddings for retrieval", "openai-compatible.embeddings"),
+    ("调用大模型生成回答", "openai-compatible.chat-completions"),
+    ("做一个聊天机器人", "openai-compatible.chat-completions"),
+    ("chat completion with gpt", "openai-compatible.chat-completions"),
+    ("自动生成PPT演示文稿", "public.presenton-api"),
+    ("根据大纲做幻灯片", "public.presenton-api"),
+    ("股票实时行情", None),
+    ("帮我订一张机票", None),
+    ("区块链钱包转账", None),
+    ("写一个贪吃蛇游戏", None),
+]
+
+
+async def build_index(distractors: int) -> LocalToolIndex:
+    """用真实工具加合成干扰工具构建本地检索索引"""
+    from agent.nodes.node_tool_index import NodeToolIndex
+
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        node = NodeToolIndex()
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        generate_catalog(tmp_dir, distractors)
+        tool_files = sorted(glob.glob("tools/**/*.yml", recursive=True) +
+                            glob.glob(os.path.join(tmp_dir, "**", "*.yml"), recursive=True))
+        loaded, _ = await ToolCatalogLoader().load(tool_files)
+
+    index = LocalToolIndex()
+    index.build([node._build_document(dict(data, file_path=path)) for path, data in loaded])
+    return index
+
+
+def candidates_for(index: LocalToolIndex, query: str, count: int, min_score: float):
+    """与NodeToolRecommend相同的候选处理：检索、按阈值过滤、附加分数"""
+    tools = []
+    for result in index.search(query, count)["results"]:
+        if result["score"] >= min_score:
+            tools.append({**result["document"], "score": result["score"]})
+    return tools
+
+
+def evaluate(predictions, eval_set):
+    """计算top1、hit@3和无合适工具时的正确率"""
+    top1 = hit3 = empty_ok = empty_total = 0
+    for (_, expected), predicted in zip(eval_set, predictions):
+        ids = [tool["id"] for tool in predicted]
+        if expected is None:
+            empty_total += 1
+            empty_ok += not ids
+            top1 += not ids
+            hit3 += not ids
+        else:
+            top1 += bool(ids) and ids[0] == expected
+            hit3 += expected in ids[:3]
+    total = len(eval_set)
+    return top1 / total, hit3 / total, empty_ok / empty_total if empty_total else 0.0
+
+
+async def llm_select(query, candidates, top_k):
+    """使用配置的大模型执行NodeToolRecommend的筛选"""
+    from agent.nodes.node_tool_recommend import NodeToolRecommend
+
+    node = NodeToolRecommend()
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        return await node._llm_filter_tools(query, candidates, top_k, None, {})
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="本地工具重排评估")
+    parser.add_argument("--distractors", type=int, default=300, help="合成干扰工具数量")
+    parser.add_argument("--candidates", type=int, default=10, help="候选数量（llm_candidate_count）")
+    parser.add_argument("--top-k", type=int, default=3, help="推荐数量")
+    parser.add_argument("--min-score", type=float, default=0.1, help="检索分数阈值")
+    parser.add_argument("--llm", action="store_true", help="gate模式下调用配置的大模型")
+    args = parser.parse_args()
+
+    index = await build_index(args.distractors)
+    reranker = ToolReranker()
+    rows = {"retrieval": [], "local": [], "gate": []}
+    latency = {"retrieval": 0.0, "local": 0.0, "gate": 0.0}
+    llm_needed = 0
+    confident_correct = 0
+
+    for query, expected in EVAL_SET:
+        candidates = candidates_for(index, query, args.candidates, args.min_score)
+        rows["retrieval"].append(candidates[:args.top_k])
+
+        start_time = time.perf_counter()
+        result = reranker.rerank(query, candidates)
+        local_selected = reranker.select(result, args.top_k)
+        latency["local"] += (time.perf_counter() - start_time) * 1000
+        rows["local"].append(local_selected)
+
+        if result.confident:
+            confident_correct += bool(local_selected) and local_selected[0]["id"] == expected
+
+        if result.confident or len(candidates) <= 1:
+            rows["gate"].append(local_selected if len(candidates) > 1 else candidates[:args.top_k])
+            latency["gate"] += (time.perf_counter() - start_time) * 1000
+        else:
+            llm_needed += 1
+            if args.llm:
+                rows["gate"].append(await llm_select(query, result.tools, args.top_k))
+            else:
+                # 未调用大模型时按本地选择结果计算（即gate模式质量的下界参考）
+                rows["gate"].append(local_selected)
+            latency["gate"] += (time.perf_counter() - start_time) * 1000
+
+    print("🧪 本地工具重排评估")
+    print(f"   查询数: {len(EVAL_SET)}, 候选数: {args.candidates}, top_k: {args.top_k}, "
+          f"索引文档数: {len(index)}")
+    print("=" * 64)
+    print(f"{'mode':<12}{'top1':>8}{'hit@3':>8}{'empty_ok':>10}{'平均ms':>10}{'大模型调用':>12}")
+    for mode, predictions in rows.items():
+        top1, hit3, empty_ok = evaluate(predictions, EVAL_SET)
+        llm_calls = llm_needed if mode == "gate" else 0
+        print(f"{mode:<12}{top1:>8.1%}{hit3:>8.1%}{empty_ok:>10.1%}"
+              f"{latency[mode] / len(EVAL_SET):>10.2f}{llm_calls:>12}")
+
+    confident = reranker.stats["confident"]
+    print(f"\n📊 gate模式跳过大模型: {len(EVAL_SET) - llm_needed}/{len(EVAL_SET)}，"
+          f"其中本地排序可信的 {confident} 个查询top1正确 {confident_correct} 个"
+          + ("" if args.llm else "\n   （未提供 --llm，需要大模型的查询按本地选择结果计算，延迟不含大模型调用）"))
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
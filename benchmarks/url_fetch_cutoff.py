@@ -0,0 +1,154 @@
+"""
+NodeURL 多URL并发抓取基准测试
+
+本地假Jina Reader服务的页面延迟为长尾分布：大部分页面0.2~1秒，--slow-rate 比例的页面5~15秒；
+--useless-rate 比例的页面内容为空或与关键词无关。对每个关键词比较两种方式：
+1. first_only：旧版做法，只抓取第一个搜索结果（客户端30秒超时）
+2. top_n：NodeURL并发抓取前N个搜索结果，单URL时限 + 整体截止时间，达到评分要求时提前采用
+
+指标：URL阶段耗时（p50 / p95 / 最大）、得到有用页面（包含关键词且有正文）的比例。
+
+用法：
+    python benchmarks/url_fetch_cutoff.py --keywords 40
+"""
+
+import argparse
+import asyncio
+import contextlib
+import os
+import random
+import sys
+import threading
+import time
+
+from aiohttp import web
+
+# 添加项目根目录到 Python 路径
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def build_pages(keywords, per_keyword: int, slow_rate: float, useless_rate: float, seed: int):
+    """为每个关键词生成候选页面：{url: (延迟秒数, 内容)}"""
+    rng = random.Random(seed)
+    pages = {}
+    for keyword in keywords:
+        for rank in range(per_keyword):
+            url = f"https://site{rank}.example.com/{keyword}"
+            latency = rng.uniform(5, 15) if rng.random() < slow_rate else rng.uniform(0.2, 1.0)
+            if rng.random() < useless_rate:
+                content = rng.choice(["", "Access denied. Please enable JavaScript.\n" * 3])
+            else:
+                content = f"# {keyword} 实践指南\n\n" + f"{keyword} 的使用方法、配置和最佳实践。\n" * 60
+            pages[url] = (latency, content)
+    return pages
+
+
+def start_fake_reader(port: int, pages) -> None:
+    """在后台线程中运行按URL返回固定延迟和内容的假Reader服务"""
+    ready = threading.Event()
+
+    async def read(request):
+        url = request.match_info["url"]
+        latency, content = pages.get(url, (0.1, ""))
+        await asyncio.sleep(latency)
+        data = {"title": url.rsplit("/", 1)[-1], "description": "", "url": url, "content": content}
+        return web.json_response({"code": 200, "status": 20000, "data": data})
+
+    def run():
+        loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(loop)
+        app = web.Application()
+        app.router.add_get("/read/{url:.*}", read)
+        runner = web.AppRunner(app)
+        loop.run_until_complete(runner.setup())
+        loop.run_until_complete(web.TCPSite(runner, "127.0.0.1", port).start())
+        ready.set()
+        loop.run_forever()
+
+    threading.Thread(target=run, daemon=True).start()
+    ready.wait(10)
+
+
+async def run_keyword(node, keyword, per_keyword: int, max_urls: int):
+    """对一个关键词执行NodeURL，返回(耗时秒数, 是否得到有用页面)"""
+    search_results = [{"url": f"https://site{rank}.example.com/{keyword}", "title": keyword}
+                      for rank in range(per_keyword)]
+    shared = {"current_keyword": keyword, "all_search_results": search_results,
+              "first_search_result": search_results[0], "max_urls": max_urls}
+    start_time = time.perf_counter()
+    try:
+        prep_res = await node.prep_async(shared)
+        exec_res = await node.exec_async(prep_res)
+        useful = keyword in exec_res["content"] and len(exec_res["content"]) > 200
+    except Exception:
+        useful = False
+    return time.perf_counter() - start_time, useful
+
+
+def percentile(values, q: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(int(len(ordered) * q), len(ordered) - 1)]
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="NodeURL 多URL并发抓取基准测试")
+    parser.add_argument("--keywords", type=int, default=40, help="关键词数量")
+    parser.add_argument("--top-n", type=int, default=3, help="并发抓取的搜索结果数量")
+    parser.add_argument("--slow-rate", type=float, default=0.2, help="慢页面比例")
+    parser.add_argument("--useless-rate", type=float, default=0.2, help="无用页面比例")
+    parser.add_argument("--concurrency", type=int, default=6, help="同时处理的关键词数量（默认与研究执行器的进程级并发上限一致）")
+    parser.add_argument("--port", type=int, default=18770, help="假服务端口")
+    parser.add_argument("--seed", type=int, default=7, help="随机种子")
+    args = parser.parse_args()
+
+    os.environ.setdefault("JINA_API_KEY", "benchmark-unused")
+    from agent.nodes.node_url import NodeURL
+    from agent.utils.URL_to_Markdown import JinaWebClient
+    from agent.utils.http_session import close_http_sessions
+
+    keywords = [f"关键词{i}" for i in range(args.keywords)]
+    pages = build_pages(keywords, max(args.top_n, 1), args.slow_rate, args.useless_rate, args.seed)
+    start_fake_reader(args.port, pages)
+
+    def make_node(legacy: bool):
+        node = NodeURL()
+        node.web_client = JinaWebClient(api_key="benchmark", base_url=f"http://127.0.0.1:{args.port}/read",
+                                        use_cache=False)
+        node.client_available = True
+        if legacy:
+            # 旧版：只有客户端30秒超时
+            node.url_timeout = node.url_deadline = 30
+        return node
+
+    rows = {}
+    semaphore = asyncio.Semaphore(args.concurrency)
+
+    async def run_mode(label: str, legacy: bool, max_urls: int):
+        node = make_node(legacy)
+
+        async def one(keyword):
+            async with semaphore:
+                return await run_keyword(node, keyword, args.top_n, max_urls)
+
+        with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+            results = await asyncio.gather(*(one(keyword) for keyword in keywords))
+        rows[label] = ([elapsed for elapsed, _ in results], sum(useful for _, useful in results))
+
+    await run_mode("first_only", True, 1)
+    await run_mode("top_n", False, args.top_n)
+
+    node = make_node(False)
+    print("🧪 NodeURL 多URL并发抓取基准测试")
+    print(f"   关键词: {args.keywords}, top_n: {args.top_n}, 慢页面: {args.slow_rate:.0%}, "
+          f"无用页面: {args.useless_rate:.0%}, 单URL时限: {node.url_timeout}s, 截止时间: {node.url_deadline}s")
+    print("=" * 62)
+    print(f"{'mode':<12}{'p50 s':>10}{'p95 s':>10}{'最大 s':>10}{'有用页面':>12}")
+    for label, (latencies, useful) in rows.items():
+        print(f"{label:<12}{percentile(latencies, 0.5):>10.2f}{percentile(latencies, 0.95):>10.2f}"
+              f"{max(latencies):>10.2f}{useful / len(latencies):>12.0%}")
+
+    await close_http_sessions()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
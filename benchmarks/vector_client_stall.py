@@ -0,0 +1,159 @@
+"""
+向量服务客户端事件循环阻塞基准测试
+
+在后台线程中启动一个带固定延迟的假向量服务，并发执行多次工具推荐检索，对比：
+1. requests：旧版做法，每次创建节点都同步探测 /health，再同步调用 /search
+2. async_client：NodeToolRecommend + 共享的VectorServiceClient（连接复用、健康状态缓存）
+
+事件循环阻塞通过1ms心跳协程测量（最大心跳延迟和累计阻塞时间）。
+
+用法：
+    python benchmarks/vector_client_stall.py --concurrency 50 --latency 0.05
+"""
+
+import argparse
+import asyncio
+import contextlib
+import os
+import sys
+import threading
+import time
+
+import requests
+from aiohttp import web
+
+# 添加项目根目录到 Python 路径
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+DOCUMENTS = [
+    {"id": f"tool-{i}", "type": "APIS", "summary": f"测试工具 {i}", "description": "", "category": "api"}
+    for i in range(10)
+]
+
+
+def start_fake_vector_service(port: int, latency: float) -> None:
+    """在后台线程中运行假向量服务"""
+
+    async def health(request):
+        return web.json_response({"status": "ok"})
+
+    async def search(request):
+        payload = await request.json()
+        await asyncio.sleep(latency)
+        results = [{"document": doc, "score": 0.9 - i * 0.05} for i, doc in enumerate(DOCUMENTS[:payload["top_k"]])]
+        return web.json_response({"results": results, "total": len(results)})
+
+    async def index_documents(request):
+        payload = await request.json()
+        return web.json_response({"count": len(payload["documents"]), "index": payload.get("index", "auto_index")})
+
+    async def clear_index(request):
+        return web.json_response({"status": "ok"})
+
+    def run():
+        loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(loop)
+        app = web.Application()
+        app.router.add_get("/health", health)
+        app.router.add_post("/search", search)
+        app.router.add_post("/documents", index_documents)
+        app.router.add_delete("/index/{index}/clear", clear_index)
+        app.router.add_delete("/index/{index}/documents", clear_index)
+        runner = web.AppRunner(app)
+        loop.run_until_complete(runner.setup())
+        loop.run_until_complete(web.TCPSite(runner, "127.0.0.1", port).start())
+        loop.run_forever()
+
+    threading.Thread(target=run, daemon=True).start()
+    for _ in range(100):
+        try:
+            requests.get(f"http://127.0.0.1:{port}/health", timeout=1)
+            return
+        except requests.exceptions.RequestException:
+            time.sleep(0.05)
+    raise RuntimeError("假向量服务启动失败")
+
+
+async def legacy_recommend(base_url: str, query: str) -> int:
+    """旧版：构造节点时同步健康检查 + 同步检索"""
+    requests.get(f"{base_url}/health", timeout=5)
+    response = requests.post(
+        f"{base_url}/search",
+        json={"query": query, "vector_field": "combined_text", "index": "tools_index", "top_k": 5},
+        timeout=30
+    )
+    return len(response.json()["results"])
+
+
+async def client_recommend(query: str) -> int:
+    """新版：NodeToolRecommend使用共享异步客户端"""
+    from agent.nodes.node_tool_recommend import NodeToolRecommend
+
+    node = NodeToolRecommend()
+    prep_res = await node.prep_async({"query": query, "top_k": 5, "use_llm_filter": False})
+    exec_res = await node.exec_async(prep_res)
+    return exec_res["total_found"]
+
+
+async def measure(label: str, concurrency: int, make_call) -> str:
+    """并发执行检索，返回耗时和事件循环阻塞的结果行（执行期间屏蔽节点日志）"""
+    max_lag = 0.0
+    total_lag = 0.0
+    running = True
+
+    async def heartbeat():
+        nonlocal max_lag, total_lag
+        loop = asyncio.get_running_loop()
+        while running:
+            expected = loop.time() + 0.001
+            await asyncio.sleep(0.001)
+            lag = max(loop.time() - expected, 0.0)
+            max_lag = max(max_lag, lag)
+            total_lag += lag
+
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        heartbeat_task = asyncio.create_task(heartbeat())
+        await asyncio.sleep(0.01)
+
+        start_time = time.perf_counter()
+        results = await asyncio.gather(*(make_call(f"查询{i}") for i in range(concurrency)))
+        elapsed = time.perf_counter() - start_time
+
+        running = False
+        await heartbeat_task
+
+    return f"{label:<14}{elapsed * 1000:>10.0f}{max_lag * 1000:>14.1f}{total_lag * 1000:>14.1f}{sum(results):>10}"
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="向量服务客户端事件循环阻塞基准测试")
+    parser.add_argument("--concurrency", type=int, default=50, help="并发检索数量")
+    parser.add_argument("--latency", type=float, default=0.05, help="假向量服务的检索延迟（秒）")
+    parser.add_argument("--port", type=int, default=18765, help="假向量服务端口")
+    args = parser.parse_args()
+
+    base_url = f"http://127.0.0.1:{args.port}"
+    os.environ["VECTOR_SERVICE_BASE_URL"] = base_url
+    # 检索时关闭大模型筛选，只需满足OpenAIClient初始化
+    os.environ.setdefault("OPENAI_API_KEY", "benchmark-unused")
+    start_fake_vector_service(args.port, args.latency)
+
+    print("🧪 向量服务客户端事件循环阻塞基准测试")
+    print(f"   并发数: {args.concurrency}, 服务延迟: {args.latency * 1000:.0f}ms")
+    print("=" * 62)
+    print(f"{'mode':<14}{'耗时ms':>10}{'最大阻塞ms':>14}{'累计阻塞ms':>14}{'结果数':>10}")
+
+    # 预热：建立连接池并缓存健康状态
+    await measure("warmup", 1, client_recommend)
+
+    print(await measure("requests", args.concurrency, lambda query: legacy_recommend(base_url, query)))
+    print(await measure("async_client", args.concurrency, client_recommend))
+
+    from agent.utils.http_session import close_http_sessions
+    from agent.utils.vector_service_client import get_vector_service_client
+    print(f"\n📊 客户端统计: {get_vector_service_client().get_stats()}")
+    await close_http_sessions()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
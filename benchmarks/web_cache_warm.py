@@ -0,0 +1,125 @@
+"""
+网页磁盘缓存基准测试
+
+用本地假Jina服务（搜索和Reader带固定延迟）和固定延迟的模拟大模型分析，
+对一批关键词执行与关键词研究子流程相同的步骤：搜索 → 抓取第一个结果的Markdown → 大模型分析。
+依次运行：
+1. no_cache：不使用缓存
+2. cold：空缓存（写入缓存）
+3. warm：缓存未过期（模拟新会话重复研究相同关键词）
+4. revalidate：Reader缓存已过期，带 If-None-Match 重新验证，上游返回304
+5. prewarm：清空缓存后先调用 prewarm_web_cache 预热，再执行研究
+
+指标：每个关键词的平均研究耗时（与纯大模型耗时对比）和上游请求数。
+
+用法：
+    python benchmarks/web_cache_warm.py --keywords 10
+"""
+
+import argparse
+import asyncio
+import contextlib
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+# 添加项目根目录到 Python 路径
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.fake_jina import start_fake_jina_service
+
+
+async def research(search_client, web_client, keywords, llm_latency: float) -> float:
+    """顺序研究每个关键词，返回平均耗时（毫秒）"""
+    total = 0.0
+    for keyword in keywords:
+        start_time = time.perf_counter()
+        results = await search_client.search_simple(keyword, count=5)
+        await web_client.get_page_info(results[0]["url"])
+        await asyncio.sleep(llm_latency)  # 模拟LLM分析
+        total += (time.perf_counter() - start_time) * 1000
+    return total / len(keywords)
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="网页磁盘缓存基准测试")
+    parser.add_argument("--keywords", type=int, default=10, help="关键词数量")
+    parser.add_argument("--search-latency", type=float, default=0.6, help="假搜索服务延迟（秒）")
+    parser.add_argument("--read-latency", type=float, default=1.0, help="假Reader服务延迟（秒）")
+    parser.add_argument("--llm-latency", type=float, default=0.8, help="模拟大模型分析延迟（秒）")
+    parser.add_argument("--port", type=int, default=18769, help="假服务端口")
+    args = parser.parse_args()
+
+    os.environ.setdefault("JINA_API_KEY", "benchmark-unused")
+    tmp_dir = tempfile.mkdtemp()
+    os.environ["WEB_CACHE_PATH"] = os.path.join(tmp_dir, "web_cache.db")
+
+    from agent.utils.search import JinaSearchClient
+    from agent.utils.URL_to_Markdown import JinaWebClient
+    from agent.utils.web_cache import web_cache, prewarm_web_cache
+    from agent.utils.http_session import close_http_sessions
+
+    counters = start_fake_jina_service(args.port, args.search_latency, args.read_latency)
+    base_url = f"http://127.0.0.1:{args.port}"
+    keywords = [f"关键词{i}" for i in range(args.keywords)]
+
+    def clients(use_cache: bool):
+        return (JinaSearchClient(api_key="benchmark", base_url=f"{base_url}/search", use_cache=use_cache),
+                JinaWebClient(api_key="benchmark", base_url=f"{base_url}/read", use_cache=use_cache))
+
+    rows = []
+
+    async def run(label: str, use_cache: bool):
+        before = dict(counters)
+        avg_ms = await research(*clients(use_cache), keywords, args.llm_latency)
+        upstream = {key: counters[key] - before[key] for key in counters}
+        rows.append((label, avg_ms, upstream))
+
+    await run("no_cache", False)
+    await run("cold", True)
+    await run("warm", True)
+
+    # Reader缓存立即过期，下一次访问需要带ETag重新验证
+    await asyncio.to_thread(expire_namespace, web_cache, "reader")
+    await run("revalidate", True)
+
+    # 预热：清空缓存后并发预热关键词和URL（搜索参数与研究时一致才能命中）
+    web_cache.clear()
+    search_client, web_client = clients(True)
+    urls = [f"https://example.com/{keyword}/0" for keyword in keywords]
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        start_time = time.perf_counter()
+        await prewarm_web_cache(keywords, urls, count=5, search_client=search_client, web_client=web_client)
+        prewarm_s = time.perf_counter() - start_time
+    await run("prewarm", True)
+
+    print("🧪 网页磁盘缓存基准测试")
+    print(f"   关键词: {args.keywords}, 搜索延迟: {args.search_latency * 1000:.0f}ms, "
+          f"Reader延迟: {args.read_latency * 1000:.0f}ms, 大模型延迟: {args.llm_latency * 1000:.0f}ms")
+    print("=" * 64)
+    print(f"{'mode':<12}{'平均研究ms':>12}{'纯大模型ms':>12}{'搜索请求':>10}{'Reader请求':>12}{'304':>6}")
+    for label, avg_ms, upstream in rows:
+        print(f"{label:<12}{avg_ms:>12.0f}{args.llm_latency * 1000:>12.0f}{upstream['search']:>10}"
+              f"{upstream['read']:>12}{upstream['not_modified']:>6}")
+
+    stats = web_cache.get_stats()
+    print(f"\n📊 预热耗时: {prewarm_s:.2f}s, 缓存命中率: {stats['hit_rate']:.1%}, "
+          f"重新验证: {stats['revalidated']} 次, 缓存大小: {stats['total_bytes']} 字节")
+
+    web_cache.close()
+    await close_http_sessions()
+    shutil.rmtree(tmp_dir, ignore_errors=True)
+
+
+def expire_namespace(cache, namespace: str) -> None:
+    """把命名空间内条目的过期时间改为过去（保留ETag用于重新验证）"""
+    with cache._lock:
+        conn = cache._connect()
+        conn.execute("UPDATE web_cache SET expires_at = 0 WHERE namespace = ?", (namespace,))
+        conn.commit()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,180 @@
+"""
+会话数据库写放大基准测试
+
+对比三种消息写入方式在每条消息上产生的写入量：
+1. legacy：旧版触发器（updated_at自我触发 + 逐行计数）+ 逐条写入
+2. per_message：新版架构，逐条调用 DatabaseDAO.add_message
+3. batch：新版架构，按批调用 DatabaseDAO.add_messages
+
+统计指标：
+- sessions行写入次数/消息（通过临时触发器计数，包含触发器内部产生的写入）
+- 页写入次数/消息（关闭自动检查点后统计WAL帧数，每个WAL帧即一次页写入）
+- 提交次数/消息
+
+用法：
+    python benchmarks/write_amplification.py --messages 2000 --batch-size 20
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+import uuid
+from collections import Counter
+from contextlib import contextmanager
+
+# 添加项目根目录到 Python 路径
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from agent.persistence.database_dao import DatabaseDAO
+
+
+# 旧版（schema v1）的会话触发器
+LEGACY_TRIGGERS_SQL = [
+    """
+    CREATE TRIGGER IF NOT EXISTS sessions_update_timestamp
+    AFTER UPDATE ON sessions
+    FOR EACH ROW
+    BEGIN
+        UPDATE sessions SET updated_at = CURRENT_TIMESTAMP WHERE session_id = NEW.session_id;
+    END;
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS sessions_message_count_insert
+    AFTER INSERT ON messages
+    FOR EACH ROW
+    BEGIN
+        UPDATE sessions
+        SET total_messages = total_messages + 1,
+            updated_at = CURRENT_TIMESTAMP
+        WHERE session_id = NEW.session_id;
+    END;
+    """
+]
+
+
+class InstrumentedDAO(DatabaseDAO):
+    """统计行写入和提交次数的DAO（关闭自动检查点，保留全部WAL帧用于统计页写入）"""
+
+    def __init__(self, db_path: str):
+        self.row_writes = Counter()
+        self.commits = 0
+        super().__init__(db_path)
+
+    @contextmanager
+    def get_connection(self):
+        with super().get_connection() as conn:
+            conn.execute("PRAGMA wal_autocheckpoint = 0;")
+            conn.create_function("count_write", 1, self._count_write)
+            for table in ("sessions", "messages"):
+                for action in ("INSERT", "UPDATE"):
+                    conn.execute(f"""
+                        CREATE TEMP TRIGGER IF NOT EXISTS count_{table}_{action.lower()}
+                        AFTER {action} ON main.{table}
+                        BEGIN SELECT count_write('{table}'); END
+                    """)
+            changes_before = conn.total_changes
+            yield conn
+            if conn.total_changes != changes_before:
+                self.commits += 1
+
+    def _count_write(self, table: str) -> int:
+        self.row_writes[table] += 1
+        return 0
+
+    def reset_counters(self):
+        """重置计数并截断WAL"""
+        with super().get_connection() as conn:
+            conn.execute("PRAGMA wal_checkpoint(TRUNCATE);").fetchone()
+        self.row_writes.clear()
+        self.commits = 0
+
+    def wal_frames(self) -> int:
+        """当前WAL中的帧数（自上次截断以来的页写入次数）"""
+        with super().get_connection() as conn:
+            return conn.execute("PRAGMA wal_checkpoint(PASSIVE);").fetchone()[1]
+
+
+def legacy_add_message(dao: DatabaseDAO, session_id: str, content: str, token_count: int):
+    """旧版add_message：插入消息后单独更新token计数（计数和时间戳依赖触发器）"""
+    with dao.transaction() as conn:
+        conn.execute("""
+            INSERT INTO messages (message_id, session_id, role, content, token_count)
+            VALUES (?, ?, ?, ?, ?)
+        """, (str(uuid.uuid4()), session_id, "user", content, token_count))
+        conn.execute("""
+            UPDATE sessions SET total_tokens = total_tokens + ? WHERE session_id = ?
+        """, (token_count, session_id))
+
+
+def run_mode(mode: str, total_messages: int, batch_size: int, content: str) -> dict:
+    """运行单个写入模式并返回统计结果"""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        dao = InstrumentedDAO(os.path.join(tmp_dir, f"{mode}.db"))
+        session_id = dao.create_session(f"bench-{mode}")
+
+        if mode == "legacy":
+            with dao.transaction() as conn:
+                for sql in LEGACY_TRIGGERS_SQL:
+                    conn.execute(sql)
+
+        dao.reset_counters()
+        start_time = time.perf_counter()
+
+        if mode == "legacy":
+            for _ in range(total_messages):
+                legacy_add_message(dao, session_id, content, 10)
+        elif mode == "per_message":
+            for _ in range(total_messages):
+                dao.add_message(session_id, "user", content, token_count=10)
+        else:
+            for offset in range(0, total_messages, batch_size):
+                count = min(batch_size, total_messages - offset)
+                dao.add_messages(session_id, [
+                    {"role": "user", "content": content, "token_count": 10}
+                    for _ in range(count)
+                ])
+
+        elapsed = time.perf_counter() - start_time
+        frames = dao.wal_frames()
+        session = dao.get_session(session_id)
+
+        return {
+            "mode": mode,
+            "session_writes_per_msg": dao.row_writes["sessions"] / total_messages,
+            "page_writes_per_msg": frames / total_messages,
+            "commits_per_msg": dao.commits / total_messages,
+            "msgs_per_sec": total_messages / elapsed if elapsed else float("inf"),
+            "total_messages_ok": session["total_messages"] == total_messages,
+            "total_tokens_ok": session["total_tokens"] == total_messages * 10
+        }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="会话数据库写放大基准测试")
+    parser.add_argument("--messages", type=int, default=2000, help="写入的消息总数")
+    parser.add_argument("--batch-size", type=int, default=20, help="batch模式每批消息数")
+    parser.add_argument("--content-size", type=int, default=200, help="每条消息内容长度")
+    args = parser.parse_args()
+
+    content = "x" * args.content_size
+
+    print("🧪 会话数据库写放大基准测试")
+    print(f"   消息数: {args.messages}, 批大小: {args.batch_size}, 内容长度: {args.content_size}")
+    print("=" * 78)
+    print(f"{'mode':<12}{'sessions写/消息':>16}{'页写入/消息':>14}{'提交/消息':>12}{'消息/秒':>12}{'计数正确':>10}")
+
+    for mode in ("legacy", "per_message", "batch"):
+        result = run_mode(mode, args.messages, args.batch_size, content)
+        counters_ok = result["total_messages_ok"] and result["total_tokens_ok"]
+        print(f"{result['mode']:<12}"
+              f"{result['session_writes_per_msg']:>16.2f}"
+              f"{result['page_writes_per_msg']:>14.2f}"
+              f"{result['commits_per_msg']:>12.2f}"
+              f"{result['msgs_per_sec']:>12.0f}"
+              f"{'✅' if counters_ok else '❌':>10}")
+
+
+if __name__ == "__main__":
+    main()
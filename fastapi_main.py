@@ -17,6 +17,8 @@ from agent.api.agent_api import SSEGTPlanner
 
 # 导入索引管理器
 from agent.utils.startup_init import initialize_application
+from agent.utils.http_session import close_http_sessions
+from agent.persistence.sqlite_session_manager import SQLiteSessionManager
 
 # 配置日志
 logging.basicConfig(level=logging.INFO)
@@ -31,7 +33,7 @@ app = FastAPI(
 # 应用启动事件 - 预加载工具索引
 @app.on_event("startup")
 async def startup_event():
-    """应用启动时预加载工具索引"""
+    """应用启动时预加载工具索引并启动数据库维护"""
     logger.info("🚀 GTPlanner API 启动中...")
 
     try:
@@ -55,6 +57,23 @@ async def startup_event():
         logger.error(f"❌ 启动时初始化失败: {str(e)}")
         # 不阻止应用启动，但记录错误
 
+    # 启动会话数据库的后台维护（WAL检查点、增量VACUUM、保留策略），与CLI共用默认会话数据库
+    try:
+        app.state.database_maintenance = SQLiteSessionManager().maintenance
+        await app.state.database_maintenance.start()
+    except Exception as e:
+        logger.error(f"❌ 数据库维护服务启动失败: {str(e)}")
+
+# 应用关闭事件 - 停止数据库维护并关闭共享HTTP会话
+@app.on_event("shutdown")
+async def shutdown_event():
+    """应用关闭时停止数据库维护并释放共享HTTP连接池"""
+    database_maintenance = getattr(app.state, "database_maintenance", None)
+    if database_maintenance:
+        await database_maintenance.stop()
+    await close_http_sessions()
+    logger.info("👋 已关闭共享HTTP会话")
+
 # CORS 配置
 app.add_middleware(
     CORSMiddleware,
@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+会话数据库管理命令行工具
+
+管理CLI和API共用的会话数据库（agent.persistence）的存储空间和保留策略。
+
+使用方式：
+python manage_database.py [command] [options]
+
+命令：
+- stats: 查看存储统计（是否需要转换为增量VACUUM模式）
+- maintain: 按配置的保留策略立即执行一次维护
+- enable-incremental-vacuum: 将旧数据库转换为INCREMENTAL自动清理模式（完整VACUUM，会锁库，请在空闲时执行）
+"""
+
+import sys
+import argparse
+from pathlib import Path
+
+# 添加项目根目录到Python路径
+project_root = Path(__file__).parent
+sys.path.insert(0, str(project_root))
+
+from agent.persistence.sqlite_session_manager import SQLiteSessionManager
+
+
+def cmd_stats(manager: SQLiteSessionManager):
+    """查看存储统计"""
+    stats = manager.dao.get_storage_statistics()
+    maintenance = manager.maintenance
+    print("📊 会话数据库存储状态:")
+    print(f"  数据库文件: {manager.dao.db_path}")
+    print(f"  文件大小: {stats['db_file_bytes'] / 1024 / 1024:.2f} MB（WAL {stats['wal_file_bytes'] / 1024 / 1024:.2f} MB）")
+    print(f"  有效数据: {stats['used_bytes'] / 1024 / 1024:.2f} MB，空闲页: {stats['freelist_count']}")
+    print(f"  增量VACUUM: {'✅ 已启用' if stats['auto_vacuum'] == 2 else '❌ 未启用'}")
+    print(f"  后台维护: {'✅ 已启用' if maintenance.policy.enabled else '❌ 未启用'}")
+    print(f"  上次维护: {manager.dao.get_metadata('last_cleanup_at') or '从未'}")
+    if maintenance.incremental_vacuum_required():
+        print("💡 空闲空间无法回收，请在空闲时运行: python manage_database.py enable-incremental-vacuum")
+
+
+def cmd_maintain(manager: SQLiteSessionManager):
+    """按配置的保留策略执行一次维护"""
+    report = manager.maintenance.run_once()
+    print(f"🧹 维护完成: 归档 {report.sessions_archived} 个会话，清理 {report.sessions_purged} 个会话，"
+          f"清理 {report.compressed_contexts_pruned} 个压缩上下文版本，回收 {report.bytes_reclaimed} 字节")
+    for error in report.errors:
+        print(f"⚠️ {error}")
+    if report.incremental_vacuum_required:
+        print("💡 数据库未启用增量VACUUM，请运行: python manage_database.py enable-incremental-vacuum")
+    return not report.errors
+
+
+def cmd_enable_incremental_vacuum(manager: SQLiteSessionManager):
+    """转换为INCREMENTAL自动清理模式"""
+    stats = manager.dao.get_storage_statistics()
+    if stats["auto_vacuum"] == 2:
+        print("✅ 数据库已启用增量VACUUM，无需转换")
+        return True
+
+    print(f"🔧 正在转换数据库（完整VACUUM，{stats['db_file_bytes'] / 1024 / 1024:.2f} MB），期间数据库被锁定...")
+    if not manager.maintenance.enable_incremental_vacuum():
+        print("❌ 转换失败，数据库仍未启用增量VACUUM")
+        return False
+
+    after = manager.dao.get_storage_statistics()
+    print(f"✅ 已启用增量VACUUM，文件大小: {after['db_file_bytes'] / 1024 / 1024:.2f} MB")
+    return True
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="会话数据库管理命令行工具",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+示例用法:
+  python manage_database.py stats
+  python manage_database.py maintain
+  python manage_database.py enable-incremental-vacuum --db gtplanner_conversations.db
+        """
+    )
+
+    parser.add_argument(
+        "command",
+        choices=["stats", "maintain", "enable-incremental-vacuum"],
+        help="要执行的命令"
+    )
+    parser.add_argument("--db", default="gtplanner_conversations.db", help="数据库文件路径 (默认: gtplanner_conversations.db)")
+
+    args = parser.parse_args()
+
+    try:
+        manager = SQLiteSessionManager(args.db)
+        if args.command == "stats":
+            cmd_stats(manager)
+        elif args.command == "maintain":
+            sys.exit(0 if cmd_maintain(manager) else 1)
+        elif args.command == "enable-incremental-vacuum":
+            sys.exit(0 if cmd_enable_incremental_vacuum(manager) else 1)
+    except KeyboardInterrupt:
+        print("\n⚠️ 操作被用户中断")
+        sys.exit(1)
+    except Exception as e:
+        print(f"❌ 命令执行失败: {str(e)}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
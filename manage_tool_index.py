@@ -57,6 +57,15 @@ async def cmd_status():
         print(f"  最后创建时间: {info.get('last_index_time', 'N/A')}")
         print(f"  工具目录: {info.get('tools_dir', 'N/A')}")
 
+        last_sync = info.get('last_sync')
+        if last_sync:
+            print(f"  最后同步: {last_sync['mode']}，新增 {last_sync['added']}，更新 {last_sync['updated']}，"
+                  f"删除 {last_sync['removed']}，未变化 {last_sync['unchanged']}，"
+                  f"向量服务写入 {last_sync['vector_writes']} 次")
+
+        if info.get('index_version'):
+            print(f"  索引版本: {info['index_version']}")
+
         if info.get('last_tools_dir_mtime'):
             import datetime
             mtime = datetime.datetime.fromtimestamp(info['last_tools_dir_mtime'])
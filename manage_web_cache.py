@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+网页缓存管理命令行工具
+
+管理Jina搜索结果和页面Markdown的磁盘缓存（agent.utils.web_cache）。
+
+使用方式：
+python manage_web_cache.py [command] [options]
+
+命令：
+- stats: 查看缓存统计
+- prewarm: 预热缓存（搜索关键词、抓取URL）
+- purge: 删除已过期的条目
+- clear: 清空缓存
+"""
+
+import sys
+import asyncio
+import argparse
+from pathlib import Path
+
+# 添加项目根目录到Python路径
+project_root = Path(__file__).parent
+sys.path.insert(0, str(project_root))
+
+from agent.utils.web_cache import web_cache, prewarm_web_cache
+from agent.utils.http_session import close_http_sessions
+
+
+def cmd_stats():
+    """查看缓存统计"""
+    stats = web_cache.get_stats()
+    print("📊 网页缓存状态:")
+    print(f"  启用: {'✅' if stats['enabled'] else '❌'}")
+    print(f"  缓存文件: {stats['db_path']}")
+    if not stats["enabled"]:
+        return
+
+    print(f"  大小: {stats['total_bytes'] / 1024 / 1024:.2f} MB / {stats['max_bytes'] / 1024 / 1024:.0f} MB")
+    for namespace, info in stats["namespaces"].items():
+        print(f"  {namespace}: {info['entries']} 条（未过期 {info['fresh']} 条），{info['bytes'] / 1024:.1f} KB")
+
+
+def read_lines(path: str) -> list:
+    """读取文件中的非空行"""
+    with open(path, "r", encoding="utf-8") as f:
+        return [line.strip() for line in f if line.strip()]
+
+
+async def cmd_prewarm(queries: list, urls: list, count: int, concurrency: int) -> bool:
+    """预热缓存"""
+    if not queries and not urls:
+        print("❌ 请通过 --query/--queries-file 或 --url/--urls-file 指定要预热的内容")
+        return False
+
+    print(f"🔥 预热网页缓存: {len(queries)} 个关键词，{len(urls)} 个URL...")
+    try:
+        summary = await prewarm_web_cache(queries, urls, count=count, concurrency=concurrency)
+    finally:
+        await close_http_sessions()
+
+    print(f"✅ 关键词: 成功 {summary['queries']['ok']}，失败 {summary['queries']['failed']}")
+    print(f"✅ URL: 成功 {summary['urls']['ok']}，失败 {summary['urls']['failed']}")
+    return summary["queries"]["failed"] + summary["urls"]["failed"] == 0
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="网页缓存管理命令行工具",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+示例用法:
+  python manage_web_cache.py stats
+  python manage_web_cache.py prewarm --query "FastAPI 认证" --url https://fastapi.tiangolo.com/
+  python manage_web_cache.py prewarm --queries-file keywords.txt
+  python manage_web_cache.py purge
+  python manage_web_cache.py clear --namespace reader
+        """
+    )
+
+    parser.add_argument(
+        "command",
+        choices=["stats", "prewarm", "purge", "clear"],
+        help="要执行的命令"
+    )
+    parser.add_argument("--query", action="append", default=[], help="预热的搜索关键词（可重复）")
+    parser.add_argument("--queries-file", help="预热的搜索关键词文件（每行一个）")
+    parser.add_argument("--url", action="append", default=[], help="预热的URL（可重复）")
+    parser.add_argument("--urls-file", help="预热的URL文件（每行一个）")
+    parser.add_argument("--count", type=int, default=10, help="每个关键词的搜索结果数量 (默认: 10，与NodeSearch一致)")
+    parser.add_argument("--concurrency", type=int, default=4, help="预热并发请求数 (默认: 4)")
+    parser.add_argument("--namespace", choices=["search", "reader"], help="只处理一个命名空间")
+
+    args = parser.parse_args()
+
+    try:
+        if args.command == "stats":
+            cmd_stats()
+        elif args.command == "prewarm":
+            queries = args.query + (read_lines(args.queries_file) if args.queries_file else [])
+            urls = args.url + (read_lines(args.urls_file) if args.urls_file else [])
+            success = asyncio.run(cmd_prewarm(queries, urls, args.count, args.concurrency))
+            sys.exit(0 if success else 1)
+        elif args.command == "purge":
+            print(f"🧹 已删除 {web_cache.purge_expired(args.namespace)} 条过期缓存")
+        elif args.command == "clear":
+            print(f"🗑️ 已清空 {web_cache.clear(args.namespace)} 条缓存")
+    except KeyboardInterrupt:
+        print("\n⚠️ 操作被用户中断")
+        sys.exit(1)
+    except Exception as e:
+        print(f"❌ 命令执行失败: {str(e)}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+"""
+近重复内容消除测试
+"""
+import os
+import sys
+
+# 添加项目根目录到 Python 路径
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from agent.persistence.sqlite_session_manager import SQLiteSessionManager
+from agent.subflows.research.utils.content_dedup import (
+    ContentDeduplicator, dedupe_texts, estimate_tokens, tokenize
+)
+from agent.utils import token_estimator
+
+RUSSIAN_REDIS = (
+    "Redis хранит данные в оперативной памяти и поддерживает репликацию между узлами кластера.\n\n"
+    "Пул соединений позволяет повторно использовать подключения и снижает задержку при высокой нагрузке."
+)
+RUSSIAN_KAFKA = (
+    "Kafka распределяет сообщения по разделам темы, а группы потребителей читают их параллельно.\n\n"
+    "Смещения фиксируются после обработки, поэтому при сбое потребитель продолжает с последней позиции."
+)
+ARABIC_PAGE = (
+    "تستخدم قواعد البيانات الفهارس لتسريع عمليات البحث وتقليل زمن الاستجابة للاستعلامات المعقدة.\n\n"
+    "يجب مراقبة حجم الفهرس لأن كثرة الفهارس تبطئ عمليات الكتابة والتحديث في الجداول الكبيرة."
+)
+THAI_PAGE = (
+    "การตั้งค่าพร็อกซีย้อนกลับช่วยกระจายโหลดไปยังเซิร์ฟเวอร์หลายเครื่องและเพิ่มความพร้อมใช้งานของระบบ\n\n"
+    "ควรตั้งค่าการหมดเวลาและการลองใหม่ให้เหมาะสมเพื่อป้องกันไม่ให้คำขอค้างเมื่อเซิร์ฟเวอร์ปลายทางไม่ตอบสนอง"
+)
+
+
+def test_different_non_latin_pages_are_all_kept():
+    """测试不同的俄文、阿拉伯文、泰文页面都被保留，不会因为切词为空被当成重复页面"""
+    deduplicator = ContentDeduplicator()
+    pages = [RUSSIAN_REDIS, RUSSIAN_KAFKA, ARABIC_PAGE, THAI_PAGE]
+
+    for page in pages:
+        filtered, duplicate_of = deduplicator.filter_page(page, source=page[:10])
+        assert duplicate_of is None
+        assert filtered == page
+
+    stats = deduplicator.get_stats()
+    assert stats["duplicate_pages"] == 0
+    assert stats["paragraphs_removed"] == 0
+    assert stats["tokens_saved"] == 0
+
+
+def test_near_duplicate_non_latin_page_is_detected():
+    """测试转载的俄文页面（只多了来源说明）仍被识别为近重复页面"""
+    deduplicator = ContentDeduplicator()
+    deduplicator.filter_page(RUSSIAN_REDIS, source="redis")
+
+    mirror = RUSSIAN_REDIS + "\n\nИсточник: example.ru"
+    filtered, duplicate_of = deduplicator.filter_page(mirror, source="mirror")
+
+    assert filtered == ""
+    assert duplicate_of == "redis"
+
+
+def test_short_pages_without_long_paragraphs_are_kept():
+    """测试本来就没有长段落的短页面（包括第一个页面）原样保留，不会被当成重复页面"""
+    deduplicator = ContentDeduplicator()
+    pages = ["# Title\n\n- item one short\n\n- item two short\n\n- item three", "一个很短的中文页面，只有一句话。"]
+
+    for page in pages:
+        assert deduplicator.filter_page(page) == (page, None)
+
+    assert deduplicator.get_stats()["duplicate_pages"] == 0
+
+
+def test_pages_without_features_skip_dedup():
+    """测试没有可用特征的页面（纯符号）不参与去重，内容原样保留"""
+    deduplicator = ContentDeduplicator()
+    symbols = "★ ☆ ✦ ✧ → ← ↑ ↓ ■ □ ▲ △ ● ○ ◆ ◇ " * 10
+
+    for _ in range(2):
+        filtered, duplicate_of = deduplicator.filter_page(symbols)
+        assert duplicate_of is None and filtered == symbols
+
+    assert dedupe_texts(["→ → →", "← ← ←"]) == ["→ → →", "← ← ←"]
+
+
+def test_tokenize_and_estimate_tokens():
+    """测试切词覆盖各种文字，token估算与会话消息的token_count一致"""
+    assert tokenize("Redis 连接池 Привет") == ["redis", "连接", "接池", "привет"]
+    assert tokenize("ภาษา") == ["ภา", "าษ", "ษา"]
+    assert tokenize("한국어 문장") == ["한국어", "문장"]
+
+    assert estimate_tokens is token_estimator.estimate_tokens
+    for text in (RUSSIAN_REDIS, "中文内容和English words混合。", THAI_PAGE):
+        assert estimate_tokens(text) == SQLiteSessionManager._estimate_tokens("assistant", text)
@@ -0,0 +1,40 @@
+"""
+流式JSON解析器修复逻辑测试
+"""
+import os
+import sys
+
+# 添加项目根目录到 Python 路径
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.json_stream_parser import JSONStreamParser, parse_json
+
+
+def test_truncated_string_is_closed():
+    """测试在字符串中间截断的输出补全引号和括号"""
+    assert parse_json('{"summary": "部分摘') == {"summary": "部分摘"}
+    assert parse_json('{"items": ["a,b", "c') == {"items": ["a,b", "c"]}
+
+
+def test_nested_arrays_and_objects_are_closed_in_order():
+    """测试嵌套的数组和对象按嵌套顺序逆序闭合，末尾不完整的元素被丢弃"""
+    assert parse_json('{"a": {"b": [1, 2, [3, 4') == {"a": {"b": [1, 2, [3, 4]]}}
+    assert parse_json('{"a": [{"x": 1}, {"x": 2}, {"x": ') == {"a": [{"x": 1}, {"x": 2}]}
+    assert parse_json('{"items": [1, 2,') == {"items": [1, 2]}
+
+    parser = JSONStreamParser()
+    # 字符串中的括号不参与配对
+    assert parser._fix_unclosed_brackets('{"a": [1, {"b": "]}"') == '{"a": [1, {"b": "]}"}]}'
+
+
+def test_escaped_quotes_and_backslashes():
+    """测试转义的引号和反斜杠不会被当成字符串边界"""
+    assert parse_json('{"quote": "他说\\"你好\\"", "next": "含\\"引号') == {
+        "quote": '他说"你好"', "next": '含"引号'
+    }
+    assert parse_json('{"path": "C:\\\\dir\\\\", "items": ["x') == {"path": "C:\\dir\\", "items": ["x"]}
+
+    parser = JSONStreamParser()
+    # 字符串中的逗号不作为截断位置
+    assert parser._truncate_incomplete_tail('{"a": "x,y", "b": "z') == '{"a": "x,y"'
+    assert parser._truncate_incomplete_tail('{"a": "x\\",y"') == ""
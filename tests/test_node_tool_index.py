@@ -0,0 +1,77 @@
+"""
+工具索引增量同步测试（使用没有按id删除接口的本地aiohttp向量服务）
+"""
+import asyncio
+import os
+import sys
+
+from aiohttp import web
+
+# 添加项目根目录到 Python 路径
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from agent.nodes.node_tool_index import NodeToolIndex
+from agent.utils.http_session import close_http_sessions
+from agent.utils.vector_service_client import VectorServiceClient
+
+
+async def _start_service(requests):
+    """只提供公开接口（健康检查、写入文档、清除索引）的向量服务，记录收到的请求"""
+    async def health(request):
+        return web.json_response({"status": "ok"})
+
+    async def documents(request):
+        body = await request.json()
+        requests.append(("index", len(body["documents"])))
+        return web.json_response({"count": len(body["documents"]), "index": body.get("index")})
+
+    async def clear(request):
+        requests.append(("clear", request.match_info["index"]))
+        return web.json_response({"ok": True})
+
+    app = web.Application()
+    app.router.add_get("/health", health)
+    app.router.add_post("/documents", documents)
+    app.router.add_delete("/index/{index}/clear", clear)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+    return runner, f"http://127.0.0.1:{port}"
+
+
+def _tool(tool_id, description):
+    return {"id": tool_id, "type": "PYTHON_PACKAGE", "summary": tool_id, "description": description}
+
+
+def test_sync_rebuilds_explicitly_when_delete_is_not_supported(tmp_path):
+    """测试服务不支持删除时，修改工具明确改为全量重建（带原因），只新增工具时仍为增量同步"""
+    async def run():
+        requests = []
+        runner, base_url = await _start_service(requests)
+        try:
+            node = NodeToolIndex()
+            node.vector_client = VectorServiceClient(base_url)
+            node.vector_service_url = base_url
+            node.manifest_path = str(tmp_path / "manifest.json")
+
+            async def sync(tools):
+                prep_res = {"parsed_tools": tools, "index_name": "tools", "tools_count": len(tools)}
+                return (await node.exec_async(prep_res))["sync"]
+
+            first = await sync([_tool("a", "A"), _tool("b", "B")])
+            changed = await sync([_tool("a", "A"), _tool("b", "B2")])
+            added = await sync([_tool("a", "A"), _tool("b", "B2"), _tool("c", "C")])
+            return first, changed, added, requests, node.vector_client
+        finally:
+            await close_http_sessions()
+            await runner.cleanup()
+
+    first, changed, added, requests, client = asyncio.run(run())
+
+    assert first["mode"] == "full" and "reason" not in first
+    assert changed["mode"] == "full" and changed["reason"] == "delete_not_supported"
+    assert added["mode"] == "incremental" and added["added"] == 1
+    assert client.delete_supported is False
+    assert requests == [("clear", "tools"), ("index", 2), ("clear", "tools"), ("index", 2), ("index", 1)]
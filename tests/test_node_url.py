@@ -0,0 +1,75 @@
+"""
+NodeURL 多URL并发抓取测试（使用假Reader客户端，不请求网络）
+"""
+import asyncio
+import os
+import sys
+
+# 添加项目根目录到 Python 路径
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from agent.nodes.node_url import NodeURL
+from agent.utils.URL_to_Markdown import JinaWebClient
+
+
+class FakeWebClient(JinaWebClient):
+    """按URL返回预设延迟和内容的Reader客户端；内容为None时抛出异常"""
+
+    def __init__(self, pages):
+        super().__init__(api_key="test", use_cache=False)
+        self.pages = pages
+        self.cancelled = []
+
+    async def get_page_info(self, url, **kwargs):
+        delay, content = self.pages[url]
+        try:
+            await asyncio.sleep(delay)
+        except asyncio.CancelledError:
+            self.cancelled.append(url)
+            raise
+        if content is None:
+            raise RuntimeError("HTTP 502")
+        return {"title": "", "description": "", "url": url, "content": content}
+
+
+def _make_node(pages, deadline=2.0):
+    node = NodeURL()
+    node.web_client = FakeWebClient(pages)
+    node.client_available = True
+    node.url_timeout = 1.0
+    node.url_deadline = deadline
+    return node
+
+
+def test_good_enough_page_cancels_remaining_fetches():
+    """测试评分达到要求的页面立即被采用，其余抓取被取消"""
+    node = _make_node({
+        "https://a.example.com": (0.3, "redis 连接池" * 200),
+        "https://b.example.com": (0.01, "redis 连接池 配置" * 200),
+        "https://c.example.com": (0.5, "redis" * 200)
+    })
+    candidates = [{"url": url, "title": ""} for url in node.web_client.pages]
+
+    best, stats = asyncio.run(node._fetch_best_page(candidates, "redis 连接池", 10000))
+
+    assert best["source_url"] == "https://b.example.com"
+    assert stats["early_cutoff"] and stats["selected_rank"] == 1
+    assert stats["completed"] == 1 and stats["cancelled"] == 2
+    assert sorted(node.web_client.cancelled) == ["https://a.example.com", "https://c.example.com"]
+
+
+def test_deadline_selects_best_completed_page_and_reports_failures():
+    """测试到达截止时间时采用已完成页面中评分最高的一个，失败和超时的URL计入统计"""
+    node = _make_node({
+        "https://a.example.com": (0.01, None),
+        "https://b.example.com": (0.02, "无关内容"),
+        "https://c.example.com": (5.0, "kafka 消费者组" * 200)
+    }, deadline=0.3)
+    candidates = [{"url": url, "title": ""} for url in node.web_client.pages]
+
+    best, stats = asyncio.run(node._fetch_best_page(candidates, "kafka 消费者组", 10000))
+
+    assert best["source_url"] == "https://b.example.com"
+    assert not stats["early_cutoff"]
+    assert stats["completed"] == 1 and stats["failed"] == 1 and stats["cancelled"] == 1
+    assert node.web_client.cancelled == ["https://c.example.com"]
@@ -0,0 +1,54 @@
+"""
+相关段落抽取测试
+"""
+import os
+import sys
+
+# 添加项目根目录到 Python 路径
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from agent.subflows.research.utils.passage_extractor import extract_relevant_passages, split_passages
+
+
+def _paragraph(text: str, length: int = 100) -> str:
+    """把文本重复到固定长度，作为一个段落"""
+    return (text * (length // len(text) + 1))[:length]
+
+
+NAVIGATION = _paragraph("首页 产品 价格 关于我们 联系方式 ")
+FOOTER = _paragraph("版权所有 备案号 隐私政策 ")
+POOL_SIZE = _paragraph("Redis连接池的最大连接数应根据并发量设置。")
+POOL_TIMEOUT = _paragraph("Redis连接池获取连接超时时应快速失败并重试。")
+KAFKA = _paragraph("Kafka消费者组按分区并行消费消息。")
+
+
+def test_adjacent_passages_fill_budget_without_gap():
+    """测试相邻片段之间不计省略号，两个相邻的相关片段可以恰好用满预算"""
+    content = "\n\n".join([NAVIGATION, POOL_SIZE, POOL_TIMEOUT, FOOTER, KAFKA])
+    assert len(split_passages(content, passage_chars=100)) == 5
+
+    result = extract_relevant_passages(content, "Redis 连接池", max_chars=202, passage_chars=100)
+
+    assert result == f"{POOL_SIZE}\n\n{POOL_TIMEOUT}"
+    assert len(result) == 202
+
+
+def test_result_stays_within_budget_and_keeps_original_order():
+    """测试结果不超过字符预算，不相邻的片段按原文顺序用省略号连接"""
+    content = "\n\n".join([NAVIGATION, POOL_TIMEOUT, FOOTER, KAFKA, FOOTER, POOL_SIZE, NAVIGATION])
+
+    for max_chars in (150, 207, 260, 400):
+        result = extract_relevant_passages(content, "Redis 连接池 超时", max_chars=max_chars, passage_chars=100)
+        assert len(result) <= max_chars
+
+    result = extract_relevant_passages(content, "Redis 连接池 超时", max_chars=207, passage_chars=100)
+    assert result == f"{POOL_TIMEOUT}\n\n...\n\n{POOL_SIZE}"
+
+
+def test_falls_back_to_prefix_when_nothing_matches():
+    """测试没有任何片段与查询相关时退回截取开头，页面不超过预算时原样返回"""
+    content = "\n\n".join([NAVIGATION, POOL_SIZE, FOOTER, KAFKA])
+
+    assert extract_relevant_passages(content, "Elasticsearch 分词器", max_chars=150,
+                                     passage_chars=100) == content[:150]
+    assert extract_relevant_passages(content, "Redis", max_chars=len(content)) == content
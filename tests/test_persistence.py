@@ -0,0 +1,483 @@
+"""
+GTPlanner 持久化层测试
+"""
+import asyncio
+import gzip
+import json
+import sys
+import os
+import time
+
+# 添加项目根目录到 Python 路径
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from agent.persistence.sqlite_session_manager import SQLiteSessionManager
+from agent.persistence.database_maintenance import DatabaseMaintenance, RetentionPolicy
+from agent.persistence.database_schema import DatabaseSchema
+from agent.persistence.async_session_manager import AsyncSessionManager, PersistenceTimeoutError
+
+
+def _make_manager(tmp_path):
+    return SQLiteSessionManager(str(tmp_path / "test.db"))
+
+
+def _set_updated_at(manager, session_id, updated_at):
+    """修改会话更新时间"""
+    with manager.dao.transaction() as conn:
+        conn.execute(
+            "UPDATE sessions SET updated_at = ? WHERE session_id = ?",
+            (updated_at, session_id)
+        )
+
+
+def test_maintenance_archives_and_purges_expired_sessions(tmp_path):
+    """测试按时间清理的会话被归档后物理删除"""
+    manager = _make_manager(tmp_path)
+    old_id = manager.create_new_session("old")
+    manager.add_user_message("旧的需求" * 5000, session_id=old_id)
+    new_id = manager.create_new_session("new")
+    manager.add_user_message("新的需求", session_id=new_id)
+
+    _set_updated_at(manager, old_id, "2000-01-01 00:00:00")
+
+    policy = RetentionPolicy(
+        max_age_days=30,
+        max_sessions=None,
+        max_db_size_mb=None,
+        archive_dir=str(tmp_path / "archives"),
+        vacuum_batch_pause=0
+    )
+    report = DatabaseMaintenance(manager.dao, policy).run_once()
+
+    assert report.sessions_purged == 1
+    assert report.sessions_archived == 1
+    assert manager.dao.get_session(old_id) is None
+    assert manager.dao.get_session(new_id) is not None
+    assert manager.dao.get_messages(old_id) == []
+
+    with gzip.open(report.archive_files[0], "rt", encoding="utf-8") as f:
+        archived = json.load(f)
+    assert archived["session"]["session_id"] == old_id
+    assert len(archived["messages"]) == 1
+    assert manager.dao.get_metadata("last_cleanup_at") == report.started_at
+    assert report.pages_vacuumed > 0
+    assert report.bytes_reclaimed > 0
+
+
+def test_maintenance_enforces_count_and_prunes_compressed_versions(tmp_path):
+    """测试按数量清理会话，并只保留最新的压缩上下文版本"""
+    manager = _make_manager(tmp_path)
+    session_ids = [manager.create_new_session(f"s{i}") for i in range(3)]
+    for i, session_id in enumerate(session_ids):
+        _set_updated_at(manager, session_id, f"2030-01-0{i + 1} 00:00:00")
+
+    keep_id = session_ids[-1]
+    for version in range(2, 7):
+        manager.dao.save_compressed_context(
+            keep_id, {"messages": [], "summary": f"v{version}"}, version, 1.0
+        )
+
+    policy = RetentionPolicy(
+        max_age_days=None,
+        max_sessions=1,
+        max_db_size_mb=None,
+        keep_compressed_versions=2,
+        archive_enabled=False,
+        vacuum_batch_pause=0
+    )
+    report = DatabaseMaintenance(manager.dao, policy).run_once()
+
+    assert report.sessions_purged == 2
+    assert [s["session_id"] for s in manager.dao.list_sessions()] == [keep_id]
+    versions = [c["version"] for c in manager.dao.get_compressed_contexts(keep_id)]
+    assert versions == [6, 5]
+
+
+def test_maintenance_scheduler_runs_in_background_and_respects_enabled(tmp_path):
+    """测试后台维护服务启动后执行维护，停止后不再运行；未启用时不启动"""
+    manager = _make_manager(tmp_path)
+
+    async def run():
+        policy = RetentionPolicy(enabled=True, archive_enabled=False, vacuum_batch_pause=0, interval_seconds=3600)
+        maintenance = DatabaseMaintenance(manager.dao, policy)
+        await maintenance.start()
+        for _ in range(100):
+            if maintenance.last_report is not None:
+                break
+            await asyncio.sleep(0.01)
+        await maintenance.stop()
+        assert maintenance.last_report is not None
+        assert not maintenance.is_running
+
+        disabled = DatabaseMaintenance(manager.dao, RetentionPolicy())
+        await disabled.start()
+        assert disabled.worker_task is None
+
+    asyncio.run(run())
+
+
+def test_maintenance_defaults_are_opt_in_and_archive_next_to_database(tmp_path):
+    """测试默认策略不清理任何会话，相对归档目录位于数据库旁，刚维护过时不会在启动时立即再次执行"""
+    manager = _make_manager(tmp_path)
+    session_id = manager.create_new_session("old")
+    _set_updated_at(manager, session_id, "2000-01-01 00:00:00")
+
+    maintenance = DatabaseMaintenance(manager.dao, RetentionPolicy(vacuum_batch_pause=0))
+    assert maintenance.archive_path() == tmp_path.resolve() / "archives"
+    assert maintenance.seconds_until_due() == 0
+
+    report = maintenance.run_once()
+    assert report.sessions_purged == 0
+    assert manager.dao.get_session(session_id) is not None
+    assert 0 < maintenance.seconds_until_due() <= maintenance.policy.interval_seconds
+
+
+def test_retention_policy_from_config(monkeypatch):
+    """测试保留策略读取配置，0表示不限制"""
+    from agent.persistence.database_maintenance import create_retention_policy
+
+    monkeypatch.setenv("DB_MAINTENANCE_MAX_SESSIONS", "0")
+    monkeypatch.setenv("DB_MAINTENANCE_INTERVAL_SECONDS", "60")
+    policy = create_retention_policy()
+
+    assert policy.max_sessions is None
+    assert policy.interval_seconds == 60
+
+
+def test_session_cache_lru_eviction_and_external_invalidation(tmp_path):
+    """测试会话缓存的LRU淘汰、命中统计和外部修改检测"""
+    manager = SQLiteSessionManager(str(tmp_path / "test.db"), cache_max_entries=2)
+    session_ids = [manager.create_new_session(f"s{i}") for i in range(3)]
+
+    for session_id in session_ids:
+        manager.load_session(session_id)
+        manager.get_current_session()
+
+    stats = manager.get_cache_statistics()
+    assert stats["entries"] == 2
+    assert stats["evictions"] == 1
+    assert stats["hits"] == 3
+    assert session_ids[0] not in manager._session_cache
+
+    # 另一个管理器（另一个连接）修改标题，缓存应检测到并失效
+    other = SQLiteSessionManager(str(tmp_path / "test.db"))
+    other.update_session_title("renamed", session_id=session_ids[-1])
+
+    assert manager.get_current_session()["title"] == "renamed"
+    assert manager.get_cache_statistics()["external_invalidations"] == 1
+
+
+def test_session_cache_survives_own_writes_to_other_sessions(tmp_path):
+    """测试本进程写入其他会话时，已缓存的会话不被整体失效"""
+    manager = _make_manager(tmp_path)
+    cached_id = manager.create_new_session("cached")
+    other_id = manager.create_new_session("other")
+
+    manager.load_session(cached_id)
+    manager.get_current_session()
+    manager.add_user_message("写入另一个会话", session_id=other_id)
+
+    assert cached_id in manager._session_cache
+    assert manager.get_current_session()["title"] == "cached"
+    stats = manager.get_cache_statistics()
+    assert stats["external_invalidations"] == 0
+    assert stats["hits"] == 2
+
+
+def test_add_messages_copies_input_and_writes_context_atomically(tmp_path):
+    """测试批量写入不修改调用方的消息字典，且缺少压缩上下文时消息写入一并回滚"""
+    manager = _make_manager(tmp_path)
+    session_id = manager.create_new_session("atomic")
+    message = manager._build_message("user", "需求")
+
+    manager.add_messages([message], session_id=session_id)
+    assert message["token_count"] is None
+    assert "message_id" not in message
+    assert len(manager.dao.get_active_compressed_context(session_id)["compressed_messages"]) == 1
+
+    with manager.dao.transaction() as conn:
+        conn.execute("DELETE FROM compressed_context WHERE session_id = ?", (session_id,))
+    try:
+        manager.add_messages([manager._build_message("user", "丢失")], session_id=session_id)
+        assert False, "缺少压缩上下文时应抛出异常"
+    except ValueError:
+        pass
+    assert [m["content"] for m in manager.dao.get_messages(session_id)] == ["需求"]
+    assert manager.dao.get_session(session_id)["total_messages"] == 1
+
+
+def test_batch_messages_update_session_row_once(tmp_path):
+    """测试批量写入消息时会话统计只更新一次，且手动设置的更新时间不会被覆盖"""
+    manager = _make_manager(tmp_path)
+    session_id = manager.create_new_session("batch")
+
+    with manager.dao.transaction() as conn:
+        # 临时表在各连接间不共享，这里用普通表记录sessions行的写入次数
+        conn.execute("CREATE TABLE session_writes (n INTEGER)")
+        conn.execute("""
+            CREATE TRIGGER count_session_writes AFTER UPDATE ON sessions
+            BEGIN INSERT INTO session_writes VALUES (1); END
+        """)
+
+    message_ids = manager.add_messages([
+        manager._build_message("user", "需求"),
+        manager._build_message("assistant", "方案", tool_calls=[{"id": "call_1"}]),
+        manager._build_message("tool", '{"ok": true}', tool_call_id="call_1")
+    ], session_id=session_id)
+
+    with manager.dao.get_connection() as conn:
+        writes = conn.execute("SELECT COUNT(*) FROM session_writes").fetchone()[0]
+
+    session = manager.dao.get_session(session_id)
+    assert len(message_ids) == 3
+    assert writes == 1
+    assert session["total_messages"] == 3
+    assert session["total_tokens"] == sum(
+        m["token_count"] for m in manager.dao.get_messages(session_id)
+    )
+    assert manager.dao.get_active_compressed_context(session_id)["compressed_message_count"] == 3
+
+    _set_updated_at(manager, session_id, "2000-01-01 00:00:00")
+    assert manager.dao.get_session(session_id)["updated_at"] == "2000-01-01 00:00:00"
+
+
+def test_migration_removes_legacy_session_triggers(tmp_path):
+    """测试旧版本数据库迁移时移除自我触发的时间戳触发器和逐行计数触发器"""
+    db_path = str(tmp_path / "legacy.db")
+    manager = SQLiteSessionManager(db_path)
+    session_id = manager.create_new_session("legacy")
+
+    with manager.dao.transaction() as conn:
+        conn.execute("""
+            CREATE TRIGGER sessions_update_timestamp AFTER UPDATE ON sessions
+            BEGIN UPDATE sessions SET updated_at = CURRENT_TIMESTAMP WHERE session_id = NEW.session_id; END
+        """)
+        conn.execute("""
+            CREATE TRIGGER sessions_message_count_insert AFTER INSERT ON messages
+            BEGIN UPDATE sessions SET total_messages = total_messages + 1 WHERE session_id = NEW.session_id; END
+        """)
+        conn.execute("UPDATE database_metadata SET value = '1' WHERE key = 'schema_version'")
+
+    migrated = SQLiteSessionManager(db_path)
+    migrated.add_user_message("hello", session_id=session_id)
+
+    with migrated.dao.get_connection() as conn:
+        triggers = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'trigger'")}
+    assert triggers == set(DatabaseSchema.get_update_triggers_sql())
+    assert migrated.dao.get_session(session_id)["total_messages"] == 1
+    assert migrated.dao.get_metadata("schema_version") == str(DatabaseSchema.CURRENT_VERSION)
+
+
+def test_async_session_manager_does_not_block_event_loop(tmp_path):
+    """测试异步门面在持久化操作阻塞期间事件循环仍在运行，并遵守并发上限和超时"""
+    async def scenario():
+        manager = AsyncSessionManager(
+            SQLiteSessionManager(str(tmp_path / "test.db")), max_concurrency=3
+        )
+
+        async def count_ticks(duration):
+            ticks = 0
+            end = time.perf_counter() + duration
+            while time.perf_counter() < end:
+                await asyncio.sleep(0.005)
+                ticks += 1
+            return ticks
+
+        async def session_traffic(i):
+            session_id = await manager.create_new_session(f"s{i}")
+            for turn in range(10):
+                await manager.add_messages([
+                    manager.sync._build_message("user", f"需求 {turn} " * 200),
+                    manager.sync._build_message("assistant", f"方案 {turn} " * 200)
+                ], session_id=session_id)
+                await manager.build_agent_context(session_id)
+            await manager.list_sessions()
+            return await manager.get_session_statistics(session_id)
+
+        results = await asyncio.gather(*(session_traffic(i) for i in range(12)))
+
+        # 持久化调用阻塞0.3秒期间，事件循环仍能持续调度其他协程
+        _, ticks = await asyncio.gather(manager.run(time.sleep, 0.3), count_ticks(0.3))
+
+        with_timeout = None
+        try:
+            await manager.run(time.sleep, 0.2, timeout=0.01)
+        except PersistenceTimeoutError as e:
+            with_timeout = e
+
+        stats = manager.get_statistics()
+        await manager.close()
+        return results, ticks, with_timeout, stats
+
+    results, ticks, timeout_error, stats = asyncio.run(scenario())
+
+    assert all(r["total_messages"] == 20 for r in results)
+    # 阻塞事件循环时这里只会有0-1次
+    assert ticks >= 5
+    assert timeout_error is not None
+    assert stats["timeouts"] == 1
+    assert stats["max_in_flight"] <= 3
+
+
+def test_async_session_manager_concurrent_writes_to_same_session(tmp_path):
+    """测试通过异步门面并发写入同一会话时，压缩上下文不会丢失消息"""
+    async def scenario():
+        manager = AsyncSessionManager(SQLiteSessionManager(str(tmp_path / "test.db")), max_concurrency=4)
+        session_id = await manager.create_new_session("shared")
+        await asyncio.gather(*(
+            manager.add_messages([manager.sync._build_message("user", f"m{i}")], session_id=session_id)
+            for i in range(20)
+        ))
+        context = await manager.run(manager.sync.dao.get_active_compressed_context, session_id)
+        await manager.close()
+        return context
+
+    context = asyncio.run(scenario())
+
+    assert sorted(m["content"] for m in context["compressed_messages"]) == sorted(f"m{i}" for i in range(20))
+    assert context["compressed_message_count"] == 20
+
+
+def test_async_session_manager_tracks_current_session_on_event_loop(tmp_path):
+    """测试门面自行维护当前会话并显式传给工作线程，超时的写入仍会在后台提交"""
+    async def scenario():
+        manager = AsyncSessionManager(SQLiteSessionManager(str(tmp_path / "test.db")), timeout=0.05)
+        first = await manager.create_new_session("first")
+        await manager.add_user_message("第一条")
+        second = await manager.create_new_session("second")
+        assert manager.current_session_id == second
+        # 工作线程不修改同步管理器的当前会话
+        assert manager.sync.current_session_id is None
+
+        assert await manager.load_session(first)
+        assert (await manager.get_current_session())["session_id"] == first
+
+        def slow_add(content, session_id):
+            time.sleep(0.2)
+            return manager.sync.add_user_message(content, session_id=session_id)
+
+        pending = None
+        try:
+            await manager.run(slow_add, "超时的消息", second)
+        except PersistenceTimeoutError as e:
+            pending = e.pending
+        assert pending is not None
+        await pending
+
+        assert await manager.delete_session()
+        assert manager.current_session_id is None
+        messages = await manager.get_messages(second)
+        await manager.close()
+        return messages
+
+    messages = asyncio.run(scenario())
+
+    assert [m["content"] for m in messages] == ["超时的消息"]
+
+
+def test_keyset_pagination_and_token_budget_tail(tmp_path):
+    """测试游标分页在时间戳相同时保持顺序，以及按token预算读取尾部消息"""
+    manager = _make_manager(tmp_path)
+    session_id = manager.create_new_session("paging")
+    # 同一批消息的时间戳相同，分页顺序依赖rowid
+    manager.dao.add_messages(session_id, [
+        {"role": "user", "content": f"m{i}", "token_count": 10} for i in range(25)
+    ])
+
+    contents, cursor, pages = [], None, 0
+    while True:
+        page = manager.get_messages_page(cursor, limit=10, session_id=session_id)
+        contents.extend(m["content"] for m in page["messages"])
+        pages += 1
+        cursor = page["next_cursor"]
+        if not cursor:
+            break
+
+    expected = [f"m{i}" for i in range(25)]
+    assert contents == expected
+    assert pages == 3
+    assert [m["content"] for m in manager.iter_messages(batch_size=7, reverse=True, session_id=session_id)] == expected[::-1]
+
+    tail = manager.get_tail_messages(35, session_id=session_id)
+    assert [m["content"] for m in tail] == ["m22", "m23", "m24"]
+    assert len(manager.get_tail_messages(0, session_id=session_id)) == 1
+
+
+def test_build_agent_context_with_token_budget(tmp_path):
+    """测试按token预算构建上下文时只保留尾部消息，且不以孤立的tool消息开头"""
+    manager = _make_manager(tmp_path)
+    session_id = manager.create_new_session("budget")
+    manager.add_messages([
+        manager._build_message("user", "需求" * 50),
+        manager._build_message("assistant", "调用工具", tool_calls=[{"id": "call_1"}]),
+        manager._build_message("tool", "x" * 400, tool_call_id="call_1"),
+        manager._build_message("assistant", "完成")
+    ], session_id=session_id)
+
+    full = manager.build_agent_context(session_id)
+    budgeted = manager.build_agent_context(session_id, token_budget=105)
+
+    assert len(full.dialogue_history) == 4
+    assert [m.role.value for m in budgeted.dialogue_history] == ["assistant"]
+
+
+def test_budgeted_agent_context_pages_compressed_tail(tmp_path, monkeypatch):
+    """测试按预算恢复上下文时从压缩上下文尾部分页读取，不加载整个压缩消息列表"""
+    manager = _make_manager(tmp_path)
+    session_id = manager.create_new_session("resume")
+    manager.dao.save_compressed_context(session_id, {
+        "messages": [{"role": "assistant", "content": "摘要", "timestamp": "2030-01-01T00:00:00",
+                      "metadata": {}, "token_count": 5}]
+    })
+    manager.add_messages([
+        manager._build_message("user" if i % 2 == 0 else "assistant", f"m{i}") for i in range(120)
+    ], session_id=session_id)
+
+    def fail(*args, **kwargs):
+        raise AssertionError("不应读取完整的压缩上下文")
+
+    monkeypatch.setattr(manager.dao, "get_active_compressed_context", fail)
+
+    tokens = manager._estimate_tokens("user", "m0")
+    tail = manager.dao.get_active_compressed_context_tail(session_id, tokens * 75, batch_size=20)
+    assert [m["content"] for m in tail["compressed_messages"]] == [f"m{i}" for i in range(45, 120)]
+    assert tail["compressed_message_count"] == 121
+
+    context = manager.build_agent_context(session_id, token_budget=tokens * 120 + 5)
+    assert context.dialogue_history[0].content == "摘要"
+    assert len(context.dialogue_history) == 121
+    assert context.is_compressed
+
+
+def test_save_compressed_context_keeps_messages_appended_during_compression(tmp_path):
+    """测试保存压缩结果时保留压缩期间新增的消息，并在清理历史版本后继续递增版本号"""
+    manager = _make_manager(tmp_path)
+    session_id = manager.create_new_session("compress")
+    manager.add_messages([
+        manager._build_message("user", f"旧消息{i}") for i in range(6)
+    ], session_id=session_id)
+
+    snapshot = manager.dao.get_compression_snapshot(session_id)
+    assert len(snapshot["messages"]) == 6
+    assert snapshot["base_message_count"] == 6
+
+    # 压缩进行中写入的新消息
+    manager.add_user_message("压缩期间的新消息", session_id=session_id)
+
+    summary_message = {"role": "assistant", "content": "摘要", "token_count": 2}
+    manager.dao.save_compressed_context(
+        session_id, {"messages": [summary_message], "summary": "摘要", "original_count": 6},
+        base_message_count=snapshot["base_message_count"]
+    )
+
+    active = manager.dao.get_active_compressed_context(session_id)
+    assert [m["content"] for m in active["compressed_messages"]] == ["摘要", "压缩期间的新消息"]
+    assert active["compression_version"] == 2
+    assert active["original_message_count"] == 7
+    assert active["compressed_token_count"] == sum(
+        m["token_count"] for m in active["compressed_messages"]
+    )
+
+    manager.dao.prune_compressed_contexts(1)
+    manager.dao.save_compressed_context(session_id, {"messages": [], "summary": "v3"})
+    assert manager.dao.get_active_compressed_context(session_id)["compression_version"] == 3
@@ -0,0 +1,148 @@
+"""
+技术调研结果流式返回测试（使用模拟的关键词研究子流程，不请求网络和大模型）
+"""
+import asyncio
+import os
+import sys
+
+# 添加项目根目录到 Python 路径
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from agent.streaming import StreamHandler, StreamingSession, StreamEventType
+from agent.subflows.research.flows import research_flow
+from agent.subflows.research.utils.research_executor import research_executor
+
+
+class RecordingHandler(StreamHandler):
+    """记录研究结果事件，以及事件到达时已经完成的关键词"""
+
+    def __init__(self, finished):
+        self.finished = finished
+        self.events = []
+
+    async def handle_event(self, event) -> None:
+        if event.event_type == StreamEventType.RESEARCH_RESULT:
+            self.events.append((event.data, set(self.finished)))
+
+    async def handle_error(self, error, session_id=None) -> None:
+        pass
+
+    async def close(self) -> None:
+        pass
+
+
+class FakeKeywordSubflow:
+    """模拟关键词研究子流程：等待一段时间后写入研究结果，findings为None时不写入，为异常时抛出"""
+
+    def __init__(self, latency, findings, finished):
+        self.latency = latency
+        self.findings = findings
+        self.finished = finished
+
+    async def run_async(self, shared):
+        await asyncio.sleep(self.latency)
+        self.finished.add(shared["current_keyword"])
+        if isinstance(self.findings, Exception):
+            raise self.findings
+        if self.findings is not None:
+            shared["research_findings"] = self.findings
+
+
+def _findings(keyword, key_points):
+    return {
+        "keyword": keyword,
+        "summary": f"{keyword} 的调研摘要",
+        "key_points": key_points,
+        "recommendations": [f"{keyword} 建议"],
+        "source": {"url": f"https://example.com/{keyword}", "title": keyword}
+    }
+
+
+def _run_research(monkeypatch, plan, **executor_settings):
+    """按计划（关键词 -> (耗时, 研究结果)）运行ConcurrentResearchNode，返回shared和记录的事件"""
+    finished = set()
+    subflows = iter([FakeKeywordSubflow(latency, findings, finished) for latency, findings in plan.values()])
+    monkeypatch.setattr(research_flow, "create_keyword_research_subflow", lambda: next(subflows))
+    settings = {"early_stop_results": 0, "max_concurrency_per_request": len(plan), "time_budget": 30}
+    settings.update(executor_settings)
+    for name, value in settings.items():
+        monkeypatch.setattr(research_executor, name, value)
+
+    session = StreamingSession("test")
+    handler = RecordingHandler(finished)
+    session.add_handler(handler)
+    shared = {
+        "research_keywords": list(plan),
+        "focus_areas": ["技术选型"],
+        "project_context": "",
+        "streaming_session": session
+    }
+    asyncio.run(research_flow.ConcurrentResearchNode().run_async(shared))
+    return shared, handler.events
+
+
+def test_research_result_is_emitted_per_keyword_as_it_completes(monkeypatch):
+    """测试每个关键词完成时立即发送一个研究结果事件，不等最慢的关键词"""
+    shared, events = _run_research(monkeypatch, {
+        "slow": (0.4, _findings("slow", ["慢关键词要点1", "慢关键词要点2", "慢关键词要点3"])),
+        "fast": (0.02, _findings("fast", ["快关键词要点1", "快关键词要点2", "快关键词要点3"])),
+        "broken": (0.1, RuntimeError("上游超时")),
+        "empty": (0.2, None)
+    })
+
+    assert [data["keyword"] for data, _ in events] == ["fast", "broken", "empty", "slow"]
+    assert [data["status"] for data, _ in events] == ["success", "failed", "failed", "success"]
+    assert [data["completed"] for data, _ in events] == [1, 2, 3, 4]
+    assert all(data["total"] == 4 for data, _ in events)
+
+    # 事件到达时只有已完成的关键词，最慢的关键词还在执行
+    first_event, finished_at_first_event = events[0]
+    assert finished_at_first_event == {"fast"}
+    assert first_event["result"]["summary"] == "fast 的调研摘要"
+    assert events[1][0]["error_message"] == "上游超时"
+    assert events[2][0]["error_message"] == "No research findings generated"
+
+    statistics = shared["research_findings"]
+    assert statistics["successful_keywords"] == 2 and statistics["failed_keywords"] == 2
+
+
+def test_skipped_keywords_are_reported_after_execution(monkeypatch):
+    """测试提前完成后被跳过的关键词在执行结束后发送事件，客户端不再等待它们"""
+    shared, events = _run_research(monkeypatch, {
+        "first": (0.02, _findings("first", ["要点1", "要点2", "要点3"])),
+        "second": (0.02, _findings("second", ["要点4", "要点5", "要点6"])),
+        "third": (0.02, _findings("third", ["要点7", "要点8", "要点9"]))
+    }, early_stop_results=1, max_concurrency_per_request=1)
+
+    assert [(data["keyword"], data["status"]) for data, _ in events] == [
+        ("first", "success"), ("second", "skipped"), ("third", "skipped")
+    ]
+    assert [data["completed"] for data, _ in events] == [1, 2, 3]
+    assert events[1][0]["error_message"] == "已获得足够的高质量研究结果"
+    assert events[-1][0]["aggregate"]["skipped_keywords"] == 2
+
+    findings = shared["research_findings"]
+    assert findings["early_completed"]
+    assert findings["skipped_keywords"] == 2
+    assert [item["keyword"] for item in findings["keyword_results"] if item.get("skipped")] == ["second", "third"]
+
+
+def test_final_snapshot_matches_aggregated_findings(monkeypatch):
+    """测试最后一个事件的增量聚合结果与最终research_findings中的aggregated_findings一致（含跨关键词去重）"""
+    shared, events = _run_research(monkeypatch, {
+        "redis": (0.02, _findings("redis", ["使用连接池复用TCP连接", "设置合理的超时时间", "开启持久化"])),
+        "cache": (0.1, _findings("cache", ["使用连接池复用TCP连接", "缓存穿透需要布隆过滤器", "设置合理的超时时间"])),
+        "queue": (0.2, _findings("queue", ["消费者组并行消费", "提交偏移量", "死信队列"]))
+    })
+
+    aggregated = shared["research_findings"]["aggregated_findings"]
+    assert events[-1][0]["aggregate"] == aggregated
+    assert aggregated["completed"] == 3 and aggregated["successful_keywords"] == 3
+    # 近重复的关键点只保留先完成的关键词中的一条
+    assert aggregated["key_findings"].count("使用连接池复用TCP连接") == 1
+    assert "缓存穿透需要布隆过滤器" in aggregated["key_findings"]
+    assert [source["keyword"] for source in aggregated["sources"]] == ["redis", "cache", "queue"]
+
+    # 中间事件的快照只包含当时已完成的关键词
+    assert [data["aggregate"]["completed"] for data, _ in events] == [1, 2, 3]
+    assert events[0][0]["aggregate"]["sources"] == [aggregated["sources"][0]]
@@ -0,0 +1,169 @@
+"""
+智能压缩器测试（使用桩LLM客户端，不需要API密钥）
+"""
+import asyncio
+import os
+import sys
+from types import SimpleNamespace
+
+# 添加项目根目录到 Python 路径
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from agent.persistence.sqlite_session_manager import SQLiteSessionManager
+from agent.persistence.smart_compressor import (
+    SmartCompressor, CompressionConfig, CompressionLevel, CompressionOutputError
+)
+
+
+class StubLLM:
+    """按顺序返回预设输出的流式LLM客户端；输出中的异常会在流中途抛出"""
+
+    def __init__(self, responses):
+        self.responses = list(responses)
+        self.prompts = []
+
+    async def chat_completion_stream(self, messages, system_prompt=None, **kwargs):
+        self.prompts.append(messages[0]["content"])
+        response = self.responses.pop(0)
+        if callable(response):
+            response = response()
+        for piece in response:
+            if isinstance(piece, Exception):
+                raise piece
+            yield SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content=piece))], usage=None)
+
+
+def _make_compressor(tmp_path, responses, **config):
+    manager = SQLiteSessionManager(str(tmp_path / "test.db"))
+    settings = {"max_tokens": 200, "context_window_tokens": 100000, "heavy_pressure": 100,
+                "preserve_recent_count": 2}
+    settings.update(config)
+    compressor = SmartCompressor(manager, CompressionConfig(**settings))
+    compressor.openai_client = StubLLM(responses)
+    return manager, compressor
+
+
+def _add_turns(manager, session_id, turns):
+    for i in turns:
+        manager.add_user_message(f"第{i}轮 " + "需求" * 40, session_id=session_id)
+
+
+def test_select_level_by_token_pressure(tmp_path):
+    """测试按token压力和消息数量选择压缩级别"""
+    _, compressor = _make_compressor(tmp_path, [], heavy_pressure=1.5, max_messages=50)
+
+    def level(tokens, count=10):
+        return compressor.select_level({"compressed_token_count": tokens, "compressed_message_count": count})
+
+    assert compressor.token_budget == 200
+    assert level(100) is None
+    assert level(150) == CompressionLevel.LIGHT
+    assert level(200) == CompressionLevel.MEDIUM
+    assert level(300) == CompressionLevel.HEAVY
+    assert level(10, count=60) == CompressionLevel.MEDIUM
+
+
+def test_rolling_summary_merges_only_new_messages(tmp_path):
+    """测试滚动摘要：第二次压缩只把新消息并入已有摘要，版本号递增"""
+    manager, compressor = _make_compressor(tmp_path, [
+        ['{"summary": "摘要1", "key_decisions": ["决策1"]}'],
+        ['{"summary": "摘要2", "key_decisions": ["决策1", "决策2"]}']
+    ])
+    session_id = manager.create_new_session("rolling")
+
+    _add_turns(manager, session_id, range(4))
+    asyncio.run(compressor._execute_compression(session_id))
+    context = manager.dao.get_active_compressed_context(session_id)
+    messages = context["compressed_messages"]
+    assert context["summary"] == "摘要1"
+    assert messages[0]["metadata"]["rolling_summary"]
+    assert [m["content"][:3] for m in messages[1:]] == ["第2轮", "第3轮"]
+
+    _add_turns(manager, session_id, range(4, 8))
+    asyncio.run(compressor._execute_compression(session_id))
+    second_prompt = compressor.openai_client.prompts[1]
+    assert "摘要1" in second_prompt
+    assert "第0轮" not in second_prompt and "第2轮" in second_prompt
+
+    context = manager.dao.get_active_compressed_context(session_id)
+    messages = context["compressed_messages"]
+    assert context["summary"] == "摘要2"
+    assert sum(1 for m in messages if (m.get("metadata") or {}).get("rolling_summary")) == 1
+    assert [m["content"][:3] for m in messages[1:]] == ["第6轮", "第7轮"]
+
+    versions = [c["version"] for c in manager.dao.get_compressed_contexts(session_id)]
+    assert versions == sorted(set(versions), reverse=True)
+    assert compressor.level_stats["medium"]["runs"] == 2
+
+
+def test_messages_added_during_compression_are_kept(tmp_path):
+    """测试压缩期间追加的消息接在压缩结果之后，不会丢失"""
+    def respond_while_user_writes():
+        manager.add_user_message("压缩期间的新消息", session_id=session_id)
+        return ['{"summary": "摘要", "key_decisions": []}']
+
+    manager, compressor = _make_compressor(tmp_path, [respond_while_user_writes])
+    session_id = manager.create_new_session("in-flight")
+    _add_turns(manager, session_id, range(4))
+
+    asyncio.run(compressor._execute_compression(session_id))
+
+    messages = manager.dao.get_active_compressed_context(session_id)["compressed_messages"]
+    assert messages[-1]["content"] == "压缩期间的新消息"
+    assert [m["content"][:3] for m in messages[1:-1]] == ["第2轮", "第3轮"]
+
+
+def test_worker_pool_deduplicates_requests_for_same_session(tmp_path):
+    """测试同一会话排队中的重复压缩请求被合并，只执行一次"""
+    manager, compressor = _make_compressor(tmp_path, [['{"summary": "摘要", "key_decisions": []}']])
+    session_id = manager.create_new_session("dedupe")
+    _add_turns(manager, session_id, range(4))
+
+    async def run():
+        await compressor.start()
+        assert compressor._schedule_compression(session_id)
+        assert not compressor._schedule_compression(session_id)
+        await compressor.wait_until_idle()
+        await compressor.stop()
+
+    asyncio.run(run())
+
+    stats = compressor.get_statistics()
+    assert stats["scheduled"] == 1
+    assert stats["deduplicated"] == 1
+    assert stats["completed"] == 1
+    assert stats["queue_depth"] == 0
+
+
+def test_truncated_llm_json_is_repaired(tmp_path):
+    """测试输出被截断或流中途中断时修复JSON并保留已生成的部分"""
+    _, compressor = _make_compressor(tmp_path, [
+        ['{"summary": "部分摘要", "key_decisions": ["决策1", "决策'],
+        ['{"summary": "中断前的摘要", ', ConnectionError("stream reset")]
+    ])
+
+    result, _ = asyncio.run(compressor._stream_llm_json("system", "prompt", 100))
+    assert result["summary"] == "部分摘要"
+    assert result["key_decisions"][0] == "决策1"
+
+    result, _ = asyncio.run(compressor._stream_llm_json("system", "prompt", 100))
+    assert result["summary"] == "中断前的摘要"
+
+    assert compressor.stats["output_repaired"] == 2
+    assert compressor.stats["stream_interrupted"] == 1
+    assert compressor.stats["output_rejected"] == 0
+
+
+def test_unusable_llm_output_is_rejected(tmp_path):
+    """测试无法使用的输出被拒绝，并计入浪费的token"""
+    _, compressor = _make_compressor(tmp_path, [["这不是JSON"], ['{"key_decisions": []}']])
+
+    for _ in range(2):
+        try:
+            asyncio.run(compressor._llm_rolling_summarize("", [], [{"role": "user", "content": "需求"}]))
+            assert False, "无法使用的输出应被拒绝"
+        except CompressionOutputError:
+            pass
+
+    assert compressor.stats["output_rejected"] == 2
+    assert compressor.stats["wasted_llm_tokens"] > 0
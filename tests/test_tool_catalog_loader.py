@@ -0,0 +1,40 @@
+"""
+工具目录加载器解析缓存测试
+"""
+import asyncio
+import datetime
+import json
+import os
+import sys
+
+# 添加项目根目录到 Python 路径
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from agent.utils.tool_catalog_loader import ToolCatalogLoader
+
+
+def test_cache_hit_returns_same_types_and_isolated_copies(tmp_path):
+    """测试含日期的结果不写入缓存文件，缓存命中与未命中返回的类型一致，调用方修改不影响缓存"""
+    dated = tmp_path / "dated.yml"
+    dated.write_text("id: dated\nreleased: 2024-05-01\nexamples:\n  - title: a\n", encoding="utf-8")
+    plain = tmp_path / "plain.yml"
+    plain.write_text("id: plain\nexamples:\n  - title: b\n", encoding="utf-8")
+    files = [str(dated), str(plain)]
+    cache_path = str(tmp_path / "cache" / "tool_parse_cache.json")
+
+    loader = ToolCatalogLoader(cache_path=cache_path)
+    first, _ = asyncio.run(loader.load(files))
+    first[1][1]["examples"][0]["title"] = "被调用方修改"
+    second, _ = asyncio.run(loader.load(files))
+
+    # 新的加载器从缓存文件读取：不能原样往返的结果重新解析
+    reloaded, _ = asyncio.run(ToolCatalogLoader(cache_path=cache_path).load(files))
+
+    with open(cache_path, encoding="utf-8") as f:
+        entries = json.load(f)["entries"]
+    assert [data["id"] for data in entries.values()] == ["plain"]
+
+    for loaded in (first, second, reloaded):
+        assert loaded[0][1]["released"] == datetime.date(2024, 5, 1)
+    assert second[1][1]["examples"][0]["title"] == "b"
+    assert reloaded[1][1] == second[1][1]
@@ -0,0 +1,95 @@
+"""
+向量服务客户端熔断器测试（使用本地aiohttp服务，不需要真实的向量服务）
+"""
+import asyncio
+import os
+import sys
+
+from aiohttp import web
+
+# 添加项目根目录到 Python 路径
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from agent.utils.http_session import close_http_sessions
+from agent.utils.vector_service_client import VectorServiceClient, CircuitOpenError, DeleteNotSupportedError
+
+
+async def _start_service():
+    async def fail(request):
+        return web.Response(status=500, text="error")
+
+    async def slow(request):
+        await asyncio.sleep(5)
+        return web.json_response({"ok": True})
+
+    async def ok(request):
+        return web.json_response({"ok": True})
+
+    app = web.Application()
+    app.router.add_route("*", "/fail", fail)
+    app.router.add_route("*", "/slow", slow)
+    app.router.add_route("*", "/ok", ok)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+    return runner, f"http://127.0.0.1:{port}"
+
+
+def test_cancelled_half_open_trial_releases_circuit():
+    """测试半开状态下的试探请求被取消后，下一个请求可以继续试探，熔断器不会一直拒绝"""
+    async def run():
+        runner, base_url = await _start_service()
+        try:
+            client = VectorServiceClient(base_url, failure_threshold=1, recovery_timeout=0.05)
+            await client.request("GET", "/fail")
+            assert client.circuit_state == "open"
+            try:
+                await client.request("GET", "/ok")
+                assert False, "熔断器打开时请求应被拒绝"
+            except CircuitOpenError:
+                pass
+
+            await asyncio.sleep(0.1)
+            assert client.circuit_state == "half_open"
+            trial = asyncio.create_task(client.request("GET", "/slow"))
+            await asyncio.sleep(0.1)
+            trial.cancel()
+            try:
+                await trial
+            except asyncio.CancelledError:
+                pass
+
+            response = await client.request("GET", "/ok")
+            assert response.status_code == 200
+            assert client.circuit_state == "closed"
+            assert client.stats["rejected"] == 1
+        finally:
+            await close_http_sessions()
+            await runner.cleanup()
+
+    asyncio.run(run())
+
+
+def test_unsupported_delete_is_detected_once():
+    """测试服务没有按id删除接口时第一次删除即探测出来，之后不再发送删除请求"""
+    async def run():
+        runner, base_url = await _start_service()
+        try:
+            client = VectorServiceClient(base_url)
+            for _ in range(2):
+                try:
+                    await client.delete_documents("tools", ["a", "b"])
+                    assert False, "服务不支持删除时应抛出DeleteNotSupportedError"
+                except DeleteNotSupportedError:
+                    pass
+
+            assert client.delete_supported is False
+            assert client.stats["requests"] == 1
+            assert client.get_stats()["delete_supported"] is False
+        finally:
+            await close_http_sessions()
+            await runner.cleanup()
+
+    asyncio.run(run())
@@ -0,0 +1,86 @@
+"""
+网页磁盘缓存测试
+"""
+import asyncio
+import sys
+import os
+
+# 添加项目根目录到 Python 路径
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from agent.utils.web_cache import WebCache, make_cache_key
+from agent.utils.http_session import close_http_sessions
+
+
+def test_web_cache_evicts_least_recently_used_by_size(tmp_path):
+    """测试超出字节上限时淘汰最久未访问的条目，且跨实例持久化"""
+    db_path = str(tmp_path / "web_cache.db")
+    cache = WebCache(db_path, max_bytes=1000, ttls={"search": 60})
+
+    for i in range(30):
+        cache.put("search", make_cache_key("q", i), {"code": 200, "data": "x" * 50})
+        # 第一个条目一直被访问，不应被淘汰
+        assert cache.get("search", make_cache_key("q", 0)) is not None
+
+    stats = cache.get_stats()
+    assert stats["total_bytes"] <= 1000
+    assert stats["evictions"] > 0
+    assert cache.get("search", make_cache_key("q", 1)) is None
+    cache.close()
+
+    reopened = WebCache(db_path, max_bytes=1000, ttls={"search": 60})
+    entry = reopened.get("search", make_cache_key("q", 29))
+    assert entry.fresh and entry.value["data"] == "x" * 50
+    reopened.close()
+
+
+def test_web_cache_serves_stale_entry_when_upstream_fails(tmp_path):
+    """测试过期条目在上游请求失败时仍被返回，刷新后重新变为未过期"""
+    cache = WebCache(str(tmp_path / "web_cache.db"))
+    cache.put("reader", "page", {"code": 200, "data": {"content": "旧内容"}}, etag='"v1"', ttl=0)
+
+    entry = cache.get("reader", "page")
+    assert not entry.fresh
+    assert entry.revalidation_headers() == {"If-None-Match": '"v1"'}
+
+    async def fetch():
+        try:
+            # 没有服务监听的端口，请求必然失败
+            return await cache.fetch_json("reader", "page", "http://127.0.0.1:9/page")
+        finally:
+            await close_http_sessions()
+
+    assert asyncio.run(fetch())["data"]["content"] == "旧内容"
+    assert cache.stats["stale_served"] == 1
+
+    cache.refresh("reader", "page", ttl=60)
+    assert cache.get("reader", "page").fresh
+    cache.close()
+
+
+def test_web_cache_hits_do_not_consume_rate_limit(tmp_path):
+    """测试未过期的缓存命中直接返回，不占用上游请求的限流配额"""
+    from agent.utils.rate_limiter import AsyncRateLimiter
+
+    cache = WebCache(str(tmp_path / "web_cache.db"))
+    cache.put("search", "fresh", {"code": 200, "data": ["缓存结果"]}, ttl=60)
+    limiter = AsyncRateLimiter(requests_per_second=1, burst=1, max_concurrency=1)
+
+    async def fetch():
+        try:
+            results = [await cache.fetch_json("search", "fresh", "http://127.0.0.1:9/search",
+                                              rate_limiter=limiter) for _ in range(5)]
+            try:
+                await cache.fetch_json("search", "missing", "http://127.0.0.1:9/search", rate_limiter=limiter)
+            except Exception:
+                pass
+            return results
+        finally:
+            await close_http_sessions()
+
+    results = asyncio.run(fetch())
+    assert all(result["data"] == ["缓存结果"] for result in results)
+    # 只有未命中的请求经过限流器
+    assert limiter.stats["acquired"] == 1
+    assert limiter.stats["throttled"] == 0
+    cache.close()
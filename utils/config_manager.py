@@ -193,6 +193,30 @@ class MultilingualConfig:
 
         return None
 
+    def get_jina_base_urls(self) -> Dict[str, str]:
+        """Get Jina search and reader endpoints (point them at a local service for offline benchmarks).
+
+        Returns:
+            Dictionary containing search_base_url and web_base_url
+        """
+        config = {}
+
+        # Try dynaconf settings first
+        if self._settings:
+            try:
+                config.update({
+                    "search_base_url": self._settings.get("jina.search_base_url"),
+                    "web_base_url": self._settings.get("jina.web_base_url")
+                })
+            except Exception as e:
+                logger.warning(f"Error reading Jina endpoints from settings: {e}")
+
+        # Environment variables have higher priority than settings.toml
+        return {
+            "search_base_url": os.getenv("JINA_SEARCH_BASE_URL") or config.get("search_base_url") or "https://s.jina.ai/",
+            "web_base_url": os.getenv("JINA_WEB_BASE_URL") or config.get("web_base_url") or "https://r.jina.ai/"
+        }
+
     def get_llm_config(self) -> Dict[str, Any]:
         """Get LLM configuration.
 
@@ -207,7 +231,8 @@ class MultilingualConfig:
                 config.update({
                     "api_key": self._settings.get("llm.api_key"),
                     "base_url": self._settings.get("llm.base_url"),
-                    "model": self._settings.get("llm.model")
+                    "model": self._settings.get("llm.model"),
+                    "context_window": self._settings.get("llm.context_window")
                 })
             except Exception as e:
                 logger.warning(f"Error reading LLM config from settings: {e}")
@@ -216,7 +241,10 @@ class MultilingualConfig:
         config.update({
             "api_key": config.get("api_key") or os.getenv("LLM_API_KEY"),
             "base_url": config.get("base_url") or os.getenv("LLM_BASE_URL"),
-            "model": config.get("model") or os.getenv("LLM_MODEL")
+            "model": config.get("model") or os.getenv("LLM_MODEL"),
+            "context_window": int(
+                os.getenv("LLM_CONTEXT_WINDOW") or config.get("context_window") or 128000
+            )
         })
 
         return {k: v for k, v in config.items() if v is not None}
@@ -236,7 +264,11 @@ class MultilingualConfig:
                     "base_url": self._settings.get("vector_service.base_url"),
                     "timeout": self._settings.get("vector_service.timeout", 30),
                     "tools_index_name": self._settings.get("vector_service.tools_index_name", "tools_index"),
-                    "vector_field": self._settings.get("vector_service.vector_field", "combined_text")
+                    "vector_field": self._settings.get("vector_service.vector_field", "combined_text"),
+                    "tools_index_manifest": self._settings.get("vector_service.tools_index_manifest"),
+                    "health_cache_ttl": self._settings.get("vector_service.health_cache_ttl", 30),
+                    "circuit_failure_threshold": self._settings.get("vector_service.circuit_failure_threshold", 3),
+                    "circuit_recovery_timeout": self._settings.get("vector_service.circuit_recovery_timeout", 30)
                 })
             except Exception as e:
                 logger.warning(f"Error reading vector service config from settings: {e}")
@@ -246,11 +278,217 @@ class MultilingualConfig:
             "base_url": os.getenv("VECTOR_SERVICE_BASE_URL") or os.getenv("GTPLANNER_VECTOR_SERVICE_BASE_URL") or config.get("base_url"),
             "timeout": int(os.getenv("VECTOR_SERVICE_TIMEOUT") or config.get("timeout", 30)),
             "tools_index_name": os.getenv("VECTOR_SERVICE_INDEX_NAME") or config.get("tools_index_name", "tools_index"),
-            "vector_field": os.getenv("VECTOR_SERVICE_VECTOR_FIELD") or config.get("vector_field", "combined_text")
+            "vector_field": os.getenv("VECTOR_SERVICE_VECTOR_FIELD") or config.get("vector_field", "combined_text"),
+            "tools_index_manifest": (
+                os.getenv("VECTOR_SERVICE_INDEX_MANIFEST") or config.get("tools_index_manifest")
+                or ".gtplanner_cache/tool_index_manifest.json"
+            ),
+            "health_cache_ttl": float(os.getenv("VECTOR_SERVICE_HEALTH_CACHE_TTL") or config.get("health_cache_ttl", 30)),
+            "circuit_failure_threshold": int(
+                os.getenv("VECTOR_SERVICE_CIRCUIT_FAILURE_THRESHOLD") or config.get("circuit_failure_threshold", 3)
+            ),
+            "circuit_recovery_timeout": float(
+                os.getenv("VECTOR_SERVICE_CIRCUIT_RECOVERY_TIMEOUT") or config.get("circuit_recovery_timeout", 30)
+            )
         })
 
         return {k: v for k, v in config.items() if v is not None}
 
+    def get_http_config(self) -> Dict[str, Any]:
+        """Get shared HTTP session configuration (used by the Jina clients).
+
+        Returns:
+            Dictionary containing connection pool configuration
+        """
+        config = {}
+
+        # Try dynaconf settings first
+        if self._settings:
+            try:
+                config.update({
+                    "pool_limit": self._settings.get("http.pool_limit", 100),
+                    "limit_per_host": self._settings.get("http.limit_per_host", 20),
+                    "keepalive_timeout": self._settings.get("http.keepalive_timeout", 30),
+                    "dns_cache_ttl": self._settings.get("http.dns_cache_ttl", 300)
+                })
+            except Exception as e:
+                logger.warning(f"Error reading HTTP config from settings: {e}")
+
+        # Environment variables have higher priority than settings.toml
+        config.update({
+            "pool_limit": int(os.getenv("HTTP_POOL_LIMIT") or config.get("pool_limit", 100)),
+            "limit_per_host": int(os.getenv("HTTP_LIMIT_PER_HOST") or config.get("limit_per_host", 20)),
+            "keepalive_timeout": float(os.getenv("HTTP_KEEPALIVE_TIMEOUT") or config.get("keepalive_timeout", 30)),
+            "dns_cache_ttl": int(os.getenv("HTTP_DNS_CACHE_TTL") or config.get("dns_cache_ttl", 300))
+        })
+
+        return config
+
+    def get_search_config(self) -> Dict[str, Any]:
+        """Get web search rate limit configuration (used by JinaSearchClient).
+
+        Returns:
+            Dictionary containing rate limit and concurrency configuration
+        """
+        config = {}
+
+        # Try dynaconf settings first
+        if self._settings:
+            try:
+                config.update({
+                    "requests_per_second": self._settings.get("search.requests_per_second", 2.0),
+                    "burst": self._settings.get("search.burst", 2),
+                    "max_concurrency": self._settings.get("search.max_concurrency", 3)
+                })
+            except Exception as e:
+                logger.warning(f"Error reading search config from settings: {e}")
+
+        # Environment variables have higher priority than settings.toml
+        config.update({
+            "requests_per_second": float(os.getenv("SEARCH_REQUESTS_PER_SECOND") or config.get("requests_per_second", 2.0)),
+            "burst": int(os.getenv("SEARCH_BURST") or config.get("burst", 2)),
+            "max_concurrency": int(os.getenv("SEARCH_MAX_CONCURRENCY") or config.get("max_concurrency", 3))
+        })
+
+        return config
+
+    def get_research_config(self) -> Dict[str, Any]:
+        """Get keyword research execution configuration (used by ConcurrentResearchNode and NodeURL).
+
+        Returns:
+            Dictionary containing concurrency, time budget, early completion, URL fetch, deduplication and analysis input configuration
+        """
+        config = {}
+
+        # Try dynaconf settings first
+        if self._settings:
+            try:
+                config.update({
+                    "max_concurrency_per_request": self._settings.get("research.max_concurrency_per_request", 3),
+                    "max_global_concurrency": self._settings.get("research.max_global_concurrency", 6),
+                    "time_budget": self._settings.get("research.time_budget", 180),
+                    "early_stop_results": self._settings.get("research.early_stop_results", 5),
+                    "quality_threshold": self._settings.get("research.quality_threshold", 0.6),
+                    "url_fetch_count": self._settings.get("research.url_fetch_count", 3),
+                    "url_timeout": self._settings.get("research.url_timeout", 8),
+                    "url_deadline": self._settings.get("research.url_deadline", 12),
+                    "url_good_enough_score": self._settings.get("research.url_good_enough_score", 0.7),
+                    "dedup_enabled": self._settings.get("research.dedup_enabled", True),
+                    "dedup_max_distance": self._settings.get("research.dedup_max_distance", 3),
+                    "dedup_similarity": self._settings.get("research.dedup_similarity", 0.8),
+                    "analysis_max_chars": self._settings.get("research.analysis_max_chars", 2000),
+                    "analysis_passage_chars": self._settings.get("research.analysis_passage_chars", 300)
+                })
+            except Exception as e:
+                logger.warning(f"Error reading research config from settings: {e}")
+
+        # Environment variables have higher priority than settings.toml
+        dedup_enabled_env = os.getenv("RESEARCH_DEDUP_ENABLED")
+        config.update({
+            "max_concurrency_per_request": int(os.getenv("RESEARCH_MAX_CONCURRENCY_PER_REQUEST") or config.get("max_concurrency_per_request", 3)),
+            "max_global_concurrency": int(os.getenv("RESEARCH_MAX_GLOBAL_CONCURRENCY") or config.get("max_global_concurrency", 6)),
+            "time_budget": float(os.getenv("RESEARCH_TIME_BUDGET") or config.get("time_budget", 180)),
+            "early_stop_results": int(os.getenv("RESEARCH_EARLY_STOP_RESULTS") or config.get("early_stop_results", 5)),
+            "quality_threshold": float(os.getenv("RESEARCH_QUALITY_THRESHOLD") or config.get("quality_threshold", 0.6)),
+            "url_fetch_count": int(os.getenv("RESEARCH_URL_FETCH_COUNT") or config.get("url_fetch_count", 3)),
+            "url_timeout": float(os.getenv("RESEARCH_URL_TIMEOUT") or config.get("url_timeout", 8)),
+            "url_deadline": float(os.getenv("RESEARCH_URL_DEADLINE") or config.get("url_deadline", 12)),
+            "url_good_enough_score": float(
+                os.getenv("RESEARCH_URL_GOOD_ENOUGH_SCORE") or config.get("url_good_enough_score", 0.7)
+            ),
+            "dedup_enabled": (dedup_enabled_env.lower() in ("true", "1", "yes", "on") if dedup_enabled_env
+                              else config.get("dedup_enabled", True)),
+            "dedup_max_distance": int(os.getenv("RESEARCH_DEDUP_MAX_DISTANCE") or config.get("dedup_max_distance", 3)),
+            "dedup_similarity": float(os.getenv("RESEARCH_DEDUP_SIMILARITY") or config.get("dedup_similarity", 0.8)),
+            "analysis_max_chars": int(os.getenv("RESEARCH_ANALYSIS_MAX_CHARS") or config.get("analysis_max_chars", 2000)),
+            "analysis_passage_chars": int(
+                os.getenv("RESEARCH_ANALYSIS_PASSAGE_CHARS") or config.get("analysis_passage_chars", 300)
+            )
+        })
+
+        return config
+
+    def get_web_cache_config(self) -> Dict[str, Any]:
+        """Get on-disk cache configuration for Jina search results and page markdown.
+
+        Returns:
+            Dictionary containing cache path, size limit and TTL configuration
+        """
+        config = {}
+
+        # Try dynaconf settings first
+        if self._settings:
+            try:
+                config.update({
+                    "enabled": self._settings.get("web_cache.enabled", True),
+                    "path": self._settings.get("web_cache.path", ".gtplanner_cache/web_cache.db"),
+                    "max_bytes": self._settings.get("web_cache.max_bytes", 256 * 1024 * 1024),
+                    "search_ttl": self._settings.get("web_cache.search_ttl", 86400),
+                    "reader_ttl": self._settings.get("web_cache.reader_ttl", 604800)
+                })
+            except Exception as e:
+                logger.warning(f"Error reading web cache config from settings: {e}")
+
+        # Environment variables have higher priority than settings.toml
+        enabled_env = os.getenv("WEB_CACHE_ENABLED")
+        config.update({
+            "enabled": enabled_env.lower() in ("true", "1", "yes", "on") if enabled_env else config.get("enabled", False),
+            "path": os.getenv("WEB_CACHE_PATH") or config.get("path", ".gtplanner_cache/web_cache.db"),
+            "max_bytes": int(os.getenv("WEB_CACHE_MAX_BYTES") or config.get("max_bytes", 256 * 1024 * 1024)),
+            "search_ttl": float(os.getenv("WEB_CACHE_SEARCH_TTL") or config.get("search_ttl", 86400)),
+            "reader_ttl": float(os.getenv("WEB_CACHE_READER_TTL") or config.get("reader_ttl", 604800))
+        })
+
+        return config
+
+    def get_database_maintenance_config(self) -> Dict[str, Any]:
+        """Get session database maintenance (retention and space reclamation) configuration.
+
+        Maintenance is disabled and all limits are 0 (unlimited) by default, so sessions are
+        only purged after an explicit opt-in.
+
+        Returns:
+            Dictionary containing schedule, retention limits and archive configuration
+        """
+        config = {}
+
+        # Try dynaconf settings first
+        if self._settings:
+            try:
+                config.update({
+                    "enabled": self._settings.get("database_maintenance.enabled", False),
+                    "interval_seconds": self._settings.get("database_maintenance.interval_seconds", 3600),
+                    "max_age_days": self._settings.get("database_maintenance.max_age_days", 0),
+                    "max_sessions": self._settings.get("database_maintenance.max_sessions", 0),
+                    "max_db_size_mb": self._settings.get("database_maintenance.max_db_size_mb", 0),
+                    "keep_compressed_versions": self._settings.get("database_maintenance.keep_compressed_versions", 3),
+                    "archive_enabled": self._settings.get("database_maintenance.archive_enabled", True),
+                    "archive_dir": self._settings.get("database_maintenance.archive_dir", "archives")
+                })
+            except Exception as e:
+                logger.warning(f"Error reading database maintenance config from settings: {e}")
+
+        # Environment variables have higher priority than settings.toml
+        enabled_env = os.getenv("DB_MAINTENANCE_ENABLED")
+        archive_env = os.getenv("DB_MAINTENANCE_ARCHIVE_ENABLED")
+        config.update({
+            "enabled": enabled_env.lower() in ("true", "1", "yes", "on") if enabled_env else config.get("enabled", False),
+            "interval_seconds": float(
+                os.getenv("DB_MAINTENANCE_INTERVAL_SECONDS") or config.get("interval_seconds", 3600)
+            ),
+            "max_age_days": int(os.getenv("DB_MAINTENANCE_MAX_AGE_DAYS") or config.get("max_age_days", 0)),
+            "max_sessions": int(os.getenv("DB_MAINTENANCE_MAX_SESSIONS") or config.get("max_sessions", 0)),
+            "max_db_size_mb": float(os.getenv("DB_MAINTENANCE_MAX_DB_SIZE_MB") or config.get("max_db_size_mb", 0)),
+            "keep_compressed_versions": int(
+                os.getenv("DB_MAINTENANCE_KEEP_COMPRESSED_VERSIONS") or config.get("keep_compressed_versions", 3)
+            ),
+            "archive_enabled": (archive_env.lower() in ("true", "1", "yes", "on") if archive_env
+                                else config.get("archive_enabled", True)),
+            "archive_dir": os.getenv("DB_MAINTENANCE_ARCHIVE_DIR") or config.get("archive_dir", "archives")
+        })
+
+        return config
+
     def is_deep_design_docs_enabled(self) -> bool:
         """Check if deep design docs feature is enabled.
 
@@ -374,6 +612,15 @@ def get_jina_api_key() -> Optional[str]:
     return multilingual_config.get_jina_api_key()
 
 
+def get_jina_base_urls() -> Dict[str, str]:
+    """Convenience function to get Jina search and reader endpoints.
+
+    Returns:
+        Dictionary containing search_base_url and web_base_url
+    """
+    return multilingual_config.get_jina_base_urls()
+
+
 def get_llm_config() -> Dict[str, Any]:
     """Convenience function to get LLM configuration.
 
@@ -392,6 +639,51 @@ def get_vector_service_config() -> Dict[str, Any]:
     return multilingual_config.get_vector_service_config()
 
 
+def get_http_config() -> Dict[str, Any]:
+    """Convenience function to get shared HTTP session configuration.
+
+    Returns:
+        Dictionary containing connection pool configuration
+    """
+    return multilingual_config.get_http_config()
+
+
+def get_search_config() -> Dict[str, Any]:
+    """Convenience function to get web search rate limit configuration.
+
+    Returns:
+        Dictionary containing rate limit and concurrency configuration
+    """
+    return multilingual_config.get_search_config()
+
+
+def get_research_config() -> Dict[str, Any]:
+    """Convenience function to get keyword research execution configuration.
+
+    Returns:
+        Dictionary containing concurrency, time budget and early completion configuration
+    """
+    return multilingual_config.get_research_config()
+
+
+def get_web_cache_config() -> Dict[str, Any]:
+    """Convenience function to get on-disk web cache configuration.
+
+    Returns:
+        Dictionary containing cache path, size limit and TTL configuration
+    """
+    return multilingual_config.get_web_cache_config()
+
+
+def get_database_maintenance_config() -> Dict[str, Any]:
+    """Convenience function to get session database maintenance configuration.
+
+    Returns:
+        Dictionary containing schedule, retention limits and archive configuration
+    """
+    return multilingual_config.get_database_maintenance_config()
+
+
 def get_all_config() -> Dict[str, Any]:
     """Convenience function to get all configuration.
 
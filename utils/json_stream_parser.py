@@ -735,14 +735,39 @@ class JSONStreamParser:
         # 清理输入
         json_str = self._clean_json_string(json_str)
 
-        # 尝试修复并解析
-        fixed_json = self._fix_incomplete_json(json_str)
+        # 尝试修复并解析；失败时截断到最后一个完整的元素再修复（最多回退3次）
+        candidate = json_str
+        for _ in range(4):
+            try:
+                return json.loads(self._fix_incomplete_json(candidate))
+            except json.JSONDecodeError:
+                candidate = self._truncate_incomplete_tail(candidate)
+                if not candidate:
+                    break
 
-        try:
-            return json.loads(fixed_json)
-        except json.JSONDecodeError:
-            # 修复失败，尝试提取部分内容
-            return self._extract_partial_json(json_str)
+        # 修复失败，尝试提取部分内容
+        return self._extract_partial_json(json_str)
+
+    def _truncate_incomplete_tail(self, json_str: str) -> str:
+        """截断到最后一个字符串外的逗号之前，丢弃末尾不完整的元素"""
+        in_string = False
+        escape_next = False
+        last_comma = -1
+
+        for index, char in enumerate(json_str):
+            if escape_next:
+                escape_next = False
+                continue
+            if char == '\\':
+                escape_next = True
+                continue
+            if char == '"':
+                in_string = not in_string
+                continue
+            if char == ',' and not in_string:
+                last_comma = index
+
+        return json_str[:last_comma] if last_comma > 0 else ""
 
     def _clean_json_string(self, json_str: str) -> str:
         """清理JSON字符串"""
@@ -798,9 +823,8 @@ class JSONStreamParser:
         return ''.join(result)
 
     def _fix_unclosed_brackets(self, json_str: str) -> str:
-        """修复未闭合的括号"""
-        brace_count = 0
-        bracket_count = 0
+        """修复未闭合的括号（按嵌套顺序逆序闭合，并去掉闭合前多余的逗号）"""
+        stack = []
         in_string = False
         escape_next = False
 
@@ -818,21 +842,17 @@ class JSONStreamParser:
                 continue
 
             if not in_string:
-                if char == '{':
-                    brace_count += 1
-                elif char == '}':
-                    brace_count -= 1
-                elif char == '[':
-                    bracket_count += 1
-                elif char == ']':
-                    bracket_count -= 1
+                if char in '{[':
+                    stack.append('}' if char == '{' else ']')
+                elif char in '}]' and stack:
+                    stack.pop()
 
         # 添加缺失的闭合括号
         result = json_str
-        for _ in range(bracket_count):
-            result += ']'
-        for _ in range(brace_count):
-            result += '}'
+        if stack:
+            result = result.rstrip().rstrip(',')
+        for closer in reversed(stack):
+            result += closer
 
         return result
 